@@ -3,6 +3,7 @@ pragma solidity 0.8.12;
 import "./dependencies/SafeERC20.sol";
 import "./dependencies/Ownable.sol";
 import "./interfaces/IERC20.sol";
+import "./interfaces/IERC20Permit.sol";
 import "./interfaces/dotdot/IEpsProxy.sol";
 import "./interfaces/ellipsis/IFeeDistributor.sol";
 
@@ -258,7 +259,7 @@ contract BondedFeeDistributor is Ownable {
         @param _user Address to deposit tokens for
         @param _amount Amount of dEPX to deposit
      */
-    function deposit(address _user, uint256 _amount) external returns (bool) {
+    function deposit(address _user, uint256 _amount) public returns (bool) {
         if (msg.sender != address(dEPX)) {
             // if the caller is dEPX we trust the balance was updated
             // and skip the transfer
@@ -287,6 +288,29 @@ contract BondedFeeDistributor is Ownable {
         return true;
     }
 
+    /**
+        @notice Bond dEPX, using an EIP-2612 signature in place of a prior approval
+        @dev The permit is given for exactly `_amount`. If the permit was already
+             used, the call succeeds as long as the allowance is sufficient.
+        @param _user Address to deposit tokens for
+        @param _amount Amount of dEPX to deposit
+        @param _deadline Deadline given within the signed permit
+     */
+    function depositWithPermit(
+        address _user,
+        uint256 _amount,
+        uint256 _deadline,
+        uint8 _v,
+        bytes32 _r,
+        bytes32 _s
+    ) external returns (bool) {
+        try IERC20Permit(address(dEPX)).permit(msg.sender, address(this), _amount, _deadline, _v, _r, _s) {} catch {
+            // the permit may already have been submitted by someone else
+            require(dEPX.allowance(msg.sender, address(this)) >= _amount, "Permit failed");
+        }
+        return deposit(_user, _amount);
+    }
+
     /**
         @notice Initiate an unbonding stream, allowing withdrawal of bonded tokens over the
                 unbonding duration.
@@ -1,5 +1,6 @@
 pragma solidity 0.8.12;
 
+import "./dependencies/MerkleProof.sol";
 import "./dependencies/Ownable.sol";
 import "./dependencies/SafeERC20.sol";
 import "./interfaces/IERC20.sol";
@@ -40,6 +41,24 @@ contract DddIncentiveDistributor is Ownable {
     ITokenLocker public dddLocker;
     IDotDotVoting public dddVoter;
 
+    // lp token bribes deposited from `merkleStartWeek` onward are distributed via
+    // merkle roots instead of `claim`. Disabled unless set with `setMerkleMode`.
+    uint256 public merkleStartWeek = type(uint256).max;
+    address public merkleRootSetter;
+    // root of a tree of the cumulative bribes earned by each voter, across all
+    // lp tokens, from `merkleStartWeek` up to and including `merkleRootWeek`
+    bytes32 public merkleRoot;
+    uint256 public merkleRootWeek;
+    // set once a claim is paid under the current root. Until then, the root for
+    // `merkleRootWeek` may be replaced to correct it.
+    bool public merkleRootClaimed;
+    // user -> bribe token -> cumulative amount claimed via merkle proofs
+    mapping(address => mapping(address => uint256)) public merkleClaimed;
+    // bribe token -> total amount deposited and claimed in merkle mode, so that
+    // merkle claims can never pay out fees or bribes from before `merkleStartWeek`
+    mapping(address => uint256) public merkleIncentiveTotal;
+    mapping(address => uint256) public merkleClaimedTotal;
+
     // depending on the situation, this contract tracks weeks using
     // the periods from `TokenLocker` (starting Monday 00:00:00 UTC)
     // and `DotDotVoting` (starting Thursday 00:00:00 UTC)
@@ -63,6 +82,21 @@ contract DddIncentiveDistributor is Ownable {
         address indexed token,
         uint256 amount
     );
+    event MerkleModeSet(
+        address rootSetter,
+        uint256 startWeek
+    );
+    event MerkleRootSet(
+        bytes32 merkleRoot,
+        uint256 week
+    );
+    event MerkleIncentiveClaimed(
+        address caller,
+        address indexed account,
+        address receiver,
+        address indexed token,
+        uint256 amount
+    );
 
     constructor(IIncentiveVoting _epsVoter) {
         epsVoter = _epsVoter;
@@ -71,6 +105,54 @@ contract DddIncentiveDistributor is Ownable {
         lockingStartTime = start - 86400 * 3;
     }
 
+    /**
+        @notice Distribute lp token bribes via merkle roots, starting from `_startWeek`
+        @dev Only callable prior to `setAddresses`, which renounces ownership. Bribes
+             deposited before `_startWeek` remain claimable via `claim`. Fees for all
+             token lockers are unaffected.
+        @param _rootSetter Address allowed to publish merkle roots
+        @param _startWeek First voting week where bribes are distributed via merkle roots
+     */
+    function setMerkleMode(address _rootSetter, uint256 _startWeek) external onlyOwner {
+        require(_rootSetter != address(0), "Invalid root setter");
+        require(_startWeek >= getVotingWeek(), "Cannot start in a past week");
+        merkleRootSetter = _rootSetter;
+        merkleStartWeek = _startWeek;
+        emit MerkleModeSet(_rootSetter, _startWeek);
+    }
+
+    /**
+        @notice Transfer the ability to publish merkle roots to another address
+        @param _rootSetter New root setter
+     */
+    function setMerkleRootSetter(address _rootSetter) external {
+        require(msg.sender == merkleRootSetter, "Only root setter");
+        require(_rootSetter != address(0), "Invalid root setter");
+        merkleRootSetter = _rootSetter;
+    }
+
+    /**
+        @notice Publish the merkle root for bribes up to and including `_week`
+        @dev See `scripts/bribe_merkle.py` for generating the tree
+        @param _merkleRoot Root of a tree where each leaf is
+                           `keccak256(abi.encode(user, tokens, cumulativeAmounts))`
+        @param _week Last voting week included in the tree. Must have ended. May be
+                     the same as `merkleRootWeek` if no claims are paid under
+                     the current root.
+     */
+    function setMerkleRoot(bytes32 _merkleRoot, uint256 _week) external {
+        require(msg.sender == merkleRootSetter, "Only root setter");
+        require(_week >= merkleStartWeek && _week < getVotingWeek(), "Invalid week");
+        require(
+            merkleRoot == bytes32(0) || _week > merkleRootWeek || (_week == merkleRootWeek && !merkleRootClaimed),
+            "Week already published"
+        );
+        merkleRoot = _merkleRoot;
+        merkleRootWeek = _week;
+        merkleRootClaimed = false;
+        emit MerkleRootSet(_merkleRoot, _week);
+    }
+
     function setAddresses(ITokenLocker _dddLocker, IDotDotVoting _dddVoter) external onlyOwner {
         dddLocker = _dddLocker;
         dddVoter = _dddVoter;
@@ -128,6 +210,9 @@ contract DddIncentiveDistributor is Ownable {
             received = IERC20(_incentive).balanceOf(address(this)) - received;
             uint256 week = _lpToken == address(0) ? getLockingWeek() : getVotingWeek();
             weeklyIncentiveAmounts[_lpToken][_incentive][week] += received;
+            if (_lpToken != address(0) && week >= merkleStartWeek) {
+                merkleIncentiveTotal[_incentive] += received;
+            }
             emit IncentiveReceived(msg.sender, _lpToken, _incentive, week, received);
         }
         return true;
@@ -181,6 +266,54 @@ contract DddIncentiveDistributor is Ownable {
         return claimedAmounts;
     }
 
+    /**
+        @notice Claim lp token bribes distributed via merkle root
+        @dev Each leaf holds the cumulative amounts earned by `_user`, across all lp
+             tokens and weeks, so a single proof covers every bribe. Only the
+             amounts not yet claimed are transferred. If a corrected root lowers
+             a cumulative amount below what was already claimed, nothing is
+             transferred for that token.
+        @param _user Address to claim for
+        @param _tokens Array of bribe tokens, as given in the merkle tree
+        @param _cumulativeAmounts Cumulative amount of each token, as given in the merkle tree
+        @param _proof Merkle proof for the leaf
+        @return claimedAmounts Array of amounts claimed
+     */
+    function claimMerkle(
+        address _user,
+        address[] calldata _tokens,
+        uint256[] calldata _cumulativeAmounts,
+        bytes32[] calldata _proof
+    ) external returns (uint256[] memory claimedAmounts) {
+        if (msg.sender != _user) {
+            require(!blockThirdPartyActions[_user], "Cannot claim on behalf of this account");
+        }
+        require(_tokens.length == _cumulativeAmounts.length, "Input length mismatch");
+        bytes32 leaf = keccak256(abi.encode(_user, _tokens, _cumulativeAmounts));
+        require(MerkleProof.verify(_proof, merkleRoot, leaf), "Invalid proof");
+
+        address receiver = claimReceiver[_user];
+        if (receiver == address(0)) receiver = _user;
+        claimedAmounts = new uint256[](_tokens.length);
+        bool claimed;
+        for (uint256 i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            uint256 claimedAmount = merkleClaimed[_user][token];
+            if (_cumulativeAmounts[i] <= claimedAmount) continue;
+            uint256 amount = _cumulativeAmounts[i] - claimedAmount;
+            merkleClaimed[_user][token] = _cumulativeAmounts[i];
+            uint256 claimedTotal = merkleClaimedTotal[token] + amount;
+            require(claimedTotal <= merkleIncentiveTotal[token], "Exceeds merkle incentives");
+            merkleClaimedTotal[token] = claimedTotal;
+            claimedAmounts[i] = amount;
+            IERC20(token).safeTransfer(receiver, amount);
+            emit MerkleIncentiveClaimed(msg.sender, _user, receiver, token, amount);
+            claimed = true;
+        }
+        if (claimed && !merkleRootClaimed) merkleRootClaimed = true;
+        return claimedAmounts;
+    }
+
     function _getClaimable(address _user, address _lpToken, address _token)
         internal
         view
@@ -197,6 +330,9 @@ contract DddIncentiveDistributor is Ownable {
         // the previous week is the claimable one
         claimableWeek -= 1;
         StreamData memory stream = activeUserStream[_user][_lpToken][_token];
+        if (_lpToken != address(0) && claimableWeek >= merkleStartWeek) {
+            return _getFinalClaimable(_user, _lpToken, _token, stream, start);
+        }
         uint256 lastClaimWeek;
         if (stream.start == 0) {
             lastClaimWeek = 0;
@@ -233,6 +369,36 @@ contract DddIncentiveDistributor is Ownable {
         return (amount + stream.claimed, stream);
     }
 
+    /**
+        @dev Claimable bribes once every week prior to `merkleStartWeek` has been
+             fully streamed. Later weeks are distributed via merkle roots.
+     */
+    function _getFinalClaimable(
+        address _user,
+        address _lpToken,
+        address _token,
+        StreamData memory _stream,
+        uint256 _start
+    ) internal view returns (uint256, StreamData memory) {
+        uint256 endWeek = merkleStartWeek;
+        if (endWeek == 0) return (0, _stream);
+
+        uint256 amount;
+        uint256 firstWeek;
+        if (_stream.start > 0) {
+            amount = _stream.amount - _stream.claimed;
+            firstWeek = (_stream.start - _start) / WEEK + 1;
+        }
+        for (uint256 i = firstWeek; i < endWeek; i++) {
+            (uint256 userWeight, uint256 totalWeight) = _getWeights(_user, _lpToken, i);
+            if (userWeight == 0) continue;
+            amount += weeklyIncentiveAmounts[_lpToken][_token][i] * userWeight / totalWeight;
+        }
+
+        // mark every week prior to `merkleStartWeek` as fully claimed
+        return (amount, StreamData({start: _start + (endWeek - 1) * WEEK, amount: 0, claimed: 0}));
+    }
+
     function _buildStreamData(
         address _user,
         address _lpToken,
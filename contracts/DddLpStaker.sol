@@ -2,6 +2,7 @@ pragma solidity 0.8.12;
 
 import "./dependencies/Ownable.sol";
 import "./interfaces/IERC20.sol";
+import "./interfaces/IERC20Permit.sol";
 import "./interfaces/dotdot/IDddToken.sol";
 
 
@@ -170,7 +171,7 @@ contract DddLpStaker is Ownable {
         @param claim If true, also claims any pending rewards. Cannot be true when
                      the caller is not the receiver.
      */
-    function deposit(address receiver, uint256 amount, bool claim) external {
+    function deposit(address receiver, uint256 amount, bool claim) public {
         if (claim) require (msg.sender == receiver, "Cannot trigger claim for another user");
         require(amount > 0, "Cannot stake 0");
 
@@ -210,6 +211,33 @@ contract DddLpStaker is Ownable {
         emit Deposited(msg.sender, receiver, amount, feeAmount);
     }
 
+    /**
+        @notice Deposit LP tokens, using an EIP-2612 signature in place of a prior approval
+        @dev The permit is given for exactly `amount`. The staking token is a PancakeSwap
+             LP token, which supports EIP-2612 permits. If the permit was already
+             used, the call succeeds as long as the allowance is sufficient.
+        @param receiver Address to credit for the deposit
+        @param amount Amount to deposit (inclusive of fee)
+        @param claim If true, also claims any pending rewards. Cannot be true when
+                     the caller is not the receiver.
+        @param deadline Deadline given within the signed permit
+     */
+    function depositWithPermit(
+        address receiver,
+        uint256 amount,
+        bool claim,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    ) external {
+        try IERC20Permit(address(stakingToken)).permit(msg.sender, address(this), amount, deadline, v, r, s) {} catch {
+            // the permit may already have been submitted by someone else
+            require(stakingToken.allowance(msg.sender, address(this)) >= amount, "Permit failed");
+        }
+        deposit(receiver, amount, claim);
+    }
+
     /**
         @notice Withdraw LP tokens
         @dev `amount` is the total amount to deduct from the caller's balance,
@@ -2,9 +2,10 @@ pragma solidity 0.8.12;
 
 import "./dependencies/Ownable.sol";
 import "./interfaces/IERC20.sol";
+import "./dependencies/ERC20Permit.sol";
 
 
-contract DotDot is IERC20, Ownable {
+contract DotDot is IERC20, ERC20Permit, Ownable {
 
     string public constant name = "DotDot";
     string public constant symbol = "DDD";
@@ -14,6 +15,7 @@ contract DotDot is IERC20, Ownable {
     mapping(address => uint256) public override balanceOf;
     mapping(address => mapping(address => uint256)) public override allowance;
     mapping(address => bool) public minters;
+    mapping(address => uint256) public override nonces;
 
     event MintersSet(address[] minters);
 
@@ -43,11 +45,23 @@ contract DotDot is IERC20, Ownable {
     }
 
     function approve(address _spender, uint256 _value) external override returns (bool) {
-        allowance[msg.sender][_spender] = _value;
-        emit Approval(msg.sender, _spender, _value);
+        _approve(msg.sender, _spender, _value);
         return true;
     }
 
+    function _domainName() internal view override returns (string memory) {
+        return name;
+    }
+
+    function _useNonce(address _owner) internal override returns (uint256) {
+        return nonces[_owner]++;
+    }
+
+    function _approve(address _owner, address _spender, uint256 _value) internal override {
+        allowance[_owner][_spender] = _value;
+        emit Approval(_owner, _spender, _value);
+    }
+
     /** shared logic for transfer and transferFrom */
     function _transfer(address _from, address _to, uint256 _value) internal {
         require(balanceOf[_from] >= _value, "Insufficient balance");
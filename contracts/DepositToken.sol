@@ -1,57 +1,89 @@
 pragma solidity 0.8.12;
 
 import "./interfaces/IERC20.sol";
+import "./dependencies/ERC20Permit.sol";
 import "./interfaces/dotdot/ILpDepositor.sol";
+import "./dependencies/Clone.sol";
 
 
-contract DepositToken is IERC20 {
+/**
+    @dev Deployed by `LpDepositor` as a clone with immutable args. The address of
+         `LpDepositor` and the related LP token are appended to the bytecode of
+         each clone, see `ClonesWithImmutableArgs` for more information.
+ */
+contract DepositToken is IERC20, ERC20Permit, Clone {
 
-    string public name;
-    string public symbol;
     uint8 public constant decimals = 18;
 
     mapping(address => mapping(address => uint256)) public override allowance;
+    mapping(address => uint256) public override nonces;
 
-    ILpDepositor public depositor;
-    address public pool;
+    /**
+        @notice The `LpDepositor` contract that deployed this token
+     */
+    function depositor() public pure returns (ILpDepositor) {
+        return ILpDepositor(_getArgAddress(0));
+    }
 
-    constructor() {
-        // set to prevent the implementation contract from being initialized
-        pool = address(0xdead);
+    /**
+        @notice The Ellipsis LP token that this token represents deposits of
+     */
+    function pool() public pure returns (address) {
+        return _getArgAddress(20);
     }
 
     /**
-        @dev Initializes the contract after deployment via a minimal proxy
+        @dev Only callable by `LpDepositor`, when the clone is deployed. Emits a
+             zero-value `Transfer` so that block explorers discover the token.
      */
-    function initialize(address _pool) external returns (bool) {
-        require(pool == address(0));
-        pool = _pool;
-        depositor = ILpDepositor(msg.sender);
-        string memory _symbol = IERC20(pool).symbol();
-        name = string(abi.encodePacked("Solidex ", _symbol, " Deposit"));
-        symbol = string(abi.encodePacked("sex-", _symbol));
+    function initialize() external returns (bool) {
+        require(msg.sender == address(depositor()));
         emit Transfer(address(0), msg.sender, 0);
         return true;
     }
 
+    /**
+        @dev The name and symbol are not stored. Each read, including the
+             EIP-712 domain used by `permit`, makes a call to `pool().symbol()`.
+     */
+    function name() public view returns (string memory) {
+        return string(abi.encodePacked("Solidex ", IERC20(pool()).symbol(), " Deposit"));
+    }
+
+    function symbol() external view returns (string memory) {
+        return string(abi.encodePacked("sex-", IERC20(pool()).symbol()));
+    }
+
     function balanceOf(address account) external view returns (uint256) {
-        return depositor.userBalances(account, pool);
+        return depositor().userBalances(account, pool());
     }
 
     function totalSupply() external view returns (uint256) {
-        return depositor.totalBalances(pool);
+        return depositor().totalBalances(pool());
     }
 
     function approve(address _spender, uint256 _value) external override returns (bool) {
-        allowance[msg.sender][_spender] = _value;
-        emit Approval(msg.sender, _spender, _value);
+        _approve(msg.sender, _spender, _value);
         return true;
     }
 
+    function _domainName() internal view override returns (string memory) {
+        return name();
+    }
+
+    function _useNonce(address _owner) internal override returns (uint256) {
+        return nonces[_owner]++;
+    }
+
+    function _approve(address _owner, address _spender, uint256 _value) internal override {
+        allowance[_owner][_spender] = _value;
+        emit Approval(_owner, _spender, _value);
+    }
+
     /** shared logic for transfer and transferFrom */
     function _transfer(address _from, address _to, uint256 _value) internal {
         if (_value > 0) {
-            depositor.transferDeposit(pool, _from, _to, _value);
+            depositor().transferDeposit(pool(), _from, _to, _value);
         }
         emit Transfer(_from, _to, _value);
     }
@@ -96,7 +128,7 @@ contract DepositToken is IERC20 {
              upon deposit of LP tokens, to aid accounting in block explorers.
      */
     function mint(address _to, uint256 _value) external returns (bool) {
-        require(msg.sender == address(depositor));
+        require(msg.sender == address(depositor()));
         emit Transfer(address(0), _to, _value);
         return true;
     }
@@ -106,7 +138,7 @@ contract DepositToken is IERC20 {
              upon withdrawal of LP tokens, to aid accounting in block explorers.
      */
     function burn(address _from, uint256 _value) external returns (bool) {
-        require(msg.sender == address(depositor));
+        require(msg.sender == address(depositor()));
         emit Transfer(_from, address(0), _value);
         return true;
     }
@@ -2,42 +2,110 @@ pragma solidity 0.8.12;
 
 import "./interfaces/IERC20.sol";
 import "./dependencies/SafeERC20.sol";
+import "./dependencies/MerkleProof.sol";
 import "./interfaces/dotdot/ILpDepositor.sol";
+import "./interfaces/dotdot/IEpsProxy.sol";
+import "./dependencies/Clone.sol";
 
 /**
     @dev Redistributes LP tokens to depositors in the event of an emergency
-        requiring withdrawal from Ellipsis via `LpStaker.emergencyWithdraw`
+        requiring withdrawal from Ellipsis via `LpStaker.emergencyWithdraw`.
+        Deployed by `EllipsisProxy` as a clone with immutable args, the LP token,
+        `LpDepositor` and `EllipsisProxy` addresses are appended to the bytecode
+        of each clone.
  */
-contract EmergencyBailout {
+contract EmergencyBailout is Clone {
     using SafeERC20 for IERC20;
 
-    IERC20 public token;
-    ILpDepositor public lpDepositor;
-
     mapping(address => bool) public hasWithdrawn;
 
+    // root of a merkle tree of (user, amount) for every depositor in the pool,
+    // allowing batched withdrawals via `withdrawMany`
+    bytes32 public merkleRoot;
+    // set once a withdrawal is made via `withdrawMany`. Until then, the root may be
+    // replaced to correct it.
+    bool public merkleRootUsed;
+
     event Withdraw(
         address indexed caller,
         address indexed user,
         uint256 amount
     );
+    event MerkleRootSet(
+        bytes32 merkleRoot
+    );
+
+    function token() public pure returns (IERC20) {
+        return IERC20(_getArgAddress(0));
+    }
+
+    function lpDepositor() public pure returns (ILpDepositor) {
+        return ILpDepositor(_getArgAddress(20));
+    }
+
+    function proxy() public pure returns (IEllipsisProxy) {
+        return IEllipsisProxy(_getArgAddress(40));
+    }
 
     /**
-        @dev Initializes the contract after deployment via a minimal proxy
+        @notice Set the merkle root used for batched withdrawals
+        @dev Only callable by the emergency admin of `EllipsisProxy`. The root may
+             be replaced until the first withdrawal via `withdrawMany`. Users with
+             an incorrect leaf can always withdraw via `withdraw`.
+             Balances within `LpDepositor` are frozen once a bailout is initiated,
+             so the tree can be generated from storage at any later block.
+             See `scripts/bailout.py` for generating the tree.
+        @param _merkleRoot Root of a tree where each leaf is `keccak256(abi.encodePacked(user, amount))`
      */
-    function initialize(IERC20 _token, ILpDepositor _lpDepositor) external returns (bool) {
-        require(address(token) == address(0));
-        token = _token;
-        lpDepositor = _lpDepositor;
-        return true;
+    function setMerkleRoot(bytes32 _merkleRoot) external {
+        require(msg.sender == proxy().emergencyAdmin(), "Only emergency admin");
+        require(!merkleRootUsed, "Root already used");
+        merkleRoot = _merkleRoot;
+        emit MerkleRootSet(_merkleRoot);
     }
 
     function withdraw(address _user) external {
         require(!hasWithdrawn[_user], "Already withdrawn");
         hasWithdrawn[_user] = true;
-        uint256 amount = lpDepositor.userBalances(_user, address(token));
-        token.safeTransfer(_user, amount);
+        IERC20 _token = token();
+        uint256 amount = lpDepositor().userBalances(_user, address(_token));
+        _token.safeTransfer(_user, amount);
         emit Withdraw(msg.sender, _user, amount);
     }
 
+    /**
+        @notice Withdraw on behalf of many users in a single call, using merkle proofs
+        @dev Users who have already withdrawn are skipped, so that a batch cannot be
+             blocked by a single withdrawal made prior to it
+        @param _users List of users to withdraw for
+        @param _amounts Balance of each user, as given in the merkle tree
+        @param _proofs Merkle proof for each user
+     */
+    function withdrawMany(
+        address[] calldata _users,
+        uint256[] calldata _amounts,
+        bytes32[][] calldata _proofs
+    ) external {
+        require(_users.length == _amounts.length && _users.length == _proofs.length, "Input length mismatch");
+        bytes32 root = merkleRoot;
+        require(root != bytes32(0), "Merkle root not set");
+
+        IERC20 _token = token();
+        bool withdrawn;
+        for (uint i = 0; i < _users.length; i++) {
+            address user = _users[i];
+            if (hasWithdrawn[user]) continue;
+
+            uint256 amount = _amounts[i];
+            bytes32 leaf = keccak256(abi.encodePacked(user, amount));
+            require(MerkleProof.verify(_proofs[i], root, leaf), "Invalid proof");
+
+            hasWithdrawn[user] = true;
+            _token.safeTransfer(user, amount);
+            emit Withdraw(msg.sender, user, amount);
+            withdrawn = true;
+        }
+        if (withdrawn && !merkleRootUsed) merkleRootUsed = true;
+    }
+
 }
@@ -2,8 +2,8 @@ pragma solidity 0.8.12;
 
 import "./dependencies/Ownable.sol";
 import "./dependencies/SafeERC20.sol";
+import "./dependencies/ClonesWithImmutableArgs.sol";
 import "./interfaces/IERC20.sol";
-import "./interfaces/dotdot/IEmergencyBailout.sol";
 import "./interfaces/ellipsis/IFeeDistributor.sol";
 import "./interfaces/ellipsis/ILpStaker.sol";
 import "./interfaces/ellipsis/IIncentiveVoting.sol";
@@ -263,18 +263,10 @@ contract EllipsisProxy is Ownable {
         require(msg.sender == emergencyAdmin);
         require(emergencyBailout[lpDepositor][_token] == address(0), "Already initiated");
 
-        bytes20 targetBytes = bytes20(bailoutImplementation);
-        address bailout;
-        assembly {
-            let clone := mload(0x40)
-            mstore(clone, 0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000)
-            mstore(add(clone, 0x14), targetBytes)
-            mstore(add(clone, 0x28), 0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000)
-            bailout := create(0, clone, 0x37)
-        }
+        bytes memory data = abi.encodePacked(_token, lpDepositor, address(this));
+        address bailout = ClonesWithImmutableArgs.clone(bailoutImplementation, data, 0);
         emergencyBailout[lpDepositor][_token] = bailout;
 
-        IEmergencyBailout(bailout).initialize(_token, lpDepositor);
         lpStaker.emergencyWithdraw(_token);
 
         uint256 amount = IERC20(_token).balanceOf(address(this));
@@ -2,12 +2,13 @@ pragma solidity 0.8.12;
 
 import "./dependencies/Ownable.sol";
 import "./interfaces/IERC20.sol";
+import "./dependencies/ERC20Permit.sol";
 import "./interfaces/dotdot/IBondedFeeDistributor.sol";
 import "./interfaces/dotdot/IEpsProxy.sol";
 import "./interfaces/ellipsis/ITokenLocker.sol";
 
 
-contract LockedEPX is IERC20, Ownable {
+contract LockedEPX is IERC20, ERC20Permit, Ownable {
 
     string public constant symbol = "dEPX";
     string public constant name = "DotDot Tokenized EPX Lock";
@@ -28,6 +29,8 @@ contract LockedEPX is IERC20, Ownable {
     uint256 immutable MAX_LOCK_WEEKS;
     uint256 lastLockWeek;
 
+    mapping(address => uint256) public override nonces;
+
     event Deposit(address indexed caller, address indexed receiver, uint256 amount, bool bond);
     event ExtendLocks(uint256 lastLockWeek);
 
@@ -58,11 +61,23 @@ contract LockedEPX is IERC20, Ownable {
     }
 
     function approve(address _spender, uint256 _value) external override returns (bool) {
-        allowance[msg.sender][_spender] = _value;
-        emit Approval(msg.sender, _spender, _value);
+        _approve(msg.sender, _spender, _value);
         return true;
     }
 
+    function _domainName() internal view override returns (string memory) {
+        return name;
+    }
+
+    function _useNonce(address _owner) internal override returns (uint256) {
+        return nonces[_owner]++;
+    }
+
+    function _approve(address _owner, address _spender, uint256 _value) internal override {
+        allowance[_owner][_spender] = _value;
+        emit Approval(_owner, _spender, _value);
+    }
+
     /** shared logic for transfer and transferFrom */
     function _transfer(address _from, address _to, uint256 _value) internal {
         require(balanceOf[_from] >= _value, "Insufficient balance");
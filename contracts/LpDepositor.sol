@@ -2,6 +2,7 @@ pragma solidity 0.8.12;
 
 import "./dependencies/Ownable.sol";
 import "./dependencies/SafeERC20.sol";
+import "./dependencies/ClonesWithImmutableArgs.sol";
 import "./interfaces/IERC20.sol";
 import "./interfaces/dotdot/IEpsProxy.sol";
 import "./interfaces/dotdot/IDepositToken.sol";
@@ -75,6 +76,9 @@ contract LpDepositor is Ownable {
     // user -> pool -> unclaimed reward balances
     mapping(address => mapping(address => mapping(uint256 => uint256))) unclaimedExtraRewards;
 
+    // user -> operator -> is operator approved to claim on behalf of user?
+    mapping(address => mapping(address => bool)) public isApprovedOperator;
+
     event Deposit(
         address indexed caller,
         address indexed receiver,
@@ -99,11 +103,25 @@ contract LpDepositor is Ownable {
         uint256 epxAmount,
         uint256 dddAmount
     );
+    event ClaimedFor(
+        address indexed operator,
+        address indexed user,
+        address indexed receiver,
+        address[] tokens,
+        uint256 epxAmount,
+        uint256 dddAmount
+    );
     event ClaimedExtraRewards(
         address indexed caller,
         address indexed receiver,
         address token
     );
+    event ClaimedExtraRewardsFor(
+        address indexed operator,
+        address indexed user,
+        address indexed receiver,
+        address token
+    );
     event ExtraRewardsUpdated(
         address indexed token,
         address[] rewards
@@ -114,6 +132,11 @@ contract LpDepositor is Ownable {
         address indexed to,
         uint256 amount
     );
+    event OperatorApprovalSet(
+        address indexed user,
+        address indexed operator,
+        bool approved
+    );
 
     constructor(
         IERC20 _EPX,
@@ -157,6 +180,16 @@ contract LpDepositor is Ownable {
         renounceOwnership();
     }
 
+    /**
+        @notice Get the address of the deposit token for `_pool`
+        @dev Deposit tokens are deployed via `CREATE2` on the first deposit of an LP
+             token, so the address is known before the token has been deployed
+     */
+    function getDepositTokenAddress(address _pool) external view returns (address) {
+        bytes memory data = abi.encodePacked(address(this), _pool);
+        return ClonesWithImmutableArgs.predictDeterministicAddress(depositTokenImplementation, data, 0, address(this));
+    }
+
     function extraRewardsLength(address _pool) external view returns (uint256) {
         return extraRewards[_pool].length;
     }
@@ -282,6 +315,53 @@ contract LpDepositor is Ownable {
         emit Claimed(msg.sender, _receiver, _tokens, claims.epx, claims.ddd);
     }
 
+    /**
+        @notice Approve or revoke an operator that may claim rewards on behalf of the caller
+        @dev Operators can only claim via `claimFor` and `claimExtraRewardsFor`, they have
+             no ability to withdraw or transfer deposits
+     */
+    function setOperatorApproval(address _operator, bool _approved) external {
+        isApprovedOperator[msg.sender][_operator] = _approved;
+        emit OperatorApprovalSet(msg.sender, _operator, _approved);
+    }
+
+    /**
+        @notice Claim pending EPX and DDD rewards on behalf of multiple users
+        @dev Each user must have approved the caller via `setOperatorApproval`. Emissions
+             for each pool are only claimed from the proxy once per call, regardless of
+             how many users in the batch have a balance in that pool.
+        @param _users List of users to claim for
+        @param _tokens List of LP tokens to claim for, per user
+        @param _receiver Account to send the combined claimed rewards to
+     */
+    function claimFor(address[] calldata _users, address[][] calldata _tokens, address _receiver) external {
+        require(_users.length == _tokens.length, "Input length mismatch");
+        uint256 count;
+        for (uint i = 0; i < _tokens.length; i++) {
+            count += _tokens[i].length;
+        }
+
+        Amounts memory claims;
+        address[] memory harvested = new address[](count);
+        count = 0;
+        for (uint i = 0; i < _users.length; i++) {
+            address user = _users[i];
+            require(isApprovedOperator[user][msg.sender], "Operator not approved");
+            Amounts memory userClaims;
+            (userClaims, count) = _claimFor(user, _tokens[i], harvested, count);
+            claims.epx += userClaims.epx;
+            claims.ddd += userClaims.ddd;
+            emit ClaimedFor(msg.sender, user, _receiver, _tokens[i], userClaims.epx, userClaims.ddd);
+        }
+        if (claims.epx > 0) {
+            EPX.safeTransfer(_receiver, claims.epx);
+        }
+        if (claims.ddd > 0) {
+            DDD.mint(_receiver, claims.ddd);
+            pendingFeeDdd += claims.ddd * 100 / (100 - DDD_LP_PERCENT) - claims.ddd;
+        }
+    }
+
     /**
         @notice Claim all third-party incentives earned from `pool`
      */
@@ -300,6 +380,31 @@ contract LpDepositor is Ownable {
         emit ClaimedExtraRewards(msg.sender, _receiver, pool);
     }
 
+    /**
+        @notice Claim all third-party incentives earned from `pool` on behalf of multiple users
+        @dev Each user must have approved the caller via `setOperatorApproval`
+     */
+    function claimExtraRewardsFor(address[] calldata _users, address _receiver, address pool) external {
+        uint256 total = totalBalances[pool];
+        uint256 length = extraRewards[pool].length;
+        uint256[] memory amounts = new uint256[](length);
+        for (uint i = 0; i < _users.length; i++) {
+            address user = _users[i];
+            require(isApprovedOperator[user][msg.sender], "Operator not approved");
+            if (total > 0) _updateExtraIntegrals(user, pool, userBalances[user][pool], total);
+            for (uint x = 0; x < length; x++) {
+                amounts[x] += unclaimedExtraRewards[user][pool][x];
+                unclaimedExtraRewards[user][pool][x] = 0;
+            }
+            emit ClaimedExtraRewardsFor(msg.sender, user, _receiver, pool);
+        }
+        for (uint i = 0; i < length; i++) {
+            if (amounts[i] > 0) {
+                IERC20(extraRewards[pool][i]).safeTransfer(_receiver, amounts[i]);
+            }
+        }
+    }
+
     /**
         @notice Update the local cache of third-party rewards for a given LP token
         @dev Must be called each time a new incentive token is added to a pool, in
@@ -376,19 +481,43 @@ contract LpDepositor is Ownable {
     }
 
     function _deployDepositToken(address pool) internal returns (address token) {
-        // taken from https://solidity-by-example.org/app/minimal-proxy/
-        bytes20 targetBytes = bytes20(depositTokenImplementation);
-        assembly {
-            let clone := mload(0x40)
-            mstore(clone, 0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000)
-            mstore(add(clone, 0x14), targetBytes)
-            mstore(add(clone, 0x28), 0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000)
-            token := create(0, clone, 0x37)
-        }
-        IDepositToken(token).initialize(pool);
+        bytes memory data = abi.encodePacked(address(this), pool);
+        token = ClonesWithImmutableArgs.clone(depositTokenImplementation, data, 0);
+        IDepositToken(token).initialize();
         return token;
     }
 
+    function _claimFor(
+        address user,
+        address[] calldata tokens,
+        address[] memory harvested,
+        uint256 harvestedCount
+    ) internal returns (Amounts memory claims, uint256) {
+        for (uint i = 0; i < tokens.length; i++) {
+            address token = tokens[i];
+            uint256 reward;
+            bool isHarvested;
+            for (uint x = 0; x < harvestedCount; x++) {
+                if (harvested[x] == token) {
+                    isHarvested = true;
+                    break;
+                }
+            }
+            if (!isHarvested) {
+                // emissions for a pool only need to be claimed once per batch,
+                // all following users in the batch are updated with a reward of zero
+                reward = proxy.claimEmissions(token);
+                harvested[harvestedCount] = token;
+                harvestedCount++;
+            }
+            _updateIntegrals(user, token, userBalances[user][token], totalBalances[token], reward);
+            claims.epx += unclaimedRewards[user][token].epx;
+            claims.ddd += unclaimedRewards[user][token].ddd;
+            delete unclaimedRewards[user][token];
+        }
+        return (claims, harvestedCount);
+    }
+
     function _updateIntegrals(
         address user,
         address pool,
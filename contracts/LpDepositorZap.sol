@@ -0,0 +1,167 @@
+pragma solidity 0.8.12;
+
+import "./dependencies/SafeERC20.sol";
+import "./interfaces/IERC20.sol";
+import "./interfaces/dotdot/ILpDepositor.sol";
+import "./interfaces/ellipsis/IEllipsisPool.sol";
+
+
+contract LpDepositorZap {
+    using SafeERC20 for IERC20;
+
+    ILpDepositor public immutable lpDepositor;
+
+    // spender -> token -> has the spender been approved to transfer the token?
+    mapping(address => mapping(address => bool)) isApproved;
+
+    event ZapDeposit(
+        address indexed caller,
+        address indexed receiver,
+        address indexed pool,
+        uint256[] amounts,
+        uint256 lpAmount
+    );
+    event ZapWithdraw(
+        address indexed caller,
+        address indexed receiver,
+        address indexed pool,
+        uint256 lpAmount
+    );
+
+    constructor(ILpDepositor _lpDepositor) {
+        lpDepositor = _lpDepositor;
+    }
+
+    /**
+        @notice Add liquidity to an Ellipsis pool and deposit the LP tokens in `LpDepositor`
+        @dev The deposited amount is the zap's measured LP token balance increase, the
+             return value of `add_liquidity` is not trusted. Deposits go through the
+             regular `LpDepositor.deposit`, so the zap has no special permissions.
+        @param _pool Ellipsis pool to add liquidity to
+        @param _amounts Amount of each coin to deposit. The length must equal
+                        the number of coins in the pool.
+        @param _minMintAmount Minimum amount of LP tokens to receive
+        @param _receiver Address to credit for the deposit
+        @return lpAmount Amount of LP tokens deposited
+     */
+    function deposit(
+        address _pool,
+        uint256[] calldata _amounts,
+        uint256 _minMintAmount,
+        address _receiver
+    ) external returns (uint256 lpAmount) {
+        IERC20 lpToken = IERC20(IEllipsisPool(_pool).lp_token());
+        uint256 initial = lpToken.balanceOf(address(this));
+
+        uint256 length = _amounts.length;
+        for (uint i = 0; i < length; i++) {
+            uint256 amount = _amounts[i];
+            if (amount == 0) continue;
+            address coin = IEllipsisPool(_pool).coins(i);
+            IERC20(coin).safeTransferFrom(msg.sender, address(this), amount);
+            if (!isApproved[_pool][coin]) {
+                IERC20(coin).safeApprove(_pool, type(uint256).max);
+                isApproved[_pool][coin] = true;
+            }
+        }
+
+        if (length == 2) {
+            uint256[2] memory amounts = [_amounts[0], _amounts[1]];
+            IEllipsisPool2(_pool).add_liquidity(amounts, _minMintAmount, address(this));
+        } else if (length == 3) {
+            uint256[3] memory amounts = [_amounts[0], _amounts[1], _amounts[2]];
+            IEllipsisPool3(_pool).add_liquidity(amounts, _minMintAmount, address(this));
+        } else if (length == 4) {
+            uint256[4] memory amounts = [_amounts[0], _amounts[1], _amounts[2], _amounts[3]];
+            IEllipsisPool4(_pool).add_liquidity(amounts, _minMintAmount, address(this));
+        } else {
+            revert("Invalid number of coins");
+        }
+
+        lpAmount = lpToken.balanceOf(address(this)) - initial;
+        require(lpAmount >= _minMintAmount, "Insufficient LP received");
+        if (!isApproved[address(lpDepositor)][address(lpToken)]) {
+            lpToken.safeApprove(address(lpDepositor), type(uint256).max);
+            isApproved[address(lpDepositor)][address(lpToken)] = true;
+        }
+        lpDepositor.deposit(_receiver, address(lpToken), lpAmount);
+        emit ZapDeposit(msg.sender, _receiver, _pool, _amounts, lpAmount);
+        return lpAmount;
+    }
+
+    /**
+        @notice Withdraw LP tokens from `LpDepositor` and remove liquidity in a balanced ratio
+        @dev The caller must approve the zap to transfer their deposit token for the pool's
+             LP token, either via `approve` or `permit`
+        @param _pool Ellipsis pool to remove liquidity from
+        @param _amount Amount of LP tokens to withdraw
+        @param _minAmounts Minimum amount of each coin to receive. The length must
+                           equal the number of coins in the pool.
+        @param _receiver Address to send the withdrawn coins to
+        @return received Amount of each coin that was received
+     */
+    function withdraw(
+        address _pool,
+        uint256 _amount,
+        uint256[] calldata _minAmounts,
+        address _receiver
+    ) external returns (uint256[] memory received) {
+        _withdrawLpTokens(_pool, _amount);
+
+        uint256 length = _minAmounts.length;
+        received = new uint256[](length);
+        if (length == 2) {
+            uint256[2] memory amounts = [_minAmounts[0], _minAmounts[1]];
+            amounts = IEllipsisPool2(_pool).remove_liquidity(_amount, amounts, _receiver);
+            for (uint i = 0; i < 2; i++) received[i] = amounts[i];
+        } else if (length == 3) {
+            uint256[3] memory amounts = [_minAmounts[0], _minAmounts[1], _minAmounts[2]];
+            amounts = IEllipsisPool3(_pool).remove_liquidity(_amount, amounts, _receiver);
+            for (uint i = 0; i < 3; i++) received[i] = amounts[i];
+        } else if (length == 4) {
+            uint256[4] memory amounts = [_minAmounts[0], _minAmounts[1], _minAmounts[2], _minAmounts[3]];
+            amounts = IEllipsisPool4(_pool).remove_liquidity(_amount, amounts, _receiver);
+            for (uint i = 0; i < 4; i++) received[i] = amounts[i];
+        } else {
+            revert("Invalid number of coins");
+        }
+
+        emit ZapWithdraw(msg.sender, _receiver, _pool, _amount);
+        return received;
+    }
+
+    /**
+        @notice Withdraw LP tokens from `LpDepositor` and remove liquidity as a single coin
+        @dev The caller must approve the zap to transfer their deposit token for the pool's
+             LP token, either via `approve` or `permit`
+        @param _pool Ellipsis pool to remove liquidity from
+        @param _amount Amount of LP tokens to withdraw
+        @param _i Index of the coin to receive
+        @param _minReceived Minimum amount of the coin to receive
+        @param _receiver Address to send the withdrawn coin to
+        @return uint256 Amount of the coin that was received
+     */
+    function withdrawOneCoin(
+        address _pool,
+        uint256 _amount,
+        int128 _i,
+        uint256 _minReceived,
+        address _receiver
+    ) external returns (uint256) {
+        _withdrawLpTokens(_pool, _amount);
+        // `remove_liquidity_one_coin` has the same signature regardless of the number of coins
+        uint256 received = IEllipsisPool2(_pool).remove_liquidity_one_coin(_amount, _i, _minReceived, _receiver);
+        emit ZapWithdraw(msg.sender, _receiver, _pool, _amount);
+        return received;
+    }
+
+    function _withdrawLpTokens(address _pool, uint256 _amount) internal {
+        address lpToken = IEllipsisPool(_pool).lp_token();
+        address depositToken = lpDepositor.depositTokens(lpToken);
+        require(depositToken != address(0), "No deposit token for pool");
+
+        IERC20(depositToken).safeTransferFrom(msg.sender, address(this), _amount);
+        lpDepositor.withdraw(address(this), lpToken, _amount);
+    }
+
+}
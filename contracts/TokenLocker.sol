@@ -3,6 +3,7 @@ pragma solidity 0.8.12;
 import "./dependencies/Ownable.sol";
 import "./dependencies/SafeERC20.sol";
 import "./interfaces/IERC20.sol";
+import "./interfaces/IERC20Permit.sol";
 
 
 contract TokenLocker is Ownable {
@@ -192,7 +193,7 @@ contract TokenLocker is Ownable {
         address _user,
         uint256 _amount,
         uint256 _weeks
-    ) external returns (bool) {
+    ) public returns (bool) {
         if (msg.sender != _user) {
             require(!blockThirdPartyActions[_user], "Cannot lock on behalf of this account");
         }
@@ -212,6 +213,32 @@ contract TokenLocker is Ownable {
         return true;
     }
 
+    /**
+        @notice Deposit tokens into the contract to create a new lock, using an EIP-2612
+                signature in place of a prior approval
+        @dev The permit is given for exactly `_amount`. If the permit was already
+             used, the call succeeds as long as the allowance is sufficient.
+        @param _user Address to create a new lock for (does not have to be the caller)
+        @param _amount Amount of tokens to lock. This balance transfered from the caller.
+        @param _weeks The number of weeks for the lock.
+        @param _deadline Deadline given within the signed permit
+     */
+    function lockWithPermit(
+        address _user,
+        uint256 _amount,
+        uint256 _weeks,
+        uint256 _deadline,
+        uint8 _v,
+        bytes32 _r,
+        bytes32 _s
+    ) external returns (bool) {
+        try IERC20Permit(address(DDD)).permit(msg.sender, address(this), _amount, _deadline, _v, _r, _s) {} catch {
+            // the permit may already have been submitted by someone else
+            require(DDD.allowance(msg.sender, address(this)) >= _amount, "Permit failed");
+        }
+        return lock(_user, _amount, _weeks);
+    }
+
     /**
         @notice Extend the length of an existing lock.
         @param _amount Amount of tokens to extend the lock for. When the value given equals
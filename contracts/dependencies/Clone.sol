@@ -0,0 +1,36 @@
+// SPDX-License-Identifier: BSD
+// Based on clones-with-immutable-args by wighawag, zefram.eth and Saw-mon & Natalie
+// https://github.com/wighawag/clones-with-immutable-args
+
+pragma solidity ^0.8.0;
+
+/**
+ * @dev Provides helper functions for reading immutable args from calldata, for
+ * implementation contracts that are deployed via {ClonesWithImmutableArgs}.
+ *
+ * The values returned are only meaningful when called via a clone, when the
+ * implementation contract is called directly the returned values are undefined.
+ */
+abstract contract Clone {
+
+    /**
+     * @dev Reads an immutable arg with type address
+     * @param argOffset The offset of the arg in the packed data
+     */
+    function _getArgAddress(uint256 argOffset) internal pure returns (address arg) {
+        uint256 offset = _getImmutableArgsOffset();
+        assembly {
+            arg := shr(0x60, calldataload(add(offset, argOffset)))
+        }
+    }
+
+    /**
+     * @dev Gets the starting location in calldata of the immutable args
+     */
+    function _getImmutableArgsOffset() internal pure returns (uint256 offset) {
+        assembly {
+            offset := sub(calldatasize(), shr(0xf0, calldataload(sub(calldatasize(), 2))))
+        }
+    }
+
+}
@@ -0,0 +1,64 @@
+// SPDX-License-Identifier: BSD
+// Based on clones-with-immutable-args by wighawag, zefram.eth and Saw-mon & Natalie
+// https://github.com/wighawag/clones-with-immutable-args
+
+pragma solidity ^0.8.0;
+
+/**
+ * @dev Deploys minimal proxies with immutable arguments appended to the bytecode.
+ *
+ * On each call the clone forwards the calldata to the implementation via `DELEGATECALL`,
+ * followed by the immutable arguments and a 2 byte length suffix. The arguments are read
+ * within the implementation using the helpers in {Clone}.
+ *
+ * Clones are deployed with `CREATE2`, so the address of each clone can be calculated
+ * ahead of time from the implementation address, the immutable arguments and the salt.
+ */
+library ClonesWithImmutableArgs {
+
+    /**
+     * @dev Deploys a clone of `implementation` with `data` appended as immutable arguments.
+     */
+    function clone(address implementation, bytes memory data, bytes32 salt) internal returns (address instance) {
+        bytes memory creationCode = _creationCode(implementation, data);
+        assembly {
+            instance := create2(0, add(creationCode, 0x20), mload(creationCode), salt)
+        }
+        require(instance != address(0), "ClonesWithImmutableArgs: create2 failed");
+    }
+
+    /**
+     * @dev Computes the address of a clone deployed by `deployer` using {clone}.
+     */
+    function predictDeterministicAddress(
+        address implementation,
+        bytes memory data,
+        bytes32 salt,
+        address deployer
+    ) internal pure returns (address) {
+        bytes32 codeHash = keccak256(_creationCode(implementation, data));
+        bytes32 hash = keccak256(abi.encodePacked(bytes1(0xff), deployer, salt, codeHash));
+        return address(uint160(uint256(hash)));
+    }
+
+    function _creationCode(address implementation, bytes memory data) private pure returns (bytes memory) {
+        // immutable args are followed by a 2 byte suffix containing the length of the args
+        // plus the suffix, which is used by `Clone` to locate the args within the calldata
+        uint256 extraLength = data.length + 2;
+        // 0x38 is the length of the runtime code, excluding the immutable args
+        uint256 runSize = 0x38 + extraLength;
+        require(runSize <= type(uint16).max, "ClonesWithImmutableArgs: data too large");
+
+        return abi.encodePacked(
+            // creation code: copy the runtime code into memory and return it
+            hex"3d61", uint16(runSize), hex"80600b3d3981f3",
+            // runtime code: copy calldata and immutable args into memory, delegatecall
+            // to the implementation and return or revert with the returned data
+            hex"363d3d3761", uint16(extraLength), hex"603836393d3d3d3661", uint16(extraLength),
+            hex"013d73", implementation, hex"5af43d82803e903d91603657fd5bf3",
+            // immutable args
+            data, uint16(extraLength)
+        );
+    }
+
+}
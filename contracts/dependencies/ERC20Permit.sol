@@ -0,0 +1,77 @@
+pragma solidity 0.8.12;
+
+import "../interfaces/IERC20Permit.sol";
+import "./ECDSA.sol";
+
+
+/**
+    @notice EIP-2612 `permit`, shared by the DotDot tokens
+    @dev This contract holds no storage, so inheriting it does not change the storage
+         layout of a token. Nonces and allowances are stored by the inheriting token,
+         and accessed via `_useNonce` and `_approve`. Signatures are recovered with
+         `ECDSA.tryRecover`, which rejects malleable (high `s`) signatures.
+ */
+abstract contract ERC20Permit is IERC20Permit {
+
+    bytes32 constant DOMAIN_TYPEHASH = keccak256(
+        "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+    );
+    bytes32 public constant PERMIT_TYPEHASH = keccak256(
+        "Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)"
+    );
+
+    /** @dev Name used in the EIP-712 domain, normally the token name */
+    function _domainName() internal view virtual returns (string memory);
+
+    /** @dev Return the current nonce of `_owner` and increment it */
+    function _useNonce(address _owner) internal virtual returns (uint256);
+
+    /** @dev Set the allowance of `_spender` over the tokens of `_owner` */
+    function _approve(address _owner, address _spender, uint256 _value) internal virtual;
+
+    /**
+        @notice Domain separator used in EIP-2612 permit signatures
+        @dev Calculated at call time, so that the value remains correct after a chain fork
+     */
+    function DOMAIN_SEPARATOR() public view override returns (bytes32) {
+        return keccak256(
+            abi.encode(
+                DOMAIN_TYPEHASH,
+                keccak256(bytes(_domainName())),
+                keccak256(bytes("1")),
+                block.chainid,
+                address(this)
+            )
+        );
+    }
+
+    /**
+        @notice Approve `_spender` via an off-chain signature from `_owner`
+        @dev https://eips.ethereum.org/EIPS/eip-2612
+        @param _owner Account that signed the permit and owns the tokens
+        @param _spender Account being approved to transfer the tokens
+        @param _value Approved amount
+        @param _deadline Timestamp after which the signature is no longer valid
+     */
+    function permit(
+        address _owner,
+        address _spender,
+        uint256 _value,
+        uint256 _deadline,
+        uint8 _v,
+        bytes32 _r,
+        bytes32 _s
+    ) external override {
+        require(_deadline >= block.timestamp, "Permit expired");
+        bytes32 digest = keccak256(
+            abi.encodePacked(
+                "\x19\x01",
+                DOMAIN_SEPARATOR(),
+                keccak256(abi.encode(PERMIT_TYPEHASH, _owner, _spender, _value, _useNonce(_owner), _deadline))
+            )
+        );
+        (address signer, ECDSA.RecoverError error) = ECDSA.tryRecover(digest, _v, _r, _s);
+        require(error == ECDSA.RecoverError.NoError && signer == _owner, "Invalid signature");
+        _approve(_owner, _spender, _value);
+    }
+}
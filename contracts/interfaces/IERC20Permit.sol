@@ -0,0 +1,22 @@
+pragma solidity 0.8.12;
+
+/**
+ * @dev Interface of the ERC20 Permit extension as defined in EIP-2612:
+ * https://eips.ethereum.org/EIPS/eip-2612
+ */
+interface IERC20Permit {
+    function permit(
+        address owner,
+        address spender,
+        uint256 value,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    ) external;
+
+    function nonces(address owner) external view returns (uint256);
+
+    // solhint-disable-next-line func-name-mixedcase
+    function DOMAIN_SEPARATOR() external view returns (bytes32);
+}
@@ -1,6 +1,7 @@
 pragma solidity 0.8.12;
 
 interface IEllipsisProxy {
+    function emergencyAdmin() external view returns (address);
     function lock(uint256 _amount) external returns (bool);
     function extendLock(uint256 _amount, uint256 _weeks) external returns (bool);
     function deposit(address _token, uint256 _amount) external returns (uint256);
@@ -4,4 +4,7 @@ interface ILpDepositor {
     function transferDeposit(address _token, address _from, address _to, uint256 _amount) external returns (bool);
     function userBalances(address _user, address _token) external view returns (uint256);
     function totalBalances(address _token) external view returns (uint256);
-}
\ No newline at end of file
+    function depositTokens(address _token) external view returns (address);
+    function deposit(address _user, address _token, uint256 _amount) external;
+    function withdraw(address _receiver, address _token, uint256 _amount) external;
+}
@@ -0,0 +1,25 @@
+pragma solidity 0.8.12;
+
+
+interface IEllipsisPool {
+    function coins(uint256 i) external view returns (address);
+    function lp_token() external view returns (address);
+}
+
+interface IEllipsisPool2 is IEllipsisPool {
+    function add_liquidity(uint256[2] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256);
+    function remove_liquidity(uint256 _burn_amount, uint256[2] calldata _min_amounts, address _receiver) external returns (uint256[2] memory);
+    function remove_liquidity_one_coin(uint256 _burn_amount, int128 i, uint256 _min_received, address _receiver) external returns (uint256);
+}
+
+interface IEllipsisPool3 is IEllipsisPool {
+    function add_liquidity(uint256[3] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256);
+    function remove_liquidity(uint256 _burn_amount, uint256[3] calldata _min_amounts, address _receiver) external returns (uint256[3] memory);
+    function remove_liquidity_one_coin(uint256 _burn_amount, int128 i, uint256 _min_received, address _receiver) external returns (uint256);
+}
+
+interface IEllipsisPool4 is IEllipsisPool {
+    function add_liquidity(uint256[4] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256);
+    function remove_liquidity(uint256 _burn_amount, uint256[4] calldata _min_amounts, address _receiver) external returns (uint256[4] memory);
+    function remove_liquidity_one_coin(uint256 _burn_amount, int128 i, uint256 _min_received, address _receiver) external returns (uint256);
+}
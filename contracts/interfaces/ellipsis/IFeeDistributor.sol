@@ -17,6 +17,13 @@ interface IFeeDistributor {
      */
     function setBlockThirdPartyActions(bool _block) external;
 
+    /**
+        @notice Get an array of claimable amounts of different tokens accrued from protocol fees
+        @param _user Address to query claimable amounts for
+        @param _tokens List of tokens to query claimable amounts of
+     */
+    function claimable(address _user, address[] calldata _tokens) external view returns (uint256[] memory amounts);
+
     /**
         @notice Claim accrued protocol fees
         @param _user Address to claim for
@@ -0,0 +1,118 @@
+pragma solidity 0.8.12;
+
+import "../interfaces/IERC20.sol";
+import "../interfaces/IERC20Permit.sol";
+
+
+/**
+    @notice Minimal ERC20 with EIP-2612 permit, used as the base for the
+            local Ellipsis and Pancake stand-ins in `contracts/testing`
+    @dev Only deployed when running the test suite with `--local`
+ */
+contract LocalERC20 is IERC20, IERC20Permit {
+
+    string public override name;
+    string public override symbol;
+    uint8 public constant override decimals = 18;
+    uint256 public override totalSupply;
+
+    mapping(address => uint256) public override balanceOf;
+    mapping(address => mapping(address => uint256)) public override allowance;
+    mapping(address => uint256) public override nonces;
+
+    bytes32 constant DOMAIN_TYPEHASH = keccak256(
+        "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+    );
+    bytes32 public constant PERMIT_TYPEHASH = keccak256(
+        "Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)"
+    );
+
+    constructor(string memory _name, string memory _symbol) {
+        name = _name;
+        symbol = _symbol;
+    }
+
+    function approve(address _spender, uint256 _value) external override returns (bool) {
+        allowance[msg.sender][_spender] = _value;
+        emit Approval(msg.sender, _spender, _value);
+        return true;
+    }
+
+    function DOMAIN_SEPARATOR() public view override returns (bytes32) {
+        return keccak256(
+            abi.encode(
+                DOMAIN_TYPEHASH,
+                keccak256(bytes(name)),
+                keccak256(bytes("1")),
+                block.chainid,
+                address(this)
+            )
+        );
+    }
+
+    function permit(
+        address _owner,
+        address _spender,
+        uint256 _value,
+        uint256 _deadline,
+        uint8 _v,
+        bytes32 _r,
+        bytes32 _s
+    ) external override {
+        require(_deadline >= block.timestamp, "Permit expired");
+        bytes32 digest = keccak256(
+            abi.encodePacked(
+                "\x19\x01",
+                DOMAIN_SEPARATOR(),
+                keccak256(abi.encode(PERMIT_TYPEHASH, _owner, _spender, _value, nonces[_owner]++, _deadline))
+            )
+        );
+        address signer = ecrecover(digest, _v, _r, _s);
+        require(signer != address(0) && signer == _owner, "Invalid signature");
+        allowance[_owner][_spender] = _value;
+        emit Approval(_owner, _spender, _value);
+    }
+
+    function transfer(address _to, uint256 _value) public override returns (bool) {
+        _transfer(msg.sender, _to, _value);
+        return true;
+    }
+
+    function transferFrom(
+        address _from,
+        address _to,
+        uint256 _value
+    )
+        public
+        override
+        returns (bool)
+    {
+        require(allowance[_from][msg.sender] >= _value, "Insufficient allowance");
+        if (allowance[_from][msg.sender] != type(uint).max) {
+            allowance[_from][msg.sender] -= _value;
+        }
+        _transfer(_from, _to, _value);
+        return true;
+    }
+
+    function _transfer(address _from, address _to, uint256 _value) internal virtual {
+        require(balanceOf[_from] >= _value, "Insufficient balance");
+        balanceOf[_from] -= _value;
+        balanceOf[_to] += _value;
+        emit Transfer(_from, _to, _value);
+    }
+
+    function _mint(address _to, uint256 _value) internal virtual {
+        balanceOf[_to] += _value;
+        totalSupply += _value;
+        emit Transfer(address(0), _to, _value);
+    }
+
+    function _burn(address _from, uint256 _value) internal virtual {
+        require(balanceOf[_from] >= _value, "Insufficient balance");
+        balanceOf[_from] -= _value;
+        totalSupply -= _value;
+        emit Transfer(_from, address(0), _value);
+    }
+
+}
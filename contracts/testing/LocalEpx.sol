@@ -0,0 +1,30 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/Ownable.sol";
+import "./LocalERC20.sol";
+
+
+/**
+    @notice Local stand-in for the Ellipsis `EPX` token
+    @dev Mirrors the parts of the real token used by DotDot: owner-approved
+         minters and the fixed EPS -> EPX `migrationRatio`
+ */
+contract LocalEpx is LocalERC20, Ownable {
+
+    uint256 public constant migrationRatio = 88;
+
+    mapping(address => bool) public minters;
+
+    constructor() LocalERC20("Ellipsis X", "EPX") {}
+
+    function addMinter(address _minter) external onlyOwner {
+        minters[_minter] = true;
+    }
+
+    function mint(address _to, uint256 _value) external returns (bool) {
+        require(minters[msg.sender] || msg.sender == owner, "Not a minter");
+        _mint(_to, _value);
+        return true;
+    }
+
+}
@@ -0,0 +1,116 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/SafeERC20.sol";
+import "../interfaces/IERC20.sol";
+import "../interfaces/ellipsis/ITokenLocker.sol";
+
+
+/**
+    @notice Local stand-in for the Ellipsis `FeeDistributor`
+    @dev Fees deposited in a week are distributed according to the lock weights of
+         that week, and stream to lockers linearly over the following week.
+ */
+contract LocalFeeDistributor {
+    using SafeERC20 for IERC20;
+
+    uint256 constant WEEK = 86400 * 7;
+
+    ITokenLocker public immutable tokenLocker;
+    uint256 public immutable startTime;
+
+    // token -> week -> fee amount
+    mapping(address => mapping(uint256 => uint256)) public weeklyFeeAmounts;
+    // user -> token -> week -> amount claimed
+    mapping(address => mapping(address => mapping(uint256 => uint256))) public userClaimed;
+    // user -> token -> first week that has not fully streamed
+    mapping(address => mapping(address => uint256)) userClaimWeek;
+
+    mapping(address => address) public claimReceiver;
+    mapping(address => bool) public blockThirdPartyActions;
+
+    event FeesReceived(address indexed caller, address indexed token, uint256 indexed week, uint256 amount);
+    event FeesClaimed(address caller, address indexed account, address indexed receiver, address indexed token, uint256 amount);
+
+    constructor(ITokenLocker _tokenLocker) {
+        tokenLocker = _tokenLocker;
+        startTime = _tokenLocker.startTime();
+    }
+
+    function getWeek() public view returns (uint256) {
+        if (startTime >= block.timestamp) return 0;
+        return (block.timestamp - startTime) / WEEK;
+    }
+
+    function setClaimReceiver(address _receiver) external {
+        claimReceiver[msg.sender] = _receiver;
+    }
+
+    function setBlockThirdPartyActions(bool _block) external {
+        blockThirdPartyActions[msg.sender] = _block;
+    }
+
+    function depositFee(address _token, uint256 _amount) external returns (bool) {
+        uint256 week = getWeek();
+        IERC20(_token).safeTransferFrom(msg.sender, address(this), _amount);
+        weeklyFeeAmounts[_token][week] += _amount;
+        emit FeesReceived(msg.sender, _token, week, _amount);
+        return true;
+    }
+
+    function claimable(address _user, address[] calldata _tokens) external view returns (uint256[] memory amounts) {
+        amounts = new uint256[](_tokens.length);
+        uint256 currentWeek = getWeek();
+        for (uint i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            for (uint256 week = userClaimWeek[_user][token]; week < currentWeek; week++) {
+                amounts[i] += _streamedAmount(_user, token, week) - userClaimed[_user][token][week];
+            }
+        }
+        return amounts;
+    }
+
+    function claim(address _user, address[] calldata _tokens) external returns (uint256[] memory claimedAmounts) {
+        if (msg.sender != _user) {
+            require(!blockThirdPartyActions[_user], "Cannot claim on behalf of this account");
+        }
+        address receiver = claimReceiver[_user];
+        if (receiver == address(0)) receiver = _user;
+
+        uint256 currentWeek = getWeek();
+        claimedAmounts = new uint256[](_tokens.length);
+        for (uint i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            uint256 amount;
+            for (uint256 week = userClaimWeek[_user][token]; week < currentWeek; week++) {
+                uint256 streamed = _streamedAmount(_user, token, week);
+                amount += streamed - userClaimed[_user][token][week];
+                userClaimed[_user][token][week] = streamed;
+            }
+            // every week prior to the previous one has now fully streamed and been claimed
+            if (currentWeek > 1) userClaimWeek[_user][token] = currentWeek - 1;
+
+            if (amount > 0) {
+                claimedAmounts[i] = amount;
+                IERC20(token).safeTransfer(receiver, amount);
+                emit FeesClaimed(msg.sender, _user, receiver, token, amount);
+            }
+        }
+        return claimedAmounts;
+    }
+
+    /**
+        @dev Amount of the fees deposited in `_week` that has streamed to `_user`
+     */
+    function _streamedAmount(address _user, address _token, uint256 _week) internal view returns (uint256) {
+        uint256 fees = weeklyFeeAmounts[_token][_week];
+        if (fees == 0) return 0;
+        (uint256 userWeight, uint256 totalWeight) = tokenLocker.weeklyWeight(_user, _week);
+        if (userWeight == 0) return 0;
+
+        uint256 amount = fees * userWeight / totalWeight;
+        uint256 elapsed = block.timestamp - (startTime + (_week + 1) * WEEK);
+        if (elapsed < WEEK) amount = amount * elapsed / WEEK;
+        return amount;
+    }
+
+}
@@ -0,0 +1,191 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/Ownable.sol";
+import "../interfaces/ellipsis/ITokenLocker.sol";
+
+
+interface ILocalLpStaking {
+    function addPool(address _token) external returns (bool);
+}
+
+
+/**
+    @notice Local stand-in for the Ellipsis `IncentiveVoting`
+    @dev Emissions for each week are distributed according to the votes made in
+         the previous week, at a constant `rewardsPerSecond`. Token approval votes
+         pass once `QUORUM_PCT` of the previous week's total lock weight votes yes.
+ */
+contract LocalIncentiveVoting is Ownable {
+
+    struct TokenApprovalVote {
+        address token;
+        uint40 startTime;
+        uint16 week;
+        uint256 requiredVotes;
+        uint256 givenVotes;
+    }
+
+    uint256 constant WEEK = 86400 * 7;
+
+    ITokenLocker public immutable tokenLocker;
+    uint256 public immutable startTime;
+    uint256 public immutable rewardsPerSecond;
+    uint256 public immutable QUORUM_PCT;
+    uint256 public immutable NEW_TOKEN_APPROVAL_VOTE_MIN_WEIGHT;
+
+    address public lpStaking;
+
+    mapping(address => bool) public isApproved;
+    address[] public approvedTokens;
+
+    // user -> week -> votes used
+    mapping(address => mapping(uint256 => uint256)) public userVotes;
+    // user -> token -> week -> votes for token
+    mapping(address => mapping(address => mapping(uint256 => uint256))) public userTokenVotes;
+    // token -> week -> votes received
+    mapping(address => mapping(uint256 => uint256)) public tokenVotes;
+    // week -> total votes
+    mapping(uint256 => uint256) public totalVotes;
+
+    TokenApprovalVote[] public tokenApprovalVotes;
+    // vote index -> user -> yes votes
+    mapping(uint256 => mapping(address => uint256)) public userTokenApprovalVotes;
+    mapping(address => uint256) public lastVote;
+
+    event VotedForIncentives(address indexed voter, address[] tokens, uint256[] votes);
+    event TokenApprovalVoteCreated(address indexed creator, address indexed token, uint256 voteIndex);
+    event VotedForTokenApproval(address indexed voter, uint256 voteIndex, uint256 yesVotes);
+    event TokenApproved(address indexed token);
+
+    constructor(
+        ITokenLocker _tokenLocker,
+        uint256 _rewardsPerSecond,
+        uint256 _quorumPct,
+        uint256 _tokenApprovalMinWeight
+    ) {
+        tokenLocker = _tokenLocker;
+        startTime = _tokenLocker.startTime();
+        rewardsPerSecond = _rewardsPerSecond;
+        QUORUM_PCT = _quorumPct;
+        NEW_TOKEN_APPROVAL_VOTE_MIN_WEIGHT = _tokenApprovalMinWeight;
+    }
+
+    function setLpStaking(address _lpStaking, address[] calldata _initialApprovedTokens) external onlyOwner {
+        require(lpStaking == address(0), "Already set");
+        lpStaking = _lpStaking;
+        for (uint i = 0; i < _initialApprovedTokens.length; i++) {
+            _approveToken(_initialApprovedTokens[i]);
+        }
+    }
+
+    function getWeek() public view returns (uint256) {
+        if (startTime >= block.timestamp) return 0;
+        return (block.timestamp - startTime) / WEEK;
+    }
+
+    function approvedTokensLength() external view returns (uint256) {
+        return approvedTokens.length;
+    }
+
+    function tokenApprovalVotesLength() external view returns (uint256) {
+        return tokenApprovalVotes.length;
+    }
+
+    /**
+        @notice Emissions per second for `_token` in `_week`, based on
+                the votes from the previous week
+     */
+    function getRewardsPerSecond(address _token, uint256 _week) external view returns (uint256) {
+        if (_week == 0) return 0;
+        uint256 total = totalVotes[_week - 1];
+        if (total == 0) return 0;
+        return rewardsPerSecond * tokenVotes[_token][_week - 1] / total;
+    }
+
+    function availableVotes(address _user) external view returns (uint256) {
+        uint256 week = getWeek();
+        return tokenLocker.weeklyWeightOf(_user, week) / 1e18 - userVotes[_user][week];
+    }
+
+    function vote(address[] calldata _tokens, uint256[] calldata _votes) external {
+        require(_tokens.length == _votes.length, "Input length mismatch");
+        uint256 week = getWeek();
+        uint256 used = userVotes[msg.sender][week];
+        uint256 total;
+        for (uint i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            uint256 amount = _votes[i];
+            require(isApproved[token], "Incentives not approved for token");
+            tokenVotes[token][week] += amount;
+            userTokenVotes[msg.sender][token][week] += amount;
+            total += amount;
+        }
+        used += total;
+        require(used <= tokenLocker.weeklyWeightOf(msg.sender, week) / 1e18, "Available votes exceeded");
+        userVotes[msg.sender][week] = used;
+        totalVotes[week] += total;
+
+        emit VotedForIncentives(msg.sender, _tokens, _votes);
+    }
+
+    function createTokenApprovalVote(address _token) external returns (uint256 _voteIndex) {
+        require(!isApproved[_token], "Already approved");
+        uint256 week = getWeek();
+        require(week > 0, "Cannot make vote in first week");
+        week -= 1;
+        uint256 weight = tokenLocker.weeklyWeightOf(msg.sender, week);
+        require(weight >= NEW_TOKEN_APPROVAL_VOTE_MIN_WEIGHT, "User has insufficient weight");
+        require(lastVote[msg.sender] + WEEK <= block.timestamp, "One new vote per week");
+
+        uint256 required = tokenLocker.weeklyTotalWeight(week) / 1e18 * QUORUM_PCT / 100;
+        _voteIndex = tokenApprovalVotes.length;
+        tokenApprovalVotes.push(
+            TokenApprovalVote({
+                token: _token,
+                startTime: uint40(block.timestamp),
+                week: uint16(week),
+                requiredVotes: required,
+                givenVotes: 0
+            })
+        );
+        lastVote[msg.sender] = block.timestamp;
+
+        emit TokenApprovalVoteCreated(msg.sender, _token, _voteIndex);
+        return _voteIndex;
+    }
+
+    function availableTokenApprovalVotes(address _user, uint256 _voteIndex) public view returns (uint256) {
+        TokenApprovalVote storage vote = tokenApprovalVotes[_voteIndex];
+        if (vote.startTime + WEEK < block.timestamp || isApproved[vote.token]) return 0;
+        uint256 weight = tokenLocker.weeklyWeightOf(_user, vote.week) / 1e18;
+        return weight - userTokenApprovalVotes[_voteIndex][_user];
+    }
+
+    function voteForTokenApproval(uint256 _voteIndex, uint256 _yesVotes) external {
+        TokenApprovalVote storage vote = tokenApprovalVotes[_voteIndex];
+        require(vote.startTime + WEEK >= block.timestamp, "Vote has ended");
+        require(!isApproved[vote.token], "Token already approved");
+
+        uint256 available = availableTokenApprovalVotes(msg.sender, _voteIndex);
+        if (_yesVotes == type(uint256).max) {
+            _yesVotes = available;
+        }
+        require(_yesVotes <= available, "Exceeds available votes");
+
+        userTokenApprovalVotes[_voteIndex][msg.sender] += _yesVotes;
+        vote.givenVotes += _yesVotes;
+        emit VotedForTokenApproval(msg.sender, _voteIndex, _yesVotes);
+
+        if (vote.givenVotes >= vote.requiredVotes) {
+            _approveToken(vote.token);
+        }
+    }
+
+    function _approveToken(address _token) internal {
+        isApproved[_token] = true;
+        approvedTokens.push(_token);
+        ILocalLpStaking(lpStaking).addPool(_token);
+        emit TokenApproved(_token);
+    }
+
+}
@@ -0,0 +1,211 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/SafeERC20.sol";
+import "../interfaces/IERC20.sol";
+import "../interfaces/ellipsis/ITokenLocker.sol";
+import "./LocalEpx.sol";
+import "./LocalIncentiveVoting.sol";
+
+
+/**
+    @notice Local stand-in for `EllipsisLpStaking`
+    @dev EPX is minted as rewards at the per-token rate given by `LocalIncentiveVoting`.
+         There is no boost, every depositor receives the full emissions for their share.
+ */
+contract LocalLpStaking {
+    using SafeERC20 for IERC20;
+
+    struct UserInfo {
+        uint256 depositAmount;
+        uint256 rewardDebt;
+        uint256 claimable;
+    }
+
+    struct PoolInfo {
+        uint256 accRewardPerShare;
+        uint256 lastRewardTime;
+        uint256 totalDeposits;
+    }
+
+    uint256 constant WEEK = 86400 * 7;
+
+    LocalEpx public immutable rewardToken;
+    LocalIncentiveVoting public immutable incentiveVoting;
+    ITokenLocker public immutable tokenLocker;
+    uint256 public immutable startTime;
+    uint256 public immutable maxMintableTokens;
+    uint256 public mintedTokens;
+
+    address[] public registeredTokens;
+    mapping(address => PoolInfo) public poolInfo;
+    // token -> user -> deposit data
+    mapping(address => mapping(address => UserInfo)) public userInfo;
+
+    mapping(address => address) public claimReceiver;
+    mapping(address => bool) public blockThirdPartyActions;
+
+    event Deposit(address indexed user, address indexed token, uint256 amount);
+    event Withdraw(address indexed user, address indexed token, uint256 amount);
+    event EmergencyWithdraw(address indexed user, address indexed token, uint256 amount);
+    event Claimed(address indexed caller, address indexed receiver, address[] tokens, uint256 amount);
+
+    constructor(
+        LocalEpx _rewardToken,
+        LocalIncentiveVoting _incentiveVoting,
+        ITokenLocker _tokenLocker,
+        uint256 _maxMintable
+    ) {
+        rewardToken = _rewardToken;
+        incentiveVoting = _incentiveVoting;
+        tokenLocker = _tokenLocker;
+        startTime = _incentiveVoting.startTime();
+        maxMintableTokens = _maxMintable;
+    }
+
+    function addPool(address _token) external returns (bool) {
+        require(msg.sender == address(incentiveVoting), "Sender not incentiveVoting");
+        require(poolInfo[_token].lastRewardTime == 0, "Pool already added");
+        registeredTokens.push(_token);
+        poolInfo[_token].lastRewardTime = block.timestamp;
+        return true;
+    }
+
+    function poolLength() external view returns (uint256) {
+        return registeredTokens.length;
+    }
+
+    function setClaimReceiver(address _receiver) external {
+        claimReceiver[msg.sender] = _receiver;
+    }
+
+    function setBlockThirdPartyActions(bool _block) external {
+        blockThirdPartyActions[msg.sender] = _block;
+    }
+
+    function claimableReward(address _user, address[] calldata _tokens) external view returns (uint256[] memory) {
+        uint256[] memory claimable = new uint256[](_tokens.length);
+        for (uint i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            PoolInfo storage pool = poolInfo[token];
+            UserInfo storage user = userInfo[token][_user];
+
+            uint256 accRewardPerShare = pool.accRewardPerShare;
+            if (block.timestamp > pool.lastRewardTime && pool.totalDeposits > 0) {
+                uint256 reward = _rewardBetween(token, pool.lastRewardTime, block.timestamp);
+                accRewardPerShare += reward * 1e18 / pool.totalDeposits;
+            }
+            claimable[i] = user.claimable + user.depositAmount * accRewardPerShare / 1e18 - user.rewardDebt;
+        }
+        return claimable;
+    }
+
+    function deposit(address _token, uint256 _amount, bool _claimRewards) external returns (uint256) {
+        require(_amount > 0, "Cannot deposit zero");
+        PoolInfo storage pool = poolInfo[_token];
+        require(pool.lastRewardTime != 0, "Invalid token");
+        UserInfo storage user = userInfo[_token][msg.sender];
+
+        _updatePool(_token);
+        _accrue(pool, user);
+        IERC20(_token).safeTransferFrom(msg.sender, address(this), _amount);
+        user.depositAmount += _amount;
+        pool.totalDeposits += _amount;
+        user.rewardDebt = user.depositAmount * pool.accRewardPerShare / 1e18;
+        emit Deposit(msg.sender, _token, _amount);
+
+        if (_claimRewards) return _claimUserRewards(msg.sender, user);
+        return 0;
+    }
+
+    function withdraw(address _token, uint256 _amount, bool _claimRewards) external returns (uint256) {
+        require(_amount > 0, "Cannot withdraw zero");
+        PoolInfo storage pool = poolInfo[_token];
+        UserInfo storage user = userInfo[_token][msg.sender];
+        require(user.depositAmount >= _amount, "withdraw: not good");
+
+        _updatePool(_token);
+        _accrue(pool, user);
+        user.depositAmount -= _amount;
+        pool.totalDeposits -= _amount;
+        user.rewardDebt = user.depositAmount * pool.accRewardPerShare / 1e18;
+        IERC20(_token).safeTransfer(msg.sender, _amount);
+        emit Withdraw(msg.sender, _token, _amount);
+
+        if (_claimRewards) return _claimUserRewards(msg.sender, user);
+        return 0;
+    }
+
+    function emergencyWithdraw(address _token) external {
+        PoolInfo storage pool = poolInfo[_token];
+        UserInfo storage user = userInfo[_token][msg.sender];
+        uint256 amount = user.depositAmount;
+
+        _updatePool(_token);
+        pool.totalDeposits -= amount;
+        delete userInfo[_token][msg.sender];
+        IERC20(_token).safeTransfer(msg.sender, amount);
+        emit EmergencyWithdraw(msg.sender, _token, amount);
+    }
+
+    function claim(address _user, address[] calldata _tokens) external returns (uint256) {
+        if (msg.sender != _user) {
+            require(!blockThirdPartyActions[_user], "Cannot claim on behalf of this account");
+        }
+        uint256 claimable;
+        for (uint i = 0; i < _tokens.length; i++) {
+            address token = _tokens[i];
+            PoolInfo storage pool = poolInfo[token];
+            UserInfo storage user = userInfo[token][_user];
+            _updatePool(token);
+            _accrue(pool, user);
+            user.rewardDebt = user.depositAmount * pool.accRewardPerShare / 1e18;
+            claimable += user.claimable;
+            user.claimable = 0;
+        }
+        _mint(_user, claimable);
+        emit Claimed(msg.sender, _user, _tokens, claimable);
+        return claimable;
+    }
+
+    function _rewardBetween(address _token, uint256 _from, uint256 _to) internal view returns (uint256 reward) {
+        while (_from < _to) {
+            uint256 week = (_from - startTime) / WEEK;
+            uint256 end = startTime + (week + 1) * WEEK;
+            if (end > _to) end = _to;
+            reward += (end - _from) * incentiveVoting.getRewardsPerSecond(_token, week);
+            _from = end;
+        }
+        return reward;
+    }
+
+    function _updatePool(address _token) internal {
+        PoolInfo storage pool = poolInfo[_token];
+        if (pool.lastRewardTime == 0 || block.timestamp <= pool.lastRewardTime) return;
+        if (pool.totalDeposits > 0) {
+            uint256 reward = _rewardBetween(_token, pool.lastRewardTime, block.timestamp);
+            pool.accRewardPerShare += reward * 1e18 / pool.totalDeposits;
+        }
+        pool.lastRewardTime = block.timestamp;
+    }
+
+    function _accrue(PoolInfo storage _pool, UserInfo storage _user) internal {
+        _user.claimable += _user.depositAmount * _pool.accRewardPerShare / 1e18 - _user.rewardDebt;
+    }
+
+    function _claimUserRewards(address _user, UserInfo storage _info) internal returns (uint256 amount) {
+        amount = _info.claimable;
+        _info.claimable = 0;
+        _mint(_user, amount);
+        return amount;
+    }
+
+    function _mint(address _user, uint256 _amount) internal {
+        if (_amount == 0) return;
+        require(mintedTokens + _amount <= maxMintableTokens, "Max mintable exceeded");
+        mintedTokens += _amount;
+        address receiver = claimReceiver[_user];
+        if (receiver == address(0)) receiver = _user;
+        rewardToken.mint(receiver, _amount);
+    }
+
+}
@@ -0,0 +1,160 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/Ownable.sol";
+import "../dependencies/SafeERC20.sol";
+import "./LocalERC20.sol";
+
+
+/**
+    @notice Local stand-in for an Ellipsis factory pool LP token
+    @dev Extra rewards are distributed according to the standard multi-reward
+         staking logic. Balances transferred into an approved deposit contract
+         (e.g. `EllipsisLpStaking`) continue to accrue rewards to the depositor.
+ */
+contract LocalLpToken is LocalERC20, Ownable {
+    using SafeERC20 for IERC20;
+
+    struct Reward {
+        address distributor;
+        uint256 duration;
+        uint256 periodFinish;
+        uint256 rewardRate;
+        uint256 lastUpdateTime;
+        uint256 rewardPerTokenStored;
+    }
+
+    address public immutable minter;
+
+    address[] public rewardTokens;
+    mapping(address => Reward) public rewardData;
+    mapping(address => mapping(address => uint256)) public userRewardPerTokenPaid;
+    mapping(address => mapping(address => uint256)) public rewards;
+
+    mapping(address => bool) public depositContracts;
+    mapping(address => uint256) public rewardBalanceOf;
+    uint256 public rewardSupply;
+
+    constructor(
+        string memory _name,
+        string memory _symbol,
+        address _minter,
+        address _owner
+    ) LocalERC20(_name, _symbol) {
+        minter = _minter;
+        _transferOwnership(_owner);
+    }
+
+    function rewardCount() external view returns (uint256) {
+        return rewardTokens.length;
+    }
+
+    function setDepositContract(address _account, bool _isDepositContract) external onlyOwner {
+        require(rewardBalanceOf[_account] == 0, "Address holds reward balance");
+        depositContracts[_account] = _isDepositContract;
+    }
+
+    function addReward(address _token, address _distributor, uint256 _duration) external onlyOwner {
+        require(rewardData[_token].lastUpdateTime == 0, "Reward already added");
+        rewardTokens.push(_token);
+        rewardData[_token].distributor = _distributor;
+        rewardData[_token].duration = _duration;
+        rewardData[_token].lastUpdateTime = block.timestamp;
+        rewardData[_token].periodFinish = block.timestamp;
+    }
+
+    function notifyRewardAmount(address _token, uint256 _amount) external {
+        Reward storage r = rewardData[_token];
+        require(r.distributor == msg.sender, "Not distributor");
+        _updateReward(address(0));
+        IERC20(_token).safeTransferFrom(msg.sender, address(this), _amount);
+
+        if (block.timestamp >= r.periodFinish) {
+            r.rewardRate = _amount / r.duration;
+        } else {
+            uint256 remaining = r.periodFinish - block.timestamp;
+            r.rewardRate = (_amount + remaining * r.rewardRate) / r.duration;
+        }
+        r.lastUpdateTime = block.timestamp;
+        r.periodFinish = block.timestamp + r.duration;
+    }
+
+    function lastTimeRewardApplicable(address _token) public view returns (uint256) {
+        uint256 periodFinish = rewardData[_token].periodFinish;
+        return block.timestamp < periodFinish ? block.timestamp : periodFinish;
+    }
+
+    function rewardPerToken(address _token) public view returns (uint256) {
+        Reward storage r = rewardData[_token];
+        if (rewardSupply == 0) return r.rewardPerTokenStored;
+        uint256 duration = lastTimeRewardApplicable(_token) - r.lastUpdateTime;
+        return r.rewardPerTokenStored + duration * r.rewardRate * 1e18 / rewardSupply;
+    }
+
+    function earned(address _account, address _token) public view returns (uint256) {
+        uint256 perToken = rewardPerToken(_token) - userRewardPerTokenPaid[_account][_token];
+        return rewardBalanceOf[_account] * perToken / 1e18 + rewards[_account][_token];
+    }
+
+    function getReward() external {
+        _updateReward(msg.sender);
+        for (uint i = 0; i < rewardTokens.length; i++) {
+            address token = rewardTokens[i];
+            uint256 amount = rewards[msg.sender][token];
+            if (amount > 0) {
+                rewards[msg.sender][token] = 0;
+                IERC20(token).safeTransfer(msg.sender, amount);
+            }
+        }
+    }
+
+    function mint(address _to, uint256 _value) external returns (bool) {
+        require(msg.sender == minter, "Only minter");
+        _mint(_to, _value);
+        return true;
+    }
+
+    function burnFrom(address _from, uint256 _value) external returns (bool) {
+        require(msg.sender == minter, "Only minter");
+        _burn(_from, _value);
+        return true;
+    }
+
+    function _mint(address _to, uint256 _value) internal override {
+        _updateReward(_to);
+        rewardBalanceOf[_to] += _value;
+        rewardSupply += _value;
+        super._mint(_to, _value);
+    }
+
+    function _burn(address _from, uint256 _value) internal override {
+        _updateReward(_from);
+        rewardBalanceOf[_from] -= _value;
+        rewardSupply -= _value;
+        super._burn(_from, _value);
+    }
+
+    function _transfer(address _from, address _to, uint256 _value) internal override {
+        // transfers into or out of a deposit contract leave the reward balance unchanged
+        if (!depositContracts[_from] && !depositContracts[_to]) {
+            _updateReward(_from);
+            _updateReward(_to);
+            rewardBalanceOf[_from] -= _value;
+            rewardBalanceOf[_to] += _value;
+        }
+        super._transfer(_from, _to, _value);
+    }
+
+    function _updateReward(address _account) internal {
+        for (uint i = 0; i < rewardTokens.length; i++) {
+            address token = rewardTokens[i];
+            Reward storage r = rewardData[token];
+            r.rewardPerTokenStored = rewardPerToken(token);
+            r.lastUpdateTime = lastTimeRewardApplicable(token);
+            if (_account != address(0)) {
+                rewards[_account][token] = earned(_account, token);
+                userRewardPerTokenPaid[_account][token] = r.rewardPerTokenStored;
+            }
+        }
+    }
+
+}
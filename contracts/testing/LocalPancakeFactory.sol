@@ -0,0 +1,34 @@
+pragma solidity 0.8.12;
+
+import "./LocalPancakePair.sol";
+
+
+/**
+    @notice Local stand-in for the PancakeSwap factory
+ */
+contract LocalPancakeFactory {
+
+    mapping(address => mapping(address => address)) public getPair;
+    address[] public allPairs;
+
+    event PairCreated(address indexed token0, address indexed token1, address pair, uint);
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function createPair(address _tokenA, address _tokenB) external returns (address pair) {
+        require(_tokenA != _tokenB, "Pancake: IDENTICAL_ADDRESSES");
+        (address token0, address token1) = _tokenA < _tokenB ? (_tokenA, _tokenB) : (_tokenB, _tokenA);
+        require(token0 != address(0), "Pancake: ZERO_ADDRESS");
+        require(getPair[token0][token1] == address(0), "Pancake: PAIR_EXISTS");
+
+        pair = address(new LocalPancakePair(token0, token1));
+        getPair[token0][token1] = pair;
+        getPair[token1][token0] = pair;
+        allPairs.push(pair);
+        emit PairCreated(token0, token1, pair, allPairs.length);
+        return pair;
+    }
+
+}
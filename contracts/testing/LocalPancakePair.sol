@@ -0,0 +1,102 @@
+pragma solidity 0.8.12;
+
+import "../interfaces/IERC20.sol";
+import "./LocalERC20.sol";
+
+
+/**
+    @notice Local stand-in for a PancakeSwap pair
+    @dev Supports adding and removing liquidity. Swaps are not implemented.
+ */
+contract LocalPancakePair is LocalERC20 {
+
+    uint256 public constant MINIMUM_LIQUIDITY = 1000;
+
+    address public immutable factory;
+    address public immutable token0;
+    address public immutable token1;
+
+    uint112 reserve0;
+    uint112 reserve1;
+    uint32 blockTimestampLast;
+
+    event Mint(address indexed sender, uint amount0, uint amount1);
+    event Burn(address indexed sender, uint amount0, uint amount1, address indexed to);
+    event Sync(uint112 reserve0, uint112 reserve1);
+
+    constructor(address _token0, address _token1) LocalERC20("Pancake LPs", "Cake-LP") {
+        factory = msg.sender;
+        token0 = _token0;
+        token1 = _token1;
+    }
+
+    function getReserves() public view returns (uint112, uint112, uint32) {
+        return (reserve0, reserve1, blockTimestampLast);
+    }
+
+    function mint(address _to) external returns (uint256 liquidity) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 amount0 = balance0 - reserve0;
+        uint256 amount1 = balance1 - reserve1;
+
+        if (totalSupply == 0) {
+            liquidity = _sqrt(amount0 * amount1) - MINIMUM_LIQUIDITY;
+            _mint(address(0), MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = _min(amount0 * totalSupply / reserve0, amount1 * totalSupply / reserve1);
+        }
+        require(liquidity > 0, "Pancake: INSUFFICIENT_LIQUIDITY_MINTED");
+        _mint(_to, liquidity);
+
+        _update(balance0, balance1);
+        emit Mint(msg.sender, amount0, amount1);
+        return liquidity;
+    }
+
+    function burn(address _to) external returns (uint256 amount0, uint256 amount1) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 liquidity = balanceOf[address(this)];
+
+        amount0 = liquidity * balance0 / totalSupply;
+        amount1 = liquidity * balance1 / totalSupply;
+        require(amount0 > 0 && amount1 > 0, "Pancake: INSUFFICIENT_LIQUIDITY_BURNED");
+        _burn(address(this), liquidity);
+        IERC20(token0).transfer(_to, amount0);
+        IERC20(token1).transfer(_to, amount1);
+
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+        emit Burn(msg.sender, amount0, amount1, _to);
+        return (amount0, amount1);
+    }
+
+    function sync() external {
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function _update(uint256 _balance0, uint256 _balance1) internal {
+        reserve0 = uint112(_balance0);
+        reserve1 = uint112(_balance1);
+        blockTimestampLast = uint32(block.timestamp);
+        emit Sync(reserve0, reserve1);
+    }
+
+    function _min(uint256 x, uint256 y) internal pure returns (uint256) {
+        return x < y ? x : y;
+    }
+
+    function _sqrt(uint256 y) internal pure returns (uint256 z) {
+        if (y > 3) {
+            z = y;
+            uint256 x = y / 2 + 1;
+            while (x < z) {
+                z = x;
+                x = (y / x + x) / 2;
+            }
+        } else if (y != 0) {
+            z = 1;
+        }
+    }
+
+}
@@ -0,0 +1,140 @@
+pragma solidity 0.8.12;
+
+import "../dependencies/SafeERC20.sol";
+import "../interfaces/IERC20.sol";
+import "./LocalLpToken.sol";
+
+
+/**
+    @notice Local stand-in for an Ellipsis factory plain pool
+    @dev All coins are valued 1:1 and no fees are charged. Only liquidity
+         management is implemented, there is no `exchange`.
+ */
+contract LocalPool {
+    using SafeERC20 for IERC20;
+
+    address public immutable factory;
+    address public lp_token;
+
+    address[] coinList;
+    uint256[] public balances;
+
+    constructor(address[] memory _coins) {
+        factory = msg.sender;
+        coinList = _coins;
+        balances = new uint256[](_coins.length);
+    }
+
+    function setLpToken(address _lpToken) external {
+        require(msg.sender == factory && lp_token == address(0));
+        lp_token = _lpToken;
+    }
+
+    function coins(uint256 i) external view returns (address) {
+        return coinList[i];
+    }
+
+    function add_liquidity(uint256[2] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256) {
+        uint256[] memory amounts = new uint256[](2);
+        for (uint i = 0; i < 2; i++) amounts[i] = _amounts[i];
+        return _addLiquidity(amounts, _min_mint_amount, _receiver);
+    }
+
+    function add_liquidity(uint256[3] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256) {
+        uint256[] memory amounts = new uint256[](3);
+        for (uint i = 0; i < 3; i++) amounts[i] = _amounts[i];
+        return _addLiquidity(amounts, _min_mint_amount, _receiver);
+    }
+
+    function add_liquidity(uint256[4] calldata _amounts, uint256 _min_mint_amount, address _receiver) external returns (uint256) {
+        uint256[] memory amounts = new uint256[](4);
+        for (uint i = 0; i < 4; i++) amounts[i] = _amounts[i];
+        return _addLiquidity(amounts, _min_mint_amount, _receiver);
+    }
+
+    function remove_liquidity(uint256 _burn_amount, uint256[2] calldata _min_amounts, address _receiver) external returns (uint256[2] memory received) {
+        uint256[] memory amounts = _removeLiquidity(_burn_amount, _receiver);
+        for (uint i = 0; i < 2; i++) {
+            require(amounts[i] >= _min_amounts[i], "Slippage");
+            received[i] = amounts[i];
+        }
+        return received;
+    }
+
+    function remove_liquidity(uint256 _burn_amount, uint256[3] calldata _min_amounts, address _receiver) external returns (uint256[3] memory received) {
+        uint256[] memory amounts = _removeLiquidity(_burn_amount, _receiver);
+        for (uint i = 0; i < 3; i++) {
+            require(amounts[i] >= _min_amounts[i], "Slippage");
+            received[i] = amounts[i];
+        }
+        return received;
+    }
+
+    function remove_liquidity(uint256 _burn_amount, uint256[4] calldata _min_amounts, address _receiver) external returns (uint256[4] memory received) {
+        uint256[] memory amounts = _removeLiquidity(_burn_amount, _receiver);
+        for (uint i = 0; i < 4; i++) {
+            require(amounts[i] >= _min_amounts[i], "Slippage");
+            received[i] = amounts[i];
+        }
+        return received;
+    }
+
+    function remove_liquidity_one_coin(
+        uint256 _burn_amount,
+        int128 i,
+        uint256 _min_received,
+        address _receiver
+    ) external returns (uint256) {
+        uint256 idx = uint256(int256(i));
+        uint256 amount = _burn_amount * _totalBalance() / IERC20(lp_token).totalSupply();
+        require(amount >= _min_received, "Slippage");
+        require(balances[idx] >= amount, "Insufficient pool balance");
+
+        LocalLpToken(lp_token).burnFrom(msg.sender, _burn_amount);
+        balances[idx] -= amount;
+        IERC20(coinList[idx]).safeTransfer(_receiver, amount);
+        return amount;
+    }
+
+    function _totalBalance() internal view returns (uint256 total) {
+        for (uint i = 0; i < balances.length; i++) {
+            total += balances[i];
+        }
+        return total;
+    }
+
+    function _addLiquidity(uint256[] memory _amounts, uint256 _minMint, address _receiver) internal returns (uint256 mintAmount) {
+        require(_amounts.length == coinList.length, "Invalid number of coins");
+        uint256 supply = IERC20(lp_token).totalSupply();
+        uint256 initial = _totalBalance();
+
+        uint256 deposited;
+        for (uint i = 0; i < _amounts.length; i++) {
+            uint256 amount = _amounts[i];
+            if (amount == 0) continue;
+            IERC20(coinList[i]).safeTransferFrom(msg.sender, address(this), amount);
+            balances[i] += amount;
+            deposited += amount;
+        }
+
+        mintAmount = supply == 0 ? deposited : deposited * supply / initial;
+        require(mintAmount >= _minMint, "Slippage");
+        LocalLpToken(lp_token).mint(_receiver, mintAmount);
+        return mintAmount;
+    }
+
+    function _removeLiquidity(uint256 _burnAmount, address _receiver) internal returns (uint256[] memory amounts) {
+        uint256 supply = IERC20(lp_token).totalSupply();
+        LocalLpToken(lp_token).burnFrom(msg.sender, _burnAmount);
+
+        amounts = new uint256[](coinList.length);
+        for (uint i = 0; i < amounts.length; i++) {
+            uint256 amount = balances[i] * _burnAmount / supply;
+            balances[i] -= amount;
+            amounts[i] = amount;
+            IERC20(coinList[i]).safeTransfer(_receiver, amount);
+        }
+        return amounts;
+    }
+
+}
@@ -0,0 +1,65 @@
+pragma solidity 0.8.12;
+
+import "./LocalLpToken.sol";
+import "./LocalPool.sol";
+
+
+/**
+    @notice Local stand-in for the Ellipsis factory
+    @dev Only `deploy_plain_pool` is implemented. `_A`, `_fee`, `_asset_type` and
+         `_implementation_idx` are accepted for interface compatibility but ignored.
+ */
+contract LocalPoolFactory {
+
+    address public admin;
+    address public fee_receiver;
+
+    address[] public pool_list;
+
+    event PlainPoolDeployed(
+        address[4] coins,
+        uint256 A,
+        uint256 fee,
+        address deployer,
+        address lp_token
+    );
+
+    constructor() {
+        admin = msg.sender;
+    }
+
+    function pool_count() external view returns (uint256) {
+        return pool_list.length;
+    }
+
+    function set_fee_receiver(address _receiver) external {
+        require(msg.sender == admin, "Only admin");
+        fee_receiver = _receiver;
+    }
+
+    function deploy_plain_pool(
+        string calldata _name,
+        string calldata _symbol,
+        address[4] calldata _coins,
+        uint256 _A,
+        uint256 _fee,
+        uint256 _asset_type,
+        uint256 _implementation_idx
+    ) external returns (address) {
+        uint256 count;
+        while (count < 4 && _coins[count] != address(0)) count++;
+        require(count > 1, "Insufficient coins");
+
+        address[] memory coins = new address[](count);
+        for (uint i = 0; i < count; i++) coins[i] = _coins[i];
+
+        LocalPool pool = new LocalPool(coins);
+        LocalLpToken lpToken = new LocalLpToken(_name, _symbol, address(pool), admin);
+        pool.setLpToken(address(lpToken));
+        pool_list.push(address(pool));
+
+        emit PlainPoolDeployed(_coins, _A, _fee, msg.sender, address(lpToken));
+        return address(pool);
+    }
+
+}
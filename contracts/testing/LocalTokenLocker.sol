@@ -0,0 +1,35 @@
+pragma solidity 0.8.12;
+
+import "../TokenLocker.sol";
+
+
+contract LocalStartTime {
+    uint256 public immutable startTime;
+
+    constructor(uint256 _startTime) {
+        startTime = _startTime;
+    }
+}
+
+
+/**
+    @notice Local stand-in for the Ellipsis `TokenLocker`
+    @dev Reuses the DotDot locker, which shares the same weight accounting.
+         The DotDot locker starts 3 days before the locker it is given, so it
+         is deployed against a `LocalStartTime` that is offset by the same amount.
+         The locked token is stored as `DDD`, but is EPX for this contract.
+ */
+contract LocalTokenLocker is TokenLocker {
+
+    constructor(
+        IERC20 _epx,
+        uint256 _startTime,
+        uint256 _maxLockWeeks
+    )
+        TokenLocker(TokenLocker(address(new LocalStartTime(_startTime + 86400 * 3))), _maxLockWeeks)
+    {
+        DDD = _epx;
+        renounceOwnership();
+    }
+
+}
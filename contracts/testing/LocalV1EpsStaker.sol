@@ -0,0 +1,49 @@
+pragma solidity 0.8.12;
+
+import "../interfaces/ellipsis/IV1EpsStaker.sol";
+
+
+/**
+    @notice Local stand-in for the EPS v1 `MultiFeeDistribution` staker
+    @dev Only lock data is tracked. Locks are created directly via `addLock`,
+         no tokens are transferred.
+ */
+contract LocalV1EpsStaker {
+
+    uint256 public lockedSupply;
+
+    mapping(address => IV1EpsStaker.LockedBalance[]) userLocks;
+
+    function addLock(address _user, uint256 _amount, uint256 _unlockTime) external {
+        userLocks[_user].push(IV1EpsStaker.LockedBalance({amount: _amount, unlockTime: _unlockTime}));
+        lockedSupply += _amount;
+    }
+
+    function lockedBalances(
+        address _user
+    ) external view returns (
+        uint256 total,
+        uint256 unlockable,
+        uint256 locked,
+        IV1EpsStaker.LockedBalance[] memory lockData
+    ) {
+        IV1EpsStaker.LockedBalance[] storage locks = userLocks[_user];
+        uint256 length;
+        for (uint i = 0; i < locks.length; i++) {
+            if (locks[i].unlockTime > block.timestamp) length++;
+        }
+        lockData = new IV1EpsStaker.LockedBalance[](length);
+        uint256 idx;
+        for (uint i = 0; i < locks.length; i++) {
+            if (locks[i].unlockTime > block.timestamp) {
+                locked += locks[i].amount;
+                lockData[idx] = locks[i];
+                idx++;
+            } else {
+                unlockable += locks[i].amount;
+            }
+        }
+        return (locked + unlockable, unlockable, locked, lockData);
+    }
+
+}
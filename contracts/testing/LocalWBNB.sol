@@ -0,0 +1,26 @@
+pragma solidity 0.8.12;
+
+import "./LocalERC20.sol";
+
+
+/**
+    @notice Local stand-in for `WBNB`
+ */
+contract LocalWBNB is LocalERC20 {
+
+    constructor() LocalERC20("Wrapped BNB", "WBNB") {}
+
+    receive() external payable {
+        deposit();
+    }
+
+    function deposit() public payable {
+        _mint(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 _value) external {
+        _burn(msg.sender, _value);
+        payable(msg.sender).transfer(_value);
+    }
+
+}
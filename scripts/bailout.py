@@ -0,0 +1,194 @@
+"""
+Merkle-snapshot tooling for `EmergencyBailout`.
+
+Once an emergency withdrawal is triggered for an LP token, all balances for that
+token within `LpDepositor` are frozen. This script collects every depositor of the
+token, reads their balances and builds a merkle tree that is used with
+`EmergencyBailout.setMerkleRoot` and `EmergencyBailout.withdrawMany`, so that the
+entire bailout can be distributed in a small number of transactions.
+
+Usage:
+
+    brownie run bailout build <lp token> [storage|events] --network bsc-main
+    brownie run bailout distribute <lp token> <account id> --network bsc-main
+"""
+
+import json
+from pathlib import Path
+
+from brownie import EllipsisProxy, EmergencyBailout, LpDepositor, accounts, web3
+from hexbytes import HexBytes
+
+from scripts.merkle import MerkleTree, balance_leaf
+from scripts.storage import find_deployment_block, get_logs, nested_slot
+
+DEPLOYMENTS = Path(__file__).parent.parent.joinpath("deployments.json")
+
+# storage slot of `LpDepositor.userBalances`
+USER_BALANCES_SLOT = 13
+# number of users to withdraw for in a single transaction
+WITHDRAW_BATCH_SIZE = 200
+
+
+def _address_from_topic(topic):
+    return web3.toChecksumAddress(topic[-20:])
+
+
+def get_balance_events(lp_depositor, token, from_block, to_block):
+    """
+    Fetch all `Deposit`, `Withdraw` and `TransferDeposit` events for `token`,
+    returned as a list of `(account, balance delta)` in the order they were emitted.
+    """
+    token_topic = "0x" + bytes.fromhex(token[2:]).rjust(32, b"\x00").hex()
+    deposit, withdraw, transfer = [
+        LpDepositor.topics[i] for i in ("Deposit", "Withdraw", "TransferDeposit")
+    ]
+
+    logs = get_logs(lp_depositor, [[deposit, withdraw], None, None, token_topic], from_block, to_block)
+    logs += get_logs(lp_depositor, [transfer, token_topic], from_block, to_block)
+    logs = sorted(logs, key=lambda k: (k["blockNumber"], k["logIndex"]))
+
+    deltas = []
+    for log in logs:
+        topic0 = log["topics"][0].hex()
+        amount = int(HexBytes(log["data"]).hex(), 16)
+        if topic0 == deposit:
+            # Deposit(caller, receiver, token, amount)
+            deltas.append((_address_from_topic(log["topics"][2]), amount))
+        elif topic0 == withdraw:
+            # Withdraw(caller, receiver, token, amount)
+            deltas.append((_address_from_topic(log["topics"][1]), -amount))
+        else:
+            # TransferDeposit(token, from, to, amount)
+            deltas.append((_address_from_topic(log["topics"][2]), -amount))
+            deltas.append((_address_from_topic(log["topics"][3]), amount))
+    return deltas
+
+
+def balances_from_events(deltas):
+    balances = {}
+    for account, delta in deltas:
+        balances[account] = balances.get(account, 0) + delta
+    return {k: v for k, v in balances.items() if v > 0}
+
+
+def balances_from_storage(lp_depositor, token, users, block):
+    """Read `LpDepositor.userBalances[user][token]` directly from storage."""
+    balances = {}
+    for user in users:
+        slot = nested_slot(USER_BALANCES_SLOT, user, token)
+        value = int(web3.eth.get_storage_at(lp_depositor, slot, block).hex(), 16)
+        if value > 0:
+            balances[user] = value
+    return balances
+
+
+def build_tree(balances):
+    """
+    Build a merkle tree from a dict of `{user: amount}`.
+
+    Returns the merkle root and a dict of `{user: {"amount": amount, "proof": proof}}`.
+    """
+    leaves = {user: balance_leaf(user, amount) for user, amount in balances.items()}
+    tree = MerkleTree(list(leaves.values()))
+    claims = {
+        user: {"amount": balances[user], "proof": ["0x" + i.hex() for i in tree.get_proof(leaf)]}
+        for user, leaf in sorted(leaves.items())
+    }
+    return "0x" + tree.root.hex(), claims
+
+
+def build_bailout_tree(lp_depositor, token, mode="storage", from_block=None, block=None):
+    """
+    Generate the merkle tree data for an `EmergencyBailout`.
+
+    Arguments
+    ---------
+    lp_depositor : Contract
+        `LpDepositor` deployment
+    token : str
+        LP token address
+    mode : str
+        Source for user balances. "storage" reads balances directly from `LpDepositor`
+        storage, "events" calculates balances by replaying the emitted events.
+    from_block : int, optional
+        First block to query events from. If not given, the block that `LpDepositor`
+        was deployed in is found via a binary search.
+    block : int, optional
+        Block to take the snapshot at. Defaults to the latest block.
+    """
+    lp_depositor = str(lp_depositor)
+    token = web3.toChecksumAddress(str(token))
+    if block is None:
+        block = web3.eth.block_number
+    if from_block is None:
+        from_block = find_deployment_block(lp_depositor, block)
+
+    deltas = get_balance_events(lp_depositor, token, from_block, block)
+    if mode == "events":
+        balances = balances_from_events(deltas)
+    elif mode == "storage":
+        users = sorted(set(i[0] for i in deltas))
+        balances = balances_from_storage(lp_depositor, token, users, block)
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    total = LpDepositor.at(lp_depositor).totalBalances(token, block_identifier=block)
+    if sum(balances.values()) != total:
+        raise ValueError(f"Sum of balances ({sum(balances.values())}) does not equal totalBalances ({total})")
+
+    proxy = EllipsisProxy.at(LpDepositor.at(lp_depositor).proxy())
+    root, claims = build_tree(balances)
+    return {
+        "lpDepositor": lp_depositor,
+        "token": token,
+        "bailout": proxy.emergencyBailout(lp_depositor, token, block_identifier=block),
+        "block": block,
+        "merkleRoot": root,
+        "total": str(total),
+        "claims": {k: {"amount": str(v["amount"]), "proof": v["proof"]} for k, v in claims.items()},
+    }
+
+
+def distribute_bailout(data, sender, batch_size=WITHDRAW_BATCH_SIZE):
+    """
+    Set the merkle root (if required) and withdraw for all users, in batches.
+    A different root is replaced, unless withdrawals have already been made with it.
+    """
+    bailout = EmergencyBailout.at(data["bailout"])
+    if bailout.merkleRoot() != data["merkleRoot"]:
+        if bailout.merkleRootUsed():
+            raise ValueError("Merkle root on bailout does not match the given data, and is already in use")
+        bailout.setMerkleRoot(data["merkleRoot"], {"from": sender})
+
+    pending = [k for k in data["claims"] if not bailout.hasWithdrawn(k)]
+    txs = []
+    for i in range(0, len(pending), batch_size):
+        users = pending[i : i + batch_size]
+        amounts = [data["claims"][k]["amount"] for k in users]
+        proofs = [data["claims"][k]["proof"] for k in users]
+        txs.append(bailout.withdrawMany(users, amounts, proofs, {"from": sender}))
+    return txs
+
+
+def _output_path(token):
+    return Path(f"bailout-{token}.json")
+
+
+def build(token, mode="storage"):
+    deployments = json.loads(DEPLOYMENTS.read_text())
+    data = build_bailout_tree(deployments["LpDepositor"], token, mode)
+    if data["bailout"] == "0x" + "00" * 20:
+        print("Warning: no emergency bailout has been initiated for this token")
+
+    path = _output_path(data["token"])
+    with path.open("w") as fp:
+        json.dump(data, fp, indent=2, sort_keys=True)
+    print(f"Merkle root {data['merkleRoot']} for {len(data['claims'])} users written to {path}")
+
+
+def distribute(token, account_id):
+    sender = accounts.load(account_id)
+    path = _output_path(web3.toChecksumAddress(token))
+    data = json.loads(path.read_text())
+    distribute_bailout(data, sender)
@@ -0,0 +1,229 @@
+"""
+Merkle distribution of lp token bribes from `DddIncentiveDistributor`.
+
+Once `setMerkleMode` is enabled, bribes deposited for lp tokens from the start
+week onward are no longer claimed with `claim`. Claiming with `claim` loops over
+every week and calls `DotDotVoting.weeklyVotes` for each one. Instead, after each
+voting week ends, this script computes the share of every voter in that week's
+bribes and publishes a merkle root of the cumulative amounts. Each leaf is
+`keccak256(abi.encode(user, tokens, cumulativeAmounts))`, summed across all lp
+tokens and weeks. Users then claim everything with a single proof, via
+`claimMerkle`.
+
+Shares are computed with the same integer formula as
+`DddIncentiveDistributor._getClaimable`. For each lp token, bribe token and week,
+a voter's share is rounded down on its own before the shares are summed. The
+output depends only on the data of weeks that have ended, so any run for the same
+week produces the same root.
+
+Usage:
+
+    brownie run bribe_merkle build <week> [database path] --network bsc-main
+    brownie run bribe_merkle publish <week> <account id> --network bsc-main
+"""
+
+import json
+from pathlib import Path
+
+import brownie
+from brownie import DddIncentiveDistributor, DotDotVoting, ZERO_ADDRESS, accounts, web3
+
+from scripts.indexer import DEFAULT_DB_PATH, EventIndexer, load_deployments
+from scripts.merkle import MerkleTree, bribe_leaf
+
+OUTPUT_DIR = Path(__file__).parent.parent.joinpath("reports/bribes")
+
+
+def weekly_shares(amounts, votes):
+    """
+    Share of each voter in the bribes of a single week.
+
+    Arguments
+    ---------
+    amounts : dict
+        `{(lp token, bribe token): amount}` deposited in the week
+    votes : dict
+        `{(user, lp token): (user votes, total votes)}` in the same week
+
+    Returns `{user: {bribe token: amount}}`.
+    """
+    shares = {}
+    for (user, lp_token), (user_votes, total_votes) in sorted(votes.items()):
+        if user_votes == 0:
+            continue
+        for (bribe_lp_token, token), amount in sorted(amounts.items()):
+            if bribe_lp_token != lp_token or amount == 0:
+                continue
+            user_shares = shares.setdefault(user, {})
+            user_shares[token] = user_shares.get(token, 0) + amount * user_votes // total_votes
+    return shares
+
+
+def add_shares(cumulative, shares):
+    """Add `shares` into the cumulative amounts `{user: {token: amount}}`, in place."""
+    for user, tokens in shares.items():
+        totals = cumulative.setdefault(user, {})
+        for token, amount in tokens.items():
+            totals[token] = totals.get(token, 0) + amount
+    return cumulative
+
+
+def build_tree(cumulative):
+    """
+    Build a merkle tree from the cumulative amounts `{user: {token: amount}}`.
+
+    Returns the merkle root and a dict of `{user: {"tokens", "amounts", "proof"}}`.
+    """
+    entries = {}
+    for user, tokens in cumulative.items():
+        tokens = {k: v for k, v in tokens.items() if v > 0}
+        if tokens:
+            order = sorted(tokens, key=str.lower)
+            entries[user] = (order, [tokens[i] for i in order])
+    if not entries:
+        raise ValueError("No bribes to distribute")
+
+    leaves = {user: bribe_leaf(user, tokens, amounts) for user, (tokens, amounts) in entries.items()}
+    tree = MerkleTree(list(leaves.values()))
+    claims = {
+        user: {
+            "tokens": entries[user][0],
+            "amounts": entries[user][1],
+            "proof": ["0x" + i.hex() for i in tree.get_proof(leaf)],
+        }
+        for user, leaf in sorted(leaves.items())
+    }
+    return "0x" + tree.root.hex(), claims
+
+
+def read_week(distributor, voting, week, voters, block=None):
+    """
+    Read the bribes deposited in `week` and the votes of `voters` in that week.
+
+    Arguments
+    ---------
+    distributor : Contract
+        `DddIncentiveDistributor` deployment
+    voting : Contract
+        `DotDotVoting` deployment
+    week : int
+        Voting week
+    voters : dict
+        `{lp token: [users]}` of possible voters for each lp token
+    block : int, optional
+        Block to read at. Defaults to the latest block.
+
+    Returns `(amounts, votes)` in the form used by `weekly_shares`.
+    """
+    lp_tokens = sorted(voters)
+    with brownie.multicall(block_identifier=block):
+        lengths = [distributor.incentiveTokensLength(i) for i in lp_tokens]
+    with brownie.multicall(block_identifier=block):
+        tokens = {lp: [distributor.incentiveTokens(lp, i) for i in range(n)] for lp, n in zip(lp_tokens, lengths)}
+    with brownie.multicall(block_identifier=block):
+        amounts = {
+            (lp, token): distributor.weeklyIncentiveAmounts(lp, token, week)
+            for lp in lp_tokens
+            for token in tokens[lp]
+        }
+        votes = {
+            (user, lp): voting.weeklyVotes(user, lp, week)
+            for lp in lp_tokens
+            for user in sorted(set(voters[lp]))
+        }
+    amounts = {k: int(v) for k, v in amounts.items() if v > 0}
+    votes = {k: (int(v[0]), int(v[1])) for k, v in votes.items() if v[0] > 0}
+    return amounts, votes
+
+
+def build_distribution(distributor, voting, week, voters, previous=None, block=None):
+    """
+    Generate the merkle distribution of all bribes up to and including `week`.
+
+    Arguments
+    ---------
+    distributor : Contract
+        `DddIncentiveDistributor` deployment, with merkle mode enabled
+    voting : Contract
+        `DotDotVoting` deployment
+    week : int
+        Last voting week to include. Must have ended.
+    voters : dict
+        `{lp token: [users]}` of possible voters for each lp token
+    previous : dict, optional
+        Distribution of an earlier week. Only the weeks after it are read.
+    block : int, optional
+        Block to read at. Defaults to the latest block.
+    """
+    start_week = distributor.merkleStartWeek(block_identifier=block)
+    if week < start_week or week >= distributor.getVotingWeek(block_identifier=block):
+        raise ValueError(f"Week {week} is not a completed merkle mode week")
+
+    cumulative = {}
+    first_week = start_week
+    if previous is not None:
+        first_week = previous["week"] + 1
+        for user, claim in previous["claims"].items():
+            cumulative[user] = {k: int(v) for k, v in zip(claim["tokens"], claim["amounts"])}
+
+    for i in range(first_week, week + 1):
+        amounts, votes = read_week(distributor, voting, i, voters, block)
+        add_shares(cumulative, weekly_shares(amounts, votes))
+
+    root, claims = build_tree(cumulative)
+    totals = {}
+    for claim in claims.values():
+        for token, amount in zip(claim["tokens"], claim["amounts"]):
+            totals[token] = totals.get(token, 0) + amount
+    return {
+        "distributor": str(distributor),
+        "week": week,
+        "merkleRoot": root,
+        "totals": {k: str(totals[k]) for k in sorted(totals, key=str.lower)},
+        "claims": {
+            k: {"tokens": v["tokens"], "amounts": [str(i) for i in v["amounts"]], "proof": v["proof"]}
+            for k, v in claims.items()
+        },
+    }
+
+
+def find_voters(indexer):
+    """Find `{lp token: [users]}` from the indexed `DotDotVoting.VotedForIncentives` events."""
+    voters = {}
+    for event in indexer.events("DotDotVoting", "VotedForIncentives"):
+        for token in event["args"]["tokens"]:
+            voters.setdefault(web3.toChecksumAddress(token), set()).add(event["args"]["voter"])
+    return {k: sorted(v) for k, v in voters.items() if k != ZERO_ADDRESS}
+
+
+def _output_path(week):
+    return OUTPUT_DIR.joinpath(f"week-{week}.json")
+
+
+def build(week, db_path=DEFAULT_DB_PATH):
+    week = int(week)
+    deployments = load_deployments()
+    distributor = DddIncentiveDistributor.at(deployments["DddIncentiveDistributor"][0])
+    voting = DotDotVoting.at(deployments["DotDotVoting"][0])
+
+    indexer = EventIndexer(db_path, deployments)
+    voters = find_voters(indexer)
+    indexer.close()
+
+    previous = None
+    if _output_path(week - 1).exists():
+        with _output_path(week - 1).open() as fp:
+            previous = json.load(fp)
+
+    data = build_distribution(distributor, voting, week, voters, previous)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with _output_path(week).open("w") as fp:
+        json.dump(data, fp, indent=2, sort_keys=True)
+    print(f"Week {week}: {len(data['claims'])} claims, root {data['merkleRoot']}")
+
+
+def publish(week, account_id):
+    with _output_path(int(week)).open() as fp:
+        data = json.load(fp)
+    distributor = DddIncentiveDistributor.at(data["distributor"])
+    distributor.setMerkleRoot(data["merkleRoot"], data["week"], {"from": accounts.load(account_id)})
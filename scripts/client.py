@@ -0,0 +1,498 @@
+"""
+Asyncio client for reading the DotDot contracts.
+
+Every view function in the contract ABIs is available as a coroutine, e.g.
+`await client.contracts["LpDepositor"].totalBalances(pool)`. Reads share one pooled
+`aiohttp` session:
+
+* Calls made in the same event loop iteration are combined. They are sent as
+  `Multicall2.tryAggregate` calls when a multicall address is given, and
+  otherwise as JSON-RPC batches.
+* Results are cached by block number, and identical calls made before the first
+  result is returned share a single request.
+* Reads without a block use the latest head. The head is followed with an
+  `eth_subscribe` websocket or by polling `eth_blockNumber`. Cached results for
+  older blocks are dropped when a new head is seen.
+
+`DotDotClient` also has typed helpers for LP positions, bonded balances, locks,
+votes, incentives and weekly data. All the reads in one helper call are made at
+the same block.
+
+Usage:
+
+    brownie run client lookup <user> [database path] --network bsc-main
+
+or within a service:
+
+    async with DotDotClient(url, load_deployments(), multicall=address) as client:
+        positions = await client.lp_positions(user, pools)
+"""
+
+import asyncio
+import itertools
+from typing import Dict, List, NamedTuple, Tuple
+
+import aiohttp
+from eth_utils import function_abi_to_4byte_selector, function_signature_to_4byte_selector, to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.indexer import DEFAULT_DB_PATH, EventIndexer, _abi_type, load_deployments
+
+try:
+    from eth_abi import decode, encode
+except ImportError:
+    from eth_abi import decode_abi as decode
+    from eth_abi import encode_abi as encode
+
+# maximum number of requests in a single JSON-RPC batch
+RPC_BATCH_SIZE = 500
+# maximum number of calls in a single `tryAggregate`
+MULTICALL_SIZE = 200
+# maximum number of `tryAggregate` calls in a single JSON-RPC batch, which keeps
+# the request size below the limits of most providers
+MULTICALL_BATCH_SIZE = 10
+# number of recent blocks to keep cached results for
+CACHE_BLOCKS = 2
+
+TRY_AGGREGATE = function_signature_to_4byte_selector("tryAggregate(bool,(address,bytes)[])")
+
+
+class LpPosition(NamedTuple):
+    pool: str
+    balance: int
+    claimable_epx: int
+    claimable_ddd: int
+    # (token, amount) for each third-party reward token of the pool
+    extra_rewards: Tuple[Tuple[str, int], ...]
+
+
+class BondedPosition(NamedTuple):
+    balance: int
+    unbondable: int
+    # fee token -> claimable amount
+    claimable: Dict[str, int]
+    # claimable and total remaining balance of the unbonding stream
+    unbonding_claimable: int
+    unbonding_remaining: int
+
+
+class LockPosition(NamedTuple):
+    balance: int
+    weight: int
+    # DDD from expired locks which can be streamed, and the claimable exit stream
+    streamable: int
+    exit_claimable: int
+
+
+class LockWeek(NamedTuple):
+    week: int
+    weight: int
+    unlocks: int
+    total_weight: int
+
+
+class VoteWeek(NamedTuple):
+    week: int
+    available: int
+    used: int
+    # token -> (votes from the user, total votes)
+    token_votes: Dict[str, Tuple[int, int]]
+
+
+def _format(item, value):
+    # checksum decoded addresses, including within arrays and tuples
+    kind = item["type"]
+    if kind.endswith("]"):
+        inner = dict(item, type=kind[: kind.rindex("[")])
+        return [_format(inner, i) for i in value]
+    if kind == "tuple":
+        return tuple(_format(c, v) for c, v in zip(item["components"], value))
+    if kind == "address":
+        return to_checksum_address(value)
+    return value
+
+
+def _arg(value):
+    # accept brownie accounts and contracts in place of addresses
+    if isinstance(value, (list, tuple)):
+        return [_arg(i) for i in value]
+    return getattr(value, "address", value)
+
+
+class AsyncRpc:
+    """
+    JSON-RPC over a pooled HTTP session. Requests made in the same event loop
+    iteration are sent together in batches.
+
+    Arguments
+    ---------
+    url : str
+        HTTP endpoint of the node
+    ws_url : str, optional
+        Websocket endpoint used to subscribe to new heads. If not given, new heads
+        are found by polling.
+    max_connections : int, optional
+        Size of the HTTP connection pool
+    batch_size : int, optional
+        Maximum number of requests in a single JSON-RPC batch
+    head_interval : float, optional
+        Seconds between polls for a new head
+    """
+
+    def __init__(self, url, ws_url=None, max_connections=64, batch_size=RPC_BATCH_SIZE, head_interval=1.0):
+        self.url = url
+        self.ws_url = ws_url
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.head_interval = head_interval
+        self.head = None
+        # number of HTTP requests sent
+        self.request_count = 0
+        self._session = None
+        self._watcher = None
+        self._head_callbacks = []
+        self._pending = []
+        self._ids = itertools.count()
+
+    async def start(self, follow_heads=True):
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+        await self.update_head()
+        if follow_heads:
+            self._watcher = asyncio.create_task(self._watch_heads())
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+        await self._session.close()
+
+    def on_head(self, callback):
+        """Call `callback(block_number)` when a new head is seen."""
+        self._head_callbacks.append(callback)
+
+    def _set_head(self, block_number):
+        if self.head is None or block_number > self.head:
+            self.head = block_number
+            for callback in self._head_callbacks:
+                callback(block_number)
+
+    async def update_head(self):
+        """Fetch the latest block number, and return it."""
+        self._set_head(int(await self.request("eth_blockNumber", []), 16))
+        return self.head
+
+    async def _watch_heads(self):
+        while True:
+            try:
+                if self.ws_url is None:
+                    await asyncio.sleep(self.head_interval)
+                    await self.update_head()
+                else:
+                    await self._subscribe_heads()
+            except (aiohttp.ClientError, ValueError) as exc:
+                print(f"Error while following new heads: {exc!r}")
+                await asyncio.sleep(self.head_interval)
+
+    async def _subscribe_heads(self):
+        async with self._session.ws_connect(self.ws_url) as ws:
+            await ws.send_json({"jsonrpc": "2.0", "id": 0, "method": "eth_subscribe", "params": ["newHeads"]})
+            async for message in ws:
+                data = message.json()
+                if data.get("method") == "eth_subscription":
+                    self._set_head(int(data["params"]["result"]["number"], 16))
+
+    def request(self, method, params):
+        """Send a JSON-RPC request, returning a future for the result."""
+        future = asyncio.get_running_loop().create_future()
+        if not self._pending:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self._pending.append(({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}, future))
+        return future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        for i in range(0, len(pending), self.batch_size):
+            asyncio.ensure_future(self._send(pending[i : i + self.batch_size]))
+
+    async def _send(self, requests):
+        self.request_count += 1
+        futures = {payload["id"]: future for payload, future in requests}
+        # every future is resolved before returning, otherwise the callers wait forever
+        error = ValueError("No response for request")
+        try:
+            async with self._session.post(self.url, json=[payload for payload, _ in requests]) as response:
+                response.raise_for_status()
+                results = await response.json(content_type=None)
+            if not isinstance(results, list):
+                # a rejected batch (rate limited, too large) returns a single error object
+                raise ValueError(f"RPC batch rejected: {results}")
+            for result in results:
+                future = futures.pop(result.get("id"), None)
+                if future is None:
+                    continue
+                if "error" in result:
+                    future.set_exception(ValueError(f"RPC error: {result['error']}"))
+                else:
+                    future.set_result(result["result"])
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            error = exc
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class ContractClient:
+    """
+    View functions of a contract, generated from its ABI. Each function is a
+    coroutine that accepts the same arguments as the contract, and an optional
+    `block` keyword argument.
+    """
+
+    def __init__(self, client, name, address, abi):
+        self._client = client
+        self._name = name
+        self.address = to_checksum_address(address)
+        self._functions = {
+            item["name"]: item
+            for item in abi
+            if item["type"] == "function" and item.get("stateMutability") in ("view", "pure")
+        }
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._functions:
+            raise AttributeError(f"{self._name} has no view function '{name}'")
+        abi = self._functions[name]
+        selector = function_abi_to_4byte_selector(abi)
+        input_types = [_abi_type(i) for i in abi["inputs"]]
+        output_types = [_abi_type(i) for i in abi["outputs"]]
+
+        async def call(*args, block=None):
+            data = selector + encode(input_types, [_arg(i) for i in args])
+            result = decode(output_types, await self._client.call(self.address, data, block))
+            result = [_format(item, value) for item, value in zip(abi["outputs"], result)]
+            return result[0] if len(result) == 1 else tuple(result)
+
+        call.__name__ = name
+        return call
+
+
+class DotDotClient:
+    """
+    Asyncio client for the DotDot contracts.
+
+    Arguments
+    ---------
+    url : str
+        HTTP endpoint of the node
+    contracts : dict
+        `{name: (address, abi)}` of contracts to read, e.g. from `load_deployments`
+    ws_url : str, optional
+        Websocket endpoint used to subscribe to new heads
+    multicall : str, optional
+        Address of a `Multicall2` deployment. If not given, each call is sent as
+        a separate `eth_call` within a JSON-RPC batch.
+    max_connections : int, optional
+        Size of the HTTP connection pool
+    head_interval : float, optional
+        Seconds between polls for a new head, when `ws_url` is not given
+    """
+
+    def __init__(self, url, contracts, ws_url=None, multicall=None, max_connections=64, head_interval=1.0):
+        batch_size = RPC_BATCH_SIZE if multicall is None else MULTICALL_BATCH_SIZE
+        self.rpc = AsyncRpc(url, ws_url, max_connections, batch_size, head_interval)
+        self.rpc.on_head(self._invalidate)
+        self.multicall = multicall
+        self.contracts = {name: ContractClient(self, name, address, abi) for name, (address, abi) in contracts.items()}
+        # block number -> {(address, calldata): future}
+        self._cache = {}
+        # block number -> [(address, calldata, future)] waiting to be sent
+        self._pending = {}
+
+    async def __aenter__(self):
+        await self.rpc.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.rpc.close()
+
+    def _invalidate(self, head):
+        for block in [i for i in self._cache if i <= head - CACHE_BLOCKS]:
+            del self._cache[block]
+
+    async def _block(self, block):
+        if block is None or block == "latest":
+            return self.rpc.head
+        return int(block)
+
+    async def call(self, address, data, block=None):
+        """`eth_call` to `address` with `data` at `block`, returning the result as bytes."""
+        block = await self._block(block)
+        cache = self._cache.setdefault(block, {})
+        key = (address, bytes(data))
+        if key not in cache:
+            future = asyncio.get_running_loop().create_future()
+            cache[key] = future
+            if not self._pending:
+                asyncio.get_running_loop().call_soon(self._flush)
+            self._pending.setdefault(block, []).append((address, key[1], future))
+        future = cache[key]
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # failed calls are not cached
+            if cache.get(key) is future:
+                del cache[key]
+            raise
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        for block, calls in pending.items():
+            if self.multicall is None:
+                for address, data, future in calls:
+                    asyncio.ensure_future(self._eth_call(block, address, data, future))
+            else:
+                for i in range(0, len(calls), MULTICALL_SIZE):
+                    asyncio.ensure_future(self._aggregate(block, calls[i : i + MULTICALL_SIZE]))
+
+    async def _eth_call(self, block, address, data, future):
+        try:
+            result = await self.rpc.request("eth_call", [{"to": address, "data": "0x" + bytes(data).hex()}, hex(block)])
+            future.set_result(HexBytes(result))
+        except Exception as exc:
+            future.set_exception(exc)
+
+    async def _aggregate(self, block, calls):
+        data = TRY_AGGREGATE + encode(["bool", "(address,bytes)[]"], [False, [(a, d) for a, d, _ in calls]])
+        try:
+            result = await self.rpc.request("eth_call", [{"to": self.multicall, "data": "0x" + bytes(data).hex()}, hex(block)])
+            results = decode(["(bool,bytes)[]"], HexBytes(result))[0]
+        except Exception as exc:
+            for _, _, future in calls:
+                future.set_exception(exc)
+            return
+        for (address, _, future), (success, value) in zip(calls, results):
+            if success:
+                future.set_result(HexBytes(value))
+            else:
+                future.set_exception(ValueError(f"Call to {address} reverted"))
+
+    async def lp_positions(self, user, pools, block=None) -> List[LpPosition]:
+        """Deposited balance and claimable rewards of `user` for each of `pools`."""
+        block = await self._block(block)
+        lp_depositor = self.contracts["LpDepositor"]
+        claimable, balances, extras = await asyncio.gather(
+            lp_depositor.claimable(user, pools, block=block),
+            asyncio.gather(*(lp_depositor.userBalances(user, pool, block=block) for pool in pools)),
+            asyncio.gather(*(lp_depositor.claimableExtraRewards(user, pool, block=block) for pool in pools)),
+        )
+        return [
+            LpPosition(_arg(pool), balance, epx, ddd, tuple(extra))
+            for pool, balance, (epx, ddd), extra in zip(pools, balances, claimable, extras)
+        ]
+
+    async def bonded_position(self, user, tokens, block=None) -> BondedPosition:
+        """Bonded dEPX balance, claimable fees for `tokens` and unbonding stream of `user`."""
+        block = await self._block(block)
+        distributor = self.contracts["BondedFeeDistributor"]
+        balance, unbondable, claimable, (stream_claimable, stream_remaining) = await asyncio.gather(
+            distributor.bondedBalance(user, block=block),
+            distributor.unbondableBalance(user, block=block),
+            distributor.claimable(user, tokens, block=block),
+            distributor.streamingBalances(user, block=block),
+        )
+        return BondedPosition(
+            balance, unbondable, dict(zip(_arg(tokens), claimable)), stream_claimable, stream_remaining
+        )
+
+    async def lock_position(self, user, block=None) -> LockPosition:
+        """Locked DDD balance, current weight and exit streams of `user`."""
+        block = await self._block(block)
+        locker = self.contracts["TokenLocker"]
+        values = await asyncio.gather(
+            locker.userBalance(user, block=block),
+            locker.userWeight(user, block=block),
+            locker.streamableBalance(user, block=block),
+            locker.claimableExitStreamBalance(user, block=block),
+        )
+        return LockPosition(*values)
+
+    async def lock_weeks(self, user, weeks, block=None) -> List[LockWeek]:
+        """Lock weight and unlocks of `user`, and the total lock weight, in each of `weeks`."""
+        block = await self._block(block)
+        locker = self.contracts["TokenLocker"]
+        weights, unlocks, totals = await asyncio.gather(
+            asyncio.gather(*(locker.weeklyWeightOf(user, week, block=block) for week in weeks)),
+            asyncio.gather(*(locker.weeklyUnlocksOf(user, week, block=block) for week in weeks)),
+            asyncio.gather(*(locker.weeklyTotalWeight(week, block=block) for week in weeks)),
+        )
+        return [LockWeek(*i) for i in zip(weeks, weights, unlocks, totals)]
+
+    async def votes(self, user, tokens, week=None, block=None) -> VoteWeek:
+        """Votes of `user` for `tokens` in `week`, defaulting to the current week."""
+        block = await self._block(block)
+        voter = self.contracts["DotDotVoting"]
+        if week is None:
+            week = await voter.getWeek(block=block)
+        available, used, token_votes = await asyncio.gather(
+            voter.availableVotes(user, block=block),
+            voter.userVotes(user, week, block=block),
+            asyncio.gather(*(voter.weeklyVotes(user, token, week, block=block) for token in tokens)),
+        )
+        return VoteWeek(week, available, used, dict(zip(_arg(tokens), token_votes)))
+
+    async def incentives(self, user, lp_token, tokens=None, block=None) -> Dict[str, int]:
+        """
+        Claimable vote incentives of `user` for `lp_token`. Defaults to every
+        incentive token deposited for `lp_token`.
+        """
+        block = await self._block(block)
+        distributor = self.contracts["DddIncentiveDistributor"]
+        if tokens is None:
+            length = await distributor.incentiveTokensLength(lp_token, block=block)
+            tokens = await asyncio.gather(*(distributor.incentiveTokens(lp_token, i, block=block) for i in range(length)))
+        amounts = await distributor.claimable(user, lp_token, tokens, block=block)
+        return dict(zip(_arg(tokens), amounts))
+
+    async def weekly_fees(self, tokens, weeks, block=None) -> Dict[str, List[int]]:
+        """Fees received by `BondedFeeDistributor` for each of `tokens` in each of `weeks`."""
+        block = await self._block(block)
+        distributor = self.contracts["BondedFeeDistributor"]
+        amounts = await asyncio.gather(
+            *(asyncio.gather(*(distributor.weeklyFeeAmounts(token, week, block=block) for week in weeks)) for token in tokens)
+        )
+        return dict(zip(_arg(tokens), amounts))
+
+
+def lookup(user, db_path=DEFAULT_DB_PATH):
+    from brownie import web3
+
+    deployments = load_deployments()
+    # pools are taken from the indexed deposits
+    indexer = EventIndexer(db_path, deployments)
+    pools = sorted({i["args"]["token"] for i in indexer.events("LpDepositor", "Deposit")})
+    indexer.close()
+
+    async def run():
+        async with DotDotClient(web3.provider.endpoint_uri, deployments) as client:
+            distributor = client.contracts["BondedFeeDistributor"]
+            length = await distributor.feeTokensLength()
+            fee_tokens = await asyncio.gather(*(distributor.feeTokens(i) for i in range(length)))
+            return await asyncio.gather(
+                client.lp_positions(user, pools),
+                client.bonded_position(user, fee_tokens),
+                client.lock_position(user),
+            )
+
+    positions, bonded, lock = asyncio.run(run())
+    for position in positions:
+        if position.balance:
+            print(position)
+    print(bonded)
+    print(lock)
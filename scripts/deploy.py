@@ -1,3 +1,6 @@
+import json
+from pathlib import Path
+
 from brownie import accounts, Contract, ZERO_ADDRESS
 from brownie import (
     BondedFeeDistributor,
@@ -12,6 +15,7 @@ from brownie import (
     EpxDepositIncentives,
     LockedEPX,
     LpDepositor,
+    LpDepositorZap,
     TokenLocker,
 )
 
@@ -47,6 +51,8 @@ EPS_FACTORY = "0xf65BEd27e96a367c61e0E06C54e14B16b84a5870"
 PANCAKE_FACTORY = "0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73"
 WBNB = "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c"
 
+DEPLOYMENTS = Path(__file__).parent.parent.joinpath("deployments.json")
+
 
 def main():
     deployer = accounts.add()
@@ -91,3 +97,17 @@ def main():
     depx.setAddresses(bonded_distributor, proxy, {'from': deployer})
     staker.setAddresses(token, depx, proxy, bonded_distributor, ddd_distributor, ddd_lp_staker, deposit_token, depx_pool, {'from': deployer})
     locker.setAddresses(token, {'from': deployer})
+
+    zap = LpDepositorZap.deploy(staker, {'from': deployer})
+
+    # written in the same order as the existing deployments.json
+    deployments = {
+        i._name: i.address for i in [
+            bonded_distributor, core_minter, ddd_distributor, ddd_lp_staker, token, voter,
+            proxy, early_incentives, depx, staker, zap, locker,
+        ]
+    }
+    deployments.update({"dEPX/EPX": depx_pool, "DDD/wBNB": ddd_pool})
+    with DEPLOYMENTS.open("w") as fp:
+        json.dump(deployments, fp, indent=4)
+        fp.write("\n")
@@ -0,0 +1,379 @@
+"""
+Weekly epoch reports for the DotDot protocol.
+
+For each `DotDotVoting` week, the report gives:
+
+* the votes for each pool, matching `DotDotVoting.tokenVotes`
+* the `epsVoteRatio` of the week
+* the bribes deposited for each pool, matching
+  `DddIncentiveDistributor.weeklyIncentiveAmounts`, and the bribes per vote
+* the fees given to DDD lockers, keyed by `TokenLocker` week, which begins
+  three days before the voting week with the same number
+* the fees received by dEPX bonders, matching `BondedFeeDistributor.weeklyFeeAmounts`
+* the DDD minted by each minter
+
+Everything except the bonded fees is built from the event database written by
+`scripts/indexer.py`. Each run only processes the events added since the last run,
+and adds them into rolling weekly aggregates. These aggregates are saved in
+`reports/epochs/state.json`. The indexer may rewind up to `REORG_DEPTH` blocks
+when it finds a reorg, and aggregates are never rolled back, so only events that
+are at least `REORG_DEPTH` blocks behind the indexer checkpoint are added.
+`VotedForIncentives` emits votes multiplied by the
+week's `epsVoteRatio`. The ratio is recovered from the change in `userVotesUsed`.
+`BondedFeeDistributor` does not emit an event when it receives fees. Instead, its
+fees are read in a single multicall once a week has ended.
+
+DDD mints are attributed by recipient. `CoreMinter` and `EpxDepositIncentives`
+mint to themselves. `DddLpStaker` mints to itself once, during a deposit. All
+other mints are made by `LpDepositor`.
+
+Reports are written to `reports/epochs/week-<week>.json` for each week with new
+data, and all weeks are written to `reports/epochs/weeks.csv`.
+
+Usage:
+
+    brownie run indexer sync --network bsc-main
+    brownie run epoch_report build [database path] --network bsc-main
+"""
+
+import csv
+import json
+from pathlib import Path
+
+import brownie
+from brownie import BondedFeeDistributor, DotDotVoting, web3
+
+from scripts.indexer import DEFAULT_DB_PATH, REORG_DEPTH, EventIndexer, load_deployments
+
+OUTPUT_DIR = Path(__file__).parent.parent.joinpath("reports/epochs")
+WEEK = 86400 * 7
+
+
+def first_block_at(timestamp, low, high, get_timestamp):
+    """
+    Return the first block in `[low, high]` with a timestamp of at least
+    `timestamp`, or `high + 1` if there is none.
+    """
+    while low <= high:
+        mid = (low + high) // 2
+        if get_timestamp(mid) >= timestamp:
+            high = mid - 1
+        else:
+            low = mid + 1
+    return low
+
+
+def _new_week():
+    return {
+        "votes": {},
+        "epsVoteRatio": 0,
+        "unattributedVotes": 0,
+        "bribes": {},
+        "lockerFees": {},
+        "bondedFees": None,
+        "dddMinted": {},
+    }
+
+
+def _add(totals, key, amount):
+    totals[key] = totals.get(key, 0) + amount
+
+
+class EpochReport:
+    """
+    Rolling weekly aggregates of the protocol events.
+
+    Arguments
+    ---------
+    addresses : dict
+        `{name: address}` of the DotDot deployments
+    start_time : int
+        `DotDotVoting.startTime`. Weeks are counted from this timestamp.
+    state : dict, optional
+        Aggregates saved from an earlier run, as returned by `get_state`
+    """
+
+    def __init__(self, addresses, start_time, state=None):
+        self.addresses = {k: web3.toChecksumAddress(v) for k, v in addresses.items()}
+        self.start_time = start_time
+        if state is None:
+            state = {"block": None, "currentWeek": None, "weeks": {}, "usedVotes": {}}
+        # last processed block
+        self.block = state["block"]
+        # week of the last processed block
+        self.current_week = state["currentWeek"]
+        self.weeks = {int(k): v for k, v in state["weeks"].items()}
+        # voter -> [week, userVotesUsed] of the voter's last vote
+        self.used_votes = state["usedVotes"]
+        # weeks changed since the aggregates were loaded
+        self.updated = set()
+
+    def get_state(self):
+        return {
+            "block": self.block,
+            "currentWeek": self.current_week,
+            "weeks": {str(k): v for k, v in sorted(self.weeks.items())},
+            "usedVotes": self.used_votes,
+        }
+
+    def get_week(self, timestamp):
+        return (timestamp - self.start_time) // WEEK
+
+    def _week(self, week):
+        self.updated.add(week)
+        return self.weeks.setdefault(week, _new_week())
+
+    def _week_finder(self, to_block, get_timestamp):
+        # events arrive in block order, so the end of the current week is found
+        # once with a binary search, rather than by fetching every block
+        span = [None, -1, -1]
+
+        def find(block):
+            if not span[1] <= block <= span[2]:
+                week = self.get_week(get_timestamp(block))
+                end = first_block_at(self.start_time + (week + 1) * WEEK, block + 1, to_block, get_timestamp)
+                span[:] = [week, block, end - 1]
+            return span[0]
+
+        return find
+
+    def update(self, events, to_block, get_timestamp):
+        """
+        Add `events` into the weekly aggregates.
+
+        Arguments
+        ---------
+        events : list
+            Indexed events after the last processed block, up to and including
+            `to_block`, as returned by `EventIndexer.events`
+        to_block : int
+            Last block covered by `events`
+        get_timestamp : callable
+            Returns the timestamp of a block number
+        """
+        if self.block is not None and to_block <= self.block:
+            return
+        find_week = self._week_finder(to_block, get_timestamp)
+
+        tx_events = []
+        for event in events + [None]:
+            if tx_events and (event is None or event["tx_hash"] != tx_events[0]["tx_hash"]):
+                self._process_tx(tx_events, find_week(tx_events[0]["block_number"]))
+                tx_events = []
+            if event is not None:
+                tx_events.append(event)
+
+        self.block = to_block
+        self.current_week = self.get_week(get_timestamp(to_block))
+        if self.weeks:
+            for week in range(min(self.weeks), self.current_week + 1):
+                if week not in self.weeks:
+                    self._week(week)
+        # only votes from the current week are needed to find later changes
+        self.used_votes = {k: v for k, v in self.used_votes.items() if v[0] >= self.current_week}
+
+    def _process_tx(self, events, week):
+        names = {(i["contract"], i["event"]) for i in events}
+        for event in events:
+            key = (event["contract"], event["event"])
+            if key == ("DotDotVoting", "VotedForIncentives"):
+                self._add_vote(week, event["args"])
+            elif key == ("DddIncentiveDistributor", "IncentiveReceived"):
+                self._add_incentive(event["args"])
+            elif key == ("DotDot", "Transfer") and int(event["args"]["from"], 16) == 0:
+                amount = int(event["args"]["value"])
+                if amount:
+                    minter = self._get_minter(event["args"]["to"], names)
+                    _add(self._week(week)["dddMinted"], minter, amount)
+
+    def _add_vote(self, week, args):
+        voter, used = args["voter"], int(args["userVotesUsed"])
+        last_week, last_used = self.used_votes.get(voter, (None, 0))
+        delta = used - (last_used if last_week == week else 0)
+        self.used_votes[voter] = [week, used]
+        if delta == 0:
+            return
+
+        data = self._week(week)
+        emitted = [int(i) for i in args["votes"]]
+        if not data["epsVoteRatio"]:
+            # emitted votes are `amount * ratio`, and `delta` is the sum of the amounts
+            data["epsVoteRatio"] = sum(emitted) // delta
+        ratio = data["epsVoteRatio"]
+        if ratio:
+            amounts = [i // ratio for i in emitted]
+        elif len(emitted) == 1:
+            amounts = [delta]
+        else:
+            # with a ratio of zero, the split between tokens is not emitted
+            data["unattributedVotes"] += delta
+            return
+        for token, amount in zip(args["tokens"], amounts):
+            if amount:
+                _add(data["votes"], web3.toChecksumAddress(token), amount)
+
+    def _add_incentive(self, args):
+        lp_token, token = args["lpToken"], args["token"]
+        week, amount = int(args["week"]), int(args["amount"])
+        data = self._week(week)
+        if int(lp_token, 16) == 0:
+            _add(data["lockerFees"], token, amount)
+        else:
+            _add(data["bribes"].setdefault(lp_token, {}), token, amount)
+
+    def _get_minter(self, receiver, names):
+        receiver = web3.toChecksumAddress(receiver)
+        for name in ("CoreMinter", "EpxDepositIncentives"):
+            if receiver == self.addresses.get(name):
+                return name
+        if (
+            receiver == self.addresses.get("DddLpStaker")
+            and ("DddLpStaker", "Deposited") in names
+            and not any(i[0] == "LpDepositor" for i in names)
+        ):
+            return "DddLpStaker"
+        return "LpDepositor"
+
+    def pending_fee_weeks(self):
+        """Weeks that have ended, but have no bonded fees recorded."""
+        return sorted(k for k, v in self.weeks.items() if v["bondedFees"] is None and k < self.current_week)
+
+    def set_bonded_fees(self, week, amounts):
+        """Record the `BondedFeeDistributor` fees `{token: amount}` of a week that has ended."""
+        self._week(week)["bondedFees"] = {k: int(v) for k, v in amounts.items()}
+
+    def report(self, week):
+        """Report for a single week, with amounts given as strings."""
+        data = self.weeks[week]
+        votes = data["votes"]
+        total_votes = sum(votes.values())
+        pools = {}
+        for lp_token in sorted(set(votes) | set(data["bribes"]), key=str.lower):
+            pool_votes = votes.get(lp_token, 0)
+            bribes = data["bribes"].get(lp_token, {})
+            pools[lp_token] = {
+                "votes": str(pool_votes),
+                "voteShare": pool_votes / total_votes if total_votes else 0.0,
+                "bribes": {k: str(bribes[k]) for k in sorted(bribes, key=str.lower)},
+                "bribesPerVote": {
+                    k: bribes[k] / pool_votes if pool_votes else None for k in sorted(bribes, key=str.lower)
+                },
+            }
+        bonded = data["bondedFees"]
+        return {
+            "week": week,
+            "startTime": self.start_time + week * WEEK,
+            "complete": week < self.current_week,
+            "epsVoteRatio": str(data["epsVoteRatio"]),
+            "totalVotes": str(total_votes),
+            "unattributedVotes": str(data["unattributedVotes"]),
+            "pools": pools,
+            "lockerFees": {k: str(v) for k, v in sorted(data["lockerFees"].items())},
+            "bondedFees": None if bonded is None else {k: str(v) for k, v in sorted(bonded.items())},
+            "dddMinted": {k: str(v) for k, v in sorted(data["dddMinted"].items())},
+            "totalDddMinted": str(sum(data["dddMinted"].values())),
+        }
+
+    def csv_rows(self):
+        """All weeks as `(week, metric, key, token, value)` rows."""
+        rows = []
+        for week in sorted(self.weeks):
+            report = self.report(week)
+            rows.append((week, "eps_vote_ratio", "", "", report["epsVoteRatio"]))
+            for lp_token, pool in report["pools"].items():
+                rows.append((week, "votes", lp_token, "", pool["votes"]))
+                for token, amount in pool["bribes"].items():
+                    rows.append((week, "bribes", lp_token, token, amount))
+                    per_vote = pool["bribesPerVote"][token]
+                    rows.append((week, "bribes_per_vote", lp_token, token, "" if per_vote is None else per_vote))
+            for token, amount in report["lockerFees"].items():
+                rows.append((week, "locker_fees", "", token, amount))
+            for token, amount in (report["bondedFees"] or {}).items():
+                rows.append((week, "bonded_fees", "", token, amount))
+            for minter, amount in report["dddMinted"].items():
+                rows.append((week, "ddd_minted", minter, "", amount))
+        return rows
+
+
+def read_bonded_fees(distributor, weeks, week_offset=0):
+    """
+    Read `weeklyFeeAmounts` from `BondedFeeDistributor` for each fee token in `weeks`.
+
+    Arguments
+    ---------
+    distributor : Contract
+        `BondedFeeDistributor` deployment
+    weeks : list
+        `DotDotVoting` weeks to read
+    week_offset : int
+        Number of weeks from `BondedFeeDistributor.startTime` to `DotDotVoting.startTime`
+
+    Returns `{week: {token: amount}}`.
+    """
+    with brownie.multicall():
+        length = distributor.feeTokensLength()
+        epx, ddd = distributor.EPX(), distributor.DDD()
+    with brownie.multicall():
+        tokens = [distributor.feeTokens(i) for i in range(length)]
+    tokens = sorted({str(i) for i in tokens + [epx, ddd]}, key=str.lower)
+    with brownie.multicall():
+        amounts = {
+            (week, token): distributor.weeklyFeeAmounts(token, week + week_offset)
+            for week in weeks
+            for token in tokens
+        }
+    return {week: {token: int(amounts[week, token]) for token in tokens if amounts[week, token] > 0} for week in weeks}
+
+
+def write_reports(report, output_dir=OUTPUT_DIR):
+    """Write the state, the JSON reports of updated weeks and the CSV of all weeks."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with output_dir.joinpath("state.json").open("w") as fp:
+        json.dump(report.get_state(), fp, sort_keys=True)
+    for week in sorted(report.updated):
+        with output_dir.joinpath(f"week-{week}.json").open("w") as fp:
+            json.dump(report.report(week), fp, indent=2, sort_keys=True)
+    with output_dir.joinpath("weeks.csv").open("w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["week", "metric", "key", "token", "value"])
+        writer.writerows(report.csv_rows())
+
+
+def build(db_path=DEFAULT_DB_PATH, output_dir=OUTPUT_DIR):
+    deployments = load_deployments()
+    addresses = {k: v[0] for k, v in deployments.items()}
+    voting = DotDotVoting.at(addresses["DotDotVoting"])
+    distributor = BondedFeeDistributor.at(addresses["BondedFeeDistributor"])
+    start_time = voting.startTime()
+
+    state = None
+    state_path = Path(output_dir).joinpath("state.json")
+    if state_path.exists():
+        with state_path.open() as fp:
+            state = json.load(fp)
+    report = EpochReport(addresses, start_time, state)
+
+    indexer = EventIndexer(db_path, deployments)
+    checkpoint = indexer.checkpoint
+    # blocks within `REORG_DEPTH` of the checkpoint may still be rewound by the indexer
+    to_block = None if checkpoint is None else checkpoint - REORG_DEPTH
+    from_block = 0 if report.block is None else report.block + 1
+    events = [] if checkpoint is None else indexer.events(from_block=from_block, to_block=to_block)
+    indexer.close()
+    if checkpoint is None:
+        print("The event database is empty, run `indexer sync` first")
+        return
+    if to_block < from_block:
+        print(f"No blocks more than {REORG_DEPTH} behind the indexer checkpoint {checkpoint} to process")
+        return
+
+    report.update(events, to_block, lambda block: web3.eth.get_block(block).timestamp)
+    weeks = report.pending_fee_weeks()
+    if weeks:
+        week_offset = (start_time - distributor.startTime()) // WEEK
+        for week, amounts in read_bonded_fees(distributor, weeks, week_offset).items():
+            report.set_bonded_fees(week, amounts)
+
+    write_reports(report, output_dir)
+    print(f"Processed {len(events)} events up to block {to_block}, updated weeks {sorted(report.updated)}")
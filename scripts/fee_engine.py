@@ -0,0 +1,399 @@
+"""
+Off-chain engine mirroring the fee accounting of `BondedFeeDistributor`.
+
+Holds the same state as the contract: the weekly bonded balance of each user
+(`weeklyUserBalance`), the weekly total (`totalBalance`), the fees received each
+week (`weeklyFeeAmounts`) and each user's active fee stream (`activeUserStream`).
+Claimable fees for every user and token, including the partially streamed amount
+for the previous week, are computed at once and match `claimable` exactly.
+
+Weekly balances are held as a dense users x weeks matrix. The contract stores a
+balance for each week up to the last one a user interacted in, and reads the
+final value for any later week, so the matrix is forward filled. Values are
+python integers in numpy object arrays so that all rounding is exact.
+
+The contract floors each user's share of each week's fees separately. A product
+of the balance matrix with per-week fee rates would round differently, so the
+engine computes the integer share matrix for each token and sums the unclaimed
+weeks of every user from its cumulative sum.
+
+The distributor does not emit events for deposits or unbonding, so state is
+loaded directly from storage.
+
+Usage:
+
+    brownie run fee_engine export [output path] --network bsc-main
+"""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+from brownie import web3
+from eth_utils import keccak
+from hexbytes import HexBytes
+
+from scripts.reward_model import _grow, _zeros
+from scripts.storage import find_deployment_block, get_logs, mapping_slot
+
+DEFAULT_OUTPUT_PATH = Path(__file__).parent.parent.joinpath("reports/bonded-fees.csv")
+
+WEEK = 604800
+
+# storage slots in `BondedFeeDistributor`
+WEEKLY_FEE_AMOUNTS_SLOT = 1
+ACTIVE_USER_STREAM_SLOT = 2
+WEEKLY_USER_BALANCE_SLOT = 3
+TOTAL_BALANCE_SLOT = 4
+
+
+class FeeEngine:
+    """
+    State and claimable fees of a `BondedFeeDistributor`.
+
+    State changes mirror the contract functions, given the timestamp of the block
+    they happen in. Users and tokens are assigned a row and column in the order
+    they are first seen, available as `users` and `tokens`.
+
+    Arguments
+    ---------
+    start_time : int
+        `BondedFeeDistributor.startTime`
+    """
+
+    def __init__(self, start_time, users=(), tokens=()):
+        self.start_time = start_time
+        self.users = []
+        self.tokens = []
+        self._user_index = {}
+        self._token_index = {}
+        self._weeks = 0
+
+        # users x weeks, forward filled
+        self._balances = _zeros(0, 0)
+        # length of `weeklyUserBalance` for each user
+        self._balance_lengths = np.zeros(0, dtype=np.int64)
+        # per week, forward filled
+        self._totals = _zeros(0)
+        self.total_length = 0
+        # tokens x weeks
+        self._fees = _zeros(0, 0)
+        # users x tokens, `activeUserStream`
+        self._stream_start = np.zeros((0, 0), dtype=np.int64)
+        self._stream_amount = _zeros(0, 0)
+        self._stream_claimed = _zeros(0, 0)
+
+        for user in users:
+            self._user(user)
+        for token in tokens:
+            self._token(token)
+
+    @property
+    def balances(self):
+        return self._balances[: len(self.users), : self._weeks]
+
+    @property
+    def totals(self):
+        return self._totals[: self._weeks]
+
+    @property
+    def fees(self):
+        return self._fees[: len(self.tokens), : self._weeks]
+
+    def get_week(self, timestamp):
+        return (timestamp - self.start_time) // WEEK
+
+    def _user(self, address):
+        if address not in self._user_index:
+            self._user_index[address] = len(self.users)
+            self.users.append(address)
+            rows = len(self.users)
+            self._balances = _grow(self._balances, (rows, self._weeks))
+            if rows > len(self._balance_lengths):
+                lengths = np.zeros(max(rows, 2 * len(self._balance_lengths)), dtype=np.int64)
+                lengths[: rows - 1] = self._balance_lengths[: rows - 1]
+                self._balance_lengths = lengths
+            self._grow_streams()
+        return self._user_index[address]
+
+    def _token(self, address):
+        if address not in self._token_index:
+            self._token_index[address] = len(self.tokens)
+            self.tokens.append(address)
+            self._fees = _grow(self._fees, (len(self.tokens), self._weeks))
+            self._grow_streams()
+        return self._token_index[address]
+
+    def _grow_streams(self):
+        shape = (len(self.users), len(self.tokens))
+        self._stream_amount = _grow(self._stream_amount, shape)
+        self._stream_claimed = _grow(self._stream_claimed, shape)
+        if any(a < b for a, b in zip(self._stream_start.shape, shape)):
+            start = np.zeros(self._stream_amount.shape, dtype=np.int64)
+            start[: self._stream_start.shape[0], : self._stream_start.shape[1]] = self._stream_start
+            self._stream_start = start
+
+    def _extend(self, week):
+        # add columns up to and including `week`, carrying forward the final balances
+        if week < self._weeks:
+            return
+        weeks = week + 1
+        self._balances = _grow(self._balances, (len(self.users), weeks))
+        self._totals = _grow(self._totals, (weeks,))
+        self._fees = _grow(self._fees, (len(self.tokens), weeks))
+        if self._weeks > 0:
+            self._balances[:, self._weeks : weeks] = self._balances[:, self._weeks - 1 : self._weeks]
+            self._totals[self._weeks : weeks] = self._totals[self._weeks - 1]
+        self._weeks = weeks
+
+    def _extend_balance_arrays(self, u, week):
+        # mirrors `_extendBalanceArray` for the user and the total
+        self._extend(week)
+        self._balance_lengths[u] = max(self._balance_lengths[u], week + 1)
+        self.total_length = max(self.total_length, week + 1)
+        return self._balances[u, week], self._totals[week]
+
+    def _set_balance(self, u, week, balance, total):
+        self._balances[u, week : self._weeks] = balance
+        self._totals[week : self._weeks] = total
+
+    def deposit(self, user, amount, timestamp):
+        """Mirrors `deposit` and `depositWithPermit`."""
+        u, week = self._user(user), self.get_week(timestamp)
+        balance, total = self._extend_balance_arrays(u, week)
+        self._set_balance(u, week, balance + amount, total + amount)
+
+    def initiate_unbonding_stream(self, user, amount, timestamp):
+        """Mirrors the change to bonded balances made by `initiateUnbondingStream`."""
+        u, week = self._user(user), self.get_week(timestamp)
+        balance, total = self._extend_balance_arrays(u, week)
+        if balance < amount:
+            raise ValueError("Insufficient balance")
+        self._set_balance(u, week, balance - amount, total - amount)
+
+    def add_fees(self, token, amount, timestamp):
+        """Mirrors fees received via `fetchEllipsisFees` or `notifyFeeAmounts`."""
+        t, week = self._token(token), self.get_week(timestamp)
+        self._extend(week)
+        self._fees[t, week] += amount
+
+    def claim(self, user, tokens, timestamp):
+        """
+        Mirrors `claim`. Returns the list of claimed amounts.
+
+        Fees fetched from Ellipsis during the claim must be added with `add_fees`.
+        """
+        u = self._user(user)
+        cols = [self._token(i) for i in tokens]
+        self._extend_balance_arrays(u, self.get_week(timestamp))
+        amounts = []
+        for t in cols:
+            # claims are processed one token at a time, so repeated tokens claim nothing
+            amount, start, stream_amount, stream_claimed = self._get_claimable(timestamp, [u], [t])
+            self._stream_start[u, t] = start[0, 0]
+            self._stream_amount[u, t] = stream_amount[0, 0]
+            self._stream_claimed[u, t] = stream_claimed[0, 0]
+            amounts.append(amount[0, 0])
+        return amounts
+
+    def claimable(self, timestamp, tokens=None):
+        """
+        Claimable fees for every user, as in `BondedFeeDistributor.claimable`.
+
+        Assumes no further actions between the current state and `timestamp`, so
+        later timestamps give a projection of the claimable amounts.
+
+        Returns
+        -------
+        users x tokens array, with columns in the order of `tokens` (default: all tokens)
+        """
+        cols = range(len(self.tokens)) if tokens is None else [self._token_index[i] for i in tokens]
+        return self._get_claimable(timestamp, np.arange(len(self.users)), np.array(cols, dtype=np.int64))[0]
+
+    def _get_claimable(self, timestamp, rows, cols):
+        # mirrors `_getClaimable`, returning `(amounts, start, amount, claimed)` of the new streams
+        rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        shape = (len(rows), len(cols))
+        amounts = _zeros(*shape)
+        start = np.full(shape, self.start_time, dtype=np.int64)
+        stream_amount = _zeros(*shape)
+        stream_claimed = _zeros(*shape)
+
+        week = self.get_week(timestamp)
+        lengths = self._balance_lengths[rows]
+        if week == 0 or not shape[0] or not shape[1]:
+            return amounts, start, stream_amount, stream_claimed
+        self._extend(week)
+        claimable_week = week - 1
+
+        # `_buildStreamData` for the active week
+        week_start = self.start_time + claimable_week * WEEK
+        balance = self._balances[rows, claimable_week]
+        total = self._totals[claimable_week]
+        if total > 0:
+            new_amount = np.outer(balance, self._fees[cols, claimable_week]) // total
+        else:
+            new_amount = _zeros(*shape)
+        new_claimed = new_amount * (timestamp - WEEK - week_start) // WEEK
+
+        old_start = self._stream_start[np.ix_(rows, cols)]
+        old_amount = self._stream_amount[np.ix_(rows, cols)]
+        old_claimed = self._stream_claimed[np.ix_(rows, cols)]
+        last_claim_week = np.where(old_start == 0, 0, (old_start - self.start_time) // WEEK)
+
+        # special case: claim is happening in the same week as a previous claim
+        same_week = last_claim_week == claimable_week
+        # otherwise, the unclaimed part of a previous stream plus the active week
+        unclaimed = np.where(old_start > 0, old_amount - old_claimed, 0)
+        result = np.where(same_week, new_claimed - old_claimed, unclaimed + new_claimed)
+
+        # add weeks that passed fully without any claims, from the week after a partial claim.
+        # the contract only reads stored balances from the first unclaimed week onwards,
+        # a user whose stored balances end before that week has no balance to earn with
+        first_week = last_claim_week + (old_start > 0)
+        earning = ~same_week & (first_week < claimable_week) & (first_week < lengths[:, None])
+        for j, t in enumerate(cols):
+            (index,) = np.nonzero(earning[:, j])
+            if not len(index):
+                continue
+            first = first_week[index, j]
+            offset = first.min()
+            totals = self._totals[offset:claimable_week]
+            divisor = np.where(totals > 0, totals, 1)
+            shares = _zeros(len(index), claimable_week - offset + 1)
+            shares[:, 1:] = np.cumsum(
+                self._balances[rows[index, None], np.arange(offset, claimable_week)]
+                * self._fees[t, offset:claimable_week]
+                // divisor,
+                axis=1,
+            )
+            position = np.arange(len(index))
+            result[index, j] += shares[:, -1] - shares[position, first - offset]
+
+        # users that have never deposited receive an empty stream
+        active = lengths > 0
+        amounts[active] = result[active]
+        start[active] = week_start
+        stream_amount[active] = new_amount[active]
+        stream_claimed[active] = new_claimed[active]
+        return amounts, start, stream_amount, stream_claimed
+
+
+def _read(address, slot, block):
+    return int(web3.eth.get_storage_at(address, slot, block).hex(), 16)
+
+
+def load_engine(distributor, users, tokens=None, block=None):
+    """
+    Load the state of `distributor` for `users` and `tokens` from storage.
+
+    Only weeks which are still unclaimed by at least one of the given users are
+    read, balances and fees in earlier weeks are left as zero.
+
+    Arguments
+    ---------
+    distributor : Contract
+        `BondedFeeDistributor` deployment
+    users : list
+        Users to load
+    tokens : list, optional
+        Fee tokens to load. Defaults to all tokens in `feeTokens`, as well as
+        EPX and DDD which are received via `notifyFeeAmounts`.
+    block : int, optional
+        Block to load the state at. Defaults to the latest block.
+    """
+    address = distributor.address
+    if block is None:
+        block = web3.eth.block_number
+    if tokens is None:
+        length = distributor.feeTokensLength(block_identifier=block)
+        tokens = [distributor.feeTokens(i, block_identifier=block) for i in range(length)]
+        tokens += [i for i in (distributor.EPX(), distributor.DDD(block_identifier=block)) if i not in tokens]
+
+    engine = FeeEngine(distributor.startTime(), users, tokens)
+    week = engine.get_week(web3.eth.get_block(block).timestamp)
+    engine._extend(week)
+
+    first_week = week
+    for u, user in enumerate(engine.users):
+        base = mapping_slot(user, ACTIVE_USER_STREAM_SLOT)
+        user_first_week = week
+        for t, token in enumerate(engine.tokens):
+            slot = int.from_bytes(mapping_slot(token, int.from_bytes(base, "big")), "big")
+            start = _read(address, slot, block)
+            if start:
+                engine._stream_start[u, t] = start
+                engine._stream_amount[u, t] = _read(address, slot + 1, block)
+                engine._stream_claimed[u, t] = _read(address, slot + 2, block)
+                user_first_week = min(user_first_week, engine.get_week(start))
+            else:
+                user_first_week = 0
+
+        slot = mapping_slot(user, WEEKLY_USER_BALANCE_SLOT)
+        length = _read(address, slot, block)
+        data = int.from_bytes(keccak(slot), "big")
+        for i in range(max(min(user_first_week, length - 1), 0), length):
+            engine._balances[u, i:] = _read(address, data + i, block)
+        engine._balance_lengths[u] = length
+        first_week = min(first_week, user_first_week)
+
+    engine.total_length = _read(address, TOTAL_BALANCE_SLOT, block)
+    data = int.from_bytes(keccak(TOTAL_BALANCE_SLOT.to_bytes(32, "big")), "big")
+    for i in range(max(min(first_week, engine.total_length - 1), 0), engine.total_length):
+        engine._totals[i:] = _read(address, data + i, block)
+
+    for t, token in enumerate(engine.tokens):
+        data = int.from_bytes(mapping_slot(token, WEEKLY_FEE_AMOUNTS_SLOT), "big")
+        for i in range(first_week, week + 1):
+            engine._fees[t, i] = _read(address, data + i, block)
+    return engine
+
+
+def find_users(depx, distributor, from_block, to_block):
+    """
+    Find bonders from bonded `LockedEPX` deposits and dEPX transfers into the
+    distributor. Deposits made via `deposit` on behalf of another account are
+    attributed to the sender of the dEPX.
+    """
+    from brownie import LockedEPX
+
+    users = set()
+    for log in get_logs(depx.address, [LockedEPX.topics["Deposit"]], from_block, to_block):
+        # Deposit(caller, receiver, amount, bond)
+        if int(HexBytes(log["data"])[32:].hex(), 16):
+            users.add(web3.toChecksumAddress(log["topics"][2][-20:]))
+
+    distributor_topic = "0x" + bytes.fromhex(distributor.address[2:]).rjust(32, b"\x00").hex()
+    for log in get_logs(depx.address, [LockedEPX.topics["Transfer"], None, distributor_topic], from_block, to_block):
+        sender = web3.toChecksumAddress(log["topics"][1][-20:])
+        if int(sender, 16):
+            users.add(sender)
+    return sorted(users)
+
+
+def export(path=DEFAULT_OUTPUT_PATH):
+    from brownie import BondedFeeDistributor, LockedEPX
+
+    from scripts.indexer import load_deployments
+
+    deployments = load_deployments()
+    distributor = BondedFeeDistributor.at(deployments["BondedFeeDistributor"][0])
+    depx = LockedEPX.at(deployments["LockedEPX"][0])
+    block = web3.eth.block_number
+    from_block = find_deployment_block(distributor.address, block)
+
+    engine = load_engine(distributor, find_users(depx, distributor, from_block, block), block=block)
+    timestamp = web3.eth.get_block(block).timestamp
+    # by the end of the current week, the stream for the previous week is almost fully released
+    end_of_week = engine.start_time + (engine.get_week(timestamp) + 1) * WEEK - 1
+    current = engine.claimable(timestamp)
+    projected = engine.claimable(end_of_week)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["user", "token", "claimable", "claimable_end_of_week"])
+        for u, t in zip(*np.nonzero(projected)):
+            writer.writerow([engine.users[u], engine.tokens[t], current[u, t], projected[u, t]])
+    print(f"Claimable fees for {len(engine.users)} bonders written to {path}")
@@ -0,0 +1,110 @@
+"""
+Gas usage baselines for the benchmark suite in `tests/benchmarks`.
+
+Each benchmark records the gas used by a transaction under a descriptive name,
+e.g. `LpDepositor.claim[pools=2]`. Results are compared against the committed
+baseline in `tests/benchmarks/gas-baseline.json`, which holds one set of entries
+for forked runs and one for `--local` runs, as the Ellipsis stand-ins do not
+cost the same as the live contracts.
+"""
+
+import json
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).parent.parent.joinpath("tests/benchmarks/gas-baseline.json")
+
+
+class GasBenchmark:
+    """
+    Gas results for a single test run.
+
+    Arguments
+    ---------
+    mode : str
+        Baseline to compare against, either "fork" or "local"
+    tolerance : float
+        Allowed increase over the baseline, as a percentage
+    """
+
+    def __init__(self, mode, tolerance, path=BASELINE_PATH):
+        self.mode = mode
+        self.tolerance = tolerance
+        self.path = Path(path)
+        self.baseline = self._load().get(mode, {})
+        self.results = {}
+
+    def _load(self):
+        try:
+            with self.path.open() as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {}
+
+    def record(self, name, gas_used):
+        """
+        Record a result. Returns an error string if the result has no baseline
+        entry, or exceeds the baseline by more than the tolerance.
+        """
+        if name in self.results:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        self.results[name] = gas_used
+        expected = self.baseline.get(name)
+        if expected is None:
+            return (
+                f"{name}: no {self.mode} baseline entry, run with "
+                "--update-gas-baseline to record one"
+            )
+        if gas_used > expected * (1 + self.tolerance / 100):
+            return (
+                f"{name}: gas used {gas_used} exceeds baseline {expected} "
+                f"by {_pct(gas_used, expected):+.2f}% (tolerance {self.tolerance}%)"
+            )
+        return None
+
+    def merge(self, results):
+        """Add `{name: gas_used}` recorded by another process, e.g. an xdist worker."""
+        self.results.update(results)
+
+    def diff(self):
+        """List of `(name, baseline, current)` for each recorded or baseline entry."""
+        names = sorted(set(self.results) | set(self.baseline))
+        return [(i, self.baseline.get(i), self.results.get(i)) for i in names]
+
+    def format_table(self):
+        rows = [("benchmark", "baseline", "current", "change")]
+        for name, expected, current in self.diff():
+            if current is None:
+                change = "not run"
+            elif expected is None:
+                change = "new"
+            else:
+                change = f"{_pct(current, expected):+.2f}%"
+                if current > expected * (1 + self.tolerance / 100):
+                    change += " !"
+            rows.append((name, _fmt(expected), _fmt(current), change))
+        widths = [max(len(row[i]) for row in rows) for i in range(4)]
+        lines = []
+        for row in rows:
+            lines.append(
+                "  ".join(
+                    row[i].ljust(widths[i]) if i == 0 else row[i].rjust(widths[i]) for i in range(4)
+                )
+            )
+        lines.insert(1, "  ".join("-" * i for i in widths))
+        return lines
+
+    def save(self):
+        """Merge the recorded results into the baseline file."""
+        data = self._load()
+        data.setdefault(self.mode, {}).update(self.results)
+        with self.path.open("w") as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+
+
+def _pct(current, expected):
+    return (current - expected) / expected * 100 if expected else 0.0
+
+
+def _fmt(value):
+    return "-" if value is None else f"{value:,}"
@@ -0,0 +1,175 @@
+"""
+Gas scaling curves for the sweeps in `tests/benchmarks/test_gas_curves.py`.
+
+Several code paths iterate over weeks that have passed since a user's last
+action, or over the number of tokens, deposits or pools involved. Each sweep
+records the gas used at a range of points, fits a linear cost model
+`gas = base + slope * x` and projects the point at which a call would exceed
+the block gas limit.
+
+Results are written to the directory given with `--gas-curves`:
+
+    gas-curves.csv  every recorded point
+    fits.csv        the fitted model and projected limit for each curve
+    <curve>.png     a plot of each curve, if matplotlib is installed
+"""
+
+import csv
+import re
+from pathlib import Path
+
+# approximate BSC block gas limit, override with `--block-gas-limit`
+BSC_BLOCK_GAS_LIMIT = 140_000_000
+
+
+class GasCurve:
+    """Gas used by a single function, as `x` increases along `axis`."""
+
+    def __init__(self, name, axis):
+        self.name = name
+        self.axis = axis
+        self.points = []
+
+    def add(self, x, gas_used):
+        self.points.append((x, gas_used))
+
+    def fit(self):
+        """
+        Least squares fit of `gas = base + slope * x`.
+
+        Returns `(base, slope, r_squared)`.
+        """
+        n = len(self.points)
+        if n == 0:
+            raise ValueError(f"{self.name}: no points recorded")
+        mean_x = sum(i[0] for i in self.points) / n
+        mean_y = sum(i[1] for i in self.points) / n
+        var_x = sum((x - mean_x) ** 2 for x, _ in self.points)
+        if var_x == 0:
+            return mean_y, 0.0, 1.0
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in self.points) / var_x
+        base = mean_y - slope * mean_x
+        ss_tot = sum((y - mean_y) ** 2 for _, y in self.points)
+        ss_res = sum((y - base - slope * x) ** 2 for x, y in self.points)
+        r_squared = 1 - ss_res / ss_tot if ss_tot else 1.0
+        return base, slope, r_squared
+
+    def limit_point(self, gas_limit):
+        """The value of `x` at which the fitted cost reaches `gas_limit`, or None."""
+        base, slope, _ = self.fit()
+        if slope <= 0:
+            return None
+        return max((gas_limit - base) / slope, 0)
+
+
+class GasCurves:
+    """
+    Collection of curves for a test run.
+
+    Arguments
+    ---------
+    gas_limit : int
+        Block gas limit used for projections
+    horizon : int
+        Number of weeks to project time-dependent curves over. Curves along
+        the "weeks" axis that reach `gas_limit` within this horizon are flagged.
+    """
+
+    def __init__(self, gas_limit=BSC_BLOCK_GAS_LIMIT, horizon=208):
+        self.gas_limit = gas_limit
+        self.horizon = horizon
+        self.curves = {}
+
+    def curve(self, name, axis):
+        if name in self.curves:
+            raise ValueError(f"Duplicate curve name: {name}")
+        self.curves[name] = GasCurve(name, axis)
+        return self.curves[name]
+
+    def flagged(self):
+        """Names of time-dependent curves projected to exceed the block gas limit."""
+        result = []
+        for curve in self.curves.values():
+            if curve.axis != "weeks" or not curve.points:
+                continue
+            limit = curve.limit_point(self.gas_limit)
+            if limit is not None and limit <= self.horizon:
+                result.append(curve.name)
+        return result
+
+    def summary(self):
+        flagged = self.flagged()
+        lines = []
+        for curve in self.curves.values():
+            if not curve.points:
+                continue
+            base, slope, r_squared = curve.fit()
+            limit = curve.limit_point(self.gas_limit)
+            limit = "never" if limit is None else f"{limit:,.0f} {curve.axis}"
+            line = (
+                f"{curve.name}: {base:,.0f} + {slope:,.0f}/{curve.axis} "
+                f"(r2={r_squared:.3f}), block limit at {limit}"
+            )
+            if curve.name in flagged:
+                line += f"  ! exceeds the block gas limit within {self.horizon} weeks"
+            lines.append(line)
+        return lines
+
+    def write(self, path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        with path.joinpath("gas-curves.csv").open("w", newline="") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(["curve", "axis", "x", "gas_used"])
+            for curve in self.curves.values():
+                for x, gas_used in curve.points:
+                    writer.writerow([curve.name, curve.axis, x, gas_used])
+
+        flagged = self.flagged()
+        with path.joinpath("fits.csv").open("w", newline="") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(["curve", "axis", "base", "slope", "r_squared", "limit_point", "flagged"])
+            for curve in self.curves.values():
+                if not curve.points:
+                    continue
+                limit = curve.limit_point(self.gas_limit)
+                writer.writerow(
+                    [
+                        curve.name,
+                        curve.axis,
+                        *(round(i, 4) for i in curve.fit()),
+                        "" if limit is None else round(limit, 2),
+                        curve.name in flagged,
+                    ]
+                )
+
+        self._plot(path)
+
+    def _plot(self, path):
+        try:
+            import matplotlib
+
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return
+
+        for curve in self.curves.values():
+            if not curve.points:
+                continue
+            base, slope, _ = curve.fit()
+            xs = [i[0] for i in curve.points]
+            fig, ax = plt.subplots()
+            ax.plot(xs, [i[1] for i in curve.points], "o", label="measured")
+            ax.plot(xs, [base + slope * x for x in xs], "-", label="fit")
+            ax.set_title(curve.name)
+            ax.set_xlabel(curve.axis)
+            ax.set_ylabel("gas used")
+            ax.legend()
+            fig.savefig(path.joinpath(f"{_filename(curve.name)}.png"))
+            plt.close(fig)
+
+
+def _filename(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
@@ -0,0 +1,198 @@
+"""
+Opcode-level gas attribution for transactions.
+
+Walks the trace of a transaction and attributes the gas used by each opcode to
+the contract, function (including internal functions) and source line that
+executed it. Also counts storage reads and writes (split by cold and warm
+access), calls, logs and memory expansion.
+
+Profiles are written as folded stacks, which can be read by `flamegraph.pl`,
+speedscope or inferno:
+
+    LpDepositor.claim;LpDepositor._updateIntegrals;EllipsisProxy.claimEmissions 31245
+
+Usage with the test suite, writing one profile per test:
+
+    brownie test tests/LpDepositor/test_claim_lp.py --gas-profile reports/gas-profile
+
+Or for a single transaction:
+
+    brownie run gas_profiler profile <txid> --network bsc-main-fork
+"""
+
+from collections import Counter
+from pathlib import Path
+
+from brownie import chain
+from brownie.network.state import _find_contract
+
+CALL_OPS = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+LOG_OPS = {"LOG0", "LOG1", "LOG2", "LOG3", "LOG4"}
+# gas not attributable to any opcode: intrinsic cost, calldata and refunds
+INTRINSIC_FRAME = "[intrinsic and refunds]"
+
+
+def _memory_cost(words):
+    return 3 * words + words * words // 512
+
+
+class GasProfile:
+    """Gas attribution for a single transaction."""
+
+    def __init__(self, tx):
+        self.tx = tx
+        self.total = tx.gas_used
+        # folded stack -> gas
+        self.stacks = Counter()
+        # (filename, line) -> gas
+        self.lines = Counter()
+        self.counts = Counter()
+        self.memory_gas = 0
+        self._sources = {}
+        self._profile(tx.trace)
+
+    def _step_costs(self, trace):
+        # gas used by each step, excluding gas consumed within any call it makes
+        costs = []
+        for i, step in enumerate(trace):
+            if i + 1 == len(trace):
+                costs.append(step["gasCost"])
+                continue
+            next_step = trace[i + 1]
+            if next_step["depth"] > step["depth"]:
+                # call into a contract: the gas forwarded to the child frame is
+                # counted by the child's own steps, less whatever it returned
+                j = i + 1
+                while j < len(trace) and trace[j]["depth"] > step["depth"]:
+                    j += 1
+                child_last = trace[j - 1]
+                returned = child_last["gas"] - child_last["gasCost"]
+                after = trace[j]["gas"] if j < len(trace) else returned
+                costs.append(step["gas"] - after - (next_step["gas"] - returned))
+            elif next_step["depth"] < step["depth"]:
+                costs.append(step["gasCost"])
+            else:
+                costs.append(step["gas"] - next_step["gas"])
+        return costs
+
+    def _line(self, step):
+        source = step.get("source")
+        if not source:
+            return None
+        filename = source["filename"]
+        if filename not in self._sources:
+            contract = _find_contract(step["address"])
+            text = None
+            if contract is not None:
+                text = contract._sources.get(filename)
+            if text is None and Path(filename).exists():
+                text = Path(filename).read_text()
+            self._sources[filename] = text
+        text = self._sources[filename]
+        if text is None:
+            return (filename, None)
+        return (filename, text.count("\n", 0, source["offset"][0]) + 1)
+
+    def _profile(self, trace):
+        costs = self._step_costs(trace)
+        accessed = set()
+        # list of ((depth, jumpDepth), name) describing the current call stack
+        frames = []
+
+        for i, step in enumerate(trace):
+            key = (step["depth"], step.get("jumpDepth", 0))
+            name = step.get("fn") or f"{step.get('contractName') or step['address']}.<unknown>"
+            while frames and frames[-1][0] > key:
+                frames.pop()
+            if frames and frames[-1][0] == key:
+                frames[-1] = (key, name)
+            else:
+                frames.append((key, name))
+
+            cost = costs[i]
+            self.stacks[";".join(i[1] for i in frames)] += cost
+            line = self._line(step)
+            if line is not None:
+                self.lines[line] += cost
+
+            op = step["op"]
+            if op in ("SLOAD", "SSTORE"):
+                slot = (step["address"], step["stack"][-1])
+                temperature = "warm" if slot in accessed else "cold"
+                accessed.add(slot)
+                self.counts[f"{op} ({temperature})"] += 1
+            elif op in CALL_OPS or op in LOG_OPS:
+                self.counts[op] += 1
+
+            if i + 1 < len(trace) and trace[i + 1]["depth"] == step["depth"]:
+                before, after = len(step["memory"]), len(trace[i + 1]["memory"])
+                if after > before:
+                    self.counts["memory expansion"] += 1
+                    self.memory_gas += _memory_cost(after) - _memory_cost(before)
+
+        remainder = self.total - sum(costs)
+        if remainder:
+            self.stacks[INTRINSIC_FRAME] += remainder
+
+    def functions(self):
+        """Inclusive gas per function, as a Counter of `{function: gas}`."""
+        result = Counter()
+        for stack, gas in self.stacks.items():
+            for name in set(stack.split(";")):
+                result[name] += gas
+        return result
+
+    def write_folded(self, path):
+        with Path(path).open("w") as fp:
+            for stack, gas in sorted(self.stacks.items()):
+                if gas > 0:
+                    fp.write(f"{stack} {gas}\n")
+
+    def format_summary(self, limit=15):
+        lines = [f"{self.tx.txid}  {self.tx._full_name()}  gas used: {self.total:,}", "", "functions (inclusive):"]
+        for name, gas in self.functions().most_common(limit):
+            lines.append(f"  {gas:>10,}  {gas / self.total:6.1%}  {name}")
+        lines += ["", "source lines:"]
+        for (filename, line), gas in self.lines.most_common(limit):
+            lines.append(f"  {gas:>10,}  {gas / self.total:6.1%}  {filename}:{line}")
+        lines += ["", "operations:"]
+        for op, count in sorted(self.counts.items()):
+            lines.append(f"  {count:>10,}  {op}")
+        lines.append(f"  {self.memory_gas:>10,}  gas for memory expansion")
+        return lines
+
+
+def profile_transaction(tx):
+    return GasProfile(tx)
+
+
+def write_profiles(txs, path, name):
+    """
+    Profile each transaction in `txs`, writing the folded stacks for all of them
+    to `<path>/<name>.folded` and a text summary to `<path>/<name>.txt`.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    profiles = [GasProfile(tx) for tx in txs]
+
+    stacks = Counter()
+    for profile in profiles:
+        stacks.update(profile.stacks)
+    with path.joinpath(f"{name}.folded").open("w") as fp:
+        for stack, gas in sorted(stacks.items()):
+            if gas > 0:
+                fp.write(f"{stack} {gas}\n")
+
+    with path.joinpath(f"{name}.txt").open("w") as fp:
+        for profile in profiles:
+            fp.write("\n".join(profile.format_summary()) + "\n\n")
+    return profiles
+
+
+def profile(txid, output=None):
+    tx = chain.get_transaction(txid)
+    result = GasProfile(tx)
+    print("\n".join(result.format_summary()))
+    if output:
+        result.write_folded(output)
+        print(f"\nFolded stacks written to {output}")
@@ -0,0 +1,343 @@
+"""
+Incremental event indexer for the DotDot contracts.
+
+Streams the logs emitted by every contract in `deployments.json`, decodes them
+and stores them in a SQLite database. Logs are fetched concurrently with
+`LogFetcher` (`scripts/log_fetcher.py`), and each fetched range is decoded at once
+with `BulkDecoder` (`scripts/log_decoder.py`). Events that `BulkDecoder` cannot
+compile are decoded one at a time with `EventDecoder`. Integer arguments are stored
+as decimal strings.
+
+The last processed block is checkpointed, so each run only fetches logs for new
+blocks. Chain reorganizations are detected by comparing stored block hashes
+against the chain, in which case the affected blocks are removed and indexed again.
+
+Usage:
+
+    brownie run indexer sync [database path] --network bsc-main
+"""
+
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+from brownie import project, web3
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+
+try:
+    from eth_abi import decode
+except ImportError:
+    from eth_abi import decode_abi as decode
+
+DEPLOYMENTS = Path(__file__).parent.parent.joinpath("deployments.json")
+DEFAULT_DB_PATH = Path(__file__).parent.parent.joinpath("reports/events.db")
+
+# maximum block range for a single `eth_getLogs` request
+LOG_BLOCK_RANGE = 5000
+# number of recent checkpoint hashes kept for reorg detection
+CHECKPOINT_HISTORY = 128
+# if no stored checkpoint matches the chain, rewind this many blocks
+REORG_DEPTH = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    address TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_name ON events (contract, event);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+"""
+
+
+def load_deployments(path=DEPLOYMENTS):
+    """
+    Load `{name: (address, abi)}` for each deployment in `deployments.json` that
+    matches a contract in the active project.
+    """
+    active = project.get_loaded_projects()[0]
+    with Path(path).open() as fp:
+        deployments = json.load(fp)
+    return {
+        name: (address, active[name].abi)
+        for name, address in deployments.items()
+        if name in active.keys()
+    }
+
+
+def _hex(value):
+    return "0x" + HexBytes(value).hex().removeprefix("0x")
+
+
+def _to_json(value):
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(i) for i in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        # every integer is a string, so that values of any size are read the same
+        # way and stay exact for consumers that parse JSON numbers as floats
+        return str(value)
+    return value
+
+
+class EventDecoder:
+    """Decodes logs for a set of contract ABIs, keyed by address and topic."""
+
+    def __init__(self, contracts):
+        # address -> contract name
+        self.names = {}
+        # (address, topic0) -> event abi
+        self.events = {}
+        for name, (address, abi) in contracts.items():
+            address = web3.toChecksumAddress(address)
+            self.names[address] = name
+            for item in abi:
+                if item["type"] == "event" and not item.get("anonymous"):
+                    topic = "0x" + event_abi_to_log_topic(item).hex()
+                    self.events[(address, topic)] = item
+
+    @property
+    def addresses(self):
+        return list(self.names)
+
+    def decode(self, log):
+        address = web3.toChecksumAddress(log["address"])
+        topics = [_hex(i) for i in log["topics"]]
+        abi = self.events.get((address, topics[0])) if topics else None
+        if abi is None:
+            return None
+
+        indexed = [i for i in abi["inputs"] if i["indexed"]]
+        data_inputs = [i for i in abi["inputs"] if not i["indexed"]]
+        data_values = decode([_abi_type(i) for i in data_inputs], HexBytes(log["data"]))
+
+        args = {}
+        for item, topic in zip(indexed, topics[1:]):
+            if item["type"] in ("string", "bytes") or item["type"].endswith("]") or item["type"] == "tuple":
+                # dynamic indexed values are stored as their hash
+                args[item["name"]] = topic
+            else:
+                args[item["name"]] = decode([item["type"]], HexBytes(topic))[0]
+        for item, value in zip(data_inputs, data_values):
+            args[item["name"]] = value
+        for item in abi["inputs"]:
+            if item["name"] not in args:
+                continue
+            if item["type"] == "address":
+                args[item["name"]] = web3.toChecksumAddress(args[item["name"]])
+            elif item["type"] == "address[]" and not item["indexed"]:
+                args[item["name"]] = [web3.toChecksumAddress(i) for i in args[item["name"]]]
+
+        return {
+            "block_number": log["blockNumber"],
+            "log_index": log["logIndex"],
+            "block_hash": _hex(log["blockHash"]),
+            "tx_hash": _hex(log["transactionHash"]),
+            "contract": self.names[address],
+            "address": address,
+            "event": abi["name"],
+            "args": {k: _to_json(v) for k, v in args.items()},
+        }
+
+
+def _abi_type(item):
+    if item["type"].startswith("tuple"):
+        inner = ",".join(_abi_type(i) for i in item["components"])
+        return f"({inner}){item['type'][5:]}"
+    return item["type"]
+
+
+class EventIndexer:
+    """
+    SQLite-backed event indexer.
+
+    Arguments
+    ---------
+    db_path : str | Path
+        Path to the SQLite database. Created if it does not exist.
+    contracts : dict
+        `{name: (address, abi)}` of contracts to index, e.g. from `load_deployments`
+    start_block : int
+        First block to index, used when the database is empty
+    confirmations : int
+        Number of blocks behind the chain head to index up to
+    """
+
+    def __init__(self, db_path, contracts, start_block=0, confirmations=0):
+        # imported here, as both modules import from this one
+        from scripts.log_decoder import BulkDecoder
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(SCHEMA)
+        self.decoder = EventDecoder(contracts)
+        self.bulk_decoder = BulkDecoder(contracts)
+        # contract name -> checksummed address
+        self.addresses = {v: k for k, v in self.decoder.names.items()}
+        self.start_block = start_block
+        self.confirmations = confirmations
+
+    @property
+    def checkpoint(self):
+        """Last block that has been fully indexed, or None."""
+        row = self.db.execute("SELECT MAX(block_number) FROM checkpoints").fetchone()
+        return row[0]
+
+    def _rewind(self):
+        # find the most recent checkpoint that is still part of the canonical chain
+        rows = self.db.execute(
+            "SELECT block_number, block_hash FROM checkpoints ORDER BY block_number DESC"
+        ).fetchall()
+        for number, block_hash in rows:
+            block = web3.eth.get_block(number) if number <= web3.eth.block_number else None
+            if block is not None and _hex(block["hash"]) == block_hash:
+                break
+        else:
+            number = max(self.start_block - 1, (rows[0][0] if rows else 0) - REORG_DEPTH)
+
+        if rows and number == rows[0][0]:
+            return False
+        with self.db:
+            self.db.execute("DELETE FROM events WHERE block_number > ?", (number,))
+            self.db.execute("DELETE FROM checkpoints WHERE block_number > ?", (number,))
+        return True
+
+    def _decode_logs(self, logs):
+        """Decode raw JSON-RPC logs into rows of the events table."""
+        from scripts.log_decoder import LogBatch, to_args
+
+        if not logs:
+            return []
+        batch = LogBatch.from_logs(logs)
+        block_hashes = {int(i["blockNumber"], 16): i["blockHash"] for i in logs}
+        rows = []
+        for (contract, name), events in self.bulk_decoder.decode(batch).items():
+            address = self.addresses[contract]
+            abi = self.decoder.events.get((address, "0x" + events.layout.topic.hex()))
+            if abi is None or abi["inputs"] != events.layout.abi["inputs"]:
+                # the layout belongs to another contract's event with the same topic
+                continue
+            records = events.records
+            tx_hashes = np.ascontiguousarray(records["tx_hash"]).view("V32")
+            for block, index, tx_hash, args in zip(
+                records["block_number"].tolist(), records["log_index"].tolist(), tx_hashes, to_args(events)
+            ):
+                args = json.dumps({k: _to_json(v) for k, v in args.items()})
+                row = (block, index, block_hashes[block], "0x" + tx_hash.tobytes().hex())
+                rows.append(row + (contract, address, name, args))
+
+        # logs of events that cannot be compiled, or that share a topic with an
+        # event of another contract, are decoded one at a time
+        decoded = {i[:2] for i in rows}
+        for i, key in enumerate(zip(batch.block_number.tolist(), batch.log_index.tolist())):
+            if key in decoded:
+                continue
+            event = self.decoder.decode(dict(logs[i], blockNumber=key[0], logIndex=key[1]))
+            if event is not None:
+                rows.append(
+                    (
+                        event["block_number"],
+                        event["log_index"],
+                        event["block_hash"],
+                        event["tx_hash"],
+                        event["contract"],
+                        event["address"],
+                        event["event"],
+                        json.dumps(event["args"]),
+                    )
+                )
+        return rows
+
+    def _fetch(self, from_block, to_block):
+        from scripts.log_fetcher import LogFetcher
+
+        async def run():
+            rows = []
+            async with LogFetcher(web3.provider.endpoint_uri, self.decoder.addresses) as fetcher:
+                async for _, _, logs in fetcher.fetch(from_block, to_block):
+                    rows += self._decode_logs(logs)
+            return rows
+
+        return asyncio.run(run())
+
+    def sync(self, to_block=None):
+        """
+        Index all new events up to `to_block` (default: the chain head, less
+        the number of confirmations). Returns the number of new events.
+        """
+        if self.checkpoint is not None:
+            self._rewind()
+
+        if to_block is None:
+            to_block = web3.eth.block_number - self.confirmations
+        checkpoint = self.checkpoint
+        from_block = self.start_block if checkpoint is None else checkpoint + 1
+        if from_block > to_block:
+            return 0
+
+        rows = self._fetch(from_block, to_block)
+
+        block_hash = _hex(web3.eth.get_block(to_block)["hash"])
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?)", rows)
+            self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?,?)", (to_block, block_hash))
+            self.db.execute(
+                "DELETE FROM checkpoints WHERE block_number NOT IN "
+                "(SELECT block_number FROM checkpoints ORDER BY block_number DESC LIMIT ?)",
+                (CHECKPOINT_HISTORY,),
+            )
+        return len(rows)
+
+    def events(self, contract=None, event=None, from_block=None, to_block=None):
+        """Query indexed events, in the order they were emitted."""
+        query = "SELECT block_number, log_index, tx_hash, contract, event, args FROM events"
+        conditions, params = [], []
+        if from_block is not None:
+            conditions.append("block_number >= ?")
+            params.append(from_block)
+        if to_block is not None:
+            conditions.append("block_number <= ?")
+            params.append(to_block)
+        if contract is not None:
+            conditions.append("contract = ?")
+            params.append(contract)
+        if event is not None:
+            conditions.append("event = ?")
+            params.append(event)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY block_number, log_index"
+        return [
+            {
+                "block_number": row[0],
+                "log_index": row[1],
+                "tx_hash": row[2],
+                "contract": row[3],
+                "event": row[4],
+                "args": json.loads(row[5]),
+            }
+            for row in self.db.execute(query, params)
+        ]
+
+    def close(self):
+        self.db.close()
+
+
+def sync(db_path=DEFAULT_DB_PATH, start_block=0):
+    indexer = EventIndexer(db_path, load_deployments(), start_block=int(start_block))
+    count = indexer.sync()
+    print(f"Indexed {count} new events up to block {indexer.checkpoint}")
+    indexer.close()
@@ -0,0 +1,300 @@
+"""
+Keeper for protocol upkeep calls.
+
+Several maintenance functions are normally triggered as a side effect of user
+actions, and do not run during quiet periods:
+
+* `LpDepositor.pushPendingProtocolFees`, once per day while fees are pending
+* `LockedEPX.extendLock`, once per week
+* `BondedFeeDistributor.fetchEllipsisFees`, one day after the last claim of a fee
+  token, while the proxy has fees to claim from Ellipsis
+* `EpxDepositIncentives.updateReservedDeposits`, when reserved deposits from the
+  previous week can be released
+* `DotDotVoting.createFixedVoteApprovalVote`, while `fixedVoteLpToken` is not
+  approved for emissions in Ellipsis
+
+Each round, the state behind every upkeep is checked concurrently. Calls that are
+due are simulated with `eth_call`, and only those that succeed are submitted. Fee
+tokens that are due in the same round are fetched in a single call. Transactions
+are sent one at a time from a locally tracked nonce, and are replaced with a
+higher gas price if they are not mined in time.
+
+Usage:
+
+    brownie run keeper main <account id> [interval] --network bsc-main
+"""
+
+import asyncio
+
+from brownie import accounts, interface, web3
+from brownie.exceptions import VirtualMachineError
+from web3.exceptions import TransactionNotFound
+
+from scripts.indexer import load_deployments
+
+DAY = 86400
+WEEK = 604800
+
+# storage slot of `LockedEPX.lastLockWeek`
+LAST_LOCK_WEEK_SLOT = 7
+# `EpxDepositIncentives.totalWeeklyReservedDeposits` has one entry per week
+RESERVED_DEPOSIT_WEEKS = 13
+
+
+def push_protocol_fees(lp_depositor):
+    """Upkeep for `LpDepositor.pushPendingProtocolFees`."""
+
+    def check(timestamp):
+        if lp_depositor.lastFeeTransfer() + DAY >= timestamp:
+            return []
+        if lp_depositor.pendingFeeEpx() == 0 and lp_depositor.pendingFeeDdd() == 0:
+            return []
+        return [(lp_depositor.pushPendingProtocolFees, ())]
+
+    return check
+
+
+def extend_lock(depx):
+    """Upkeep for `LockedEPX.extendLock`."""
+
+    def check(timestamp):
+        last_lock_week = int(web3.eth.get_storage_at(depx.address, LAST_LOCK_WEEK_SLOT).hex(), 16)
+        if last_lock_week >= timestamp // WEEK:
+            return []
+        return [(depx.extendLock, ())]
+
+    return check
+
+
+def fetch_fees(distributor, tokens=()):
+    """
+    Upkeep for `BondedFeeDistributor.fetchEllipsisFees`.
+
+    Checks every token in `feeTokens`, as well as `tokens` which have not yet been
+    received by the distributor.
+    """
+
+    def check(timestamp):
+        length = distributor.feeTokensLength()
+        fee_tokens = [distributor.feeTokens(i) for i in range(length)]
+        fee_tokens += [i for i in tokens if i not in fee_tokens]
+
+        due = [i for i in fee_tokens if distributor.lastClaim(i) + DAY <= timestamp]
+        if not due:
+            return []
+        eps_fee_distro = interface.IFeeDistributor(distributor.epsFeeDistributor())
+        amounts = eps_fee_distro.claimable(distributor.proxy(), due)
+        due = [token for token, amount in zip(due, amounts) if amount]
+        if not due:
+            return []
+        return [(distributor.fetchEllipsisFees, (due,))]
+
+    return check
+
+
+def update_reserved_deposits(early_incentives):
+    """Upkeep for `EpxDepositIncentives.updateReservedDeposits`."""
+
+    def check(timestamp):
+        week = early_incentives.getWeek()
+        if week == 0 or week > RESERVED_DEPOSIT_WEEKS:
+            return []
+        if early_incentives.totalWeeklyReservedDeposits(week - 1) == 0:
+            return []
+        return [(early_incentives.updateReservedDeposits, ())]
+
+    return check
+
+
+def create_fixed_vote_approval_vote(voter):
+    """
+    Upkeep for `DotDotVoting.createFixedVoteApprovalVote`. The vote reverts within
+    Ellipsis while a previous vote is less than a week old, so it is only sent once
+    the simulated call succeeds.
+    """
+
+    def check(timestamp):
+        if interface.IIncentiveVoting(voter.epsVoter()).isApproved(voter.fixedVoteLpToken()):
+            return []
+        return [(voter.createFixedVoteApprovalVote, ())]
+
+    return check
+
+
+def protocol_upkeeps(lp_depositor, depx, distributor, early_incentives, voter, fee_tokens=()):
+    """
+    Upkeeps for every maintenance call, in the order they are submitted.
+
+    `pushPendingProtocolFees` deposits into `LockedEPX`, which also extends the
+    lock, so it is placed before `extendLock`.
+    """
+    return {
+        "push_protocol_fees": push_protocol_fees(lp_depositor),
+        "extend_lock": extend_lock(depx),
+        "fetch_fees": fetch_fees(distributor, fee_tokens),
+        "update_reserved_deposits": update_reserved_deposits(early_incentives),
+        "create_fixed_vote_approval_vote": create_fixed_vote_approval_vote(voter),
+    }
+
+
+class Keeper:
+    """
+    Checks upkeeps and submits the calls that are due.
+
+    Arguments
+    ---------
+    account : Account
+        Account that submits the transactions
+    upkeeps : dict
+        `{name: check}`, where `check(timestamp)` returns a list of `(method, args)`
+        that are due at the given block timestamp. Calls are submitted in the
+        order of `upkeeps`.
+    max_gas_price : int, optional
+        Highest gas price to submit or replace a transaction with. Calls are not
+        submitted while the network gas price is above this.
+    gas_price_multiplier : float, optional
+        Multiplier applied to the network gas price
+    replace_after : int, optional
+        Seconds to wait for a transaction before replacing it with a higher gas price
+    poll_interval : float, optional
+        Seconds between checks for a transaction receipt
+    """
+
+    def __init__(self, account, upkeeps, max_gas_price=None, gas_price_multiplier=1.0, replace_after=120, poll_interval=1):
+        self.account = account
+        self.upkeeps = upkeeps
+        self.max_gas_price = max_gas_price
+        self.gas_price_multiplier = gas_price_multiplier
+        self.replace_after = replace_after
+        self.poll_interval = poll_interval
+        self.nonce = None
+
+    def _gas_price(self):
+        gas_price = int(web3.eth.gas_price * self.gas_price_multiplier)
+        if self.max_gas_price is not None and gas_price > self.max_gas_price:
+            return None
+        return gas_price
+
+    async def _check(self, name, timestamp):
+        # a failing check only skips its own upkeep for this round
+        try:
+            return await asyncio.to_thread(self.upkeeps[name], timestamp)
+        except Exception as exc:
+            print(f"{name}: check failed: {exc!r}")
+            return []
+
+    async def _simulate(self, method, args):
+        try:
+            await asyncio.to_thread(method.call, *args, {'from': self.account})
+        except (VirtualMachineError, ValueError):
+            return False
+        return True
+
+    async def run_once(self):
+        """
+        Check every upkeep and submit the calls that are due. Returns the list of
+        mined transactions.
+        """
+        timestamp = (await asyncio.to_thread(web3.eth.get_block, "latest")).timestamp
+        names = list(self.upkeeps)
+        results = await asyncio.gather(*(self._check(name, timestamp) for name in names))
+
+        txs = []
+        for name, calls in zip(names, results):
+            if not calls:
+                continue
+            if txs:
+                # an earlier transaction in this round may have performed this upkeep
+                timestamp = (await asyncio.to_thread(web3.eth.get_block, "latest")).timestamp
+                calls = await self._check(name, timestamp)
+            for method, args in calls:
+                if not await self._simulate(method, args):
+                    print(f"{name}: {method._name} reverts, skipping")
+                    continue
+                gas_price = await asyncio.to_thread(self._gas_price)
+                if gas_price is None:
+                    print(f"Network gas price is above {self.max_gas_price}, skipping this round")
+                    return txs
+                try:
+                    txs.append(await self._send(method, args, gas_price))
+                except ValueError as exc:
+                    # the nonce is read again from the node in the next round
+                    print(f"{name}: {method._name} could not be submitted: {exc!r}")
+                    return txs
+        return txs
+
+    def _receipt(self, txid):
+        try:
+            return web3.eth.get_transaction_receipt(txid)
+        except TransactionNotFound:
+            return None
+
+    async def _wait(self, sent):
+        # wait for any of the transactions sent with the current nonce
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.replace_after
+        while loop.time() < deadline:
+            for tx in sent:
+                receipt = await asyncio.to_thread(self._receipt, tx.txid)
+                if receipt is not None:
+                    return tx, receipt
+            await asyncio.sleep(self.poll_interval)
+        return None, None
+
+    async def _send(self, method, args, gas_price):
+        if self.nonce is None:
+            self.nonce = await asyncio.to_thread(web3.eth.get_transaction_count, self.account.address, "pending")
+
+        params = {'from': self.account, 'nonce': self.nonce, 'gas_price': gas_price, 'required_confs': 0}
+        try:
+            sent = [await asyncio.to_thread(method, *args, params)]
+        except ValueError:
+            # most likely a nonce that was used outside of the keeper
+            self.nonce = None
+            raise
+
+        while True:
+            tx, receipt = await self._wait(sent)
+            if tx is not None:
+                break
+            # replacements must raise the gas price by at least 10%
+            replacement = gas_price * 9 // 8 + 1
+            if self.max_gas_price is not None and replacement > self.max_gas_price:
+                # keep waiting for the last transaction sent
+                continue
+            try:
+                sent.append(await asyncio.to_thread(sent[-1].replace, None, replacement))
+            except ValueError:
+                # the previous transaction confirmed while waiting
+                continue
+            gas_price = replacement
+
+        self.nonce += 1
+        if receipt.status == 0:
+            print(f"{tx.fn_name} reverted in {tx.txid}")
+        return tx
+
+    async def run(self, interval=60, rounds=None):
+        """Run a round every `interval` seconds, indefinitely unless `rounds` is given."""
+        count = 0
+        while rounds is None or count < rounds:
+            for tx in await self.run_once():
+                print(f"{tx.fn_name}: {tx.txid}")
+            count += 1
+            if rounds is None or count < rounds:
+                await asyncio.sleep(interval)
+
+
+def main(account_id, interval=60):
+    from brownie import BondedFeeDistributor, DotDotVoting, EpxDepositIncentives, LockedEPX, LpDepositor
+
+    deployments = load_deployments()
+    upkeeps = protocol_upkeeps(
+        LpDepositor.at(deployments["LpDepositor"][0]),
+        LockedEPX.at(deployments["LockedEPX"][0]),
+        BondedFeeDistributor.at(deployments["BondedFeeDistributor"][0]),
+        EpxDepositIncentives.at(deployments["EpxDepositIncentives"][0]),
+        DotDotVoting.at(deployments["DotDotVoting"][0]),
+    )
+    keeper = Keeper(accounts.load(account_id), upkeeps)
+    asyncio.run(keeper.run(int(interval)))
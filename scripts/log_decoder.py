@@ -0,0 +1,447 @@
+"""
+Bulk log decoder for the DotDot events.
+
+`EventDecoder` in `scripts/indexer.py` decodes one log at a time into a dict. For
+large ranges, most of the indexing time goes into that decoding. `BulkDecoder`
+instead decodes many logs at once:
+
+* When the decoder is created, each event ABI is compiled into a fixed row layout.
+  Logs are looked up from a table keyed by topic0.
+* Logs are held in a `LogBatch`, which stores the raw topics and data of the
+  whole batch in flat NumPy buffers.
+* Logs are grouped by event. Each log is copied once into a row of its event's
+  layout. Every static field is then a view into those rows, read as a NumPy
+  structured array.
+* Dynamic arrays, such as `Claimed.tokens` and `VotedForIncentives.tokens`, are
+  gathered for the whole group at once. Each is returned as `(offsets, values)`,
+  in the same layout as an Arrow list array: the elements of the i-th log are
+  `values[offsets[i]:offsets[i + 1]]`.
+
+Fields are read directly from the ABI words:
+
+* `address` fields are 20 byte strings, converted with `to_address`.
+* Integers of up to 64 bits are NumPy integers.
+* Larger integers are four big-endian uint64 limbs, converted with `to_int` or
+  `to_float`.
+
+Events with strings, bytes, tuples or nested arrays are not compiled. Their
+names are listed in `BulkDecoder.unsupported`. `EventIndexer` decodes these with
+`EventDecoder` instead.
+
+Usage:
+
+    brownie run log_decoder benchmark [number of logs]
+"""
+
+import time
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+from scripts.indexer import _abi_type, load_deployments
+
+try:
+    from eth_abi import encode
+except ImportError:
+    from eth_abi import encode_abi as encode
+
+# offsets of the fields that every row starts with
+BLOCK_NUMBER_OFFSET = 0
+LOG_INDEX_OFFSET = 8
+TX_HASH_OFFSET = 16
+HEADER_SIZE = 48
+
+_ZERO_WORD = "0x" + "00" * 32
+
+_LIMB_WEIGHTS = np.array([2.0**192, 2.0**128, 2.0**64, 1.0])
+
+
+def _word_dtype(kind):
+    """Dtype of a 32 byte ABI word of type `kind`, and its offset within the word."""
+    if kind == "address":
+        return np.dtype("S20"), 12
+    if kind == "bool":
+        return np.dtype("?"), 31
+    if kind.startswith("bytes") and kind != "bytes":
+        size = int(kind[5:])
+        return np.dtype(f"S{size}"), 0
+    for prefix, code in (("uint", "u"), ("int", "i")):
+        if kind.startswith(prefix) and kind[len(prefix):].isdigit():
+            bits = int(kind[len(prefix):] or 256)
+            if bits > 64:
+                return np.dtype((">u8", (4,))), 0
+            size = next(i for i in (1, 2, 4, 8) if i * 8 >= bits)
+            return np.dtype(f">{code}{size}"), 32 - size
+    return None, None
+
+
+def _is_array(kind):
+    # one-dimensional dynamic arrays of static elements
+    return kind.endswith("[]") and kind.count("[") == 1
+
+
+class EventLayout:
+    """
+    Compiled row layout of an event.
+
+    Each row holds the block number, log index and transaction hash of the log,
+    followed by the indexed topics and the head of the data. Static fields are
+    defined as views into the row.
+    """
+
+    def __init__(self, abi):
+        self.abi = abi
+        self.name = abi["name"]
+        self.topic = event_abi_to_log_topic(abi)
+        self.topic_count = 1 + sum(1 for i in abi["inputs"] if i["indexed"])
+        data_inputs = [i for i in abi["inputs"] if not i["indexed"]]
+        self.data_size = 32 * len(data_inputs)
+        data_offset = HEADER_SIZE + 32 * (self.topic_count - 1)
+        self.row_size = data_offset + self.data_size
+
+        names = ["block_number", "log_index", "tx_hash"]
+        formats = ["<i8", "<i8", "S32"]
+        offsets = [BLOCK_NUMBER_OFFSET, LOG_INDEX_OFFSET, TX_HASH_OFFSET]
+        # name -> (byte offset of the head word within the data, element dtype, offset in word)
+        self.arrays = {}
+
+        topic_offset = HEADER_SIZE
+        for item in abi["inputs"]:
+            if item["indexed"]:
+                offset, topic_offset = topic_offset, topic_offset + 32
+            else:
+                offset = data_offset + 32 * data_inputs.index(item)
+
+            kind = _abi_type(item)
+            if item["indexed"] and (kind.endswith("]") or kind.startswith("(") or kind in ("string", "bytes")):
+                # dynamic indexed values are stored as their hash
+                dtype, shift = np.dtype("S32"), 0
+            elif not item["indexed"] and _is_array(kind):
+                dtype, shift = _word_dtype(kind[:-2])
+                if dtype is None:
+                    raise ValueError(f"Unsupported type: {kind}")
+                self.arrays[item["name"]] = (offset - data_offset, dtype, shift)
+                continue
+            else:
+                dtype, shift = _word_dtype(kind)
+                if dtype is None:
+                    raise ValueError(f"Unsupported type: {kind}")
+
+            names.append(item["name"])
+            formats.append(dtype)
+            offsets.append(offset + shift)
+
+        self.dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": self.row_size})
+
+
+class LogBatch(NamedTuple):
+    """
+    Raw logs held in flat buffers. The data of log `i` is
+    `data[data_offsets[i]:data_offsets[i + 1]]`.
+    """
+
+    block_number: np.ndarray
+    log_index: np.ndarray
+    tx_hash: np.ndarray
+    address: np.ndarray
+    # (n, 4) topics, padded with zero words
+    topics: np.ndarray
+    topic_count: np.ndarray
+    data: np.ndarray
+    data_offsets: np.ndarray
+
+    def __len__(self):
+        return len(self.block_number)
+
+    @classmethod
+    def from_logs(cls, logs):
+        """
+        Pack logs returned by `eth_getLogs`, either as raw JSON-RPC dicts with hex
+        string values or as decoded web3 logs.
+        """
+        if not logs:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(
+                empty, empty, np.zeros(0, "S32"), np.zeros(0, "S20"), np.zeros((0, 4), "S32"),
+                np.zeros(0, np.int8), np.zeros(0, np.uint8), np.zeros(1, np.int64),
+            )
+
+        topics = [log["topics"] for log in logs]
+        data = [log["data"] for log in logs]
+        zero = _ZERO_WORD if isinstance(next((t[0] for t in topics if t), ""), str) else bytes(32)
+        padded = [[t[i] if len(t) > i else zero for t in topics] for i in range(4)]
+        data_bytes = [_unhex(i) for i in data]
+        return cls(
+            block_number=_int_array([log["blockNumber"] for log in logs]),
+            log_index=_int_array([log["logIndex"] for log in logs]),
+            tx_hash=np.frombuffer(_join([log["transactionHash"] for log in logs]), dtype="S32"),
+            address=np.frombuffer(_join([log["address"] for log in logs]), dtype="S20"),
+            topics=np.stack([np.frombuffer(_join(i), dtype="S32") for i in padded], axis=1),
+            topic_count=np.fromiter(map(len, topics), dtype=np.int8, count=len(logs)),
+            data=np.frombuffer(b"".join(data_bytes), dtype=np.uint8),
+            data_offsets=np.concatenate(([0], np.cumsum(np.fromiter(map(len, data_bytes), dtype=np.int64)))),
+        )
+
+
+def _unhex(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:])
+    return bytes(value)
+
+
+def _join(values):
+    if isinstance(values[0], str):
+        return bytes.fromhex("".join(i[2:] for i in values))
+    return b"".join(bytes(i) for i in values)
+
+
+def _int_array(values):
+    if isinstance(values[0], str):
+        return np.array([int(i, 16) for i in values], dtype=np.int64)
+    return np.array(values, dtype=np.int64)
+
+
+def _windows(buffer, size):
+    # every `size` byte window of `buffer`, so that rows can be gathered by start offset
+    if len(buffer) < size:
+        buffer = np.concatenate((buffer, np.zeros(size - len(buffer), dtype=np.uint8)))
+    return np.lib.stride_tricks.sliding_window_view(buffer, size)
+
+
+class DecodedEvents(NamedTuple):
+    # one structured row per log
+    records: np.ndarray
+    # name -> (offsets, values) for each dynamic array field
+    arrays: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    layout: EventLayout
+
+
+class BulkDecoder:
+    """
+    Decodes batches of logs into NumPy structured arrays.
+
+    Arguments
+    ---------
+    contracts : dict
+        `{name: (address, abi)}` of contracts to decode, e.g. from `load_deployments`
+    """
+
+    def __init__(self, contracts):
+        # address -> contract name
+        self.names = {}
+        # topic0 -> EventLayout
+        self.layouts = {}
+        # names of events which cannot be compiled
+        self.unsupported = set()
+        for name, (address, abi) in contracts.items():
+            self.names[bytes.fromhex(address[2:])] = name
+            for item in abi:
+                if item["type"] != "event" or item.get("anonymous"):
+                    continue
+                try:
+                    layout = EventLayout(item)
+                except ValueError:
+                    self.unsupported.add(f"{name}.{item['name']}")
+                    continue
+                self.layouts.setdefault(layout.topic, layout)
+
+    @property
+    def addresses(self):
+        return [to_checksum_address(i) for i in self.names]
+
+    def decode(self, batch):
+        """
+        Decode a `LogBatch`. Returns `{(contract, event): DecodedEvents}`, with the
+        logs of each event in the order of the batch. Logs from other addresses or
+        with an unknown topic0 are skipped.
+        """
+        if not len(batch):
+            return {}
+        topic0 = batch.topics[:, 0]
+        keys, inverse = np.unique(topic0, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+
+        result = {}
+        for key, start, end in zip(keys, bounds[:-1], bounds[1:]):
+            layout = self.layouts.get(bytes(key).ljust(32, b"\0"))
+            if layout is None:
+                continue
+            idx = order[start:end]
+            addresses = batch.address[idx]
+            if (addresses == addresses[0]).all():
+                groups = [(addresses[0], idx)]
+            else:
+                groups = [(i, idx[addresses == i]) for i in np.unique(addresses)]
+            for address, group in groups:
+                name = self.names.get(bytes(address).ljust(20, b"\0"))
+                if name is not None:
+                    events = self._decode_group(batch, layout, group)
+                    if len(events.records):
+                        result[(name, layout.name)] = events
+        return result
+
+    def _decode_group(self, batch, layout, idx):
+        starts = batch.data_offsets[idx]
+        lengths = batch.data_offsets[idx + 1] - starts
+        # skip logs with the same topic0 but a different layout, e.g. other indexed inputs
+        valid = (batch.topic_count[idx] == layout.topic_count) & (lengths >= layout.data_size)
+        if not valid.all():
+            idx, starts = idx[valid], starts[valid]
+
+        rows = np.empty((len(idx), layout.row_size), dtype=np.uint8)
+        rows[:, BLOCK_NUMBER_OFFSET:LOG_INDEX_OFFSET] = batch.block_number[idx, None].view(np.uint8)
+        rows[:, LOG_INDEX_OFFSET:TX_HASH_OFFSET] = batch.log_index[idx, None].view(np.uint8)
+        rows[:, TX_HASH_OFFSET:HEADER_SIZE] = batch.tx_hash[idx, None].view(np.uint8)
+        topic_end = HEADER_SIZE + 32 * (layout.topic_count - 1)
+        if layout.topic_count > 1:
+            topics = batch.topics[idx, 1 : layout.topic_count]
+            rows[:, HEADER_SIZE:topic_end] = topics.view(np.uint8).reshape(len(idx), -1)
+        if layout.data_size:
+            rows[:, topic_end:] = _windows(batch.data, layout.data_size)[starts]
+
+        arrays = {}
+        if layout.arrays:
+            words = _windows(batch.data, 32)
+            for name, (head, dtype, shift) in layout.arrays.items():
+                arrays[name] = self._decode_array(words, starts, rows[:, topic_end + head :], dtype, shift)
+
+        return DecodedEvents(rows.view(layout.dtype).reshape(-1), arrays, layout)
+
+    def _decode_array(self, words, starts, heads, dtype, shift):
+        # the head word holds the offset of the array within the data, where the
+        # length is stored followed by the elements
+        position = starts + np.ascontiguousarray(heads[:, 24:32]).view(">u8").reshape(-1).astype(np.int64)
+        lengths = np.ascontiguousarray(words[position][:, 24:32]).view(">u8").reshape(-1).astype(np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        element = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+        positions = np.repeat(position + 32, lengths) + 32 * element
+        values = np.ascontiguousarray(words[positions][:, shift : shift + dtype.itemsize])
+        if dtype.subdtype is not None:
+            # uint256 elements are kept as (n, 4) limbs
+            return offsets, values.view(dtype.base).reshape(-1, *dtype.shape)
+        return offsets, values.view(dtype).reshape(-1)
+
+
+def to_address(values):
+    """Checksummed addresses from an array of 20 byte values."""
+    raw = np.ascontiguousarray(values).view(np.uint8).reshape(-1, 20)
+    return [to_checksum_address(i.tobytes()) for i in raw]
+
+
+def to_int(values):
+    """Python integers from an array of big-endian uint64 limbs."""
+    values = np.asarray(values).astype(object)
+    return (values[:, 0] << 192) + (values[:, 1] << 128) + (values[:, 2] << 64) + values[:, 3]
+
+
+def to_float(values):
+    """Approximate float64 values from an array of big-endian uint64 limbs."""
+    return np.asarray(values).astype(np.float64) @ _LIMB_WEIGHTS
+
+
+def to_args(events):
+    """
+    Convert `DecodedEvents` into a list of `args` dicts, with the same values as
+    `EventDecoder.decode` before conversion to JSON.
+    """
+    records, arrays, layout = events
+    columns = {}
+    for item in layout.abi["inputs"]:
+        name = item["name"]
+        if name in arrays:
+            offsets, values = arrays[name]
+            values = _to_python(values)
+            columns[name] = [tuple(values[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]
+        else:
+            values = records[name]
+            if item["indexed"] and values.dtype == np.dtype("S32") and item["type"] != "bytes32":
+                columns[name] = ["0x" + i.tobytes().hex() for i in np.ascontiguousarray(values).view("V32")]
+            else:
+                columns[name] = _to_python(values)
+    return [{k: v[i] for k, v in columns.items()} for i in range(len(records))]
+
+
+def _to_python(values):
+    if values.dtype == np.dtype("S20"):
+        return to_address(values)
+    if values.dtype.kind == "S":
+        return [bytes(i).ljust(values.dtype.itemsize, b"\0") for i in np.ascontiguousarray(values).view(f"V{values.dtype.itemsize}")]
+    if values.ndim == 2:
+        return list(to_int(values))
+    if values.dtype.kind == "b":
+        return [bool(i) for i in values]
+    return [int(i) for i in values]
+
+
+def _synthetic_logs(contracts, count, seed=0):
+    # logs with realistic event mixes, encoded as raw JSON-RPC responses
+    rng = np.random.default_rng(seed)
+    templates = []
+    for name, (address, abi) in contracts.items():
+        for item in abi:
+            if item["type"] != "event" or item.get("anonymous"):
+                continue
+            try:
+                EventLayout(item)
+            except ValueError:
+                continue
+            templates.append((address, item))
+
+    def value(kind):
+        if kind.endswith("[]"):
+            return [value(kind[:-2]) for _ in range(int(rng.integers(1, 6)))]
+        if kind == "address":
+            return "0x" + rng.bytes(20).hex()
+        if kind == "bool":
+            return bool(rng.integers(2))
+        if kind.startswith("bytes"):
+            return rng.bytes(int(kind[5:]))
+        return int(rng.integers(2**62)) * 10**18
+
+    logs = []
+    for i in range(count):
+        address, item = templates[int(rng.integers(len(templates)))]
+        topics = ["0x" + event_abi_to_log_topic(item).hex()]
+        types, values = [], []
+        for inp in item["inputs"]:
+            kind = _abi_type(inp)
+            if inp["indexed"]:
+                topics.append("0x" + encode([kind], [value(kind)]).hex())
+            else:
+                types.append(kind)
+                values.append(value(kind))
+        logs.append(
+            {
+                "address": address.lower(),
+                "topics": topics,
+                "data": "0x" + encode(types, values).hex(),
+                "blockNumber": hex(20_000_000 + i // 50),
+                "transactionHash": "0x" + rng.bytes(32).hex(),
+                "logIndex": hex(i % 50),
+            }
+        )
+    return logs
+
+
+def benchmark(count=1_000_000, unique=10_000):
+    """
+    Measure decoding throughput. `unique` synthetic logs are generated and repeated
+    up to `count`, then packed and decoded.
+    """
+    count, unique = int(count), int(unique)
+    contracts = load_deployments()
+    decoder = BulkDecoder(contracts)
+    logs = _synthetic_logs(contracts, min(unique, count))
+    logs = (logs * -(-count // len(logs)))[:count]
+
+    start = time.perf_counter()
+    batch = LogBatch.from_logs(logs)
+    packed = time.perf_counter()
+    decoded = decoder.decode(batch)
+    end = time.perf_counter()
+
+    total = sum(len(i.records) for i in decoded.values())
+    print(f"Packed {count} logs in {packed - start:.2f}s ({count / (packed - start):,.0f} logs/s)")
+    print(f"Decoded {total} logs in {end - packed:.2f}s ({total / (end - packed):,.0f} logs/s)")
@@ -0,0 +1,210 @@
+"""
+Adaptive concurrent `eth_getLogs` fetcher.
+
+Fetching logs serially, in fixed ranges of `LOG_BLOCK_RANGE` blocks, is slow over
+long histories. It also fails whenever a provider limits the number of results or
+the block range of a single request. `LogFetcher` instead:
+
+* sends requests for consecutive block ranges concurrently, up to a fixed number
+  in flight
+* adapts the range to the provider. When a request is rejected for returning too
+  many results, or for covering too many blocks, the range is split in half and
+  the range used for later requests shrinks. After a run of successful requests,
+  the range grows again.
+* retries other failures, such as rate limits and timeouts, with exponential
+  backoff and jitter
+* yields the results of each range in block order as an async iterator, so the
+  memory used is bounded by the number of requests in flight
+
+Usage:
+
+    brownie run log_fetcher count <from block> [to block] --network bsc-main
+
+or within a service:
+
+    async with LogFetcher(url, addresses) as fetcher:
+        async for start, end, logs in fetcher.fetch(from_block, to_block):
+            ...
+"""
+
+import asyncio
+import random
+from collections import Counter, deque
+
+import aiohttp
+
+from scripts.client import AsyncRpc
+from scripts.indexer import LOG_BLOCK_RANGE, load_deployments
+from scripts.log_decoder import BulkDecoder, LogBatch
+
+# requests in flight at once
+CONCURRENCY = 8
+# largest block range the fetcher grows to
+MAX_BLOCK_RANGE = 100_000
+# consecutive successful requests after which the block range is doubled
+GROW_AFTER = 4
+# attempts for a request that fails for reasons other than its size
+RETRIES = 5
+# seconds before the first retry, doubled on every further attempt
+BACKOFF = 0.5
+
+# fragments of the errors that providers return when a request would return too
+# many results, and when it covers more blocks than they allow
+RESULT_ERRORS = ("too many results", "too many logs", "more than 10000 results", "returned more than", "response size")
+BLOCK_RANGE_ERRORS = ("block range", "range is too", "range too large", "is limited to")
+# fragments of rate limit errors, which are retried with backoff instead of splitting the range
+RATE_LIMIT_ERRORS = ("rate limit", "too many requests")
+
+
+def range_error(exc):
+    """
+    Check if `exc` means that a request should be retried over a smaller range.
+    Returns "blocks" if the provider limits the block range of a request,
+    "results" if it limits the number of results, and otherwise None.
+    """
+    if isinstance(exc, aiohttp.ClientResponseError):
+        # HTTP 429 and other statuses are retried
+        return "results" if exc.status == 413 else None
+    message = str(exc).lower()
+    if not isinstance(exc, ValueError) or any(i in message for i in RATE_LIMIT_ERRORS):
+        return None
+    if any(i in message for i in BLOCK_RANGE_ERRORS):
+        return "blocks"
+    if any(i in message for i in RESULT_ERRORS):
+        return "results"
+    return None
+
+
+class RangeTooLarge(Exception):
+    def __init__(self, kind):
+        super().__init__(kind)
+        self.kind = kind
+
+
+class LogFetcher:
+    """
+    Fetches logs for a set of addresses over a block range.
+
+    Arguments
+    ---------
+    url : str
+        HTTP endpoint of the node
+    addresses : list
+        Addresses to fetch logs for
+    concurrency : int, optional
+        Maximum number of requests in flight
+    block_range : int, optional
+        Initial number of blocks in each request
+    max_block_range : int, optional
+        Largest number of blocks in a request
+    retries : int, optional
+        Attempts for a request that fails for reasons other than its size
+    backoff : float, optional
+        Seconds before the first retry, doubled on every further attempt
+    """
+
+    def __init__(
+        self,
+        url,
+        addresses,
+        concurrency=CONCURRENCY,
+        block_range=LOG_BLOCK_RANGE,
+        max_block_range=MAX_BLOCK_RANGE,
+        retries=RETRIES,
+        backoff=BACKOFF,
+    ):
+        # each request is sent on its own, so that requests use separate connections
+        self.rpc = AsyncRpc(url, max_connections=concurrency, batch_size=1)
+        self.addresses = list(addresses)
+        self.concurrency = concurrency
+        self.block_range = block_range
+        self.max_block_range = max_block_range
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphore = None
+        self._successes = 0
+
+    async def __aenter__(self):
+        await self.rpc.start(follow_heads=False)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *args):
+        await self.rpc.close()
+
+    async def _request(self, start, end):
+        params = [{"address": self.addresses, "fromBlock": hex(start), "toBlock": hex(end)}]
+        for attempt in range(self.retries):
+            try:
+                async with self._semaphore:
+                    return await self.rpc.request("eth_getLogs", params)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                kind = range_error(exc)
+                if kind is not None and end > start:
+                    raise RangeTooLarge(kind) from exc
+                if attempt == self.retries - 1:
+                    raise
+                await asyncio.sleep(self.backoff * 2**attempt * (1 + random.random()))
+
+    async def _fetch_range(self, start, end):
+        try:
+            logs = await self._request(start, end)
+        except RangeTooLarge as exc:
+            size = end - start + 1
+            if exc.kind == "blocks":
+                # a block range limit is fixed, so the range never grows past it again
+                self.max_block_range = max(1, min(self.max_block_range, size // 2))
+            # the number of results depends on the blocks, so the range may grow
+            # again once it is past them
+            self.block_range = max(1, min(self.block_range, size // 2))
+            self._successes = 0
+            middle = (start + end) // 2
+            lower, upper = await asyncio.gather(self._fetch_range(start, middle), self._fetch_range(middle + 1, end))
+            return lower + upper
+
+        self._successes += 1
+        if self._successes >= GROW_AFTER and end - start + 1 >= self.block_range:
+            self.block_range = min(self.block_range * 2, self.max_block_range)
+            self._successes = 0
+        return logs
+
+    async def fetch(self, from_block, to_block=None):
+        """
+        Fetch logs from `from_block` to `to_block` (default: the chain head).
+        Yields `(start, end, logs)` for consecutive block ranges, in order, with
+        logs as raw JSON-RPC dicts.
+        """
+        if to_block is None:
+            to_block = await self.rpc.update_head()
+        pending = deque()
+        next_block = from_block
+        try:
+            while next_block <= to_block or pending:
+                while next_block <= to_block and len(pending) < self.concurrency:
+                    end = min(next_block + self.block_range - 1, to_block)
+                    pending.append((next_block, end, asyncio.ensure_future(self._fetch_range(next_block, end))))
+                    next_block = end + 1
+                start, end, task = pending.popleft()
+                yield start, end, await task
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+
+
+def count(from_block, to_block=None):
+    from brownie import web3
+
+    deployments = load_deployments()
+    decoder = BulkDecoder(deployments)
+
+    async def run():
+        counts = Counter()
+        async with LogFetcher(web3.provider.endpoint_uri, decoder.addresses) as fetcher:
+            async for start, end, logs in fetcher.fetch(int(from_block), None if to_block is None else int(to_block)):
+                for key, events in decoder.decode(LogBatch.from_logs(logs)).items():
+                    counts[key] += len(events.records)
+                print(f"{start}-{end}: {len(logs)} logs (block range {fetcher.block_range})")
+        return counts
+
+    for (contract, event), total in sorted(asyncio.run(run()).items()):
+        print(f"{contract}.{event}: {total}")
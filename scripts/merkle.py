@@ -0,0 +1,67 @@
+from eth_utils import keccak
+
+try:
+    from eth_abi import encode
+except ImportError:
+    from eth_abi import encode_abi as encode
+
+
+def hash_pair(a, b):
+    """Hash two nodes, sorted by value as in OpenZeppelin's `MerkleProof`."""
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+class MerkleTree:
+    """
+    Merkle tree with sorted pair hashing, compatible with OpenZeppelin's `MerkleProof`.
+
+    Leaves are given as 32 byte hashes. When a layer has an odd number of nodes,
+    the final node is carried up to the next layer unhashed.
+    """
+
+    def __init__(self, leaves):
+        if not leaves:
+            raise ValueError("Cannot build a merkle tree without leaves")
+        layer = sorted(set(leaves))
+        self.layers = [layer]
+        while len(layer) > 1:
+            layer = [
+                hash_pair(layer[i], layer[i + 1]) if i + 1 < len(layer) else layer[i]
+                for i in range(0, len(layer), 2)
+            ]
+            self.layers.append(layer)
+        self._index = {leaf: i for i, leaf in enumerate(self.layers[0])}
+
+    @property
+    def root(self):
+        return self.layers[-1][0]
+
+    def get_proof(self, leaf):
+        idx = self._index[leaf]
+        proof = []
+        for layer in self.layers[:-1]:
+            sibling = idx ^ 1
+            if sibling < len(layer):
+                proof.append(layer[sibling])
+            idx //= 2
+        return proof
+
+
+def verify_proof(proof, root, leaf):
+    computed = leaf
+    for node in proof:
+        computed = hash_pair(computed, node)
+    return computed == root
+
+
+def balance_leaf(account, amount):
+    """Leaf for `account` and `amount`, equal to `keccak256(abi.encodePacked(account, amount))`."""
+    return keccak(bytes.fromhex(account[2:]) + int(amount).to_bytes(32, "big"))
+
+
+def bribe_leaf(account, tokens, amounts):
+    """
+    Leaf for the cumulative bribe `amounts` of `tokens` earned by `account`, equal
+    to `keccak256(abi.encode(account, tokens, amounts))`.
+    """
+    return keccak(encode(["address", "address[]", "uint256[]"], [account, list(tokens), [int(i) for i in amounts]]))
@@ -0,0 +1,538 @@
+"""
+Off-chain model of the `LpDepositor` reward integrals.
+
+Replays every deposit, withdrawal, deposit transfer and claim made through
+`LpDepositor`, applying the same integer arithmetic as `_updateIntegrals` and
+`_updateExtraIntegrals`: the 15% fee on harvested EPX, DDD earned at
+`DDD_EARN_RATIO` and integrals stored at 1e18 precision. Claimable EPX, DDD
+and third-party rewards are then computed for every user and pool at once,
+matching `LpDepositor.claimable` and `claimableExtraRewards` exactly.
+
+State is held in dense users x pools arrays. Values are python integers in numpy
+object arrays, because an integral multiplied by a balance overflows 64 bits and
+the result must round exactly as it does on-chain.
+
+The EPX and third-party rewards harvested by each action are not part of the
+`LpDepositor` events. The replay reads them from the `lpStaker` events emitted
+for the proxy, and from token transfers into `LpDepositor`.
+
+Usage:
+
+    brownie run reward_model export <start block> [output path] --network bsc-main
+"""
+
+import csv
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from brownie import web3
+from eth_utils import event_signature_to_log_topic
+from hexbytes import HexBytes
+
+from scripts.indexer import LOG_BLOCK_RANGE, EventDecoder, _hex
+
+DEFAULT_OUTPUT_PATH = Path(__file__).parent.parent.joinpath("reports/claimable.csv")
+
+PRECISION = 10**18
+FEE_PERCENT = 15
+
+TRANSFER_TOPIC = "0x" + event_signature_to_log_topic("Transfer(address,address,uint256)").hex()
+
+# events emitted by `IEllipsisLpStaking` when the proxy deposits, withdraws or claims
+LP_STAKING_EVENTS = [
+    {
+        "type": "event",
+        "name": name,
+        "anonymous": False,
+        "inputs": [
+            {"name": "user", "type": "address", "indexed": True},
+            {"name": "token", "type": "address", "indexed": True},
+            {"name": "amount", "type": "uint256", "indexed": False},
+        ],
+    }
+    for name in ("Deposit", "Withdraw")
+] + [
+    {
+        "type": "event",
+        "name": "Claimed",
+        "anonymous": False,
+        "inputs": [
+            {"name": "caller", "type": "address", "indexed": True},
+            {"name": "receiver", "type": "address", "indexed": True},
+            {"name": "tokens", "type": "address[]", "indexed": False},
+            {"name": "amount", "type": "uint256", "indexed": False},
+        ],
+    }
+]
+
+
+def _zeros(*shape):
+    return np.zeros(shape, dtype=object)
+
+
+def _grow(array, shape):
+    # resize to at least `shape`, doubling each axis that needs to grow
+    if all(a >= b for a, b in zip(array.shape, shape)):
+        return array
+    new_shape = tuple(max(a, b, 2 * a) if b > a else a for a, b in zip(array.shape, shape))
+    result = _zeros(*new_shape)
+    result[tuple(slice(0, i) for i in array.shape)] = array
+    return result
+
+
+class RewardModel:
+    """
+    Integer-exact model of the `LpDepositor` reward accounting.
+
+    Users and pools are assigned a row and column in the order they are first
+    seen, available as `users` and `pools`. Third-party reward tokens are given
+    a column in `extra_tokens`, as `(pool, token)` pairs.
+
+    Arguments
+    ---------
+    ddd_earn_ratio : int
+        `LpDepositor.DDD_EARN_RATIO`
+    """
+
+    def __init__(self, ddd_earn_ratio):
+        self.ddd_earn_ratio = ddd_earn_ratio
+        self.users = []
+        self.pools = []
+        self.extra_tokens = []
+        self._user_index = {}
+        self._pool_index = {}
+        # pool -> extra reward columns, in the same order as `LpDepositor.extraRewards`
+        self._extra_columns = {}
+        self.pending_fee_epx = 0
+
+        # per pool
+        self._total_balances = _zeros(0)
+        self._integral_epx = _zeros(0)
+        self._integral_ddd = _zeros(0)
+        # users x pools
+        self._balances = _zeros(0, 0)
+        self._integral_for_epx = _zeros(0, 0)
+        self._integral_for_ddd = _zeros(0, 0)
+        self._unclaimed_epx = _zeros(0, 0)
+        self._unclaimed_ddd = _zeros(0, 0)
+        # per extra reward column
+        self._extra_pools = np.zeros(0, dtype=np.int64)
+        self._extra_integral = _zeros(0)
+        # users x extra reward columns
+        self._extra_integral_for = _zeros(0, 0)
+        self._unclaimed_extra = _zeros(0, 0)
+
+    @property
+    def total_balances(self):
+        return self._total_balances[: len(self.pools)]
+
+    @property
+    def balances(self):
+        return self._balances[: len(self.users), : len(self.pools)]
+
+    def _user(self, address):
+        if address not in self._user_index:
+            self._user_index[address] = len(self.users)
+            self.users.append(address)
+            rows = len(self.users)
+            for name in (
+                "_balances",
+                "_integral_for_epx",
+                "_integral_for_ddd",
+                "_unclaimed_epx",
+                "_unclaimed_ddd",
+            ):
+                setattr(self, name, _grow(getattr(self, name), (rows, len(self.pools))))
+            for name in ("_extra_integral_for", "_unclaimed_extra"):
+                setattr(self, name, _grow(getattr(self, name), (rows, len(self.extra_tokens))))
+        return self._user_index[address]
+
+    def _pool(self, address):
+        if address not in self._pool_index:
+            self._pool_index[address] = len(self.pools)
+            self.pools.append(address)
+            self._extra_columns[address] = []
+            cols = len(self.pools)
+            for name in ("_total_balances", "_integral_epx", "_integral_ddd"):
+                setattr(self, name, _grow(getattr(self, name), (cols,)))
+            for name in (
+                "_balances",
+                "_integral_for_epx",
+                "_integral_for_ddd",
+                "_unclaimed_epx",
+                "_unclaimed_ddd",
+            ):
+                setattr(self, name, _grow(getattr(self, name), (len(self.users), cols)))
+        return self._pool_index[address]
+
+    def extra_rewards(self, pool):
+        """Third-party reward tokens for `pool`, as in `LpDepositor.extraRewards`."""
+        return [self.extra_tokens[i][1] for i in self._extra_columns.get(pool, [])]
+
+    def update_pool_extra_rewards(self, pool, rewards):
+        """Mirrors `updatePoolExtraRewards`, given the pool's full list of reward tokens."""
+        p = self._pool(pool)
+        columns = self._extra_columns[pool]
+        for token in rewards[len(columns):]:
+            columns.append(len(self.extra_tokens))
+            self.extra_tokens.append((pool, token))
+        cols = len(self.extra_tokens)
+        self._extra_pools = np.resize(self._extra_pools, max(cols, len(self._extra_pools)))
+        self._extra_pools[columns] = p
+        self._extra_integral = _grow(self._extra_integral, (cols,))
+        for name in ("_extra_integral_for", "_unclaimed_extra"):
+            setattr(self, name, _grow(getattr(self, name), (len(self.users), cols)))
+
+    def deposit(self, user, pool, amount, reward=0, extras=None):
+        u, p = self._user(user), self._pool(pool)
+        balance, total = self._balances[u, p], self._total_balances[p]
+        self._update_integrals(u, p, balance, total, reward, extras)
+        self._balances[u, p] = balance + amount
+        self._total_balances[p] = total + amount
+
+    def withdraw(self, user, pool, amount, reward=0, extras=None):
+        u, p = self._user(user), self._pool(pool)
+        balance, total = self._balances[u, p], self._total_balances[p]
+        if balance < amount:
+            raise ValueError("Insufficient balance")
+        self._balances[u, p] = balance - amount
+        self._total_balances[p] = total - amount
+        self._update_integrals(u, p, balance, total, reward, extras)
+
+    def transfer_deposit(self, pool, sender, receiver, amount, reward=0, extras=None):
+        p = self._pool(pool)
+        total = self._total_balances[p]
+        u = self._user(sender)
+        balance = self._balances[u, p]
+        if balance < amount:
+            raise ValueError("Insufficient balance")
+        self._update_integrals(u, p, balance, total, reward, extras)
+        self._balances[u, p] = balance - amount
+
+        u = self._user(receiver)
+        balance = self._balances[u, p]
+        self._update_integrals(u, p, balance, total - amount, 0, None)
+        self._balances[u, p] = balance + amount
+
+    def claim(self, user, pools, rewards=None, extras=None):
+        """
+        Mirrors `claim` and `claimFor` for a single user. `rewards` and `extras`
+        give the EPX and third-party rewards harvested for each pool, or zero if
+        the pool was already harvested earlier in the same call.
+
+        Returns the claimed `(epx, ddd)`, before any bond multiplier.
+        """
+        rewards = rewards or [0] * len(pools)
+        extras = extras or [None] * len(pools)
+        u = self._user(user)
+        epx = ddd = 0
+        for pool, reward, extra in zip(pools, rewards, extras):
+            p = self._pool(pool)
+            self._update_integrals(u, p, self._balances[u, p], self._total_balances[p], reward, extra)
+            epx += self._unclaimed_epx[u, p]
+            ddd += self._unclaimed_ddd[u, p]
+            self._unclaimed_epx[u, p] = 0
+            self._unclaimed_ddd[u, p] = 0
+        return epx, ddd
+
+    def claim_extra_rewards(self, user, pool, extras=None):
+        """Mirrors `claimExtraRewards`. Returns `{token: amount}` of claimed rewards."""
+        u, p = self._user(user), self._pool(pool)
+        total = self._total_balances[p]
+        if total > 0:
+            self._update_extra_integrals(u, p, pool, self._balances[u, p], total, extras)
+        claimed = {}
+        for i in self._extra_columns[pool]:
+            if self._unclaimed_extra[u, i] > 0:
+                claimed[self.extra_tokens[i][1]] = self._unclaimed_extra[u, i]
+                self._unclaimed_extra[u, i] = 0
+        return claimed
+
+    def _update_integrals(self, u, p, balance, total, reward, extras):
+        if reward > 0:
+            fee = reward * FEE_PERCENT // 100
+            reward -= fee
+            self.pending_fee_epx += fee
+            self._integral_epx[p] += PRECISION * reward // total
+            self._integral_ddd[p] += PRECISION * (reward // self.ddd_earn_ratio) // total
+
+        integral_epx, integral_ddd = self._integral_epx[p], self._integral_ddd[p]
+        if self._integral_for_epx[u, p] < integral_epx:
+            self._unclaimed_epx[u, p] += balance * (integral_epx - self._integral_for_epx[u, p]) // PRECISION
+            self._unclaimed_ddd[u, p] += balance * (integral_ddd - self._integral_for_ddd[u, p]) // PRECISION
+            self._integral_for_epx[u, p] = integral_epx
+            self._integral_for_ddd[u, p] = integral_ddd
+
+        pool = self.pools[p]
+        if total > 0 and self._extra_columns[pool]:
+            self._update_extra_integrals(u, p, pool, balance, total, extras)
+
+    def _update_extra_integrals(self, u, p, pool, balance, total, extras):
+        extras = extras or {}
+        for i in self._extra_columns[pool]:
+            delta = extras.get(self.extra_tokens[i][1], 0)
+            if delta > 0:
+                self._extra_integral[i] += PRECISION * delta // total
+            integral = self._extra_integral[i]
+            if self._extra_integral_for[u, i] < integral:
+                self._unclaimed_extra[u, i] += balance * (integral - self._extra_integral_for[u, i]) // PRECISION
+                self._extra_integral_for[u, i] = integral
+
+    def claimable(self, pending=None):
+        """
+        Claimable EPX and DDD for every user and pool, as in `LpDepositor.claimable`.
+
+        Arguments
+        ---------
+        pending : list, optional
+            EPX claimable by the proxy for each pool in `pools`, as returned by
+            `lpStaker.claimableReward(proxy, pools)`
+
+        Returns
+        -------
+        (epx, ddd) : users x pools arrays
+        """
+        n_users, n_pools = len(self.users), len(self.pools)
+        integral_epx = self._integral_epx[:n_pools].copy()
+        integral_ddd = self._integral_ddd[:n_pools].copy()
+        if pending is not None:
+            reward = np.array([int(i) for i in pending], dtype=object)
+            reward -= reward * FEE_PERCENT // 100
+            total = self.total_balances
+            active = np.nonzero(total)[0]
+            integral_epx[active] += PRECISION * reward[active] // total[active]
+            integral_ddd[active] += PRECISION * (reward[active] // self.ddd_earn_ratio) // total[active]
+
+        epx = self._unclaimed_epx[:n_users, :n_pools].copy()
+        ddd = self._unclaimed_ddd[:n_users, :n_pools].copy()
+
+        # only positions with a balance can have earned since they were last updated
+        rows, cols = np.nonzero(self.balances)
+        integral_for_epx = self._integral_for_epx[rows, cols]
+        earning = integral_for_epx < integral_epx[cols]
+        rows, cols, integral_for_epx = rows[earning], cols[earning], integral_for_epx[earning]
+        balance = self._balances[rows, cols]
+        epx[rows, cols] += balance * (integral_epx[cols] - integral_for_epx) // PRECISION
+        ddd[rows, cols] += balance * (integral_ddd[cols] - self._integral_for_ddd[rows, cols]) // PRECISION
+        return epx, ddd
+
+    def claimable_extra_rewards(self, earned=None):
+        """
+        Claimable third-party rewards for every user, as in `LpDepositor.claimableExtraRewards`.
+
+        Arguments
+        ---------
+        earned : list, optional
+            Rewards earned by the proxy for each `(pool, token)` in `extra_tokens`,
+            as returned by `IRewardsToken(pool).earned(proxy, token)`
+
+        Returns
+        -------
+        users x extra reward columns array
+        """
+        n_users, n_extra = len(self.users), len(self.extra_tokens)
+        amounts = self._unclaimed_extra[:n_users, :n_extra].copy()
+        pools = self._extra_pools[:n_extra]
+
+        # the view only adds pending rewards for users with a balance, which
+        # guarantees the pool's total balance is non-zero
+        rows, cols = np.nonzero(self._balances[:n_users, pools])
+        integral = self._extra_integral[:n_extra].copy()
+        if earned is not None:
+            earned = np.array([int(i) for i in earned], dtype=object)
+            total = self._total_balances[pools]
+            active = np.nonzero(total)[0]
+            integral[active] += PRECISION * earned[active] // total[active]
+        balance = self._balances[rows, pools[cols]]
+        amounts[rows, cols] += balance * (integral[cols] - self._extra_integral_for[rows, cols]) // PRECISION
+        return amounts
+
+
+class LogReplay:
+    """
+    Applies `LpDepositor` logs to a `RewardModel`.
+
+    Logs must be given in the order they were emitted and include, alongside the
+    logs of `LpDepositor`, the `lpStaker` events emitted for the proxy and every
+    token transfer into `LpDepositor`.
+
+    The EPX harvested by an action is taken from the `lpStaker` claim event, or
+    from the EPX transferred to `LpDepositor` following a proxy deposit or
+    withdrawal. Third-party rewards are the amounts the proxy transfers to
+    `LpDepositor`, and are credited to the pool most recently harvested within
+    the same call.
+    """
+
+    def __init__(self, model, lp_depositor, lp_staker, proxy, epx):
+        self.model = model
+        self.lp_depositor = web3.toChecksumAddress(lp_depositor.address)
+        self.proxy = web3.toChecksumAddress(proxy)
+        self.epx = web3.toChecksumAddress(epx)
+        self.decoder = EventDecoder(
+            {
+                "LpDepositor": (lp_depositor.address, lp_depositor.abi),
+                "LpStaking": (lp_staker, LP_STAKING_EVENTS),
+            }
+        )
+        self._reset()
+
+    def _reset(self):
+        # rewards harvested within the current call: [pool, epx, extras, is_claim]
+        self._harvests = []
+        self._epx = 0
+        self._extras = Counter()
+
+    def _take(self, pool):
+        for i, harvest in enumerate(self._harvests):
+            if harvest[0] == pool:
+                del self._harvests[i]
+                return harvest[1], harvest[2]
+        return 0, None
+
+    def apply(self, logs):
+        tx_hash = None
+        for log in logs:
+            if _hex(log["transactionHash"]) != tx_hash:
+                tx_hash = _hex(log["transactionHash"])
+                self._reset()
+            topics = [_hex(i) for i in log["topics"]]
+            if len(topics) == 3 and topics[0] == TRANSFER_TOPIC:
+                if _topic_address(topics[2]) == self.lp_depositor:
+                    self._transfer(log, topics)
+                continue
+            event = self.decoder.decode(log)
+            if event is None:
+                continue
+            if event["contract"] == "LpStaking":
+                self._lp_staking_event(event["event"], event["args"])
+            else:
+                self._lp_depositor_event(event["event"], event["args"])
+
+    def _transfer(self, log, topics):
+        token = web3.toChecksumAddress(log["address"])
+        amount = int.from_bytes(HexBytes(log["data"]), "big")
+        if token == self.epx:
+            if self._harvests and not self._harvests[-1][3]:
+                self._harvests[-1][1] += amount
+            else:
+                self._epx += amount
+        elif _topic_address(topics[1]) == self.proxy:
+            if self._harvests and token in self.model.extra_rewards(self._harvests[-1][0]):
+                self._harvests[-1][2][token] += amount
+            else:
+                self._extras[token] += amount
+
+    def _lp_staking_event(self, name, args):
+        if name == "Claimed":
+            if web3.toChecksumAddress(args["caller"]) != self.proxy:
+                return
+            # the EPX transfer for a claim is emitted before the claim event
+            pool = web3.toChecksumAddress(args["tokens"][0])
+            self._harvests.append([pool, int(args["amount"]), Counter(), True])
+            self._epx = 0
+        elif args["user"] == self.proxy:
+            self._harvests.append([args["token"], self._epx, Counter(), False])
+            self._epx = 0
+
+    def _lp_depositor_event(self, name, args):
+        model = self.model
+        if name == "ExtraRewardsUpdated":
+            model.update_pool_extra_rewards(args["token"], [web3.toChecksumAddress(i) for i in args["rewards"]])
+            return
+
+        if name == "Deposit":
+            model.deposit(args["receiver"], args["token"], int(args["amount"]), *self._take(args["token"]))
+        elif name == "Withdraw":
+            model.withdraw(args["caller"], args["token"], int(args["amount"]), *self._take(args["token"]))
+        elif name == "TransferDeposit":
+            model.transfer_deposit(
+                args["token"], args["from"], args["to"], int(args["amount"]), *self._take(args["token"])
+            )
+        elif name in ("Claimed", "ClaimedFor"):
+            user = args["caller"] if name == "Claimed" else args["user"]
+            pools = [web3.toChecksumAddress(i) for i in args["tokens"]]
+            harvests = [self._take(pool) for pool in pools]
+            model.claim(user, pools, [i[0] for i in harvests], [i[1] for i in harvests])
+        elif name in ("ClaimedExtraRewards", "ClaimedExtraRewardsFor"):
+            user = args["caller"] if name == "ClaimedExtraRewards" else args["user"]
+            model.claim_extra_rewards(user, args["token"], self._extras)
+        else:
+            return
+        self._reset()
+
+
+def _topic_address(topic):
+    return web3.toChecksumAddress("0x" + topic[-40:])
+
+
+def _topic(address):
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+def fetch_logs(lp_depositor, lp_staker, proxy, start_block, to_block):
+    """Fetch all logs needed to replay `LpDepositor`, in the order they were emitted."""
+    filters = [
+        {"address": lp_depositor.address},
+        {"address": lp_staker, "topics": [None, _topic(proxy)]},
+        {"topics": [TRANSFER_TOPIC, None, _topic(lp_depositor.address)]},
+    ]
+    logs = []
+    for start in range(start_block, to_block + 1, LOG_BLOCK_RANGE):
+        end = min(start + LOG_BLOCK_RANGE - 1, to_block)
+        for log_filter in filters:
+            logs += web3.eth.get_logs({**log_filter, "fromBlock": start, "toBlock": end})
+    return sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+
+def build_model(lp_depositor, start_block, to_block=None):
+    """Replay `LpDepositor` from `start_block` (its deployment block) to `to_block`."""
+    if to_block is None:
+        to_block = web3.eth.block_number
+    lp_staker, proxy = lp_depositor.lpStaker(), lp_depositor.proxy()
+    model = RewardModel(lp_depositor.DDD_EARN_RATIO())
+    replay = LogReplay(model, lp_depositor, lp_staker, proxy, lp_depositor.EPX())
+    replay.apply(fetch_logs(lp_depositor, lp_staker, proxy, start_block, to_block))
+    return model
+
+
+def pending_rewards(model, lp_depositor):
+    """
+    Rewards that are pending for the proxy, as used by the `LpDepositor` views.
+
+    Returns `(pending, earned)`, for use with `RewardModel.claimable` and
+    `RewardModel.claimable_extra_rewards`.
+    """
+    from brownie import interface
+
+    proxy = lp_depositor.proxy()
+    pending = []
+    if model.pools:
+        pending = interface.IEllipsisLpStaking(lp_depositor.lpStaker()).claimableReward(proxy, model.pools)
+    earned = [interface.IRewardsToken(pool).earned(proxy, token) for pool, token in model.extra_tokens]
+    return pending, earned
+
+
+def export(start_block, path=DEFAULT_OUTPUT_PATH):
+    from brownie import LpDepositor
+
+    from scripts.indexer import load_deployments
+
+    lp_depositor = LpDepositor.at(load_deployments()["LpDepositor"][0])
+    model = build_model(lp_depositor, int(start_block))
+    pending, earned = pending_rewards(model, lp_depositor)
+    epx, ddd = model.claimable(pending)
+    extras = model.claimable_extra_rewards(earned)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["user", "pool", "token", "amount"])
+        for u, p in zip(*np.nonzero(epx + ddd)):
+            writer.writerow([model.users[u], model.pools[p], "EPX", epx[u, p]])
+            writer.writerow([model.users[u], model.pools[p], "DDD", ddd[u, p]])
+        for u, i in zip(*np.nonzero(extras)):
+            pool, token = model.extra_tokens[i]
+            writer.writerow([model.users[u], pool, token, extras[u, i]])
+    print(f"Claimable rewards for {len(model.users)} users in {len(model.pools)} pools written to {path}")
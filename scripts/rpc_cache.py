@@ -0,0 +1,273 @@
+"""
+Caching JSON-RPC proxy for forked test runs.
+
+Ganache forks read every storage slot, code hash and block header they touch from
+the upstream node. All of these reads are made against a fixed fork block, so the
+responses never change and can be stored locally. This module runs a small HTTP
+proxy between ganache and the upstream node that stores each response in a
+content-addressed directory, keyed by the hash of the request method and params
+(which include the block number). Once warm, a forked run makes no upstream
+requests at all.
+
+Used by the test suite via `brownie test --rpc-cache <directory>`. It can also be
+run standalone, e.g. for use with `brownie console`:
+
+    python scripts/rpc_cache.py <upstream url> <cache directory> [--port 8549]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+# methods whose result never changes
+CONSTANT_METHODS = {"eth_chainId", "net_version"}
+
+# methods where the result is fixed once the block tag is a number,
+# mapped to the index of the block tag within the params
+BLOCK_METHODS = {
+    "eth_call": 1,
+    "eth_getBalance": 1,
+    "eth_getBlockByNumber": 0,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getTransactionCount": 1,
+}
+
+# methods keyed by a hash, which may only be cached once a result exists
+HASH_METHODS = {
+    "eth_getBlockByHash",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+}
+
+FORK_BLOCK_FILE = "fork-block"
+
+
+def is_cacheable(method, params):
+    """Check if the response to a request is immutable and may be cached."""
+    if method in CONSTANT_METHODS or method in HASH_METHODS:
+        return True
+    if method in BLOCK_METHODS:
+        idx = BLOCK_METHODS[method]
+        if len(params) <= idx:
+            return False
+        tag = params[idx]
+        if isinstance(tag, dict):
+            # EIP-1898 block parameter
+            tag = tag.get("blockNumber") or tag.get("blockHash")
+        return isinstance(tag, str) and tag.startswith("0x")
+    return False
+
+
+def request_key(method, params):
+    """Content address for a request, as a hex string."""
+    data = json.dumps([method, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class RpcCache:
+    """
+    Content-addressed store of JSON-RPC results.
+
+    Each result is stored as `<root>/<key[:2]>/<key>.json`, where `key` is the
+    sha256 of the request method and params.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.root.joinpath(key[:2], f"{key}.json")
+
+    def get(self, method, params):
+        path = self._path(request_key(method, params))
+        try:
+            with path.open() as fp:
+                result = json.load(fp)["result"]
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def set(self, method, params, result):
+        path = self._path(request_key(method, params))
+        path.parent.mkdir(exist_ok=True)
+        # write to a temporary file first, so concurrent readers never see a partial entry
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w") as fp:
+            json.dump({"method": method, "params": params, "result": result}, fp)
+        os.replace(tmp, path)
+
+    def get_fork_block(self):
+        path = self.root.joinpath(FORK_BLOCK_FILE)
+        if path.exists():
+            return int(path.read_text())
+        return None
+
+    def set_fork_block(self, block):
+        self.root.joinpath(FORK_BLOCK_FILE).write_text(str(block))
+
+
+class RpcCacheProxy:
+    """
+    HTTP JSON-RPC proxy that serves cacheable requests from an `RpcCache`.
+
+    Arguments
+    ---------
+    upstream : str
+        URL of the upstream node
+    cache : RpcCache
+        Cache to read from and write to
+    fork_block : int, optional
+        If given, `eth_blockNumber` is answered locally with this value so that
+        a fork pinned to this block never needs to contact the upstream node.
+    """
+
+    def __init__(self, upstream, cache, fork_block=None, host="127.0.0.1", port=0):
+        self.upstream = upstream
+        self.cache = cache
+        self.fork_block = fork_block
+        self._local = threading.local()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _forward(self, payload):
+        response = self._session().post(self.upstream, json=payload, timeout=120)
+        response.raise_for_status()
+        return response.json()
+
+    def handle(self, request):
+        """Handle a single JSON-RPC request dict, returning the response dict."""
+        method = request.get("method")
+        params = request.get("params", [])
+        rpc_id = request.get("id")
+
+        if method == "eth_blockNumber" and self.fork_block is not None:
+            return {"jsonrpc": "2.0", "id": rpc_id, "result": hex(self.fork_block)}
+
+        cacheable = is_cacheable(method, params)
+        if cacheable:
+            result = self.cache.get(method, params)
+            if result is not None:
+                return {"jsonrpc": "2.0", "id": rpc_id, "result": result}
+
+        try:
+            response = self._forward(request)
+        except requests.RequestException as exc:
+            return {
+                "jsonrpc": "2.0",
+                "id": rpc_id,
+                "error": {"code": -32000, "message": f"rpc-cache: upstream unavailable ({exc})"},
+            }
+        if cacheable and response.get("result") is not None and "error" not in response:
+            self.cache.set(method, params, response["result"])
+        return response
+
+    def _make_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                payload = json.loads(body)
+                if isinstance(payload, list):
+                    response = [proxy.handle(i) for i in payload]
+                else:
+                    response = proxy.handle(payload)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def split_fork_url(fork):
+    """Split a ganache fork string of the form `url[@block]`."""
+    url, sep, block = fork.rpartition("@")
+    if sep and block.isdigit():
+        return url, int(block)
+    return fork, None
+
+
+def start_proxy(fork, cache_dir, port=0):
+    """
+    Start a caching proxy for the ganache fork string `fork`.
+
+    The fork block is taken from `fork` if it is pinned. Otherwise the block used
+    by the first run is stored in the cache directory and reused on later runs,
+    so that cached results remain valid. Delete the `fork-block` file within the
+    cache directory to move to a newer block.
+
+    Returns the running proxy and the fork string to give to ganache.
+    """
+    upstream, block = split_fork_url(fork)
+    cache = RpcCache(cache_dir)
+    if block is None:
+        block = cache.get_fork_block()
+    if block is None:
+        response = requests.post(
+            upstream, json={"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []}
+        )
+        block = int(response.json()["result"], 16)
+    cache.set_fork_block(block)
+
+    proxy = RpcCacheProxy(upstream, cache, fork_block=block, port=port).start()
+    return proxy, f"{proxy.url}@{block}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("upstream", help="upstream node url, optionally pinned as url@block")
+    parser.add_argument("cache_dir", help="directory to store cached results in")
+    parser.add_argument("--port", type=int, default=8549)
+    args = parser.parse_args()
+
+    proxy, fork = start_proxy(args.upstream, args.cache_dir, args.port)
+    print(f"Caching proxy running, fork from: {fork}")
+    try:
+        proxy._thread.join()
+    except KeyboardInterrupt:
+        proxy.stop()
+        print(f"Cache hits: {proxy.cache.hits}, misses: {proxy.cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
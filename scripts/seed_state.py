@@ -0,0 +1,448 @@
+"""
+Seed a development chain with a large synthetic population via direct storage writes.
+
+Building production-sized state (tens of thousands of LPs, thousands of lockers and
+years of weekly history) by sending transactions takes hours. This module instead
+computes the storage slots of the per-user mappings in `LpDepositor`, `TokenLocker`,
+`DotDotVoting` and `BondedFeeDistributor` and writes the synthetic state straight
+into the node with `evm_setAccountStorageAt` (ganache), `hardhat_setStorageAt` or
+`anvil_setStorageAt`, in batched JSON-RPC requests.
+
+The seeded state is kept consistent with the rest of the system:
+
+* The tokens backing the population are moved with real transactions from a funding
+  account: LP tokens are deposited into `LpDepositor` (and so staked in Ellipsis)
+  and then redistributed, DDD is sent to `TokenLocker` and dEPX to
+  `BondedFeeDistributor`.
+* Totals are written as deltas on top of the existing values, so sums such as
+  `totalBalances`, `weeklyTotalWeight`, `tokenVotes` and `totalBalance` still equal
+  the sum over all users, including those created by real transactions.
+* Seeded LPs start at the current reward integral, so they have nothing to claim
+  until the next harvest. Seeded votes are only made in weeks that have already
+  passed, and never exceed the lock weight of the voter in that week.
+
+No events are emitted for seeded state, so it is invisible to the event indexer and
+the log-based reward replay. LP and bonding positions may only be seeded for
+accounts without an existing position in the same contract.
+
+Usage:
+
+    brownie test tests/benchmarks/test_gas_seeded.py --seeded-state
+"""
+
+import numpy as np
+import requests
+from brownie import web3
+from eth_utils import keccak, to_checksum_address
+
+from scripts.storage import RPC_BATCH_SIZE, array_slot, batch_request, nested_slot, read_storage
+
+WEEK = 604800
+
+# storage slots in `LpDepositor`
+USER_BALANCES_SLOT = 13
+TOTAL_BALANCES_SLOT = 14
+REWARD_INTEGRAL_SLOT = 15
+REWARD_INTEGRAL_FOR_SLOT = 16
+
+# storage slots in `TokenLocker`, `weeklyTotalWeight` packs two weeks per slot
+WEEKLY_TOTAL_WEIGHT_SLOT = 1
+WEEKLY_LOCK_DATA_SLOT = 32769
+
+# storage slots in `DotDotVoting`
+USER_VOTES_SLOT = 1
+USER_TOKEN_VOTES_SLOT = 2
+TOKEN_VOTES_SLOT = 3
+
+# storage slots in `BondedFeeDistributor`
+WEEKLY_USER_BALANCE_SLOT = 3
+TOTAL_BALANCE_SLOT = 4
+USER_DEPOSITS_SLOT = 5
+TOKEN_BALANCE_SLOT = 9
+
+# storage write methods of each development node, in the order they are tried
+SET_STORAGE_METHODS = ("evm_setAccountStorageAt", "hardhat_setStorageAt", "anvil_setStorageAt")
+
+
+def _word(value):
+    return "0x" + value.to_bytes(32, "big").hex()
+
+
+class StorageWriter:
+    """
+    Batched storage writes to a development node.
+
+    Writes are collected with `set` and `add` and sent in batched JSON-RPC requests
+    when calling `flush`. Values given to `add` are applied on top of the value in
+    the node at the time of the flush, so that existing state is preserved.
+
+    Arguments
+    ---------
+    batch_size : int, optional
+        Number of requests sent in a single JSON-RPC batch
+    """
+
+    def __init__(self, batch_size=RPC_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.method = None
+        self._session = requests.Session()
+        self._values = {}
+        self._deltas = {}
+
+    def _request(self, calls):
+        return batch_request(calls, self.batch_size, self._session)
+
+    def _set_storage_call(self, method, address, slot, value):
+        if method == "evm_setAccountStorageAt":
+            return method, [address, _word(slot), _word(value)]
+        return method, [address, hex(slot), _word(value)]
+
+    def _detect_method(self, address, slot, value):
+        for method in SET_STORAGE_METHODS:
+            response = self._request([self._set_storage_call(method, address, slot, value)])[0]
+            if "error" not in response:
+                return method
+        raise ValueError("Connected node does not support writing to storage")
+
+    def read(self, address, slots):
+        """
+        Read `slots` of `address` at the latest block, including pending writes.
+        """
+        values = read_storage([(address, slot) for slot in slots], batch_size=self.batch_size)
+        return [
+            self._values.get((address, slot), value) + self._deltas.get((address, slot), 0)
+            for slot, value in zip(slots, values)
+        ]
+
+    def set(self, address, slot, value):
+        """Set a storage slot, replacing any earlier write to the same slot."""
+        self._values[(address, slot)] = value
+        self._deltas.pop((address, slot), None)
+
+    def add(self, address, slot, amount, empty=False):
+        """
+        Add `amount` to the value of a storage slot. If `empty` is True the slot is
+        known to be unset, and is not read from the node.
+        """
+        key = (address, slot)
+        if empty:
+            self._values.setdefault(key, 0)
+        self._deltas[key] = self._deltas.get(key, 0) + amount
+
+    def flush(self):
+        """Send all pending writes to the node."""
+        pending = [k for k in self._deltas if k not in self._values]
+        self._values.update(zip(pending, read_storage(pending, batch_size=self.batch_size)))
+
+        writes = []
+        for key, value in self._values.items():
+            value += self._deltas.get(key, 0)
+            if not 0 <= value < 2**256:
+                raise ValueError(f"Storage write out of range at {key[0]} slot {hex(key[1])}")
+            writes.append((*key, value))
+        self._values.clear()
+        self._deltas.clear()
+        if not writes:
+            return
+
+        if self.method is None:
+            self.method = self._detect_method(*writes[0])
+        calls = [self._set_storage_call(self.method, *i) for i in writes]
+        for response in self._request(calls):
+            if "error" in response:
+                raise ValueError(f"{self.method} failed: {response['error']}")
+
+
+def synthetic_users(count, salt=0):
+    """Generate `count` deterministic addresses without known private keys."""
+    prefix = b"dotdot-seed" + salt.to_bytes(32, "big")
+    return [to_checksum_address(keccak(prefix + i.to_bytes(32, "big"))[-20:]) for i in range(count)]
+
+
+class Population:
+    """
+    Synthetic users and their positions.
+
+    Amounts are whole tokens, drawn from a log-normal distribution. Ages are given
+    in weeks before the current week, and are converted to absolute weeks of each
+    contract when seeding. The first `lps` users hold LP deposits, the first
+    `lockers` users hold DDD locks and vote, and the first `bonders` users bond
+    dEPX, so that larger positions overlap as they do in practice.
+
+    Arguments
+    ---------
+    pools : list
+        LP tokens to deposit
+    lps : int
+        Number of users with LP deposits
+    lockers : int
+        Number of users with DDD locks
+    bonders : int
+        Number of users with bonded dEPX
+    weeks : int
+        Number of weeks of history to generate
+    users : list, optional
+        Addresses to use for the first users, e.g. test accounts. The remaining
+        users are filled with `synthetic_users`.
+    seed : int, optional
+        Random seed
+    max_lock_weeks : int, optional
+        Maximum lock duration of `TokenLocker`
+    max_locks : int, optional
+        Maximum number of locks created by each locker
+    vote_participation : float, optional
+        Probability that a locker votes in any week with an active lock weight
+    """
+
+    def __init__(
+        self,
+        pools,
+        lps,
+        lockers,
+        bonders,
+        weeks,
+        users=None,
+        seed=0,
+        max_lock_weeks=52,
+        max_locks=4,
+        vote_participation=0.5,
+    ):
+        rng = np.random.default_rng(seed)
+        users = [str(i) for i in users or []][: max(lps, lockers, bonders)]
+        count = max(lps, lockers, bonders) - len(users)
+        self.users = users + synthetic_users(count, seed)
+        # synthetic users are known to have no existing state
+        self.synthetic = np.array([False] * len(users) + [True] * count)
+        self.pools = [str(i) for i in pools]
+        self.weeks = weeks
+        self.max_lock_weeks = max_lock_weeks
+
+        # LP deposits, one pool per user
+        self.lp_pools = rng.integers(0, len(pools), lps)
+        self.lp_amounts = _token_amounts(rng, lps)
+
+        # DDD locks, each locker may create several locks over time
+        per_user = rng.integers(1, max_locks + 1, lockers)
+        self.lock_owners = np.repeat(np.arange(lockers), per_user)
+        self.lock_amounts = _token_amounts(rng, len(self.lock_owners))
+        self.lock_weeks = rng.integers(1, max_lock_weeks + 1, len(self.lock_owners))
+        self.lock_ages = rng.integers(0, weeks + 1, len(self.lock_owners))
+
+        # each locker votes for a single pool, with a fixed share of their weight
+        self.vote_pools = rng.integers(0, len(pools), lockers)
+        self.vote_shares = rng.uniform(0.1, 1, lockers)
+        self.vote_mask = rng.random((lockers, weeks + max_lock_weeks + 1)) < vote_participation
+
+        # bonded dEPX, one deposit per user
+        self.bond_amounts = _token_amounts(rng, bonders)
+        self.bond_ages = rng.integers(0, weeks + 1, bonders)
+
+    def lp_totals(self):
+        """Total LP tokens deposited for each pool, in wei."""
+        totals = np.bincount(self.lp_pools, weights=self.lp_amounts, minlength=len(self.pools))
+        return {pool: int(totals[i]) * 10**18 for i, pool in enumerate(self.pools)}
+
+    def lock_total(self):
+        """Total DDD held in locks, in wei."""
+        return int(self.lock_amounts.sum()) * 10**18
+
+    def bond_total(self):
+        """Total bonded dEPX, in wei."""
+        return int(self.bond_amounts.sum()) * 10**18
+
+
+def _token_amounts(rng, count, median=1000):
+    return np.maximum(rng.lognormal(np.log(median), 1.5, count), 1).astype(np.int64)
+
+
+def seed_deposits(writer, lp_depositor, population, funder):
+    """
+    Seed LP deposits into `LpDepositor`.
+
+    The total for each pool is deposited by `funder`, which must hold the LP
+    tokens, and the balance is then moved to the seeded users.
+    """
+    from brownie import interface
+
+    address = lp_depositor.address
+    users = population.users[: len(population.lp_amounts)]
+    balance_slots = [
+        nested_slot(USER_BALANCES_SLOT, user, population.pools[p]) for user, p in zip(users, population.lp_pools)
+    ]
+    existing = [slot for slot, synthetic in zip(balance_slots, population.synthetic) if not synthetic]
+    if any(writer.read(address, existing)):
+        raise ValueError("Cannot seed LP deposits for users with an existing deposit")
+
+    for pool, total in population.lp_totals().items():
+        if total == 0:
+            continue
+        interface.IERC20(pool).approve(lp_depositor, total, {"from": funder})
+        lp_depositor.deposit(funder, pool, total, {"from": funder})
+        writer.add(address, nested_slot(USER_BALANCES_SLOT, str(funder), pool), -total)
+
+    integrals = {}
+    for pool in population.pools:
+        integrals[pool] = writer.read(address, [nested_slot(REWARD_INTEGRAL_SLOT, pool) + i for i in range(2)])
+
+    for user, p, amount, slot in zip(users, population.lp_pools, population.lp_amounts, balance_slots):
+        pool = population.pools[p]
+        writer.set(address, slot, int(amount) * 10**18)
+        integral_slot = nested_slot(REWARD_INTEGRAL_FOR_SLOT, user, pool)
+        for i, value in enumerate(integrals[pool]):
+            writer.set(address, integral_slot + i, value)
+
+
+def lock_weights(population, current_week):
+    """
+    Build the lock weights and unlocks of each locker, in whole tokens.
+
+    Returns `(first_week, weights, unlocks)` where `weights` and `unlocks` are
+    lockers x weeks matrices, and column 0 is `first_week`.
+    """
+    starts = np.maximum(current_week - population.lock_ages, 0)
+    first_week = int(starts.min(initial=current_week))
+    length = current_week - first_week + population.max_lock_weeks + 1
+    lockers = len(population.vote_pools)
+    weights = np.zeros((lockers, length), dtype=np.int64)
+    unlocks = np.zeros((lockers, length), dtype=np.int64)
+
+    for owner, amount, start, weeks in zip(
+        population.lock_owners, population.lock_amounts, starts - first_week, population.lock_weeks
+    ):
+        # `TokenLocker._increaseAmount`: weight decays by `amount` each week until the unlock
+        weights[owner, start : start + weeks] += amount * np.arange(weeks, 0, -1)
+        unlocks[owner, start + weeks] += amount
+    return first_week, weights, unlocks
+
+
+def seed_locks(writer, locker, population, funder):
+    """
+    Seed DDD locks into `TokenLocker`.
+
+    The locked DDD is sent to the locker by `funder`. Expired locks are left in
+    place, to be withdrawn through an exit stream.
+
+    Returns `(first_week, weights)` as given by `lock_weights`.
+    """
+    from brownie import interface
+
+    address = locker.address
+    if population.lock_weeks.max(initial=0) > locker.MAX_LOCK_WEEKS():
+        raise ValueError("Population has locks longer than MAX_LOCK_WEEKS")
+    first_week, weights, unlocks = lock_weights(population, locker.getWeek())
+
+    interface.IERC20(locker.DDD()).transfer(locker, population.lock_total(), {"from": funder})
+
+    for i, user in enumerate(population.users[: len(weights)]):
+        base = nested_slot(WEEKLY_LOCK_DATA_SLOT, user) + first_week
+        # `LockData` packs the weight in the low and the unlock in the high 128 bits
+        for week in np.flatnonzero(weights[i] | unlocks[i]):
+            value = (int(unlocks[i, week]) << 128) + int(weights[i, week])
+            writer.add(address, base + int(week), value * 10**18, population.synthetic[i])
+
+    for week, total in enumerate(weights.sum(axis=0), first_week):
+        if total:
+            writer.add(address, WEEKLY_TOTAL_WEIGHT_SLOT + week // 2, int(total) * 10**18 << (week % 2 * 128))
+    return first_week, weights
+
+
+def seed_votes(writer, voter, population, first_week, weights):
+    """
+    Seed votes into `DotDotVoting` for weeks that have already passed.
+
+    Each voter uses a share of their lock weight in the week, given in whole
+    tokens as it is in `DotDotVoting.vote`.
+    """
+    address = voter.address
+    current_week = voter.getWeek()
+    length = min(max(current_week - first_week, 0), weights.shape[1])
+    mask = population.vote_mask[:, :length]
+    votes = (weights[:, :length] * population.vote_shares[:, None]).astype(np.int64) * mask
+
+    token_votes = np.zeros((len(population.pools), length), dtype=np.int64)
+    np.add.at(token_votes, population.vote_pools, votes)
+
+    for i, user in enumerate(population.users[: len(votes)]):
+        pool = population.pools[population.vote_pools[i]]
+        user_base = nested_slot(USER_VOTES_SLOT, user) + first_week
+        token_base = nested_slot(USER_TOKEN_VOTES_SLOT, user, pool) + first_week
+        for week in np.flatnonzero(votes[i]):
+            writer.add(address, user_base + int(week), int(votes[i, week]), population.synthetic[i])
+            writer.add(address, token_base + int(week), int(votes[i, week]), population.synthetic[i])
+
+    for p, pool in enumerate(population.pools):
+        base = nested_slot(TOKEN_VOTES_SLOT, pool) + first_week
+        for week in np.flatnonzero(token_votes[p]):
+            writer.add(address, base + int(week), int(token_votes[p, week]))
+
+
+def seed_bonds(writer, distributor, population, funder):
+    """
+    Seed bonded dEPX into `BondedFeeDistributor`.
+
+    Each user makes a single deposit, on the first day of the week given by their
+    age. The bonded dEPX is sent to the distributor by `funder`.
+    """
+    from brownie import interface
+
+    address = distributor.address
+    users = population.users[: len(population.bond_amounts)]
+    length_slots = [nested_slot(WEEKLY_USER_BALANCE_SLOT, user) for user in users]
+    existing = [slot for slot, synthetic in zip(length_slots, population.synthetic) if not synthetic]
+    if any(writer.read(address, existing)):
+        raise ValueError("Cannot seed bonds for users with an existing bonded balance")
+
+    start_time = distributor.startTime()
+    now = web3.eth.get_block("latest").timestamp
+    current_week = (now - start_time) // WEEK
+    weeks = np.maximum(current_week - population.bond_ages, 0)
+
+    depx = distributor.dEPX()
+    total = population.bond_total()
+    interface.IERC20(depx).transfer(distributor, total, {"from": funder})
+    writer.add(address, nested_slot(TOKEN_BALANCE_SLOT, depx), total)
+
+    for user, amount, week, slot in zip(users, population.bond_amounts, weeks, length_slots):
+        amount = int(amount) * 10**18
+        week = int(week)
+        # `weeklyUserBalance` is zero until the week of the deposit
+        writer.set(address, slot, week + 1)
+        writer.set(address, array_slot(slot) + week, amount)
+
+        timestamp = min(-(-(start_time + week * WEEK) // 86400) * 86400, now // 86400 * 86400)
+        deposits = nested_slot(USER_DEPOSITS_SLOT, user) + 1
+        writer.set(address, deposits, 1)
+        writer.set(address, array_slot(deposits), timestamp)
+        writer.set(address, array_slot(deposits) + 1, amount)
+
+    # extend `totalBalance` to the current week as `_extendBalanceArray` would,
+    # adding the cumulative seeded balance to each week
+    data = array_slot(TOTAL_BALANCE_SLOT)
+    length = writer.read(address, [TOTAL_BALANCE_SLOT])[0]
+    last = writer.read(address, [data + length - 1])[0] if length else 0
+    start = min(int(weeks.min(initial=current_week)), length)
+    added = np.zeros(current_week - start + 1, dtype=np.int64)
+    np.add.at(added, weeks - start, population.bond_amounts)
+    for week, value in enumerate(np.cumsum(added), start):
+        if week < length:
+            writer.add(address, data + week, int(value) * 10**18)
+        else:
+            writer.set(address, data + week, last + int(value) * 10**18)
+    writer.set(address, TOTAL_BALANCE_SLOT, max(length, current_week + 1))
+
+
+def seed_state(population, funder, lp_depositor, locker, voter, distributor, writer=None):
+    """
+    Seed `population` into the DotDot contracts.
+
+    `funder` must hold the LP tokens, DDD and dEPX given by `Population.lp_totals`,
+    `lock_total` and `bond_total`. Returns the `StorageWriter` used.
+    """
+    if writer is None:
+        writer = StorageWriter()
+    seed_deposits(writer, lp_depositor, population, funder)
+    first_week, weights = seed_locks(writer, locker, population, funder)
+    seed_votes(writer, voter, population, first_week, weights)
+    seed_bonds(writer, distributor, population, funder)
+    writer.flush()
+    return writer
@@ -0,0 +1,861 @@
+"""
+Columnar snapshots of the DotDot protocol state at a block.
+
+Captures every user's LP deposit balances and reward integrals in `LpDepositor`,
+locks and exit streams in `TokenLocker`, votes in `DotDotVoting`, and bonded
+balances, deposits, fee streams and weekly fees in `BondedFeeDistributor`. State
+is read directly from storage with batched `eth_getStorageAt` requests, so a full
+snapshot takes minutes rather than the hours needed to replay every event.
+
+Accounts are found from the event database written by `scripts/indexer.py`, which
+only needs to fetch the blocks added since its last run.
+
+Each table is a set of equal-length columns, saved together in a compressed NPZ
+file. Users and tokens are stored once, and referenced by their index in
+`Snapshot.users` and `Snapshot.tokens`. Values that may exceed 64 bits are stored
+as four little-endian uint64 limbs, with shape `(rows, 4)`.
+
+A snapshot can be loaded into the off-chain models with `to_reward_model` and
+`to_fee_engine`, or written back into the storage of a development chain with
+`restore_state`. Deposit token clones and the tokens held by each contract are
+not part of the snapshot, so a restored state is intended for views and analysis.
+
+Usage:
+
+    brownie run indexer sync --network bsc-main
+    brownie run snapshot export [output path] --network bsc-main
+    brownie run snapshot restore <snapshot path> --network bsc-main-fork
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+from brownie import web3
+
+from scripts.fee_engine import ACTIVE_USER_STREAM_SLOT, WEEKLY_FEE_AMOUNTS_SLOT, FeeEngine
+from scripts.indexer import DEFAULT_DB_PATH, EventIndexer, load_deployments
+from scripts.reward_model import RewardModel
+from scripts.seed_state import (
+    REWARD_INTEGRAL_FOR_SLOT,
+    REWARD_INTEGRAL_SLOT,
+    TOKEN_BALANCE_SLOT,
+    TOKEN_VOTES_SLOT,
+    TOTAL_BALANCE_SLOT,
+    TOTAL_BALANCES_SLOT,
+    USER_BALANCES_SLOT,
+    USER_DEPOSITS_SLOT,
+    USER_TOKEN_VOTES_SLOT,
+    USER_VOTES_SLOT,
+    WEEK,
+    WEEKLY_LOCK_DATA_SLOT,
+    WEEKLY_TOTAL_WEIGHT_SLOT,
+    WEEKLY_USER_BALANCE_SLOT,
+    StorageWriter,
+)
+from scripts.storage import array_slot, nested_slot, read_storage
+
+DEFAULT_OUTPUT_PATH = Path(__file__).parent.parent.joinpath("reports/snapshot.npz")
+
+# storage slots in `LpDepositor`
+PENDING_FEE_EPX_SLOT = 9
+PENDING_FEE_DDD_SLOT = 10
+LAST_FEE_TRANSFER_SLOT = 11
+UNCLAIMED_REWARDS_SLOT = 17
+EXTRA_REWARDS_SLOT = 18
+EXTRA_REWARD_INTEGRAL_SLOT = 19
+EXTRA_REWARD_INTEGRAL_FOR_SLOT = 20
+UNCLAIMED_EXTRA_REWARDS_SLOT = 21
+
+# storage slots in `TokenLocker`
+WITHDRAWN_UNTIL_SLOT = 32770
+LOCKER_EXIT_STREAM_SLOT = 32771
+
+# storage slots in `DotDotVoting`
+EPS_VOTE_RATIO_SLOT = 4
+VOTER_START_TIME_SLOT = 65542
+
+# storage slots in `BondedFeeDistributor`
+BONDED_EXIT_STREAM_SLOT = 6
+FEE_TOKENS_SLOT = 7
+LAST_CLAIM_SLOT = 8
+
+UINT128_MASK = 2**128 - 1
+
+
+def _u256(values):
+    # encode integers as uint64 limbs, least significant first
+    values = [int(i) for i in values]
+    limbs = np.zeros((len(values), 4), dtype=np.uint64)
+    for i in range(4):
+        limbs[:, i] = [(value >> (64 * i)) & (2**64 - 1) for value in values]
+    return limbs
+
+
+def _from_u256(limbs):
+    values = np.zeros(len(limbs), dtype=object)
+    for i in range(4):
+        values += limbs[:, i].astype(object) << (64 * i)
+    return values
+
+
+def _address(value):
+    return web3.toChecksumAddress(f"0x{value:040x}")
+
+
+def _read(address, slots, block):
+    return np.array(read_storage([(address, slot) for slot in slots], block), dtype=object)
+
+
+class Snapshot:
+    """
+    Protocol state at a single block, held as columnar tables.
+
+    Arguments
+    ---------
+    meta : dict
+        Block number and timestamp, contract addresses, immutable parameters and
+        scalar state
+    users : list, optional
+        Addresses referenced by the `user` column of each table
+    tokens : list, optional
+        Addresses referenced by the `token` and `pool` columns of each table
+    """
+
+    def __init__(self, meta, users=(), tokens=()):
+        self.meta = meta
+        self.users = list(users)
+        self.tokens = list(tokens)
+        self.tables = {}
+        self._user_index = {user: i for i, user in enumerate(self.users)}
+        self._token_index = {token: i for i, token in enumerate(self.tokens)}
+
+    def user_index(self, address):
+        if address not in self._user_index:
+            self._user_index[address] = len(self.users)
+            self.users.append(address)
+        return self._user_index[address]
+
+    def token_index(self, address):
+        if address not in self._token_index:
+            self._token_index[address] = len(self.tokens)
+            self.tokens.append(address)
+        return self._token_index[address]
+
+    def add_table(self, name, columns, wide=()):
+        """
+        Add a table from a dict of equal-length columns. Columns named in `wide`
+        hold values of up to 256 bits, all others are stored as int64.
+        """
+        self.tables[name] = {
+            key: _u256(value) if key in wide else np.asarray(value, dtype=np.int64).reshape(-1)
+            for key, value in columns.items()
+        }
+
+    def table(self, name):
+        """Columns of a table, with 256 bit values decoded to python integers."""
+        return {
+            key: _from_u256(value) if value.ndim == 2 else value
+            for key, value in self.tables[name].items()
+        }
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "meta": np.array(json.dumps(self.meta)),
+            "users": np.array(self.users, dtype="U42"),
+            "tokens": np.array(self.tokens, dtype="U42"),
+        }
+        for name, columns in self.tables.items():
+            for key, value in columns.items():
+                arrays[f"{name}.{key}"] = value
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            snapshot = cls(json.loads(str(data["meta"])), data["users"].tolist(), data["tokens"].tolist())
+            for key in data.files:
+                if "." in key:
+                    name, column = key.split(".", 1)
+                    snapshot.tables.setdefault(name, {})[column] = data[key]
+        return snapshot
+
+    def to_reward_model(self):
+        """`RewardModel` holding the `LpDepositor` state of the snapshot."""
+        model = RewardModel(self.meta["ddd_earn_ratio"])
+        model.pending_fee_epx = self.meta["pending_fee_epx"]
+
+        pools = self.table("lp_pools")
+        cols = [model._pool(self.tokens[i]) for i in pools["pool"]]
+        model._total_balances[cols] = pools["total_balance"]
+        model._integral_epx[cols] = pools["integral_epx"]
+        model._integral_ddd[cols] = pools["integral_ddd"]
+
+        # rows are ordered by pool and by index within `extraRewards[pool]`
+        extras = self.table("lp_extra_rewards")
+        rewards = {}
+        for pool, token in zip(extras["pool"], extras["token"]):
+            rewards.setdefault(self.tokens[pool], []).append(self.tokens[token])
+        for pool, tokens in rewards.items():
+            model.update_pool_extra_rewards(pool, tokens)
+        extra_cols = [model._extra_columns[self.tokens[p]][i] for p, i in zip(extras["pool"], extras["index"])]
+        model._extra_integral[extra_cols] = extras["integral"]
+
+        positions = self.table("lp_positions")
+        rows = [model._user(self.users[i]) for i in positions["user"]]
+        cols = [model._pool(self.tokens[i]) for i in positions["pool"]]
+        model._balances[rows, cols] = positions["balance"]
+        model._integral_for_epx[rows, cols] = positions["integral_for_epx"]
+        model._integral_for_ddd[rows, cols] = positions["integral_for_ddd"]
+        model._unclaimed_epx[rows, cols] = positions["unclaimed_epx"]
+        model._unclaimed_ddd[rows, cols] = positions["unclaimed_ddd"]
+
+        positions = self.table("lp_extra_positions")
+        rows = [model._user(self.users[i]) for i in positions["user"]]
+        cols = [extra_cols[i] for i in positions["column"]]
+        model._extra_integral_for[rows, cols] = positions["integral_for"]
+        model._unclaimed_extra[rows, cols] = positions["unclaimed"]
+        return model
+
+    def to_fee_engine(self):
+        """`FeeEngine` holding the `BondedFeeDistributor` state of the snapshot."""
+        bonders = self.table("bonders")
+        fee_tokens = self.table("fee_tokens")
+        engine = FeeEngine(
+            self.meta["distributor"]["start_time"],
+            [self.users[i] for i in bonders["user"]],
+            [self.tokens[i] for i in fee_tokens["token"]],
+        )
+        engine._extend(engine.get_week(self.meta["timestamp"]))
+
+        totals = self.table("bonded_weeks")["total_balance"]
+        engine.total_length = len(totals)
+        if len(totals):
+            engine._totals[: len(totals)] = totals
+            engine._totals[len(totals) :] = totals[-1]
+
+        rows = [engine._user_index[self.users[i]] for i in bonders["user"]]
+        engine._balance_lengths[rows] = bonders["balance_length"]
+        balances = self.table("bonded_balances")
+        for user, week, balance in zip(balances["user"], balances["week"], balances["balance"]):
+            engine._balances[engine._user_index[self.users[user]], week:] = balance
+
+        fees = self.table("fee_amounts")
+        cols = [engine._token_index[self.tokens[i]] for i in fees["token"]]
+        engine._fees[cols, fees["week"]] = fees["amount"]
+
+        streams = self.table("fee_streams")
+        rows = [engine._user_index[self.users[i]] for i in streams["user"]]
+        cols = [engine._token_index[self.tokens[i]] for i in streams["token"]]
+        engine._stream_start[rows, cols] = streams["start"]
+        engine._stream_amount[rows, cols] = streams["amount"]
+        engine._stream_claimed[rows, cols] = streams["claimed"]
+        return engine
+
+
+def find_accounts(indexer):
+    """
+    Find the accounts with state in each contract from the indexed events.
+
+    Returns a dict of:
+
+    * `depositors`: `{user: [pools]}` for `LpDepositor`
+    * `lockers`: list of `TokenLocker` users
+    * `voters`: `{user: [tokens]}` for `DotDotVoting`
+    * `bonders`: list of `BondedFeeDistributor` users
+    """
+    depositors, voters = {}, {}
+    for event in indexer.events("LpDepositor", "Deposit"):
+        depositors.setdefault(event["args"]["receiver"], set()).add(event["args"]["token"])
+    for event in indexer.events("LpDepositor", "TransferDeposit"):
+        depositors.setdefault(event["args"]["to"], set()).add(event["args"]["token"])
+
+    lockers = {i["args"]["user"] for i in indexer.events("TokenLocker", "NewLock")}
+    for event in indexer.events("DotDotVoting", "VotedForIncentives"):
+        voters.setdefault(event["args"]["voter"], set()).update(event["args"]["tokens"])
+
+    # as in `fee_engine.find_users`, bonders are found from bonded dEPX deposits
+    # and from dEPX sent to the distributor
+    distributor = {name: address for address, name in indexer.decoder.names.items()}.get("BondedFeeDistributor")
+    bonders = {i["args"]["receiver"] for i in indexer.events("LockedEPX", "Deposit") if i["args"]["bond"]}
+    for event in indexer.events("LockedEPX", "Transfer"):
+        if event["args"]["to"] == distributor and int(event["args"]["from"], 16):
+            bonders.add(event["args"]["from"])
+    bonders.update(i["args"]["account"] for i in indexer.events("BondedFeeDistributor", "FeesClaimed"))
+
+    return {
+        "depositors": {k: sorted(v) for k, v in sorted(depositors.items())},
+        "lockers": sorted(lockers),
+        "voters": {k: sorted(v) for k, v in sorted(voters.items())},
+        "bonders": sorted(bonders),
+    }
+
+
+def take_snapshot(lp_depositor, locker, voter, distributor, accounts, block=None):
+    """
+    Read the state of the given contracts for `accounts` at `block`.
+
+    Arguments
+    ---------
+    lp_depositor, locker, voter, distributor : Contract
+        `LpDepositor`, `TokenLocker`, `DotDotVoting` and `BondedFeeDistributor`
+    accounts : dict
+        Accounts to read, as returned by `find_accounts`
+    block : int, optional
+        Block to read the state at. Defaults to the latest block.
+    """
+    if block is None:
+        block = web3.eth.block_number
+    block = int(block)
+    meta = {
+        "block": block,
+        "timestamp": int(web3.eth.get_block(block).timestamp),
+        "addresses": {
+            "LpDepositor": lp_depositor.address,
+            "TokenLocker": locker.address,
+            "DotDotVoting": voter.address,
+            "BondedFeeDistributor": distributor.address,
+        },
+    }
+    snapshot = Snapshot(meta)
+    _snapshot_lp_depositor(snapshot, lp_depositor, accounts["depositors"], block)
+    _snapshot_locker(snapshot, locker, accounts["lockers"], block)
+    _snapshot_voter(snapshot, voter, accounts["voters"], block)
+    _snapshot_distributor(snapshot, distributor, accounts["bonders"], block)
+    return snapshot
+
+
+def _snapshot_lp_depositor(snapshot, lp_depositor, depositors, block):
+    address = lp_depositor.address
+    meta = snapshot.meta
+    meta["ddd_earn_ratio"] = int(lp_depositor.DDD_EARN_RATIO())
+    meta["pending_fee_epx"], meta["pending_fee_ddd"], meta["last_fee_transfer"] = (
+        int(i) for i in _read(address, [PENDING_FEE_EPX_SLOT, PENDING_FEE_DDD_SLOT, LAST_FEE_TRANSFER_SLOT], block)
+    )
+
+    pools = sorted({pool for user_pools in depositors.values() for pool in user_pools})
+    slots = []
+    for pool in pools:
+        integral = nested_slot(REWARD_INTEGRAL_SLOT, pool)
+        slots += [nested_slot(TOTAL_BALANCES_SLOT, pool), integral, integral + 1, nested_slot(EXTRA_REWARDS_SLOT, pool)]
+    values = _read(address, slots, block).reshape(-1, 4)
+    snapshot.add_table(
+        "lp_pools",
+        {
+            "pool": [snapshot.token_index(pool) for pool in pools],
+            "total_balance": values[:, 0],
+            "integral_epx": values[:, 1],
+            "integral_ddd": values[:, 2],
+        },
+        wide=("total_balance", "integral_epx", "integral_ddd"),
+    )
+
+    # third-party rewards, one row per entry in `extraRewards[pool]`
+    extras = [(pool, i) for pool, length in zip(pools, values[:, 3]) for i in range(length)]
+    slots = []
+    for pool, i in extras:
+        slots += [
+            array_slot(nested_slot(EXTRA_REWARDS_SLOT, pool)) + i,
+            array_slot(nested_slot(EXTRA_REWARD_INTEGRAL_SLOT, pool)) + i,
+        ]
+    values = _read(address, slots, block).reshape(-1, 2)
+    snapshot.add_table(
+        "lp_extra_rewards",
+        {
+            "pool": [snapshot.token_index(pool) for pool, _ in extras],
+            "index": [i for _, i in extras],
+            "token": [snapshot.token_index(_address(i)) for i in values[:, 0]],
+            "integral": values[:, 1],
+        },
+        wide=("integral",),
+    )
+
+    positions = [(user, pool) for user, user_pools in depositors.items() for pool in user_pools]
+    slots = []
+    for user, pool in positions:
+        integral_for = nested_slot(REWARD_INTEGRAL_FOR_SLOT, user, pool)
+        unclaimed = nested_slot(UNCLAIMED_REWARDS_SLOT, user, pool)
+        slots += [nested_slot(USER_BALANCES_SLOT, user, pool), integral_for, integral_for + 1, unclaimed, unclaimed + 1]
+    values = _read(address, slots, block).reshape(-1, 5)
+    rows = np.flatnonzero(values.any(axis=1))
+    snapshot.add_table(
+        "lp_positions",
+        {
+            "user": [snapshot.user_index(positions[i][0]) for i in rows],
+            "pool": [snapshot.token_index(positions[i][1]) for i in rows],
+            "balance": values[rows, 0],
+            "integral_for_epx": values[rows, 1],
+            "integral_for_ddd": values[rows, 2],
+            "unclaimed_epx": values[rows, 3],
+            "unclaimed_ddd": values[rows, 4],
+        },
+        wide=("balance", "integral_for_epx", "integral_for_ddd", "unclaimed_epx", "unclaimed_ddd"),
+    )
+
+    # per-user third-party reward integrals, referencing rows of `lp_extra_rewards`
+    extra_positions = [
+        (user, column, i)
+        for user, user_pools in depositors.items()
+        for column, (pool, i) in enumerate(extras)
+        if pool in user_pools
+    ]
+    slots = []
+    for user, column, i in extra_positions:
+        pool = extras[column][0]
+        index = i.to_bytes(32, "big")
+        slots += [
+            nested_slot(EXTRA_REWARD_INTEGRAL_FOR_SLOT, user, pool, index),
+            nested_slot(UNCLAIMED_EXTRA_REWARDS_SLOT, user, pool, index),
+        ]
+    values = _read(address, slots, block).reshape(-1, 2)
+    rows = np.flatnonzero(values.any(axis=1))
+    snapshot.add_table(
+        "lp_extra_positions",
+        {
+            "user": [snapshot.user_index(extra_positions[i][0]) for i in rows],
+            "column": [extra_positions[i][1] for i in rows],
+            "integral_for": values[rows, 0],
+            "unclaimed": values[rows, 1],
+        },
+        wide=("integral_for", "unclaimed"),
+    )
+
+
+def _snapshot_locker(snapshot, locker, lockers, block):
+    address = locker.address
+    start_time = locker.startTime()
+    max_lock_weeks = locker.MAX_LOCK_WEEKS()
+    # every week that can hold a weight or unlock
+    weeks = (snapshot.meta["timestamp"] - start_time) // WEEK + max_lock_weeks + 1
+    snapshot.meta["locker"] = {"start_time": int(start_time), "max_lock_weeks": int(max_lock_weeks)}
+
+    packed = _read(address, [WEEKLY_TOTAL_WEIGHT_SLOT + i for i in range((weeks + 1) // 2)], block)
+    totals = np.zeros(len(packed) * 2, dtype=object)
+    totals[0::2] = packed & UINT128_MASK
+    totals[1::2] = packed >> 128
+    snapshot.add_table(
+        "locker_weeks", {"week": np.arange(weeks), "total_weight": totals[:weeks]}, wide=("total_weight",)
+    )
+
+    slots = []
+    for user in lockers:
+        base = nested_slot(WEEKLY_LOCK_DATA_SLOT, user)
+        slots += range(base, base + weeks)
+    values = _read(address, slots, block).reshape(-1, weeks)
+    rows, cols = np.nonzero(values)
+    snapshot.add_table(
+        "locks",
+        {
+            "user": [snapshot.user_index(lockers[i]) for i in rows],
+            "week": cols,
+            "weight": values[rows, cols] & UINT128_MASK,
+            "unlock": values[rows, cols] >> 128,
+        },
+        wide=("weight", "unlock"),
+    )
+
+    slots = []
+    for user in lockers:
+        stream = nested_slot(LOCKER_EXIT_STREAM_SLOT, user)
+        slots += [nested_slot(WITHDRAWN_UNTIL_SLOT, user), stream, stream + 1, stream + 2]
+    values = _read(address, slots, block).reshape(-1, 4)
+    snapshot.add_table(
+        "lockers",
+        {
+            "user": [snapshot.user_index(user) for user in lockers],
+            "withdrawn_until": values[:, 0],
+            "exit_start": values[:, 1],
+            "exit_amount": values[:, 2],
+            "exit_claimed": values[:, 3],
+        },
+        wide=("exit_amount", "exit_claimed"),
+    )
+
+
+def _snapshot_voter(snapshot, voter, voters, block):
+    address = voter.address
+    start_time = voter.startTime(block_identifier=block)
+    weeks = max(snapshot.meta["timestamp"] - start_time, 0) // WEEK + 1
+    snapshot.meta["voter"] = {"start_time": int(start_time)}
+
+    ratios = _read(address, [EPS_VOTE_RATIO_SLOT + i for i in range(weeks)], block)
+    snapshot.add_table("vote_weeks", {"week": np.arange(weeks), "eps_vote_ratio": ratios}, wide=("eps_vote_ratio",))
+
+    users = list(voters)
+    slots = []
+    for user in users:
+        base = nested_slot(USER_VOTES_SLOT, user)
+        slots += range(base, base + weeks)
+    values = _read(address, slots, block).reshape(-1, weeks)
+    rows, cols = np.nonzero(values)
+    snapshot.add_table(
+        "user_votes",
+        {"user": [snapshot.user_index(users[i]) for i in rows], "week": cols, "votes": values[rows, cols]},
+        wide=("votes",),
+    )
+
+    # votes for each token are only read in weeks where the user voted
+    keys = [(users[u], token, int(w)) for u, w in zip(rows, cols) for token in voters[users[u]]]
+    values = _read(address, [nested_slot(USER_TOKEN_VOTES_SLOT, user, token) + w for user, token, w in keys], block)
+    rows = np.flatnonzero(values)
+    snapshot.add_table(
+        "user_token_votes",
+        {
+            "user": [snapshot.user_index(keys[i][0]) for i in rows],
+            "token": [snapshot.token_index(keys[i][1]) for i in rows],
+            "week": [keys[i][2] for i in rows],
+            "votes": values[rows],
+        },
+        wide=("votes",),
+    )
+
+    tokens = sorted({token for user_tokens in voters.values() for token in user_tokens})
+    slots = []
+    for token in tokens:
+        base = nested_slot(TOKEN_VOTES_SLOT, token)
+        slots += range(base, base + weeks)
+    values = _read(address, slots, block).reshape(-1, weeks)
+    rows, cols = np.nonzero(values)
+    snapshot.add_table(
+        "token_votes",
+        {"token": [snapshot.token_index(tokens[i]) for i in rows], "week": cols, "votes": values[rows, cols]},
+        wide=("votes",),
+    )
+
+
+def _snapshot_distributor(snapshot, distributor, bonders, block):
+    address = distributor.address
+    start_time = distributor.startTime()
+    week = (snapshot.meta["timestamp"] - start_time) // WEEK
+    snapshot.meta["distributor"] = {"start_time": int(start_time)}
+
+    # fee tokens as in `fee_engine.load_engine`
+    length = _read(address, [FEE_TOKENS_SLOT], block)[0]
+    tokens = [_address(i) for i in _read(address, [array_slot(FEE_TOKENS_SLOT) + i for i in range(length)], block)]
+    snapshot.meta["distributor"]["fee_token_count"] = len(tokens)
+    # bonded dEPX is also tracked in `tokenBalance`
+    depx = distributor.dEPX(block_identifier=block)
+    snapshot.meta["distributor"]["depx"] = depx
+    snapshot.meta["distributor"]["depx_balance"] = int(_read(address, [nested_slot(TOKEN_BALANCE_SLOT, depx)], block)[0])
+    for token in (distributor.EPX(), distributor.DDD(block_identifier=block)):
+        if token not in tokens:
+            tokens.append(token)
+
+    length = _read(address, [TOTAL_BALANCE_SLOT], block)[0]
+    totals = _read(address, [array_slot(TOTAL_BALANCE_SLOT) + i for i in range(length)], block)
+    snapshot.add_table("bonded_weeks", {"week": np.arange(length), "total_balance": totals}, wide=("total_balance",))
+
+    slots = []
+    for token in tokens:
+        slots += [nested_slot(TOKEN_BALANCE_SLOT, token), nested_slot(LAST_CLAIM_SLOT, token)]
+        base = nested_slot(WEEKLY_FEE_AMOUNTS_SLOT, token)
+        slots += range(base, base + week + 1)
+    values = _read(address, slots, block).reshape(-1, week + 3)
+    snapshot.add_table(
+        "fee_tokens",
+        {"token": [snapshot.token_index(token) for token in tokens], "token_balance": values[:, 0], "last_claim": values[:, 1]},
+        wide=("token_balance",),
+    )
+    rows, cols = np.nonzero(values[:, 2:])
+    snapshot.add_table(
+        "fee_amounts",
+        {"token": [snapshot.token_index(tokens[i]) for i in rows], "week": cols, "amount": values[rows, cols + 2]},
+        wide=("amount",),
+    )
+
+    slots = []
+    for user in bonders:
+        deposits = nested_slot(USER_DEPOSITS_SLOT, user)
+        stream = nested_slot(BONDED_EXIT_STREAM_SLOT, user)
+        slots += [nested_slot(WEEKLY_USER_BALANCE_SLOT, user), deposits, deposits + 1, stream, stream + 1, stream + 2]
+    values = _read(address, slots, block).reshape(-1, 6)
+    snapshot.add_table(
+        "bonders",
+        {
+            "user": [snapshot.user_index(user) for user in bonders],
+            "balance_length": values[:, 0],
+            "deposit_index": values[:, 1],
+            "deposit_length": values[:, 2],
+            "exit_start": values[:, 3],
+            "exit_amount": values[:, 4],
+            "exit_claimed": values[:, 5],
+        },
+        wide=("exit_amount", "exit_claimed"),
+    )
+    lengths, deposit_index, deposit_length = values[:, 0], values[:, 1], values[:, 2]
+
+    # weekly balances are stored where they change, the contract carries each
+    # value forward until the next change
+    slots = []
+    for user, length in zip(bonders, lengths):
+        base = array_slot(nested_slot(WEEKLY_USER_BALANCE_SLOT, user))
+        slots += range(base, base + length)
+    values = _read(address, slots, block)
+    user_rows = np.repeat(np.arange(len(bonders)), lengths.astype(np.int64))
+    weeks = np.concatenate([np.arange(i) for i in lengths.astype(np.int64)] + [np.zeros(0, dtype=np.int64)])
+    changed = np.ones(len(values), dtype=bool)
+    changed[1:] = (values[1:] != values[:-1]) | (user_rows[1:] != user_rows[:-1])
+    changed &= (values != 0) | (weeks > 0)
+    snapshot.add_table(
+        "bonded_balances",
+        {
+            "user": [snapshot.user_index(bonders[i]) for i in user_rows[changed]],
+            "week": weeks[changed],
+            "balance": values[changed],
+        },
+        wide=("balance",),
+    )
+
+    slots, keys = [], []
+    for user, start, end in zip(bonders, deposit_index, deposit_length):
+        base = array_slot(nested_slot(USER_DEPOSITS_SLOT, user) + 1)
+        for i in range(start, end):
+            slots += [base + 2 * i, base + 2 * i + 1]
+            keys.append((user, i))
+    values = _read(address, slots, block).reshape(-1, 2)
+    snapshot.add_table(
+        "bonder_deposits",
+        {
+            "user": [snapshot.user_index(user) for user, _ in keys],
+            "index": [i for _, i in keys],
+            "timestamp": values[:, 0],
+            "amount": values[:, 1],
+        },
+        wide=("amount",),
+    )
+
+    slots, keys = [], []
+    for user in bonders:
+        base = nested_slot(ACTIVE_USER_STREAM_SLOT, user)
+        for token in tokens:
+            stream = nested_slot(base, token)
+            slots += [stream, stream + 1, stream + 2]
+            keys.append((user, token))
+    values = _read(address, slots, block).reshape(-1, 3)
+    rows = np.flatnonzero(values[:, 0])
+    snapshot.add_table(
+        "fee_streams",
+        {
+            "user": [snapshot.user_index(keys[i][0]) for i in rows],
+            "token": [snapshot.token_index(keys[i][1]) for i in rows],
+            "start": values[rows, 0],
+            "amount": values[rows, 1],
+            "claimed": values[rows, 2],
+        },
+        wide=("amount", "claimed"),
+    )
+
+
+def restore_state(snapshot, addresses=None, writer=None):
+    """
+    Write a snapshot into contract storage on a development chain.
+
+    Every value in the snapshot is written, slots that are not part of the
+    snapshot are left unchanged. Restoring into fresh deployments gives the same
+    views as the snapshotted contracts, provided they share the same EPS contracts
+    and so the same `startTime`. Token balances are not restored.
+
+    Arguments
+    ---------
+    snapshot : Snapshot
+        Snapshot to restore
+    addresses : dict, optional
+        Contract addresses to restore into, by contract name. Defaults to the
+        addresses the snapshot was taken from.
+    writer : StorageWriter, optional
+        Writer used to set the storage, flushed before returning
+    """
+    addresses = {**snapshot.meta["addresses"], **(addresses or {})}
+    if writer is None:
+        writer = StorageWriter()
+    _restore_lp_depositor(snapshot, addresses["LpDepositor"], writer)
+    _restore_locker(snapshot, addresses["TokenLocker"], writer)
+    _restore_voter(snapshot, addresses["DotDotVoting"], writer)
+    _restore_distributor(snapshot, addresses["BondedFeeDistributor"], writer)
+    writer.flush()
+
+
+def _restore_lp_depositor(snapshot, address, writer):
+    meta = snapshot.meta
+    writer.set(address, PENDING_FEE_EPX_SLOT, meta["pending_fee_epx"])
+    writer.set(address, PENDING_FEE_DDD_SLOT, meta["pending_fee_ddd"])
+    writer.set(address, LAST_FEE_TRANSFER_SLOT, meta["last_fee_transfer"])
+
+    pools = snapshot.table("lp_pools")
+    for pool, total, epx, ddd in zip(pools["pool"], pools["total_balance"], pools["integral_epx"], pools["integral_ddd"]):
+        pool = snapshot.tokens[pool]
+        integral = nested_slot(REWARD_INTEGRAL_SLOT, pool)
+        writer.set(address, nested_slot(TOTAL_BALANCES_SLOT, pool), total)
+        writer.set(address, integral, epx)
+        writer.set(address, integral + 1, ddd)
+
+    extras = snapshot.table("lp_extra_rewards")
+    columns = []
+    for pool, i, token, integral in zip(extras["pool"], extras["index"], extras["token"], extras["integral"]):
+        pool, i = snapshot.tokens[pool], int(i)
+        columns.append((pool, i))
+        for slot, value in ((EXTRA_REWARDS_SLOT, int(snapshot.tokens[token], 16)), (EXTRA_REWARD_INTEGRAL_SLOT, integral)):
+            slot = nested_slot(slot, pool)
+            # rows are ordered by index, so the final write sets the array length
+            writer.set(address, slot, i + 1)
+            writer.set(address, array_slot(slot) + i, value)
+
+    positions = snapshot.table("lp_positions")
+    for row in range(len(positions["user"])):
+        user, pool = snapshot.users[positions["user"][row]], snapshot.tokens[positions["pool"][row]]
+        integral_for = nested_slot(REWARD_INTEGRAL_FOR_SLOT, user, pool)
+        unclaimed = nested_slot(UNCLAIMED_REWARDS_SLOT, user, pool)
+        writer.set(address, nested_slot(USER_BALANCES_SLOT, user, pool), positions["balance"][row])
+        writer.set(address, integral_for, positions["integral_for_epx"][row])
+        writer.set(address, integral_for + 1, positions["integral_for_ddd"][row])
+        writer.set(address, unclaimed, positions["unclaimed_epx"][row])
+        writer.set(address, unclaimed + 1, positions["unclaimed_ddd"][row])
+
+    positions = snapshot.table("lp_extra_positions")
+    for user, column, integral_for, unclaimed in zip(
+        positions["user"], positions["column"], positions["integral_for"], positions["unclaimed"]
+    ):
+        user = snapshot.users[user]
+        pool, i = columns[column]
+        index = i.to_bytes(32, "big")
+        writer.set(address, nested_slot(EXTRA_REWARD_INTEGRAL_FOR_SLOT, user, pool, index), integral_for)
+        writer.set(address, nested_slot(UNCLAIMED_EXTRA_REWARDS_SLOT, user, pool, index), unclaimed)
+
+
+def _restore_locker(snapshot, address, writer):
+    totals = list(snapshot.table("locker_weeks")["total_weight"])
+    if len(totals) % 2:
+        totals.append(0)
+    for i in range(0, len(totals), 2):
+        writer.set(address, WEEKLY_TOTAL_WEIGHT_SLOT + i // 2, totals[i] | (totals[i + 1] << 128))
+
+    locks = snapshot.table("locks")
+    for user, week, weight, unlock in zip(locks["user"], locks["week"], locks["weight"], locks["unlock"]):
+        writer.set(address, nested_slot(WEEKLY_LOCK_DATA_SLOT, snapshot.users[user]) + int(week), weight | (unlock << 128))
+
+    lockers = snapshot.table("lockers")
+    for row in range(len(lockers["user"])):
+        user = snapshot.users[lockers["user"][row]]
+        stream = nested_slot(LOCKER_EXIT_STREAM_SLOT, user)
+        writer.set(address, nested_slot(WITHDRAWN_UNTIL_SLOT, user), int(lockers["withdrawn_until"][row]))
+        writer.set(address, stream, int(lockers["exit_start"][row]))
+        writer.set(address, stream + 1, lockers["exit_amount"][row])
+        writer.set(address, stream + 2, lockers["exit_claimed"][row])
+
+
+def _restore_voter(snapshot, address, writer):
+    writer.set(address, VOTER_START_TIME_SLOT, snapshot.meta["voter"]["start_time"])
+
+    weeks = snapshot.table("vote_weeks")
+    for week, ratio in zip(weeks["week"], weeks["eps_vote_ratio"]):
+        writer.set(address, EPS_VOTE_RATIO_SLOT + int(week), ratio)
+
+    votes = snapshot.table("user_votes")
+    for user, week, value in zip(votes["user"], votes["week"], votes["votes"]):
+        writer.set(address, nested_slot(USER_VOTES_SLOT, snapshot.users[user]) + int(week), value)
+
+    votes = snapshot.table("user_token_votes")
+    for user, token, week, value in zip(votes["user"], votes["token"], votes["week"], votes["votes"]):
+        user, token = snapshot.users[user], snapshot.tokens[token]
+        writer.set(address, nested_slot(USER_TOKEN_VOTES_SLOT, user, token) + int(week), value)
+
+    votes = snapshot.table("token_votes")
+    for token, week, value in zip(votes["token"], votes["week"], votes["votes"]):
+        writer.set(address, nested_slot(TOKEN_VOTES_SLOT, snapshot.tokens[token]) + int(week), value)
+
+
+def _restore_distributor(snapshot, address, writer):
+    meta = snapshot.meta["distributor"]
+    writer.set(address, nested_slot(TOKEN_BALANCE_SLOT, meta["depx"]), meta["depx_balance"])
+
+    fee_tokens = snapshot.table("fee_tokens")
+    count = meta["fee_token_count"]
+    writer.set(address, FEE_TOKENS_SLOT, count)
+    for i, (token, balance, last_claim) in enumerate(
+        zip(fee_tokens["token"], fee_tokens["token_balance"], fee_tokens["last_claim"])
+    ):
+        token = snapshot.tokens[token]
+        if i < count:
+            writer.set(address, array_slot(FEE_TOKENS_SLOT) + i, int(token, 16))
+        writer.set(address, nested_slot(TOKEN_BALANCE_SLOT, token), balance)
+        writer.set(address, nested_slot(LAST_CLAIM_SLOT, token), int(last_claim))
+
+    fees = snapshot.table("fee_amounts")
+    for token, week, amount in zip(fees["token"], fees["week"], fees["amount"]):
+        writer.set(address, nested_slot(WEEKLY_FEE_AMOUNTS_SLOT, snapshot.tokens[token]) + int(week), amount)
+
+    totals = snapshot.table("bonded_weeks")["total_balance"]
+    writer.set(address, TOTAL_BALANCE_SLOT, len(totals))
+    for week, total in enumerate(totals):
+        writer.set(address, array_slot(TOTAL_BALANCE_SLOT) + week, total)
+
+    bonders = snapshot.table("bonders")
+    lengths = {}
+    for row in range(len(bonders["user"])):
+        user = snapshot.users[bonders["user"][row]]
+        lengths[user] = int(bonders["balance_length"][row])
+        deposits = nested_slot(USER_DEPOSITS_SLOT, user)
+        stream = nested_slot(BONDED_EXIT_STREAM_SLOT, user)
+        writer.set(address, nested_slot(WEEKLY_USER_BALANCE_SLOT, user), lengths[user])
+        writer.set(address, deposits, int(bonders["deposit_index"][row]))
+        writer.set(address, deposits + 1, int(bonders["deposit_length"][row]))
+        writer.set(address, stream, int(bonders["exit_start"][row]))
+        writer.set(address, stream + 1, bonders["exit_amount"][row])
+        writer.set(address, stream + 2, bonders["exit_claimed"][row])
+
+    # expand the change points back into one entry per week
+    balances = snapshot.table("bonded_balances")
+    rows = list(zip(balances["user"], balances["week"], balances["balance"]))
+    for i, (user, week, balance) in enumerate(rows):
+        user = snapshot.users[user]
+        end = lengths[user]
+        if i + 1 < len(rows) and snapshot.users[rows[i + 1][0]] == user:
+            end = int(rows[i + 1][1])
+        base = array_slot(nested_slot(WEEKLY_USER_BALANCE_SLOT, user))
+        for week in range(int(week), end):
+            writer.set(address, base + week, balance)
+
+    deposits = snapshot.table("bonder_deposits")
+    for user, i, timestamp, amount in zip(deposits["user"], deposits["index"], deposits["timestamp"], deposits["amount"]):
+        base = array_slot(nested_slot(USER_DEPOSITS_SLOT, snapshot.users[user]) + 1)
+        writer.set(address, base + 2 * int(i), int(timestamp))
+        writer.set(address, base + 2 * int(i) + 1, amount)
+
+    streams = snapshot.table("fee_streams")
+    for row in range(len(streams["user"])):
+        user, token = snapshot.users[streams["user"][row]], snapshot.tokens[streams["token"][row]]
+        stream = nested_slot(ACTIVE_USER_STREAM_SLOT, user, token)
+        writer.set(address, stream, int(streams["start"][row]))
+        writer.set(address, stream + 1, streams["amount"][row])
+        writer.set(address, stream + 2, streams["claimed"][row])
+
+
+def export(path=DEFAULT_OUTPUT_PATH, db_path=DEFAULT_DB_PATH):
+    from brownie import BondedFeeDistributor, DotDotVoting, LpDepositor, TokenLocker
+
+    # accounts are taken from the event database, and state is read at its checkpoint
+    deployments = load_deployments()
+    indexer = EventIndexer(db_path, deployments)
+    indexer.sync()
+    block = indexer.checkpoint
+    accounts = find_accounts(indexer)
+    indexer.close()
+
+    snapshot = take_snapshot(
+        LpDepositor.at(deployments["LpDepositor"][0]),
+        TokenLocker.at(deployments["TokenLocker"][0]),
+        DotDotVoting.at(deployments["DotDotVoting"][0]),
+        BondedFeeDistributor.at(deployments["BondedFeeDistributor"][0]),
+        accounts,
+        block,
+    )
+    snapshot.save(path)
+    print(f"Saved a snapshot of {len(snapshot.users)} users at block {block} to {path}")
+
+
+def restore(path):
+    snapshot = Snapshot.load(path)
+    restore_state(snapshot)
+    print(f"Restored the snapshot at block {snapshot.meta['block']} from {path}")
@@ -0,0 +1,92 @@
+"""
+Storage slot and event log helpers shared by the off-chain tooling.
+
+Slots follow the Solidity storage layout: the value of `mapping[key]` for a mapping
+at `slot` is stored at `keccak(key . slot)`, and the elements of a dynamic array
+at `slot` start at `keccak(slot)`. Reads and logs use the active brownie network,
+and do not require a loaded project.
+"""
+
+import requests
+from brownie import web3
+from eth_utils import keccak
+
+from scripts.indexer import LOG_BLOCK_RANGE
+
+# number of requests sent in a single JSON-RPC batch
+RPC_BATCH_SIZE = 1000
+
+
+def mapping_slot(key, slot):
+    """Slot of `mapping[key]` for a mapping at `slot`, as bytes."""
+    if isinstance(key, str):
+        key = bytes.fromhex(key[2:])
+    return keccak(key.rjust(32, b"\x00") + slot.to_bytes(32, "big"))
+
+
+def nested_slot(slot, *keys):
+    """Slot of `mapping[keys[0]][keys[1]]...` for a mapping at `slot`."""
+    for key in keys:
+        slot = int.from_bytes(mapping_slot(key, slot), "big")
+    return slot
+
+
+def array_slot(slot):
+    """Slot of the first element of a dynamic array stored at `slot`."""
+    return int.from_bytes(keccak(slot.to_bytes(32, "big")), "big")
+
+
+def batch_request(calls, batch_size=RPC_BATCH_SIZE, session=requests):
+    """
+    Send a list of `(method, params)` in JSON-RPC batches, and return the
+    responses in the same order.
+    """
+    results = []
+    for i in range(0, len(calls), batch_size):
+        payload = [
+            {"jsonrpc": "2.0", "id": c, "method": method, "params": params}
+            for c, (method, params) in enumerate(calls[i : i + batch_size])
+        ]
+        response = session.post(web3.provider.endpoint_uri, json=payload)
+        response.raise_for_status()
+        results += sorted(response.json(), key=lambda k: k["id"])
+    return results
+
+
+def read_storage(keys, block="latest", batch_size=RPC_BATCH_SIZE):
+    """
+    Read a list of `(address, slot)` in batched `eth_getStorageAt` requests.
+    """
+    if isinstance(block, int):
+        block = hex(block)
+    calls = [("eth_getStorageAt", [address, hex(slot), block]) for address, slot in keys]
+    values = []
+    for response in batch_request(calls, batch_size):
+        if "error" in response:
+            raise ValueError(f"eth_getStorageAt failed: {response['error']}")
+        values.append(int(response["result"], 16))
+    return values
+
+
+def find_deployment_block(address, to_block):
+    """Binary search for the first block where `address` has code."""
+    low, high = 0, to_block
+    while low < high:
+        mid = (low + high) // 2
+        if web3.eth.get_code(address, block_identifier=mid):
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def get_logs(address, topics, from_block, to_block):
+    """
+    Fetch the logs of `address` matching `topics` in ranges of `LOG_BLOCK_RANGE`
+    blocks, sorted in the order they were emitted.
+    """
+    logs = []
+    for start in range(from_block, to_block + 1, LOG_BLOCK_RANGE):
+        end = min(start + LOG_BLOCK_RANGE - 1, to_block)
+        logs += web3.eth.get_logs({"address": address, "fromBlock": start, "toBlock": end, "topics": topics})
+    return sorted(logs, key=lambda k: (k["blockNumber"], k["logIndex"]))
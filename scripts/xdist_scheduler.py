@@ -0,0 +1,71 @@
+"""
+Duration-aware scheduling for parallel test runs with pytest-xdist.
+
+Brownie distributes tests to xdist workers one module at a time, in collection
+order. A slow module that is collected last can leave one worker running long
+after the others have finished. `DurationScheduling` instead hands out modules
+longest-first, using the durations recorded by a previous run with
+`--store-durations`, so that the total time is spread evenly across workers.
+"""
+
+import json
+from pathlib import Path
+
+from xdist.scheduler import LoadFileScheduling
+
+DURATIONS_PATH = Path(__file__).parent.parent.joinpath(".test-durations.json")
+
+
+def load_durations(path=DURATIONS_PATH):
+    """Load recorded module durations as a dict of `{module path: seconds}`."""
+    try:
+        with Path(path).open() as fp:
+            return json.load(fp)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def store_durations(durations, path=DURATIONS_PATH):
+    """Merge `durations` into the recorded module durations."""
+    recorded = load_durations(path)
+    recorded.update(durations)
+    with Path(path).open("w") as fp:
+        json.dump(recorded, fp, indent=2, sort_keys=True)
+
+
+class DurationScheduling(LoadFileScheduling):
+    """
+    Module scheduling that assigns the longest remaining module first.
+
+    Modules without a recorded duration are estimated from their number of tests
+    and the average recorded duration per test.
+    """
+
+    def __init__(self, config, log=None, durations=None):
+        super().__init__(config, log)
+        self.durations = load_durations() if durations is None else durations
+        self._test_count = {}
+        self._per_test = 0
+
+    def schedule(self):
+        if self.collection is None and self.collection_is_completed:
+            collection = next(iter(self.registered_collections.values()), [])
+            for nodeid in collection:
+                scope = self._split_scope(nodeid)
+                self._test_count[scope] = self._test_count.get(scope, 0) + 1
+            known = [i for i in self._test_count if i in self.durations]
+            if known:
+                total = sum(self.durations[i] for i in known)
+                self._per_test = total / sum(self._test_count[i] for i in known)
+        super().schedule()
+
+    def estimate(self, scope):
+        if scope in self.durations:
+            return self.durations[scope]
+        return self._test_count.get(scope, 0) * self._per_test
+
+    def _assign_work_unit(self, node):
+        # move the longest remaining module to the front of the queue
+        scope = max(self.workqueue, key=self.estimate)
+        self.workqueue.move_to_end(scope, last=False)
+        super()._assign_work_unit(node)
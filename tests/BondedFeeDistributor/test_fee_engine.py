@@ -0,0 +1,94 @@
+import pytest
+from brownie import chain
+
+from scripts.fee_engine import FeeEngine, load_engine
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, epx, depx, locker1, fee1, fee2, eps_fee_distro, deployer, alice, bob, charlie, bonded_distro):
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    for acct in [alice, bob, charlie]:
+        depx.deposit(acct, 10**21, False, {'from': locker1})
+        depx.approve(bonded_distro, 2**256-1, {'from': acct})
+
+    for fee in [fee1, fee2]:
+        fee.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+        fee._mint_for_testing(deployer, 10**24)
+
+
+def fee_delta(bonded_distro, token, tx):
+    # fees received by `tx`, including any fetched from Ellipsis during a claim
+    week = (tx.timestamp - bonded_distro.startTime()) // 604800
+    before = bonded_distro.weeklyFeeAmounts(token, week, block_identifier=tx.block_number - 1)
+    return bonded_distro.weeklyFeeAmounts(token, week) - before
+
+
+def test_loaded_state_matches_claims(bonded_distro, eps_fee_distro, fee1, fee2, alice, bob, charlie, deployer, advance_week):
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    eps_fee_distro.depositFee(fee2, 3 * 10**18, {'from': deployer})
+    advance_week()
+    bonded_distro.deposit(alice, 10**21, {'from': alice})
+    chain.sleep(86400)
+    bonded_distro.fetchEllipsisFees([fee1, fee2], {'from': deployer})
+    bonded_distro.deposit(bob, 3 * 10**20 + 7, {'from': bob})
+    advance_week()
+    chain.sleep(86400 * 2)
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    bonded_distro.fetchEllipsisFees([fee1, fee2], {'from': deployer})
+    advance_week(2)
+    chain.sleep(86400 * 3)
+
+    # claims partway through the week, a second claim within the same week,
+    # a claim after several full weeks and a user that never deposited
+    for user, sleep in [(alice, 0), (bob, 3600), (alice, 86400), (charlie, 0)]:
+        chain.sleep(sleep)
+        engine = load_engine(bonded_distro, [alice, bob, charlie], [fee1, fee2], block=chain.height)
+        tx = bonded_distro.claim(user, [fee1, fee2], {'from': user})
+        assert list(engine.claimable(tx.timestamp)[engine.users.index(user)]) == tx.return_value
+
+
+def test_mirrored_actions_match_claims(bonded_distro, eps_fee_distro, fee1, fee2, alice, bob, deployer, advance_week):
+    engine = FeeEngine(bonded_distro.startTime())
+    tokens = [fee1, fee2]
+
+    def fetch():
+        tx = bonded_distro.fetchEllipsisFees(tokens, {'from': deployer})
+        for token in tokens:
+            engine.add_fees(token, fee_delta(bonded_distro, token, tx), tx.timestamp)
+
+    def claim(user):
+        tx = bonded_distro.claim(user, tokens, {'from': user})
+        assert engine.claim(user, tokens, tx.timestamp) == tx.return_value
+        for token in tokens:
+            engine.add_fees(token, fee_delta(bonded_distro, token, tx), tx.timestamp)
+
+    tx = bonded_distro.deposit(alice, 10**21, {'from': alice})
+    engine.deposit(alice, 10**21, tx.timestamp)
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    advance_week()
+    fetch()
+    tx = bonded_distro.deposit(bob, 5 * 10**20, {'from': bob})
+    engine.deposit(bob, 5 * 10**20, tx.timestamp)
+    claim(alice)
+
+    advance_week()
+    chain.sleep(86400 * 2)
+    eps_fee_distro.depositFee(fee2, 2 * 10**18, {'from': deployer})
+    claim(alice)
+    chain.sleep(3600)
+    claim(bob)
+
+    chain.sleep(86400 * 8)
+    tx = bonded_distro.initiateUnbondingStream(10**20, {'from': bob})
+    engine.initiate_unbonding_stream(bob, 10**20, tx.timestamp)
+    advance_week(3)
+    chain.sleep(86400)
+    fetch()
+    for user in [alice, bob, alice]:
+        chain.sleep(7200)
+        claim(user)
+
+    # weeks without any actions are projected from the existing state
+    advance_week(2)
+    chain.sleep(86400 * 4)
+    claim(bob)
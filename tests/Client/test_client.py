@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from brownie import chain, web3
+from brownie._config import CONFIG
+
+from scripts.client import DotDotClient, LpPosition
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, staker, locker, voter, bonded_distro, epx, depx, ddd, fee1, eps_fee_distro, token_3eps, token_abnb, alice, bob, locker1, deployer, advance_week):
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    fee1.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+    fee1._mint_for_testing(deployer, 10**24)
+
+    for acct in [alice, bob]:
+        for token in [token_3eps, token_abnb]:
+            token.mint(acct, 100 * 10**18, {'from': token.minter()})
+            token.approve(staker, 2**256-1, {'from': acct})
+        ddd.mint(acct, 10**21, {'from': staker})
+        ddd.approve(locker, 2**256-1, {'from': acct})
+        depx.deposit(acct, 10**21, False, {'from': locker1})
+        depx.approve(bonded_distro, 2**256-1, {'from': acct})
+
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_abnb, 3 * 10**18, {'from': bob})
+    locker.lock(alice, 10**21, 10, {'from': alice})
+    bonded_distro.deposit(alice, 10**21, {'from': alice})
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    advance_week()
+    chain.mine(timedelta=86400)
+    bonded_distro.fetchEllipsisFees([fee1], {'from': alice})
+
+
+@pytest.fixture(params=["batch", "multicall"])
+def multicall(request):
+    if request.param == "batch":
+        return None
+    # deployed by `dotdot_setup` before the session snapshot, so it is never reverted
+    return CONFIG.active_network["multicall2"]
+
+
+@pytest.fixture
+def contracts(staker, locker, voter, bonded_distro, ddd_distro):
+    return {i._name: (i.address, i.abi) for i in [staker, locker, voter, bonded_distro, ddd_distro]}
+
+
+def run(contracts, multicall, fn):
+    async def main():
+        async with DotDotClient(web3.provider.endpoint_uri, contracts, multicall=multicall, head_interval=3600) as client:
+            return await fn(client)
+
+    return asyncio.run(main())
+
+
+def test_lp_positions(contracts, multicall, staker, token_3eps, token_abnb, alice):
+    pools = [token_3eps, token_abnb]
+    positions = run(contracts, multicall, lambda client: client.lp_positions(alice, pools))
+    claimable = staker.claimable(alice, pools)
+
+    assert positions[0] == LpPosition(token_3eps.address, 4 * 10**18, *claimable[0], ())
+    assert positions[1] == LpPosition(token_abnb.address, 0, *claimable[1], ())
+
+
+def test_bonded_and_lock_positions(contracts, multicall, bonded_distro, locker, fee1, alice):
+    async def fn(client):
+        return await asyncio.gather(client.bonded_position(alice, [fee1]), client.lock_position(alice))
+
+    bonded, lock = run(contracts, multicall, fn)
+
+    assert bonded.balance == bonded_distro.bondedBalance(alice) == 10**21
+    assert bonded.unbondable == bonded_distro.unbondableBalance(alice)
+    assert bonded.claimable == {fee1.address: bonded_distro.claimable(alice, [fee1])[0]}
+    assert lock.balance == locker.userBalance(alice) == 10**21
+    assert lock.weight == locker.userWeight(alice)
+
+
+def test_weekly_data(contracts, multicall, bonded_distro, locker, fee1, alice):
+    week = locker.getWeek()
+    weeks = list(range(week - 1, week + 3))
+
+    async def fn(client):
+        return await asyncio.gather(client.lock_weeks(alice, weeks), client.weekly_fees([fee1], weeks))
+
+    lock_weeks, fees = run(contracts, multicall, fn)
+
+    for i, week in zip(lock_weeks, weeks):
+        assert i.weight == locker.weeklyWeightOf(alice, week)
+        assert i.unlocks == locker.weeklyUnlocksOf(alice, week)
+        assert i.total_weight == locker.weeklyTotalWeight(week)
+    assert fees == {fee1.address: [bonded_distro.weeklyFeeAmounts(fee1, i) for i in weeks]}
+
+
+def test_cached_until_new_head(contracts, multicall, staker, token_3eps, alice):
+    async def fn(client):
+        lp_depositor = client.contracts["LpDepositor"]
+        first = await lp_depositor.totalBalances(token_3eps)
+        count = client.rpc.request_count
+        assert await lp_depositor.totalBalances(token_3eps) == first
+        assert client.rpc.request_count == count
+
+        await asyncio.to_thread(staker.deposit, alice, token_3eps, 10**18, {'from': alice})
+        assert await lp_depositor.totalBalances(token_3eps) == first
+        await client.rpc.update_head()
+        assert await lp_depositor.totalBalances(token_3eps) == first + 10**18
+        return first
+
+    assert run(contracts, multicall, fn) == 4 * 10**18
+
+
+def test_batched(contracts, multicall, staker, token_3eps, token_abnb, alice, bob, charlie):
+    users = [alice, bob, charlie]
+    pools = [token_3eps, token_abnb]
+
+    async def fn(client):
+        count = client.rpc.request_count
+        results = await asyncio.gather(*(client.lp_positions(i, pools) for i in users))
+        return results, client.rpc.request_count - count
+
+    results, request_count = run(contracts, multicall, fn)
+
+    assert request_count == 1
+    for user, positions in zip(users, results):
+        assert [i.balance for i in positions] == [staker.userBalances(user, i) for i in pools]
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+
+from scripts.client import AsyncRpc
+
+
+class FailingNode:
+    """
+    Local JSON-RPC node that answers `eth_blockNumber`, and answers any batch
+    containing another method with `status` and `body`.
+    """
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if all(i["method"] == "eth_blockNumber" for i in payload):
+                    status, body = 200, [{"jsonrpc": "2.0", "id": i["id"], "result": "0x1"} for i in payload]
+                else:
+                    status, body = node.status, node.body(payload) if callable(node.body) else node.body
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def failing_node():
+    nodes = []
+
+    def start(status, body):
+        nodes.append(FailingNode(status, body))
+        return nodes[-1]
+
+    yield start
+    for node in nodes:
+        node.stop()
+
+
+def call_all(url, count=3):
+    async def run():
+        rpc = AsyncRpc(url)
+        await rpc.start(follow_heads=False)
+        try:
+            requests = [rpc.request("eth_call", [{}, "latest"]) for i in range(count)]
+            # a request that is never resolved fails the test instead of hanging it
+            return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 10)
+        finally:
+            await rpc.close()
+
+    return asyncio.run(run())
+
+
+def test_rejected_batch(failing_node):
+    error = {"jsonrpc": "2.0", "id": None, "error": {"code": -32005, "message": "batch too large"}}
+    node = failing_node(200, error)
+    results = call_all(node.url)
+
+    assert all(isinstance(i, ValueError) and "batch too large" in str(i) for i in results)
+
+
+def test_http_error(failing_node):
+    node = failing_node(429, {"error": "Too many requests"})
+    results = call_all(node.url)
+
+    assert all(isinstance(i, aiohttp.ClientResponseError) and i.status == 429 for i in results)
+
+
+def test_unmatched_ids(failing_node):
+    node = failing_node(200, lambda payload: [{"jsonrpc": "2.0", "id": i["id"] + 1000, "result": "0x"} for i in payload])
+    results = call_all(node.url)
+
+    assert all(isinstance(i, ValueError) and "No response" in str(i) for i in results)
+
+
+def test_partial_response(failing_node):
+    node = failing_node(200, lambda payload: [{"jsonrpc": "2.0", "id": payload[0]["id"], "result": "0x01"}])
+    results = call_all(node.url)
+
+    assert results[0] == "0x01"
+    assert all(isinstance(i, ValueError) and "No response" in str(i) for i in results[1:])
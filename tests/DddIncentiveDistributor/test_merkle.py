@@ -0,0 +1,260 @@
+import brownie
+import pytest
+from brownie import chain
+
+from scripts.bribe_merkle import add_shares, build_distribution, build_tree, read_week, weekly_shares
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, epx, early_incentives, alice, bob, locker1, fee1, fee2, deployer, ddd_distro, advance_week):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(alice, 10**24, {'from': locker1})
+    early_incentives.deposit(bob, 3 * 10**24, {'from': locker1})
+
+    for token in [fee1, fee2]:
+        token._mint_for_testing(deployer, 10**24)
+        token.approve(ddd_distro, 2**256-1, {'from': deployer})
+
+
+@pytest.fixture(scope="module")
+def deploy_merkle_distro(DddIncentiveDistributor, eps_voter, locker, voter, fee1, fee2, deployer):
+    def deploy(start_offset=0):
+        distro = DddIncentiveDistributor.deploy(eps_voter, {'from': deployer})
+        distro.setMerkleMode(deployer, distro.getVotingWeek() + start_offset, {'from': deployer})
+        distro.setAddresses(locker, voter, {'from': deployer})
+        for token in [fee1, fee2]:
+            token.approve(distro, 2**256-1, {'from': deployer})
+        return distro
+
+    return deploy
+
+
+@pytest.fixture(scope="module")
+def merkle_distro(deploy_merkle_distro):
+    return deploy_merkle_distro()
+
+
+@pytest.fixture
+def voters(token_3eps, alice, bob):
+    return {token_3eps.address: [alice.address, bob.address]}
+
+
+def _claim(distro, data, user):
+    claim = data["claims"][user.address]
+    return distro.claimMerkle(user, claim["tokens"], claim["amounts"], claim["proof"], {'from': user})
+
+
+def test_shares_match_claimable(ddd_distro, voter, voters, alice, bob, fee1, fee2, token_3eps, deployer, advance_week):
+    week = ddd_distro.getVotingWeek()
+    ddd_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    ddd_distro.depositIncentive(token_3eps, fee2, 10**18 + 7, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+    voter.vote([token_3eps], [300], {'from': bob})
+
+    advance_week()
+    ddd_distro.depositIncentive(token_3eps, fee1, 3 * 10**18 + 1, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [200], {'from': alice})
+    voter.vote([token_3eps], [100], {'from': bob})
+
+    # at the start of a week, `claimable` includes every week prior to the last one
+    advance_week(2)
+    cumulative = {}
+    for i in [week, week + 1]:
+        add_shares(cumulative, weekly_shares(*read_week(ddd_distro, voter, i, voters)))
+
+    for user in [alice, bob]:
+        expected = [cumulative[user.address].get(i.address, 0) for i in [fee1, fee2]]
+        assert ddd_distro.claimable(user, token_3eps, [fee1, fee2]) == expected
+
+
+def test_claim_merkle(merkle_distro, voter, voters, alice, bob, fee1, fee2, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    merkle_distro.depositIncentive(token_3eps, fee2, 2 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+    voter.vote([token_3eps], [300], {'from': bob})
+
+    advance_week()
+    data = build_distribution(merkle_distro, voter, week, voters)
+    merkle_distro.setMerkleRoot(data["merkleRoot"], week, {'from': deployer})
+
+    _claim(merkle_distro, data, alice)
+    assert fee1.balanceOf(alice) == 10**18
+    assert fee2.balanceOf(alice) == 5 * 10**17
+
+    # repeating a claim transfers nothing
+    tx = _claim(merkle_distro, data, alice)
+    assert tx.return_value == [0, 0]
+    assert fee1.balanceOf(alice) == 10**18
+
+    _claim(merkle_distro, data, bob)
+    assert fee1.balanceOf(bob) == 3 * 10**18
+    assert fee2.balanceOf(bob) == 15 * 10**17
+
+    # bribes distributed via merkle root are not claimable via `claim`
+    advance_week()
+    assert merkle_distro.claimable(alice, token_3eps, [fee1, fee2]) == [0, 0]
+
+
+def test_cumulative_roots(merkle_distro, voter, voters, alice, bob, fee1, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+    voter.vote([token_3eps], [300], {'from': bob})
+
+    advance_week()
+    first = build_distribution(merkle_distro, voter, week, voters)
+    merkle_distro.setMerkleRoot(first["merkleRoot"], week, {'from': deployer})
+    _claim(merkle_distro, first, bob)
+
+    merkle_distro.depositIncentive(token_3eps, fee1, 6 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+    voter.vote([token_3eps], [100], {'from': bob})
+
+    advance_week()
+    second = build_distribution(merkle_distro, voter, week + 1, voters, previous=first)
+    assert second == build_distribution(merkle_distro, voter, week + 1, voters)
+    merkle_distro.setMerkleRoot(second["merkleRoot"], week + 1, {'from': deployer})
+
+    # a single claim covers both weeks
+    _claim(merkle_distro, second, alice)
+    assert fee1.balanceOf(alice) == 4 * 10**18
+    _claim(merkle_distro, second, bob)
+    assert fee1.balanceOf(bob) == 6 * 10**18
+
+
+def test_invalid_proof(merkle_distro, voter, voters, alice, fee1, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+
+    advance_week()
+    data = build_distribution(merkle_distro, voter, week, voters)
+    merkle_distro.setMerkleRoot(data["merkleRoot"], week, {'from': deployer})
+
+    claim = data["claims"][alice.address]
+    with brownie.reverts("Invalid proof"):
+        merkle_distro.claimMerkle(alice, claim["tokens"], [5 * 10**18], claim["proof"], {'from': alice})
+
+
+def test_exceeds_merkle_incentives(merkle_distro, alice, fee1, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    # fees for lockers are held by the same contract, but cannot be claimed via merkle root
+    merkle_distro.depositIncentive(brownie.ZERO_ADDRESS, fee1, 10**20, {'from': deployer})
+
+    advance_week()
+    root, claims = build_tree({alice.address: {fee1.address: 5 * 10**18}})
+    merkle_distro.setMerkleRoot(root, week, {'from': deployer})
+
+    claim = claims[alice.address]
+    with brownie.reverts("Exceeds merkle incentives"):
+        merkle_distro.claimMerkle(alice, claim["tokens"], claim["amounts"], claim["proof"], {'from': alice})
+
+
+def test_set_merkle_root(merkle_distro, alice, fee1, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    root, _ = build_tree({alice.address: {fee1.address: 1}})
+
+    with brownie.reverts("Invalid week"):
+        merkle_distro.setMerkleRoot(root, week, {'from': deployer})
+
+    advance_week()
+    with brownie.reverts("Only root setter"):
+        merkle_distro.setMerkleRoot(root, week, {'from': alice})
+
+    merkle_distro.setMerkleRoot(root, week, {'from': deployer})
+    with brownie.reverts("Invalid week"):
+        merkle_distro.setMerkleRoot(root, week - 1, {'from': deployer})
+
+    merkle_distro.setMerkleRootSetter(alice, {'from': deployer})
+    advance_week()
+    merkle_distro.setMerkleRoot(root, week + 1, {'from': alice})
+    assert merkle_distro.merkleRootWeek() == week + 1
+    with brownie.reverts("Week already published"):
+        merkle_distro.setMerkleRoot(root, week, {'from': alice})
+
+
+def test_replace_root_before_claims(merkle_distro, alice, bob, fee1, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+
+    advance_week()
+    wrong, _ = build_tree({alice.address: {fee1.address: 4 * 10**18}})
+    merkle_distro.setMerkleRoot(wrong, week, {'from': deployer})
+
+    # the root for the same week can be corrected until a claim is paid under it
+    root, claims = build_tree({alice.address: {fee1.address: 10**18}, bob.address: {fee1.address: 3 * 10**18}})
+    merkle_distro.setMerkleRoot(root, week, {'from': deployer})
+    assert merkle_distro.merkleRoot() == root
+
+    claim = claims[alice.address]
+    merkle_distro.claimMerkle(alice, claim["tokens"], claim["amounts"], claim["proof"], {'from': alice})
+    assert fee1.balanceOf(alice) == 10**18
+    with brownie.reverts("Week already published"):
+        merkle_distro.setMerkleRoot(wrong, week, {'from': deployer})
+
+
+def test_corrected_root_below_claimed(merkle_distro, alice, fee1, fee2, token_3eps, deployer, advance_week):
+    week = merkle_distro.merkleStartWeek()
+    merkle_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    merkle_distro.depositIncentive(token_3eps, fee2, 10**18, {'from': deployer})
+
+    advance_week()
+    root, claims = build_tree({alice.address: {fee1.address: 3 * 10**18}})
+    merkle_distro.setMerkleRoot(root, week, {'from': deployer})
+    claim = claims[alice.address]
+    merkle_distro.claimMerkle(alice, claim["tokens"], claim["amounts"], claim["proof"], {'from': alice})
+
+    # a later root lowers the cumulative amount below what was already claimed
+    advance_week()
+    root, claims = build_tree({alice.address: {fee1.address: 2 * 10**18, fee2.address: 10**18}})
+    merkle_distro.setMerkleRoot(root, week + 1, {'from': deployer})
+    claim = claims[alice.address]
+    tx = merkle_distro.claimMerkle(alice, claim["tokens"], claim["amounts"], claim["proof"], {'from': alice})
+
+    assert dict(zip(claim["tokens"], tx.return_value)) == {fee1.address: 0, fee2.address: 10**18}
+    assert fee1.balanceOf(alice) == 3 * 10**18
+    assert fee2.balanceOf(alice) == 10**18
+    assert merkle_distro.merkleClaimed(alice, fee1) == 3 * 10**18
+
+
+def test_set_merkle_mode_after_setup(merkle_distro, alice, deployer):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        merkle_distro.setMerkleMode(alice, merkle_distro.getVotingWeek() + 1, {'from': deployer})
+
+
+def test_bribes_before_start_week(deploy_merkle_distro, voter, voters, alice, bob, fee1, token_3eps, deployer, advance_week):
+    distro = deploy_merkle_distro(start_offset=1)
+    week = distro.getVotingWeek()
+    distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+    voter.vote([token_3eps], [300], {'from': bob})
+
+    advance_week()
+    distro.depositIncentive(token_3eps, fee1, 8 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': alice})
+
+    advance_week()
+    data = build_distribution(distro, voter, week + 1, voters)
+    assert data["claims"][alice.address]["amounts"] == [str(8 * 10**18)]
+    assert bob.address not in data["claims"]
+
+    # bribes from the week before merkle mode begins are still paid by `claim`
+    distro.claim(alice, token_3eps, [fee1], {'from': alice})
+    distro.claim(bob, token_3eps, [fee1], {'from': bob})
+    assert fee1.balanceOf(alice) == 10**18
+    assert fee1.balanceOf(bob) == 3 * 10**18
+
+    distro.setMerkleRoot(data["merkleRoot"], week + 1, {'from': deployer})
+    _claim(distro, data, alice)
+    assert fee1.balanceOf(alice) == 9 * 10**18
@@ -0,0 +1,35 @@
+import brownie
+import pytest
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, ddd, wbnb, ddd_pool, alice, staker, signer):
+    ddd.mint(ddd_pool, 10**19, {'from': staker})
+    wbnb.deposit({'from': alice, 'value': "10 ether"})
+    wbnb.transfer(ddd_pool, 10**19, {'from': alice})
+    ddd_pool.mint(signer, {'from': alice})
+
+
+def test_deposit_with_permit(ddd_pool, ddd_lp_staker, signer, sign_permit):
+    initial = ddd_pool.balanceOf(signer)
+    deadline, v, r, s = sign_permit(ddd_pool, signer, ddd_lp_staker, 10**18)
+    ddd_lp_staker.depositWithPermit(signer, 10**18, False, deadline, v, r, s, {'from': signer})
+
+    assert ddd_pool.balanceOf(signer) == initial - 10**18
+    assert ddd_lp_staker.balanceOf(signer) == 10**18 * 0.98
+    assert ddd_pool.allowance(signer, ddd_lp_staker) == 0
+
+
+def test_deposit_with_permit_front_run(ddd_pool, ddd_lp_staker, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(ddd_pool, signer, ddd_lp_staker, 10**18)
+    ddd_pool.permit(signer, ddd_lp_staker, 10**18, deadline, v, r, s, {'from': alice})
+    ddd_lp_staker.depositWithPermit(signer, 10**18, False, deadline, v, r, s, {'from': signer})
+
+    assert ddd_lp_staker.balanceOf(signer) == 10**18 * 0.98
+
+
+def test_deposit_with_invalid_permit(ddd_pool, ddd_lp_staker, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(ddd_pool, signer, alice, 10**18)
+
+    with brownie.reverts("Permit failed"):
+        ddd_lp_staker.depositWithPermit(signer, 10**18, False, deadline, v, r, s, {'from': signer})
@@ -0,0 +1,139 @@
+import csv
+import json
+
+import pytest
+from brownie import ZERO_ADDRESS, chain
+
+from scripts.epoch_report import WEEK, EpochReport, read_bonded_fees, write_reports
+from scripts.indexer import EventIndexer
+
+
+def get_timestamp(block):
+    return chain[block].timestamp
+
+
+@pytest.fixture(scope="module")
+def start_block(dotdot_setup):
+    return chain.height + 1
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(start_block, staker, locker, voter, bonded_distro, ddd_distro, early_incentives, eps_fee_distro, epx, depx, ddd, fee1, token_3eps, token_abnb, alice, bob, locker1, deployer, advance_week):
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    fee1._mint_for_testing(deployer, 10**24)
+    fee1.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+    fee1.approve(ddd_distro, 2**256-1, {'from': deployer})
+
+    ddd.mint(alice, 10**21, {'from': staker})
+    ddd.approve(locker, 2**256-1, {'from': alice})
+    locker.lock(alice, 10**21, locker.MAX_LOCK_WEEKS(), {'from': alice})
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    advance_week()
+
+    ddd_distro.depositIncentive(token_3eps, fee1, 4 * 10**18, {'from': deployer})
+    ddd_distro.depositIncentive(token_abnb, fee1, 10**18 + 3, {'from': deployer})
+    ddd_distro.depositIncentive(ZERO_ADDRESS, fee1, 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+    voter.vote([token_3eps], [voter.availableVotes(alice)], {'from': alice})
+    bonded_distro.fetchEllipsisFees([fee1], {'from': deployer})
+    advance_week()
+
+    ddd_distro.depositIncentive(token_abnb, fee1, 2 * 10**18, {'from': deployer})
+    chain.sleep(86400 * 4)
+    voter.vote([token_abnb], [40], {'from': locker1})
+    voter.vote([token_3eps, token_abnb], [10, 30], {'from': locker1})
+    ddd.mint(bob, 10**20, {'from': staker})
+    advance_week()
+    chain.mine(timedelta=3600)
+
+
+@pytest.fixture(scope="module")
+def contracts(staker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, core_incentives, ddd):
+    return [staker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, core_incentives, ddd]
+
+
+@pytest.fixture(scope="module")
+def indexer(tmp_path_factory, start_block, contracts):
+    indexer = EventIndexer(
+        tmp_path_factory.mktemp("epochs").joinpath("events.db"),
+        {i._name: (i.address, i.abi) for i in contracts},
+        start_block=start_block,
+    )
+    indexer.sync()
+    yield indexer
+    indexer.close()
+
+
+@pytest.fixture
+def report(contracts, voter):
+    return EpochReport({i._name: i.address for i in contracts}, voter.startTime())
+
+
+def test_matches_chain(report, indexer, start_block, voter, bonded_distro, ddd_distro, ddd, fee1, token_3eps, token_abnb):
+    report.update(indexer.events(), indexer.checkpoint, get_timestamp)
+    week_offset = (voter.startTime() - bonded_distro.startTime()) // WEEK
+    weeks = report.pending_fee_weeks()
+    for week, amounts in read_bonded_fees(bonded_distro, weeks, week_offset).items():
+        report.set_bonded_fees(week, amounts)
+
+    assert report.current_week == voter.getWeek()
+    assert report.pending_fee_weeks() == []
+    for week in weeks:
+        data = report.report(week)
+        assert int(data["epsVoteRatio"]) == voter.epsVoteRatio(week)
+        for token in [token_3eps, token_abnb]:
+            pool = data["pools"].get(token.address, {"votes": "0", "bribes": {}})
+            assert int(pool["votes"]) == voter.tokenVotes(token, week)
+            assert int(pool["bribes"].get(fee1.address, 0)) == ddd_distro.weeklyIncentiveAmounts(token, fee1, week)
+        assert int(data["lockerFees"].get(fee1.address, 0)) == ddd_distro.weeklyIncentiveAmounts(ZERO_ADDRESS, fee1, week)
+        assert int(data["bondedFees"].get(fee1.address, 0)) == bonded_distro.weeklyFeeAmounts(fee1, week + week_offset)
+
+    assert sum(i["votes"].get(token_abnb.address, 0) for i in report.weeks.values()) == 25 + 70
+    assert sum(i["bribes"].get(token_abnb.address, {}).get(fee1.address, 0) for i in report.weeks.values()) == 3 * 10**18 + 3
+
+    minted = {}
+    for data in report.weeks.values():
+        for minter, amount in data["dddMinted"].items():
+            minted[minter] = minted.get(minter, 0) + amount
+    assert sum(minted.values()) == ddd.totalSupply() - ddd.totalSupply(block_identifier=start_block - 1)
+    assert minted["LpDepositor"] == 10**21 + 10**20
+    assert minted["EpxDepositIncentives"] > 0
+
+
+def test_incremental(report, indexer, contracts, voter):
+    middle = (indexer.checkpoint + indexer.start_block) // 2
+    report.update(indexer.events(to_block=middle), middle, get_timestamp)
+    middle_week = report.current_week
+
+    # reload from the saved state and process the remaining blocks
+    state = json.loads(json.dumps(report.get_state()))
+    incremental = EpochReport({i._name: i.address for i in contracts}, voter.startTime(), state)
+    incremental.update(indexer.events(from_block=middle + 1), indexer.checkpoint, get_timestamp)
+    assert min(incremental.updated) >= middle_week - 1
+
+    full = EpochReport({i._name: i.address for i in contracts}, voter.startTime())
+    full.update(indexer.events(), indexer.checkpoint, get_timestamp)
+    assert incremental.get_state() == full.get_state()
+
+    # no new blocks, nothing to process
+    incremental.updated.clear()
+    incremental.update([], indexer.checkpoint, get_timestamp)
+    assert incremental.updated == set()
+
+
+def test_write_reports(tmp_path, report, indexer, token_3eps):
+    report.update(indexer.events(), indexer.checkpoint, get_timestamp)
+    write_reports(report, tmp_path)
+
+    with tmp_path.joinpath("state.json").open() as fp:
+        assert EpochReport(report.addresses, report.start_time, json.load(fp)).get_state() == report.get_state()
+    for week in report.updated:
+        with tmp_path.joinpath(f"week-{week}.json").open() as fp:
+            assert json.load(fp) == json.loads(json.dumps(report.report(week)))
+
+    with tmp_path.joinpath("weeks.csv").open() as fp:
+        rows = list(csv.DictReader(fp))
+    votes = [i for i in rows if i["metric"] == "votes" and i["key"] == token_3eps.address]
+    assert sum(int(i["value"]) for i in votes) == sum(i["votes"].get(token_3eps.address, 0) for i in report.weeks.values())
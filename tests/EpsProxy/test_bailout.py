@@ -20,6 +20,8 @@ def test_bailout(EmergencyBailout, staker, alice, charlie, token_3eps, bob, prox
 
     bailout = EmergencyBailout.at(proxy.emergencyBailout(staker, token_3eps))
 
+    assert bailout.token() == token_3eps
+    assert bailout.lpDepositor() == staker
     assert token_3eps.balanceOf(bailout) == 3 * 10**18
 
     bailout.withdraw(alice, {'from': alice})
@@ -0,0 +1,126 @@
+import brownie
+import pytest
+from brownie import chain
+
+from scripts.bailout import build_bailout_tree, build_tree, distribute_bailout
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, DepositToken, token_3eps, accounts, alice, bob, charlie, staker):
+    start_block = chain.height
+    token_3eps.mint(alice, 100 * 10**18, {'from': token_3eps.minter()})
+    token_3eps.approve(staker, 2**256-1, {'from': alice})
+    for i, acct in enumerate(accounts[1:8], start=1):
+        staker.deposit(acct, token_3eps, i * 10**18, {'from': alice})
+    staker.withdraw(alice, token_3eps, 10**17, {'from': alice})
+    deposit_token = DepositToken.at(staker.depositTokens(token_3eps))
+    deposit_token.transfer(accounts[9], 10**18, {'from': bob})
+    return start_block
+
+
+@pytest.fixture(scope="module")
+def bailout(setup, EmergencyBailout, proxy, staker, token_3eps, deployer):
+    proxy.emergencyWithdraw(token_3eps, {'from': deployer})
+    return EmergencyBailout.at(proxy.emergencyBailout(staker, token_3eps))
+
+
+@pytest.fixture(scope="module", params=["storage", "events"])
+def tree(request, setup, bailout, staker, token_3eps):
+    return build_bailout_tree(staker, token_3eps, request.param, from_block=setup)
+
+
+def test_tree_balances(tree, bailout, staker, token_3eps, accounts):
+    assert tree["bailout"] == bailout
+    assert len(tree["claims"]) == 8
+    for acct in accounts[1:10]:
+        amount = int(tree["claims"].get(acct.address, {"amount": 0})["amount"])
+        assert amount == staker.userBalances(acct, token_3eps)
+    assert int(tree["total"]) == token_3eps.balanceOf(bailout)
+
+
+def test_withdraw_many(tree, bailout, token_3eps, accounts, deployer, charlie):
+    bailout.setMerkleRoot(tree["merkleRoot"], {'from': deployer})
+
+    users = list(tree["claims"])
+    amounts = [tree["claims"][i]["amount"] for i in users]
+    proofs = [tree["claims"][i]["proof"] for i in users]
+    bailout.withdrawMany(users, amounts, proofs, {'from': charlie})
+
+    for user, amount in zip(users, amounts):
+        assert token_3eps.balanceOf(user) == int(amount)
+        assert bailout.hasWithdrawn(user)
+    assert token_3eps.balanceOf(bailout) == 0
+
+
+def test_distribute(tree, bailout, token_3eps, deployer):
+    user = list(tree["claims"])[2]
+    bailout.withdraw(user, {'from': deployer})
+
+    txs = distribute_bailout(tree, deployer, batch_size=3)
+
+    assert len(txs) == 3
+    assert bailout.merkleRoot() == tree["merkleRoot"]
+    assert token_3eps.balanceOf(bailout) == 0
+
+
+def test_skips_withdrawn(tree, bailout, token_3eps, deployer, charlie):
+    bailout.setMerkleRoot(tree["merkleRoot"], {'from': deployer})
+    users = list(tree["claims"])[:2]
+    bailout.withdraw(users[0], {'from': charlie})
+
+    amounts = [tree["claims"][i]["amount"] for i in users]
+    proofs = [tree["claims"][i]["proof"] for i in users]
+    tx = bailout.withdrawMany(users, amounts, proofs, {'from': charlie})
+
+    assert len(tx.events['Withdraw']) == 1
+    assert token_3eps.balanceOf(users[0]) == int(amounts[0])
+    assert token_3eps.balanceOf(users[1]) == int(amounts[1])
+
+
+def test_invalid_proof(tree, bailout, deployer, charlie):
+    bailout.setMerkleRoot(tree["merkleRoot"], {'from': deployer})
+    user = list(tree["claims"])[0]
+    amount = int(tree["claims"][user]["amount"])
+
+    with brownie.reverts("Invalid proof"):
+        bailout.withdrawMany([user], [amount + 1], [tree["claims"][user]["proof"]], {'from': charlie})
+    with brownie.reverts("Invalid proof"):
+        bailout.withdrawMany([charlie], [amount], [tree["claims"][user]["proof"]], {'from': charlie})
+
+
+def test_root_not_set(tree, bailout, charlie):
+    user = list(tree["claims"])[0]
+    with brownie.reverts("Merkle root not set"):
+        bailout.withdrawMany([user], [tree["claims"][user]["amount"]], [tree["claims"][user]["proof"]], {'from': charlie})
+
+
+def test_set_root_only_admin(tree, bailout, deployer, alice):
+    with brownie.reverts("Only emergency admin"):
+        bailout.setMerkleRoot(tree["merkleRoot"], {'from': alice})
+
+    bailout.setMerkleRoot(tree["merkleRoot"], {'from': deployer})
+    assert bailout.merkleRoot() == tree["merkleRoot"]
+
+
+def test_replace_root_before_use(tree, bailout, deployer, charlie):
+    user = list(tree["claims"])[0]
+    wrong, _ = build_tree({user: int(tree["claims"][user]["amount"]) + 1})
+    bailout.setMerkleRoot(wrong, {'from': deployer})
+
+    # the root can be corrected until a withdrawal is made with it
+    bailout.setMerkleRoot(tree["merkleRoot"], {'from': deployer})
+    bailout.withdrawMany([user], [tree["claims"][user]["amount"]], [tree["claims"][user]["proof"]], {'from': charlie})
+    assert bailout.merkleRootUsed()
+
+    with brownie.reverts("Root already used"):
+        bailout.setMerkleRoot(wrong, {'from': deployer})
+
+
+def test_distribute_replaces_unused_root(tree, bailout, token_3eps, deployer):
+    user = list(tree["claims"])[0]
+    root, _ = build_tree({user: int(tree["claims"][user]["amount"]) + 1})
+    bailout.setMerkleRoot(root, {'from': deployer})
+
+    distribute_bailout(tree, deployer)
+    assert bailout.merkleRoot() == tree["merkleRoot"]
+    assert token_3eps.balanceOf(bailout) == 0
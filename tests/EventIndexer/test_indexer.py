@@ -0,0 +1,68 @@
+import pytest
+from brownie import chain
+
+from scripts.indexer import EventIndexer
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, alice, staker):
+    token_3eps.mint(alice, 100 * 10**18, {'from': token_3eps.minter()})
+    token_3eps.approve(staker, 2**256-1, {'from': alice})
+
+
+@pytest.fixture
+def indexer(tmp_path, staker, proxy, depx, locker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, ddd):
+    contracts = [staker, proxy, depx, locker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, ddd]
+    indexer = EventIndexer(
+        tmp_path.joinpath("events.db"),
+        {i._name: (i.address, i.abi) for i in contracts},
+        start_block=chain.height + 1,
+    )
+    yield indexer
+    indexer.close()
+
+
+def test_index_events(indexer, staker, token_3eps, alice, bob):
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 2 * 10**18, {'from': alice})
+    staker.withdraw(alice, token_3eps, 10**17, {'from': alice})
+
+    assert indexer.sync() == len(indexer.events())
+    assert indexer.checkpoint == chain.height
+
+    deposits = indexer.events("LpDepositor", "Deposit")
+    assert [i["args"]["receiver"] for i in deposits] == [alice, bob]
+    assert [i["args"]["amount"] for i in deposits] == [str(10**18), str(2 * 10**18)]
+
+    withdrawals = indexer.events("LpDepositor", "Withdraw")
+    assert len(withdrawals) == 1
+    assert int(withdrawals[0]["args"]["amount"]) == 10**17
+
+
+def test_incremental(indexer, staker, token_3eps, alice):
+    tx = staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    count = indexer.sync()
+    assert count > 0
+    assert indexer.sync() == 0
+
+    tx2 = staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    assert indexer.sync() > 0
+    assert len(indexer.events()) > count
+
+    deposits = indexer.events("LpDepositor", "Deposit")
+    assert [i["tx_hash"] for i in deposits] == [tx.txid, tx2.txid]
+
+
+def test_reorg(indexer, staker, token_3eps, alice, bob):
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    indexer.sync()
+
+    # replace the last block with a different transaction at the same height
+    chain.undo()
+    tx = staker.deposit(bob, token_3eps, 10**18, {'from': alice})
+    indexer.sync()
+    assert tx.txid in [i["tx_hash"] for i in indexer.events()]
+
+    deposits = indexer.events("LpDepositor", "Deposit")
+    assert [i["args"]["receiver"] for i in deposits] == [alice, bob]
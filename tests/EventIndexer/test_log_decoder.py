@@ -0,0 +1,72 @@
+import pytest
+from brownie import chain, web3
+
+from scripts.indexer import EventDecoder, _to_json
+from scripts.log_decoder import BulkDecoder, LogBatch, to_address, to_args, to_int
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, staker):
+    for token in [token_3eps, token_abnb]:
+        token.mint(alice, 100 * 10**18, {'from': token.minter()})
+        token.approve(staker, 2**256-1, {'from': alice})
+
+
+@pytest.fixture
+def contracts(staker, proxy, depx, locker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, ddd):
+    contracts = [staker, proxy, depx, locker, voter, bonded_distro, ddd_distro, ddd_lp_staker, early_incentives, ddd]
+    return {i._name: (i.address, i.abi) for i in contracts}
+
+
+def test_matches_event_decoder(contracts, staker, token_3eps, token_abnb, alice, bob):
+    start = chain.height + 1
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    staker.deposit(bob, token_abnb, 2 * 10**18, {'from': alice})
+    chain.mine(timedelta=3600)
+    staker.claim(alice, [token_3eps], 0, {'from': alice})
+    staker.setOperatorApproval(bob, True, {'from': alice})
+
+    logs = web3.eth.get_logs({"address": [i[0] for i in contracts.values()], "fromBlock": start})
+    decoded = BulkDecoder(contracts).decode(LogBatch.from_logs(logs))
+
+    expected = {}
+    for event in filter(None, map(EventDecoder(contracts).decode, logs)):
+        expected.setdefault((event["contract"], event["event"]), []).append(event)
+
+    assert set(decoded) == set(expected)
+    for (contract, name), events in decoded.items():
+        assert list(events.records["block_number"]) == [i["block_number"] for i in expected[(contract, name)]]
+        assert list(events.records["log_index"]) == [i["log_index"] for i in expected[(contract, name)]]
+        args = [{k: _to_json(v) for k, v in i.items()} for i in to_args(events)]
+        assert args == [i["args"] for i in expected[(contract, name)]]
+
+
+def test_dynamic_arrays(contracts, staker, token_3eps, token_abnb, alice, bob):
+    start = chain.height + 1
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    chain.mine(timedelta=3600)
+    staker.claim(alice, [token_3eps, token_abnb], 0, {'from': alice})
+    staker.claim(bob, [token_abnb], 0, {'from': alice})
+    staker.claim(alice, [], 0, {'from': alice})
+
+    logs = web3.eth.get_logs({"address": staker.address, "fromBlock": start})
+    records, arrays, _ = BulkDecoder(contracts).decode(LogBatch.from_logs(logs))[("LpDepositor", "Claimed")]
+
+    offsets, tokens = arrays["tokens"]
+    assert list(offsets) == [0, 2, 3, 3]
+    assert to_address(tokens) == [token_3eps, token_abnb, token_abnb]
+    assert to_address(records["receiver"]) == [alice, bob, alice]
+    assert to_int(records["epxAmount"])[0] > 0
+    assert to_int(records["epxAmount"])[2] == 0
+
+
+def test_skips_unknown_logs(contracts, staker, token_3eps, alice):
+    start = chain.height + 1
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+
+    # the LP token transfer is emitted by a contract the decoder does not know
+    logs = web3.eth.get_logs({"fromBlock": start})
+    decoded = BulkDecoder(contracts).decode(LogBatch.from_logs(logs))
+    assert all(contract in contracts for contract, _ in decoded)
+    assert len(decoded[("LpDepositor", "Deposit")].records) == 1
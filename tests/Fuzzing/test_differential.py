@@ -0,0 +1,319 @@
+"""
+Differential fuzzing of the off-chain models against the deployed contracts.
+
+Random sequences of deposits, withdrawals, deposit transfers, claims, bonding,
+unbonding, locks, votes and time jumps are applied to the contracts and, at the
+same time, to `RewardModel`, `FeeEngine` and the lock and vote mirrors below.
+After every step each balance, claimable amount, lock weight and vote total is
+compared. The comparisons are made in a single batched call via multicall.
+
+The chain is reverted to a snapshot taken after the module setup at the start
+of each run, and the models are loaded from that state, so runs do not repeat
+any setup transactions. The total number of steps is set with `--fuzz-steps`.
+"""
+
+import brownie
+import pytest
+from brownie import ZERO_ADDRESS, chain, interface
+from brownie.test import strategy
+
+from scripts.fee_engine import load_engine
+from scripts.reward_model import LogReplay, RewardModel
+from scripts.simulator import vote_ratio
+
+WEEK = 604800
+STEPS_PER_RUN = 50
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, bob, charlie, locker1, staker, early_incentives, epx, ddd, locker, advance_week, voter):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+
+    for acct in [alice, bob, charlie, locker1]:
+        for token in [token_3eps, token_abnb]:
+            token.mint(acct, 100 * 10**18, {'from': token.minter()})
+            token.approve(staker, 2**256-1, {'from': acct})
+        ddd.approve(locker, 2**256-1, {'from': acct})
+    chain.mine(timedelta=86400 * 2)
+
+
+def _voting_open(timestamp):
+    return timestamp - 86400 * 4 >= timestamp // WEEK * WEEK
+
+
+class StateMachine:
+
+    st_user = strategy("uint8", max_value=3)
+    st_pool = strategy("uint8", max_value=1)
+    st_amount = strategy("uint256", min_value=1, max_value=50 * 10**18)
+    st_pct = strategy("uint8", min_value=1, max_value=100)
+    st_bond = strategy("uint256", max_value=10**20)
+    st_weeks = strategy("uint8", min_value=1, max_value=16)
+    st_time = strategy("uint256", min_value=60, max_value=WEEK * 3)
+
+    def __init__(cls, contracts, users, pools):
+        for name, value in contracts.items():
+            setattr(cls, name, value)
+        cls.users = users
+        cls.pools = pools
+        cls.fee_tokens = [cls.epx, cls.ddd]
+        cls.lp_staker = interface.IEllipsisLpStaking(cls.staker.lpStaker())
+        cls.proxy = cls.staker.proxy()
+        cls.locker_start = cls.locker.startTime()
+        cls.voter_start = cls.voter.startTime()
+        cls.max_lock_weeks = cls.locker.MAX_LOCK_WEEKS()
+        cls.fixed_vote = cls.eps_voter.isApproved(cls.voter.fixedVoteLpToken())
+
+    def setup(self):
+        # the models are loaded from the state of the chain at the start of each run
+        self.model = RewardModel(self.staker.DDD_EARN_RATIO())
+        self.replay = LogReplay(self.model, self.staker, self.lp_staker, self.proxy, self.epx)
+        self.engine = load_engine(self.bonded_distro, self.users, self.fee_tokens, block=chain.height)
+
+        timestamp = chain[-1].timestamp
+        fee_week = self.engine.get_week(timestamp)
+        lock_week = self._lock_week(timestamp)
+        vote_week = self._vote_week(timestamp)
+        weeks = range(lock_week, lock_week + self.max_lock_weeks + 1)
+        with brownie.multicall:
+            fees = {token: self.bonded_distro.weeklyFeeAmounts(token, fee_week) for token in self.fee_tokens}
+            weights = {user: [self.locker.weeklyWeightOf(user, i) for i in weeks] for user in self.users}
+            total_weights = [self.locker.weeklyTotalWeight(i) for i in weeks]
+            ratio = self.voter.epsVoteRatio(vote_week)
+            user_votes = {user: self.voter.userVotes(user, vote_week) for user in self.users}
+            token_votes = {pool: self.voter.tokenVotes(pool, vote_week) for pool in self.pools}
+            balances = {
+                (user, token): token.balanceOf(user)
+                for user in self.users for token in self.pools + self.fee_tokens
+            }
+
+        self.fee_amounts = {(token, fee_week): int(value) for token, value in fees.items()}
+        self.weights = {(user, i): int(weights[user][n]) for user in self.users for n, i in enumerate(weeks)}
+        self.total_weights = {i: int(total_weights[n]) for n, i in enumerate(weeks)}
+        self.ratios = {vote_week: int(ratio)} if ratio else {}
+        self.user_votes = {(user, vote_week): int(value) for user, value in user_votes.items()}
+        self.token_votes = {(pool, vote_week): int(value) for pool, value in token_votes.items()}
+        self.balances = {key: int(value) for key, value in balances.items()}
+        self.deposit_tokens = {}
+
+    def _lock_week(self, timestamp):
+        return (timestamp - self.locker_start) // WEEK
+
+    def _vote_week(self, timestamp):
+        if self.voter_start >= timestamp:
+            return 0
+        return (timestamp - self.voter_start) // WEEK
+
+    def _deposit_token(self, pool):
+        # deposit tokens are deployed on the first deposit of each pool
+        if pool not in self.deposit_tokens:
+            address = self.staker.depositTokens(pool)
+            if address == ZERO_ADDRESS:
+                return None
+            self.deposit_tokens[pool] = self.DepositToken.at(address)
+        return self.deposit_tokens[pool]
+
+    def _lp_balance(self, user, pool):
+        if user not in self.model.users or pool not in self.model.pools:
+            return 0
+        return self.model.balances[self.model.users.index(user), self.model.pools.index(pool)]
+
+    def rule_deposit(self, st_user, st_pool, st_amount):
+        user, pool = self.users[st_user], self.pools[st_pool]
+        amount = min(st_amount, self.balances[(user, pool)])
+        if amount == 0:
+            return
+        tx = self.staker.deposit(user, pool, amount, {'from': user})
+        self.replay.apply(tx.logs)
+        self.balances[(user, pool)] -= amount
+
+    def rule_withdraw(self, st_user, st_pool, st_pct):
+        user, pool = self.users[st_user], self.pools[st_pool]
+        amount = self._lp_balance(user, pool) * st_pct // 100
+        if amount == 0:
+            return
+        tx = self.staker.withdraw(user, pool, amount, {'from': user})
+        self.replay.apply(tx.logs)
+        self.balances[(user, pool)] += amount
+
+    def rule_transfer(self, st_user, st_pool, st_pct, receiver="st_user"):
+        sender, receiver, pool = self.users[st_user], self.users[receiver], self.pools[st_pool]
+        amount = self._lp_balance(sender, pool) * st_pct // 100
+        if amount == 0:
+            return
+        tx = self._deposit_token(pool).transfer(receiver, amount, {'from': sender})
+        self.replay.apply(tx.logs)
+
+    def rule_claim(self, st_user, st_pool, st_bond, both_pools="st_pct"):
+        user = self.users[st_user]
+        pools = self.pools if both_pools > 50 else [self.pools[st_pool]]
+        if st_bond and not sum(i[0] for i in self.staker.claimable(user, pools)):
+            # bonding reverts when there is no EPX to claim
+            st_bond = 0
+        tx = self.staker.claim(user, pools, st_bond, {'from': user})
+        self.replay.apply(tx.logs)
+
+        claimed = next(i for i in tx.events["Claimed"] if i.address == self.staker)
+        self.balances[(user, self.epx)] += claimed["epxAmount"]
+        self.balances[(user, self.ddd)] += claimed["dddAmount"]
+        if "ClaimedAndBonded" in tx.events:
+            self.engine.deposit(user, tx.events["ClaimedAndBonded"]["bondAmount"], tx.timestamp)
+
+    def rule_unbond(self, st_user, st_pct):
+        user = self.users[st_user]
+        amount = self.bonded_distro.unbondableBalance(user) * st_pct // 100
+        if amount == 0:
+            return
+        tx = self.bonded_distro.initiateUnbondingStream(amount, {'from': user})
+        self.engine.initiate_unbonding_stream(user, amount, tx.timestamp)
+
+    def rule_claim_fees(self, st_user):
+        user = self.users[st_user]
+        tx = self.bonded_distro.claim(user, self.fee_tokens, {'from': user})
+        expected = self.engine.claim(user, self.fee_tokens, tx.timestamp)
+        assert tx.return_value == expected
+        for token, amount in zip(self.fee_tokens, expected):
+            self.balances[(user, token)] += amount
+
+    def rule_lock(self, st_user, st_pct, st_weeks):
+        user = self.users[st_user]
+        amount = self.balances[(user, self.ddd)] * st_pct // 100
+        if amount == 0:
+            return
+        tx = self.locker.lock(user, amount, st_weeks, {'from': user})
+        week = self._lock_week(tx.timestamp)
+        for i in range(st_weeks):
+            weight = amount * (st_weeks - i)
+            self.weights[(user, week + i)] = self.weights.get((user, week + i), 0) + weight
+            self.total_weights[week + i] = self.total_weights.get(week + i, 0) + weight
+        self.balances[(user, self.ddd)] -= amount
+
+    def rule_vote(self, st_user, st_pool, st_pct):
+        user, pool = self.users[st_user], self.pools[st_pool]
+        timestamp = chain.time()
+        if not _voting_open(timestamp) or (timestamp + 60) // WEEK != timestamp // WEEK:
+            # voting is closed, or the vote could be mined in the following week
+            return
+        week = self._vote_week(timestamp)
+        total_votes = self.total_weights.get(week, 0) // 10**18
+        available = self.weights.get((user, week), 0) // 10**18 - self.user_votes.get((user, week), 0)
+        amount = available * st_pct // 100
+        if total_votes == 0 or amount == 0:
+            return
+
+        eps_votes = self.eps_voter.availableVotes(self.proxy)
+        tx = self.voter.vote([pool], [amount], {'from': user})
+        assert self._vote_week(tx.timestamp) == week
+        if not self.ratios.get(week):
+            # the ratio is calculated on the first vote of each week, or again while it is zero
+            self.ratios[week] = int(vote_ratio(eps_votes, total_votes, self.fixed_vote))
+        self.user_votes[(user, week)] = self.user_votes.get((user, week), 0) + amount
+        self.token_votes[(pool, week)] = self.token_votes.get((pool, week), 0) + amount
+
+    def rule_time(self, st_time):
+        chain.mine(timedelta=st_time)
+
+    def invariant(self):
+        model, engine = self.model, self.engine
+        timestamp = chain[-1].timestamp
+        fee_week = engine.get_week(timestamp)
+        lock_week = self._lock_week(timestamp)
+        vote_week = self._vote_week(timestamp)
+        deposit_tokens = {pool: self._deposit_token(pool) for pool in self.pools}
+
+        with brownie.multicall:
+            pending = self.lp_staker.claimableReward(self.proxy, model.pools) if model.pools else []
+            lp_claimable = {user: self.staker.claimable(user, self.pools) for user in self.users}
+            lp_balances = {
+                (user, pool): self.staker.userBalances(user, pool) for user in self.users for pool in self.pools
+            }
+            lp_totals = {pool: self.staker.totalBalances(pool) for pool in self.pools}
+            deposit_balances = {
+                (user, pool): token.balanceOf(user)
+                for user in self.users for pool, token in deposit_tokens.items() if token is not None
+            }
+            fees = {token: self.bonded_distro.weeklyFeeAmounts(token, fee_week) for token in self.fee_tokens}
+            fee_claimable = {user: self.bonded_distro.claimable(user, self.fee_tokens) for user in self.users}
+            bonded = {user: self.bonded_distro.bondedBalance(user) for user in self.users}
+            weights = {user: self.locker.weeklyWeightOf(user, lock_week) for user in self.users}
+            total_weight = self.locker.weeklyTotalWeight(lock_week)
+            ratio = self.voter.epsVoteRatio(vote_week)
+            user_votes = {user: self.voter.userVotes(user, vote_week) for user in self.users}
+            available = {user: self.voter.availableVotes(user) for user in self.users}
+            token_votes = {pool: self.voter.tokenVotes(pool, vote_week) for pool in self.pools}
+            balances = {key: key[1].balanceOf(key[0]) for key in self.balances}
+
+        # fees received since the last step are added to the engine before comparing
+        for token, value in fees.items():
+            added = int(value) - self.fee_amounts.get((token, fee_week), 0)
+            if added:
+                engine.add_fees(token, added, timestamp)
+                self.fee_amounts[(token, fee_week)] = int(value)
+
+        # LpDepositor
+        epx, ddd = model.claimable(pending)
+        for user in self.users:
+            u = model.users.index(user) if user in model.users else None
+            for pool, amounts in zip(self.pools, lp_claimable[user]):
+                p = model.pools.index(pool) if pool in model.pools else None
+                if u is None or p is None:
+                    assert amounts == (0, 0)
+                    assert lp_balances[(user, pool)] == 0
+                    continue
+                assert amounts == (epx[u, p], ddd[u, p])
+                assert lp_balances[(user, pool)] == model.balances[u, p]
+                if (user, pool) in deposit_balances:
+                    assert deposit_balances[(user, pool)] == model.balances[u, p]
+        for pool in self.pools:
+            expected = model.total_balances[model.pools.index(pool)] if pool in model.pools else 0
+            assert lp_totals[pool] == expected
+
+        # BondedFeeDistributor
+        fee_expected = engine.claimable(timestamp, self.fee_tokens)
+        for user in self.users:
+            u = engine.users.index(user)
+            assert list(fee_claimable[user]) == list(fee_expected[u])
+            assert bonded[user] == (engine.balances[u, -1] if engine.balances.shape[1] else 0)
+
+        # TokenLocker and DotDotVoting
+        for user in self.users:
+            assert weights[user] == self.weights.get((user, lock_week), 0)
+            assert user_votes[user] == self.user_votes.get((user, vote_week), 0)
+            if _voting_open(timestamp):
+                expected = self.weights.get((user, vote_week), 0) // 10**18 - user_votes[user]
+            else:
+                expected = 0
+            assert available[user] == expected
+        assert total_weight == self.total_weights.get(lock_week, 0)
+        assert ratio == self.ratios.get(vote_week, 0)
+        for pool in self.pools:
+            assert token_votes[pool] == self.token_votes.get((pool, vote_week), 0)
+
+        # token balances
+        for key, value in balances.items():
+            assert value == self.balances[key]
+
+
+def test_differential(request, state_machine, DepositToken, staker, bonded_distro, locker, voter, eps_voter, epx, ddd, alice, bob, charlie, locker1, token_3eps, token_abnb):
+    steps = request.config.getoption("fuzz_steps")
+    contracts = {
+        "DepositToken": DepositToken,
+        "staker": staker,
+        "bonded_distro": bonded_distro,
+        "locker": locker,
+        "voter": voter,
+        "eps_voter": eps_voter,
+        "epx": epx,
+        "ddd": ddd,
+    }
+    settings = {
+        "stateful_step_count": STEPS_PER_RUN,
+        "max_examples": max(steps // STEPS_PER_RUN, 1),
+    }
+    state_machine(
+        StateMachine, contracts, [alice, bob, charlie, locker1], [token_3eps, token_abnb], settings=settings
+    )
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+from brownie import chain
+
+from scripts.gas_profiler import INTRINSIC_FRAME, GasProfile, _memory_cost
+
+CALLER = "0x" + "11" * 20
+CALLEE = "0x" + "22" * 20
+
+
+def _step(op, depth, gas, gas_cost, fn, address, memory=0, stack=()):
+    return {
+        "op": op,
+        "depth": depth,
+        "gas": gas,
+        "gasCost": gas_cost,
+        "fn": fn,
+        "address": address,
+        "memory": ["00" * 32] * memory,
+        "stack": list(stack),
+    }
+
+
+def _profile(trace, gas_used):
+    return GasProfile(SimpleNamespace(trace=trace, gas_used=gas_used, txid="0x00"))
+
+
+@pytest.fixture
+def call_trace():
+    # `Caller.run` expands memory to 2 words, then calls `Callee.read`, forwarding
+    # 500 gas of which 100 is unused and returned. The call itself costs 100.
+    return [
+        _step("PUSH1", 1, 10000, 3, "Caller.run", CALLER),
+        _step("MSTORE", 1, 9997, 9, "Caller.run", CALLER),
+        _step("CALL", 1, 9988, 600, "Caller.run", CALLER, memory=2),
+        _step("SLOAD", 2, 500, 2100, "Callee.read", CALLEE, stack=["0x1"]),
+        _step("SLOAD", 2, 400, 100, "Callee.read", CALLEE, stack=["0x1"]),
+        _step("SSTORE", 2, 300, 200, "Callee.read", CALLEE, stack=["0x5", "0x1"]),
+        _step("STOP", 2, 100, 0, "Callee.read", CALLEE),
+        _step("POP", 1, 9488, 2, "Caller.run", CALLER, memory=2),
+        _step("STOP", 1, 9486, 0, "Caller.run", CALLER, memory=2),
+    ]
+
+
+def test_step_costs(call_trace):
+    profile = _profile(call_trace, 21000 + 10000 - 9486)
+    costs = profile._step_costs(call_trace)
+
+    # the call only costs its own overhead, the forwarded gas is counted by the child
+    assert costs == [3, 9, 100, 100, 100, 200, 0, 2, 0]
+    assert sum(costs) == 10000 - 9486
+
+
+def test_stacks(call_trace):
+    profile = _profile(call_trace, 21000 + 10000 - 9486)
+
+    assert profile.stacks == {
+        "Caller.run": 3 + 9 + 100 + 2,
+        "Caller.run;Callee.read": 400,
+        INTRINSIC_FRAME: 21000,
+    }
+    assert sum(profile.stacks.values()) == profile.total
+    assert profile.functions()["Caller.run"] == 514
+
+
+def test_counts(call_trace):
+    profile = _profile(call_trace, 21000 + 10000 - 9486)
+
+    assert profile.counts["SLOAD (cold)"] == 1
+    assert profile.counts["SLOAD (warm)"] == 1
+    # the write is to the slot read before it
+    assert profile.counts["SSTORE (warm)"] == 1
+    assert profile.counts["CALL"] == 1
+    assert profile.counts["memory expansion"] == 1
+    assert profile.memory_gas == _memory_cost(2)
+
+
+def test_lp_claim(dotdot_setup, staker, voter, early_incentives, epx, token_3eps, token_abnb, alice, locker1, advance_week):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+    token_3eps.mint(alice, 100 * 10**18, {'from': token_3eps.minter()})
+    token_3eps.approve(staker, 2**256-1, {'from': alice})
+    advance_week()
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    chain.mine(timedelta=50000)
+
+    tx = staker.claim(alice, [token_3eps], 0, {'from': alice})
+    profile = GasProfile(tx)
+
+    assert sum(profile.stacks.values()) == tx.gas_used
+    assert all(gas >= 0 for stack, gas in profile.stacks.items() if stack != INTRINSIC_FRAME)
+    for op in ("SLOAD", "SSTORE"):
+        assert profile.counts[f"{op} (cold)"] > 0
+        assert profile.counts[f"{op} (warm)"] > 0
+    frames = {name for stack in profile.stacks for name in stack.split(";")}
+    assert "LpDepositor._updateIntegrals" in frames
+    assert profile.functions()["LpDepositor.claim"] <= tx.gas_used
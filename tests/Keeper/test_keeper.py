@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from brownie import chain, web3
+
+from scripts.keeper import Keeper, protocol_upkeeps
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, staker, early_incentives, locker1, epx, voter, fee1, eps_fee_distro, deployer, advance_week):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**26, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+
+    token_3eps.mint(alice, 100 * 10**18, {'from': token_3eps.minter()})
+    token_3eps.approve(staker, 2**256-1, {'from': alice})
+    fee1._mint_for_testing(deployer, 10**24)
+    fee1.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+
+
+@pytest.fixture
+def keeper(staker, depx, bonded_distro, early_incentives, voter, fee1, charlie):
+    return Keeper(charlie, protocol_upkeeps(staker, depx, bonded_distro, early_incentives, voter, [fee1]))
+
+
+def run(keeper):
+    return [tx.fn_name for tx in asyncio.run(keeper.run_once())]
+
+
+def test_nothing_due(keeper, charlie):
+    nonce = charlie.nonce
+    assert run(keeper) == []
+    assert charlie.nonce == nonce
+
+
+def test_push_protocol_fees(keeper, staker, token_3eps, alice, advance_week):
+    advance_week()
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    chain.mine(timedelta=50000)
+    staker.claim(alice, [token_3eps], 0, {'from': alice})
+    assert staker.pendingFeeEpx() > 0
+    assert "pushPendingProtocolFees" not in run(keeper)
+
+    chain.mine(timedelta=86400)
+    assert "pushPendingProtocolFees" in run(keeper)
+    assert staker.pendingFeeEpx() == 0
+    assert staker.pendingFeeDdd() == 0
+    assert "pushPendingProtocolFees" not in run(keeper)
+
+
+def test_extend_lock(keeper, depx, advance_week):
+    advance_week()
+    assert "extendLock" in run(keeper)
+    assert "extendLock" not in run(keeper)
+
+
+def test_fetch_fees(keeper, bonded_distro, eps_fee_distro, fee1, deployer, advance_week):
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    assert "fetchEllipsisFees" not in run(keeper)
+
+    # fees deposited in a week stream to the proxy during the following week
+    advance_week()
+    chain.mine(timedelta=3600)
+    fee_amount = bonded_distro.weeklyFeeAmounts(fee1, bonded_distro.getWeek())
+    txs = asyncio.run(keeper.run_once())
+    fetch = [tx for tx in txs if tx.fn_name == "fetchEllipsisFees"]
+    assert len(fetch) == 1
+    assert bonded_distro.lastClaim(fee1) == fetch[0].timestamp
+    assert bonded_distro.weeklyFeeAmounts(fee1, bonded_distro.getWeek()) > fee_amount
+
+    # the next fetch is due one day after the last
+    chain.mine(timestamp=fetch[0].timestamp + 86399)
+    assert "fetchEllipsisFees" not in run(keeper)
+    chain.mine(timedelta=1)
+    assert "fetchEllipsisFees" in run(keeper)
+
+
+def test_skips_reverting_calls(voter, charlie):
+    # the proxy had no lock weight in the previous week
+    keeper = Keeper(charlie, {"vote": lambda timestamp: [(voter.createFixedVoteApprovalVote, ())]})
+    nonce = charlie.nonce
+    assert run(keeper) == []
+    assert charlie.nonce == nonce
+
+
+def test_nonce_tracking(staker, depx, charlie):
+    upkeeps = {
+        "fees": lambda timestamp: [(staker.pushPendingProtocolFees, ())],
+        "lock": lambda timestamp: [(depx.extendLock, ()), (depx.extendLock, ())],
+    }
+    keeper = Keeper(charlie, upkeeps)
+    nonce = charlie.nonce
+    txs = asyncio.run(keeper.run_once())
+
+    assert [tx.nonce for tx in txs] == [nonce, nonce + 1, nonce + 2]
+    assert keeper.nonce == nonce + 3 == web3.eth.get_transaction_count(charlie.address)
+    assert all(tx.status == 1 for tx in txs)
+
+
+def test_gas_price_limit(staker, charlie):
+    keeper = Keeper(charlie, {"fees": lambda timestamp: [(staker.pushPendingProtocolFees, ())]}, gas_price_multiplier=2)
+    gas_price = web3.eth.gas_price
+    if gas_price == 0:
+        pytest.skip("requires a non-zero network gas price")
+
+    keeper.max_gas_price = 2 * gas_price - 1
+    assert run(keeper) == []
+    keeper.max_gas_price = 2 * gas_price
+    txs = asyncio.run(keeper.run_once())
+    assert [tx.gas_price for tx in txs] == [2 * gas_price]
+
+
+def test_submission_error(staker, charlie):
+    keeper = Keeper(charlie, {"fees": lambda timestamp: [(staker.pushPendingProtocolFees, ())]})
+    charlie.transfer(charlie, 0)
+    nonce = charlie.nonce
+    # a nonce that was already used outside of the keeper
+    keeper.nonce = nonce - 1
+
+    asyncio.run(keeper.run(interval=0, rounds=2))
+
+    assert keeper.nonce == nonce + 1 == web3.eth.get_transaction_count(charlie.address)
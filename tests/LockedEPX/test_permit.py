@@ -0,0 +1,93 @@
+import brownie
+from brownie import chain
+import pytest
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, epx, depx, ddd, staker, locker1, signer):
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    depx.deposit(signer, 10**20, False, {'from': locker1})
+    ddd.mint(signer, 10**20, {'from': staker})
+
+
+def test_permit(depx, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, alice, 10**18)
+    depx.permit(signer, alice, 10**18, deadline, v, r, s, {'from': alice})
+
+    assert depx.allowance(signer, alice) == 10**18
+    assert depx.nonces(signer) == 1
+
+
+def test_permit_replay(depx, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, alice, 10**18)
+    depx.permit(signer, alice, 10**18, deadline, v, r, s, {'from': alice})
+
+    with brownie.reverts("Invalid signature"):
+        depx.permit(signer, alice, 10**18, deadline, v, r, s, {'from': alice})
+
+
+def test_permit_wrong_spender(depx, signer, alice, bob, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, alice, 10**18)
+
+    with brownie.reverts("Invalid signature"):
+        depx.permit(signer, bob, 10**18, deadline, v, r, s, {'from': bob})
+
+
+def test_permit_expired(ddd, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(ddd, signer, alice, 10**18, chain.time() + 100)
+    chain.sleep(101)
+    chain.mine()
+
+    with brownie.reverts("Permit expired"):
+        ddd.permit(signer, alice, 10**18, deadline, v, r, s, {'from': alice})
+
+
+def test_bond_with_permit(depx, bonded_distro, signer, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, bonded_distro, 10**18)
+    bonded_distro.depositWithPermit(signer, 10**18, deadline, v, r, s, {'from': signer})
+
+    assert depx.balanceOf(signer) == 10**20 - 10**18
+    assert bonded_distro.bondedBalance(signer) == 10**18
+    assert depx.allowance(signer, bonded_distro) == 0
+
+
+def test_lock_with_permit(ddd, locker, signer, sign_permit):
+    deadline, v, r, s = sign_permit(ddd, signer, locker, 10**18)
+    locker.lockWithPermit(signer, 10**18, 4, deadline, v, r, s, {'from': signer})
+
+    assert ddd.balanceOf(signer) == 10**20 - 10**18
+    assert locker.getActiveUserLocks(signer) == [(4, 10**18)]
+
+
+def test_permit_malleable_signature(depx, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, alice, 10**18)
+    # the same signature with the high `s` value recovers to the same signer
+    n = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+    s = (n - int.from_bytes(s, "big")).to_bytes(32, "big")
+    v = 55 - v
+
+    with brownie.reverts("Invalid signature"):
+        depx.permit(signer, alice, 10**18, deadline, v, r, s, {'from': alice})
+
+
+def test_bond_with_permit_front_run(depx, bonded_distro, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(depx, signer, bonded_distro, 10**18)
+    depx.permit(signer, bonded_distro, 10**18, deadline, v, r, s, {'from': alice})
+    bonded_distro.depositWithPermit(signer, 10**18, deadline, v, r, s, {'from': signer})
+
+    assert bonded_distro.bondedBalance(signer) == 10**18
+
+
+def test_lock_with_permit_front_run(ddd, locker, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(ddd, signer, locker, 10**18)
+    ddd.permit(signer, locker, 10**18, deadline, v, r, s, {'from': alice})
+    locker.lockWithPermit(signer, 10**18, 4, deadline, v, r, s, {'from': signer})
+
+    assert locker.getActiveUserLocks(signer) == [(4, 10**18)]
+
+
+def test_lock_with_invalid_permit(ddd, locker, signer, alice, sign_permit):
+    deadline, v, r, s = sign_permit(ddd, signer, alice, 10**18)
+
+    with brownie.reverts("Permit failed"):
+        locker.lockWithPermit(signer, 10**18, 4, deadline, v, r, s, {'from': signer})
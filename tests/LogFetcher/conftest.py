@@ -0,0 +1,173 @@
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+# BSC produces a block every 3 seconds
+BLOCKS_PER_WEEK = 201600
+
+
+class StandInNode:
+    """
+    Local JSON-RPC node that answers `eth_getLogs` with generated logs.
+
+    Log densities follow the DotDot contracts on BSC. There are a few logs in a
+    typical block. Claims, locks and votes surge in the blocks after each weekly
+    epoch begins, and occasional blocks hold hundreds of logs from batched
+    transactions. Requests are limited in the same way as public providers:
+
+    * more than `max_block_range` blocks, or more than `max_results` logs,
+      returns an error
+    * `failure_rate` of requests fail with HTTP 429 or a rate limit error, with
+      the message `rate_limit_message`
+    """
+
+    def __init__(
+        self,
+        addresses,
+        head=1_000_000,
+        max_block_range=5000,
+        max_results=10000,
+        failure_rate=0.0,
+        rate_limit_message="rate limit exceeded",
+        seed=0,
+    ):
+        self.addresses = [i.lower() for i in addresses]
+        self.head = head
+        self.max_block_range = max_block_range
+        self.max_results = max_results
+        self.failure_rate = failure_rate
+        self.rate_limit_message = rate_limit_message
+        self.seed = seed
+        self.requests = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def density(self, blocks):
+        """Expected number of logs in each of `blocks`."""
+        blocks = np.asarray(blocks)
+        rate = np.full(len(blocks), 2.0)
+        rate[blocks % BLOCKS_PER_WEEK < 600] = 40.0
+        return rate
+
+    def log_counts(self, start, end):
+        """Number of logs in each block from `start` to `end`."""
+        # generated per chunk of blocks, so that any range gives the same logs
+        chunks = range(start // 1000, end // 1000 + 1)
+        counts = np.concatenate([self._chunk_counts(i) for i in chunks])
+        return counts[start - chunks[0] * 1000 : end - chunks[0] * 1000 + 1]
+
+    def _chunk_counts(self, chunk):
+        rng = np.random.default_rng((self.seed, chunk))
+        blocks = np.arange(chunk * 1000, chunk * 1000 + 1000)
+        counts = rng.poisson(self.density(blocks))
+        counts[rng.random(1000) < 0.0005] += 300
+        return counts
+
+    def get_logs(self, start, end, addresses=None):
+        addresses = self.addresses if addresses is None else [i.lower() for i in addresses]
+        logs = []
+        for block, count in zip(range(start, end + 1), self.log_counts(start, end)):
+            for index in range(count):
+                address = self.addresses[(block + index) % len(self.addresses)]
+                if address in addresses:
+                    logs.append(
+                        {
+                            "address": address,
+                            "topics": [f"0x{block:032x}{index:032x}"],
+                            "data": "0x" + f"{block * 1000 + index:064x}",
+                            "blockNumber": hex(block),
+                            "blockHash": f"0x{block:064x}",
+                            "transactionHash": f"0x{block:032x}{index // 4:032x}",
+                            "transactionIndex": hex(index // 4),
+                            "logIndex": hex(index),
+                            "removed": False,
+                        }
+                    )
+        return logs
+
+    def handle(self, request):
+        method, params = request["method"], request.get("params", [])
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if method == "eth_blockNumber":
+            response["result"] = hex(self.head)
+        elif method == "eth_getLogs":
+            query = params[0]
+            start, end = int(query["fromBlock"], 16), int(query["toBlock"], 16)
+            with self._lock:
+                self.requests.append((start, end))
+                failed = self._random.random() < self.failure_rate
+            addresses = query.get("address")
+            if isinstance(addresses, str):
+                addresses = [addresses]
+            if failed:
+                response["error"] = {"code": -32005, "message": self.rate_limit_message}
+            elif end - start + 1 > self.max_block_range:
+                response["error"] = {"code": -32005, "message": f"exceed maximum block range: {self.max_block_range}"}
+            else:
+                logs = self.get_logs(start, end, addresses)
+                if len(logs) > self.max_results:
+                    response["error"] = {"code": -32005, "message": f"query returned more than {self.max_results} results"}
+                else:
+                    response["result"] = logs
+        else:
+            response["error"] = {"code": -32601, "message": f"method {method} not supported"}
+        return response
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                payload = json.loads(body)
+                with node._lock:
+                    throttled = node._random.random() < node.failure_rate
+                if throttled:
+                    self.send_response(429)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if isinstance(payload, list):
+                    response = [node.handle(i) for i in payload]
+                else:
+                    response = node.handle(payload)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def log_node():
+    nodes = []
+
+    def start(addresses, **kwargs):
+        nodes.append(StandInNode(addresses, **kwargs).start())
+        return nodes[-1]
+
+    yield start
+    for node in nodes:
+        node.stop()
@@ -0,0 +1,96 @@
+import asyncio
+
+from scripts.indexer import load_deployments
+from scripts.log_fetcher import LogFetcher, range_error
+
+ADDRESSES = ["0x" + f"{i:040x}" for i in range(1, 4)]
+# the stand-in node starts a weekly epoch every 201600 blocks, so this range
+# includes the surge of logs at the start of an epoch
+EPOCH_START = 201600
+START = EPOCH_START - 15000
+END = EPOCH_START + 5000
+
+
+def fetch(url, addresses, start=START, end=END, **kwargs):
+    async def run():
+        ranges, logs = [], []
+        async with LogFetcher(url, addresses, **kwargs) as fetcher:
+            async for range_start, range_end, range_logs in fetcher.fetch(start, end):
+                ranges.append((range_start, range_end))
+                logs += range_logs
+            return ranges, logs, fetcher.block_range
+
+    return asyncio.run(run())
+
+
+def test_fetch_in_order(log_node):
+    node = log_node(ADDRESSES)
+    ranges, logs, _ = fetch(node.url, ADDRESSES)
+
+    assert ranges[0][0] == START
+    assert ranges[-1][1] == END
+    assert all(a[1] + 1 == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert logs == node.get_logs(START, END)
+
+
+def test_split_on_too_many_results(log_node):
+    node = log_node(ADDRESSES, max_results=10000)
+    _, logs, _ = fetch(node.url, ADDRESSES, block_range=5000)
+
+    assert logs == node.get_logs(START, END)
+    # the surge at the start of the epoch cannot be fetched in a single request
+    assert max(node.log_counts(*i).sum() for i in node.requests) > 10000
+
+
+def test_adapts_to_block_range_limit(log_node):
+    node = log_node(ADDRESSES, max_block_range=1500, max_results=10**6)
+    _, logs, block_range = fetch(node.url, ADDRESSES, block_range=10000)
+
+    assert logs == node.get_logs(START, END)
+    assert block_range <= 1500
+
+
+def test_grows_after_successes(log_node):
+    node = log_node(ADDRESSES, max_results=10**6)
+    start = EPOCH_START + 1000
+    _, logs, block_range = fetch(node.url, ADDRESSES, start, start + 20000, block_range=100, max_block_range=5000)
+
+    assert logs == node.get_logs(start, start + 20000)
+    assert block_range > 100
+    assert len(node.requests) < 200
+
+
+def test_retries(log_node):
+    node = log_node(ADDRESSES, failure_rate=0.2)
+    _, logs, _ = fetch(node.url, ADDRESSES, backoff=0.01, retries=10)
+
+    assert logs == node.get_logs(START, END)
+
+
+def test_rate_limit_does_not_split(log_node):
+    node = log_node(ADDRESSES, max_results=10**6, failure_rate=0.5, rate_limit_message="Too many requests, slow down")
+    _, logs, block_range = fetch(node.url, ADDRESSES, block_range=5000, max_block_range=5000, backoff=0.01, retries=20)
+
+    assert logs == node.get_logs(START, END)
+    # throttled requests are retried over the same range
+    assert len(node.requests) > 5
+    assert {end - start + 1 for start, end in node.requests} == {5000, 1}
+    assert block_range == 5000
+
+
+def test_range_error_messages():
+    assert range_error(ValueError("RPC error: {'message': 'query returned more than 10000 results'}")) == "results"
+    assert range_error(ValueError("RPC error: {'message': 'Log response size exceeded'}")) == "results"
+    assert range_error(ValueError("RPC error: {'message': 'exceed maximum block range: 5000'}")) == "blocks"
+    assert range_error(ValueError("RPC error: {'message': 'Too many requests'}")) is None
+    assert range_error(ValueError("RPC error: {'message': 'rate limit exceeded'}")) is None
+
+
+def test_dotdot_addresses(log_node):
+    dotdot = [address for address, _ in load_deployments().values()]
+    node = log_node(dotdot + ADDRESSES, max_results=10**6)
+    _, logs, _ = fetch(node.url, dotdot)
+
+    assert logs
+    assert logs == node.get_logs(START, END, dotdot)
+    assert {i["address"] for i in logs} == {i.lower() for i in dotdot}
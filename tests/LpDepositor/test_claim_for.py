@@ -0,0 +1,88 @@
+import brownie
+import pytest
+from brownie import chain
+
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, bob, charlie, staker, early_incentives, locker1, epx, advance_week, voter):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+
+    for acct in [alice, bob]:
+        token_3eps.mint(acct, 100 * 10**18, {'from': token_3eps.minter()})
+        token_abnb.mint(acct, 100 * 10**18, {'from': token_abnb.minter()})
+        token_3eps.approve(staker, 2**256-1, {'from': acct})
+        token_abnb.approve(staker, 2**256-1, {'from': acct})
+        staker.setOperatorApproval(charlie, True, {'from': acct})
+
+
+def test_set_operator_approval(staker, alice, bob, charlie):
+    assert staker.isApprovedOperator(alice, charlie)
+    assert not staker.isApprovedOperator(alice, bob)
+
+    staker.setOperatorApproval(charlie, False, {'from': alice})
+    assert not staker.isApprovedOperator(alice, charlie)
+
+
+def test_claim_for(staker, alice, bob, charlie, token_3eps, token_abnb, advance_week, epx, ddd):
+    advance_week()
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 2 * 10**18, {'from': bob})
+    staker.deposit(bob, token_abnb, 10**18, {'from': bob})
+    chain.mine(timedelta=50000)
+
+    expected = staker.claimable(alice, [token_3eps])[0]
+    expected2 = staker.claimable(bob, [token_3eps, token_abnb])
+    tx = staker.claimFor([alice, bob], [[token_3eps], [token_3eps, token_abnb]], charlie, {'from': charlie})
+
+    received = epx.balanceOf(charlie)
+    expected_total = expected[0] + expected2[0][0] + expected2[1][0]
+    assert received > 0
+    assert 0.9999 <= expected_total / received <= 1
+    assert epx.balanceOf(alice) == 0
+    assert epx.balanceOf(bob) == 0
+
+    for acct, tokens in [(alice, [token_3eps]), (bob, [token_3eps, token_abnb])]:
+        assert staker.claimable(acct, tokens) == [(0, 0)] * len(tokens)
+
+    assert len(tx.events['ClaimedFor']) == 2
+    assert tx.events['ClaimedFor'][0]['user'] == alice
+    assert tx.events['ClaimedFor'][1]['user'] == bob
+    assert sum(i['epxAmount'] for i in tx.events['ClaimedFor']) == received
+    assert sum(i['dddAmount'] for i in tx.events['ClaimedFor']) == ddd.balanceOf(charlie)
+
+
+def test_claim_for_harvests_once(staker, alice, bob, charlie, token_3eps, advance_week):
+    advance_week()
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 4 * 10**18, {'from': bob})
+    chain.mine(timedelta=50000)
+
+    tx = staker.claimFor([alice, bob], [[token_3eps], [token_3eps]], charlie, {'from': charlie})
+
+    assert len([i for i in tx.subcalls if i['function'].startswith("claimEmissions")]) == 1
+    alice_epx, bob_epx = [i['epxAmount'] for i in tx.events['ClaimedFor']]
+    assert alice_epx > 0
+    assert 0.999 <= bob_epx / alice_epx <= 1
+
+
+def test_claim_for_not_approved(staker, alice, bob, charlie, token_3eps, advance_week):
+    advance_week()
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    chain.mine(timedelta=50000)
+
+    with brownie.reverts("Operator not approved"):
+        staker.claimFor([alice], [[token_3eps]], bob, {'from': bob})
+
+    staker.setOperatorApproval(charlie, False, {'from': alice})
+    with brownie.reverts("Operator not approved"):
+        staker.claimFor([alice], [[token_3eps]], charlie, {'from': charlie})
+
+
+def test_claim_for_length_mismatch(staker, alice, bob, charlie, token_3eps):
+    with brownie.reverts("Input length mismatch"):
+        staker.claimFor([alice, bob], [[token_3eps]], charlie, {'from': charlie})
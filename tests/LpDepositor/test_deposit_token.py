@@ -1,5 +1,6 @@
 import brownie
 import pytest
+from brownie import ZERO_ADDRESS, web3
 
 
 
@@ -84,3 +85,78 @@ def test_insufficient_balance(deposit_token, alice, charlie):
 def test_transferDeposit_guarded(staker, alice, bob, token_3eps):
     with brownie.reverts("Unauthorized caller"):
         staker.transferDeposit(token_3eps, alice, bob, 10**18, {'from': alice})
+
+
+def test_immutable_args(deposit_token, staker, token_3eps):
+    assert deposit_token.depositor() == staker
+    assert deposit_token.pool() == token_3eps
+
+    symbol = token_3eps.symbol()
+    assert deposit_token.name() == f"Solidex {symbol} Deposit"
+    assert deposit_token.symbol() == f"sex-{symbol}"
+
+
+def test_deterministic_address(deposit_token, staker, token_3eps, token_abnb, alice):
+    assert staker.getDepositTokenAddress(token_3eps) == deposit_token
+
+    # the address can also be calculated off-chain
+    data = bytes.fromhex(staker.address[2:] + token_abnb.address[2:])
+    extra = (len(data) + 2).to_bytes(2, "big")
+    creation_code = (
+        bytes.fromhex("3d61") + (0x38 + len(data) + 2).to_bytes(2, "big") + bytes.fromhex("80600b3d3981f3")
+        + bytes.fromhex("363d3d3761") + extra + bytes.fromhex("603836393d3d3d3661") + extra
+        + bytes.fromhex("013d73") + bytes.fromhex(staker.depositTokenImplementation()[2:])
+        + bytes.fromhex("5af43d82803e903d91603657fd5bf3") + data + extra
+    )
+    expected = web3.keccak(
+        b"\xff" + bytes.fromhex(staker.address[2:]) + bytes(32) + web3.keccak(creation_code)
+    )[12:]
+    assert staker.getDepositTokenAddress(token_abnb) == web3.toChecksumAddress(expected.hex())
+
+    assert staker.depositTokens(token_abnb) == ZERO_ADDRESS
+    token_abnb.mint(alice, 10**18, {'from': token_abnb.minter()})
+    token_abnb.approve(staker, 2**256-1, {'from': alice})
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    assert staker.depositTokens(token_abnb) == staker.getDepositTokenAddress(token_abnb)
+
+
+def test_initialize_transfer_event(DepositToken, staker, token_abnb, alice):
+    token_abnb.mint(alice, 10**18, {'from': token_abnb.minter()})
+    token_abnb.approve(staker, 2**256-1, {'from': alice})
+    tx = staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+
+    # a zero-value transfer to `LpDepositor` is emitted when the clone is deployed
+    deposit_token = staker.depositTokens(token_abnb)
+    transfers = [i for i in tx.events['Transfer'] if i.address == deposit_token]
+    assert [dict(i) for i in transfers] == [
+        {'from': ZERO_ADDRESS, 'to': staker, 'value': 0},
+        {'from': ZERO_ADDRESS, 'to': alice, 'value': 10**18},
+    ]
+
+    with brownie.reverts():
+        DepositToken.at(deposit_token).initialize({'from': alice})
+
+
+def test_permit(deposit_token, staker, token_3eps, signer, alice, bob, sign_permit):
+    staker.deposit(signer, token_3eps, 10**18, {'from': alice})
+    deadline, v, r, s = sign_permit(deposit_token, signer, bob, 10**18)
+    deposit_token.permit(signer, bob, 10**18, deadline, v, r, s, {'from': bob})
+
+    assert deposit_token.allowance(signer, bob) == 10**18
+    assert deposit_token.nonces(signer) == 1
+
+    deposit_token.transferFrom(signer, bob, 10**18, {'from': bob})
+    assert deposit_token.balanceOf(signer) == 0
+    assert deposit_token.balanceOf(bob) == 6 * 10**18
+
+
+def test_permit_clones_have_separate_domains(DepositToken, deposit_token, staker, token_abnb, signer, alice, bob, sign_permit):
+    token_abnb.mint(alice, 10**18, {'from': token_abnb.minter()})
+    token_abnb.approve(staker, 2**256-1, {'from': alice})
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    other = DepositToken.at(staker.depositTokens(token_abnb))
+    assert other.DOMAIN_SEPARATOR() != deposit_token.DOMAIN_SEPARATOR()
+
+    deadline, v, r, s = sign_permit(other, signer, bob, 10**18)
+    with brownie.reverts("Invalid signature"):
+        deposit_token.permit(signer, bob, 10**18, deadline, v, r, s, {'from': bob})
@@ -64,3 +64,25 @@ def test_claimable_extras_multiple_actions(staker, alice, token_abnb, fee1, depl
     staker.claimExtraRewards(alice, token_abnb, {'from': alice})
     assert staker.claimableExtraRewards(alice, token_abnb)[-1] == (fee1, 0)
     assert fee1.balanceOf(alice) == expected
+
+
+def test_claim_extras_for(staker, alice, bob, token_abnb, fee1, deployer, proxy):
+    staker.updatePoolExtraRewards(token_abnb, {'from': alice})
+    staker.setOperatorApproval(bob, True, {'from': alice})
+
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    chain.sleep(10)
+    token_abnb.notifyRewardAmount(fee1, 10**24, {'from': deployer})
+    chain.mine(timedelta=86400 * 8)
+
+    expected = token_abnb.earned(proxy, fee1)
+    tx = staker.claimExtraRewardsFor([alice], bob, token_abnb, {'from': bob})
+    assert fee1.balanceOf(bob) == expected
+    assert staker.claimableExtraRewards(alice, token_abnb)[-1] == (fee1, 0)
+
+    assert 'ClaimedExtraRewards' not in tx.events
+    event = tx.events['ClaimedExtraRewardsFor']
+    assert event['operator'] == bob
+    assert event['user'] == alice
+    assert event['receiver'] == bob
+    assert event['token'] == token_abnb
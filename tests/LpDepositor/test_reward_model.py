@@ -0,0 +1,119 @@
+import pytest
+from brownie import chain
+
+from scripts.reward_model import build_model, pending_rewards
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, bob, charlie, staker, early_incentives, locker1, epx, advance_week, voter, fee1, deployer):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+
+    for acct in [alice, bob]:
+        token_3eps.mint(acct, 100 * 10**18, {'from': token_3eps.minter()})
+        token_abnb.mint(acct, 100 * 10**18, {'from': token_abnb.minter()})
+        token_3eps.approve(staker, 2**256-1, {'from': acct})
+        token_abnb.approve(staker, 2**256-1, {'from': acct})
+        staker.setOperatorApproval(charlie, True, {'from': acct})
+
+    token_abnb.addReward(fee1, deployer, 604800, {'from': token_abnb.owner()})
+    fee1._mint_for_testing(deployer, 10**24)
+    fee1.approve(token_abnb, 2**256-1, {'from': deployer})
+
+
+@pytest.fixture
+def start_block():
+    # no LpDepositor actions happen during the module setup, so replaying
+    # from here is equivalent to replaying from the deployment
+    return chain.height + 1
+
+
+def assert_model_matches(staker, start_block):
+    model = build_model(staker, start_block)
+    pending, earned = pending_rewards(model, staker)
+    epx, ddd = model.claimable(pending)
+    extras = model.claimable_extra_rewards(earned)
+
+    for u, user in enumerate(model.users):
+        assert staker.claimable(user, model.pools) == list(zip(epx[u], ddd[u]))
+        for pool in model.pools:
+            columns = [i for i, (p, _) in enumerate(model.extra_tokens) if p == pool]
+            expected = [(model.extra_tokens[i][1], extras[u, i]) for i in columns]
+            assert staker.claimableExtraRewards(user, pool) == expected
+    for p, pool in enumerate(model.pools):
+        assert staker.totalBalances(pool) == model.total_balances[p]
+    return model
+
+
+def test_deposit_withdraw(start_block, staker, alice, bob, token_3eps, token_abnb):
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    chain.sleep(3600)
+    staker.deposit(bob, token_3eps, 3 * 10**18 + 7, {'from': bob})
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    chain.sleep(3600)
+    staker.withdraw(alice, token_3eps, 10**18 + 3, {'from': alice})
+    chain.mine(timedelta=7200)
+
+    model = assert_model_matches(staker, start_block)
+    assert model.users == [alice, bob]
+    assert model.pools == [token_3eps, token_abnb]
+
+
+def test_claim(start_block, staker, alice, bob, token_3eps, token_abnb, advance_week):
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 10**18, {'from': bob})
+    staker.deposit(bob, token_abnb, 2 * 10**18, {'from': bob})
+    chain.sleep(50000)
+    staker.claim(alice, [token_3eps], 2 * 10**18, {'from': alice})
+    chain.sleep(50000)
+    staker.claim(bob, [token_3eps, token_abnb], 0, {'from': bob})
+    chain.mine(timedelta=3600)
+
+    assert_model_matches(staker, start_block)
+
+
+def test_claim_for(start_block, staker, alice, bob, charlie, token_3eps, token_abnb):
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 2 * 10**18, {'from': bob})
+    staker.deposit(bob, token_abnb, 10**18, {'from': bob})
+    chain.sleep(50000)
+    # `token_3eps` is only harvested for the first user in the batch
+    staker.claimFor([alice, bob], [[token_3eps], [token_3eps, token_abnb]], charlie, {'from': charlie})
+    chain.mine(timedelta=3600)
+
+    assert_model_matches(staker, start_block)
+
+
+def test_transfer_deposit(start_block, DepositToken, staker, alice, bob, charlie, token_3eps):
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_3eps, 10**18, {'from': bob})
+    deposit_token = DepositToken.at(staker.depositTokens(token_3eps))
+    chain.sleep(3600)
+    deposit_token.transfer(charlie, 10**18, {'from': alice})
+    chain.sleep(3600)
+    deposit_token.transfer(alice, 3 * 10**17, {'from': charlie})
+    chain.mine(timedelta=3600)
+
+    model = assert_model_matches(staker, start_block)
+    assert charlie in model.users
+
+
+def test_extra_rewards(start_block, staker, alice, bob, charlie, token_abnb, fee1, deployer):
+    staker.updatePoolExtraRewards(token_abnb, {'from': alice})
+    staker.deposit(alice, token_abnb, 10**18, {'from': alice})
+    token_abnb.notifyRewardAmount(fee1, 10**24, {'from': deployer})
+    chain.sleep(86400)
+    staker.deposit(bob, token_abnb, 3 * 10**18, {'from': bob})
+    chain.sleep(86400)
+    staker.withdraw(alice, token_abnb, 10**17, {'from': alice})
+    chain.sleep(86400)
+    staker.claimExtraRewards(alice, token_abnb, {'from': alice})
+    chain.sleep(86400)
+    staker.claimExtraRewardsFor([alice, bob], charlie, token_abnb, {'from': charlie})
+    chain.mine(timedelta=86400)
+
+    model = assert_model_matches(staker, start_block)
+    assert model.extra_rewards(token_abnb) == [staker.extraRewards(token_abnb, i) for i in range(staker.extraRewardsLength(token_abnb))]
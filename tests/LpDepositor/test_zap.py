@@ -0,0 +1,96 @@
+import brownie
+import pytest
+from brownie import interface
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, zap, voter, epx, depx, early_incentives, alice, locker1, advance_week):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(alice, 10**25, {'from': locker1})
+    advance_week()
+    voter.createFixedVoteApprovalVote({'from': alice})
+
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    depx.deposit(alice, 10**21, False, {'from': locker1})
+    epx.transfer(alice, 10**21, {'from': locker1})
+    epx.approve(zap, 2**256-1, {'from': alice})
+    depx.approve(zap, 2**256-1, {'from': alice})
+
+
+@pytest.fixture(scope="module")
+def deposit_token(DepositToken, staker, depx_pool, zap, depx_swap, alice):
+    zap.deposit(depx_swap, [10**18, 10**18], 0, alice, {'from': alice})
+    token = DepositToken.at(staker.depositTokens(depx_pool))
+    token.approve(zap, 2**256-1, {'from': alice})
+    return token
+
+
+def test_deposit(staker, zap, proxy, depx_swap, depx_pool, depx, epx, alice, bob):
+    tx = zap.deposit(depx_swap, [10**20, 2 * 10**20], 0, bob, {'from': alice})
+    amount = tx.return_value
+
+    assert amount > 0
+    assert staker.userBalances(bob, depx_pool) == amount
+    assert staker.totalBalances(depx_pool) == amount
+    assert depx.balanceOf(alice) == 10**21 - 10**20
+    assert epx.balanceOf(alice) == 10**21 - 2 * 10**20
+
+    for acct in [zap, proxy]:
+        assert interface.IERC20(depx_pool).balanceOf(acct) == 0
+        assert depx.balanceOf(acct) == 0
+        assert epx.balanceOf(acct) == 0
+
+
+def test_deposit_single_coin(staker, zap, depx_swap, depx_pool, depx, alice):
+    amount = zap.deposit(depx_swap, [0, 10**20], 0, alice, {'from': alice}).return_value
+
+    assert staker.userBalances(alice, depx_pool) == amount
+    assert depx.balanceOf(alice) == 10**21
+
+
+def test_deposit_min_mint(zap, depx_swap, alice):
+    with brownie.reverts():
+        zap.deposit(depx_swap, [10**18, 10**18], 10**30, alice, {'from': alice})
+
+
+def test_deposit_invalid_length(zap, depx_swap, alice):
+    with brownie.reverts("Invalid number of coins"):
+        zap.deposit(depx_swap, [10**18], 0, alice, {'from': alice})
+
+
+def test_withdraw(staker, zap, deposit_token, depx_swap, depx_pool, depx, epx, alice, bob):
+    balance = staker.userBalances(alice, depx_pool)
+    tx = zap.withdraw(depx_swap, balance // 2, [0, 0], bob, {'from': alice})
+
+    assert staker.userBalances(alice, depx_pool) == balance - balance // 2
+    assert staker.userBalances(zap, depx_pool) == 0
+    assert [depx.balanceOf(bob), epx.balanceOf(bob)] == tx.return_value
+    assert min(tx.return_value) > 0
+
+
+def test_withdraw_one_coin(staker, zap, deposit_token, depx_swap, depx_pool, epx, alice, bob):
+    balance = staker.userBalances(alice, depx_pool)
+    tx = zap.withdrawOneCoin(depx_swap, balance, 1, 0, bob, {'from': alice})
+
+    assert staker.userBalances(alice, depx_pool) == 0
+    assert staker.totalBalances(depx_pool) == 0
+    assert epx.balanceOf(bob) == tx.return_value > 0
+
+
+def test_withdraw_not_approved(staker, zap, deposit_token, depx_swap, depx_pool, alice):
+    deposit_token.approve(zap, 0, {'from': alice})
+    with brownie.reverts("Insufficient allowance"):
+        zap.withdraw(depx_swap, 10**17, [0, 0], alice, {'from': alice})
+
+
+def test_deposit_ignores_stray_balance(staker, zap, depx_swap, depx_pool, depx, epx, alice, bob):
+    depx.approve(depx_swap, 2**256-1, {'from': alice})
+    epx.approve(depx_swap, 2**256-1, {'from': alice})
+    depx_swap.add_liquidity([10**18, 10**18], 0, zap, {'from': alice})
+    stray = interface.IERC20(depx_pool).balanceOf(zap)
+
+    amount = zap.deposit(depx_swap, [10**18, 10**18], 0, bob, {'from': alice}).return_value
+
+    assert staker.userBalances(bob, depx_pool) == amount
+    assert interface.IERC20(depx_pool).balanceOf(zap) == stray
@@ -0,0 +1,189 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scripts.rpc_cache import RpcCache, RpcCacheProxy, is_cacheable, start_proxy
+
+FORK_BLOCK = 1000
+CACHEABLE = [
+    ("eth_chainId", []),
+    ("eth_getStorageAt", ["0x" + "11" * 20, "0x0", hex(FORK_BLOCK)]),
+    ("eth_call", [{"to": "0x" + "22" * 20, "data": "0x"}, {"blockNumber": hex(FORK_BLOCK)}]),
+    ("eth_getBlockByNumber", [hex(FORK_BLOCK), False]),
+    ("eth_getTransactionReceipt", ["0x" + "33" * 32]),
+]
+PASS_THROUGH = [
+    ("eth_call", [{"to": "0x" + "22" * 20, "data": "0x"}, "latest"]),
+    ("eth_getBalance", ["0x" + "11" * 20, "pending"]),
+    ("eth_getCode", ["0x" + "11" * 20]),
+    ("eth_sendTransaction", [{"from": "0x" + "11" * 20}]),
+    ("evm_snapshot", []),
+    ("evm_mine", []),
+]
+
+
+class StubUpstream:
+    """
+    Local JSON-RPC node that records every request. Each response holds a new
+    result, so a cached response can be told apart from a forwarded one.
+    Requests with a `0xdead` param return an error.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, request):
+        with self._lock:
+            self.requests.append((request["method"], request["params"]))
+            count = len(self.requests)
+        if request["method"] == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": request["id"], "result": hex(FORK_BLOCK + count)}
+        if "0xdead" in request["params"]:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "failed"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": hex(count)}
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if isinstance(payload, list):
+                    body = [node.respond(i) for i in payload]
+                else:
+                    body = node.respond(payload)
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def upstream():
+    node = StubUpstream()
+    yield node
+    node.stop()
+
+
+@pytest.fixture
+def proxies():
+    running = []
+    yield running
+    for proxy in running:
+        proxy.stop()
+
+
+@pytest.fixture
+def proxy(upstream, proxies, tmp_path):
+    proxies.append(RpcCacheProxy(upstream.url, RpcCache(tmp_path), fork_block=FORK_BLOCK).start())
+    return proxies[-1]
+
+
+def call(url, method, params, rpc_id=1):
+    payload = {"jsonrpc": "2.0", "id": rpc_id, "method": method, "params": params}
+    return requests.post(url, json=payload).json()
+
+
+@pytest.mark.parametrize("method,params", CACHEABLE)
+def test_is_cacheable(method, params):
+    assert is_cacheable(method, params)
+
+
+@pytest.mark.parametrize("method,params", PASS_THROUGH)
+def test_is_not_cacheable(method, params):
+    assert not is_cacheable(method, params)
+
+
+def test_cache_hits_and_misses(proxy, upstream):
+    first = [call(proxy.url, *i) for i in CACHEABLE]
+    assert proxy.cache.misses == len(CACHEABLE)
+    assert proxy.cache.hits == 0
+    assert upstream.requests == CACHEABLE
+
+    second = [call(proxy.url, *i, rpc_id=2) for i in CACHEABLE]
+    assert proxy.cache.hits == len(CACHEABLE)
+    assert len(upstream.requests) == len(CACHEABLE)
+    assert [i["result"] for i in first] == [i["result"] for i in second]
+    assert all(i["id"] == 2 for i in second)
+
+
+def test_pass_through(proxy, upstream):
+    for _ in range(2):
+        responses = [call(proxy.url, *i) for i in PASS_THROUGH]
+    assert upstream.requests == PASS_THROUGH * 2
+    assert len({i["result"] for i in responses}) == len(PASS_THROUGH)
+    assert proxy.cache.hits == proxy.cache.misses == 0
+    assert not any(proxy.cache.root.glob("*/*.json"))
+
+
+def test_errors_not_cached(proxy, upstream):
+    params = ["0x" + "11" * 20, "0xdead", hex(FORK_BLOCK)]
+    for _ in range(2):
+        assert "error" in call(proxy.url, "eth_getStorageAt", params)
+    assert len(upstream.requests) == 2
+    assert not any(proxy.cache.root.glob("*/*.json"))
+
+
+def test_fork_block(proxy, upstream):
+    assert call(proxy.url, "eth_blockNumber", [])["result"] == hex(FORK_BLOCK)
+    assert upstream.requests == []
+
+
+def test_batch(proxy, upstream):
+    payload = [{"jsonrpc": "2.0", "id": c, "method": m, "params": p} for c, (m, p) in enumerate(CACHEABLE)]
+    first = requests.post(proxy.url, json=payload).json()
+    second = requests.post(proxy.url, json=payload).json()
+
+    assert [i["id"] for i in second] == list(range(len(CACHEABLE)))
+    assert first == second
+    assert len(upstream.requests) == len(CACHEABLE)
+
+
+def test_repeat_run_is_offline(upstream, proxies, tmp_path):
+    proxy, fork = start_proxy(upstream.url, tmp_path)
+    proxies.append(proxy)
+    # the first run pins the fork to the upstream head
+    block = int(fork.rpartition("@")[2])
+    assert upstream.requests == [("eth_blockNumber", [])]
+    assert RpcCache(tmp_path).get_fork_block() == block
+    first = [call(proxy.url, *i) for i in CACHEABLE]
+    proxy.stop()
+    proxies.remove(proxy)
+
+    count = len(upstream.requests)
+    proxy, fork = start_proxy(upstream.url, tmp_path)
+    proxies.append(proxy)
+    assert fork == f"{proxy.url}@{block}"
+    assert call(proxy.url, "eth_blockNumber", [])["result"] == hex(block)
+    assert [call(proxy.url, *i) for i in CACHEABLE] == first
+    assert len(upstream.requests) == count
+    assert proxy.cache.misses == 0
+
+
+def test_pinned_fork_block(upstream, proxies, tmp_path):
+    proxy, fork = start_proxy(f"{upstream.url}@{FORK_BLOCK}", tmp_path)
+    proxies.append(proxy)
+
+    assert fork == f"{proxy.url}@{FORK_BLOCK}"
+    assert upstream.requests == []
+    assert RpcCache(tmp_path).get_fork_block() == FORK_BLOCK
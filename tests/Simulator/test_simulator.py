@@ -0,0 +1,92 @@
+import pytest
+from brownie import chain
+
+from scripts.simulator import (
+    SCENARIOS,
+    claim_rewards,
+    core_mint_limit,
+    load_parameters,
+    simulate,
+    vote_ratio,
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, alice, staker, early_incentives, locker1, epx, advance_week, voter):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps], [100], {'from': locker1})
+
+    token_3eps.mint(alice, 100 * 10**18, {'from': token_3eps.minter()})
+    token_3eps.approve(staker, 2**256-1, {'from': alice})
+
+
+@pytest.fixture(scope="module")
+def params():
+    return load_parameters()
+
+
+def test_parameters(params, staker, locker, core_incentives):
+    assert params["DDD_EARN_RATIO"] == staker.DDD_EARN_RATIO()
+    assert params["DDD_LOCK_MULTIPLIER"] == staker.DDD_LOCK_MULTIPLIER()
+    assert params["DDD_LP_PCT"] == staker.DDD_LP_PERCENT()
+    assert params["MAX_LOCK_WEEKS"] == locker.MAX_LOCK_WEEKS()
+    assert params["CORE_MINT_PCT"] == core_incentives.MINT_PCT()
+    assert params["CORE_LOCK_WEEKS"] == core_incentives.LOCK_WEEKS()
+
+
+def test_claim_rewards(params, staker, alice, token_3eps, advance_week, epx, ddd, bonded_distro):
+    advance_week()
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    advance_week()
+    # push pending fees first, so the fee from the claim remains pending
+    staker.pushPendingProtocolFees({'from': alice})
+
+    earned = staker.claimable(alice, [token_3eps])[0][0]
+    staker.claim(alice, [token_3eps], earned // 4, {'from': alice})
+
+    received = epx.balanceOf(alice)
+    bonded = bonded_distro.bondedBalance(alice)
+    reward = staker.pendingFeeEpx() + received + bonded
+    expected = claim_rewards(reward, bonded / (received + bonded), params)
+
+    assert received == pytest.approx(expected[0], rel=1e-9)
+    assert bonded == pytest.approx(expected[1], rel=1e-9)
+    assert ddd.balanceOf(alice) == pytest.approx(expected[2], rel=1e-9)
+    assert staker.pendingFeeEpx() == pytest.approx(expected[3], rel=1e-9)
+    assert staker.pendingFeeDdd() == pytest.approx(expected[4], rel=1e-9)
+
+
+def test_core_mint_limit(params, core_incentives, core_receivers, ddd, staker, alice):
+    ddd.mint(alice, 10**24, {'from': staker})
+    chain.mine(timedelta=86400 * 3)
+    core_incentives.claim(core_receivers[0], 10**21, 4, {'from': core_receivers[0]})
+    chain.mine(timedelta=86400)
+
+    params = dict(params, MAX_DAILY_MINT=core_incentives.MAX_DAILY_MINT())
+    days = (chain[-1].timestamp - core_incentives.startTime()) // 86400
+    limit = core_mint_limit(ddd.totalSupply(), core_incentives.minted(), days, params)
+    assert limit == pytest.approx(min(core_incentives.supplyMintLimit(), core_incentives.timeMintLimit()))
+
+
+def test_vote_ratio(voter, locker, locker1, eps_voter, proxy, depx_pool, advance_week):
+    advance_week()
+    chain.mine(timedelta=86400 * 4)
+    eps_votes = eps_voter.availableVotes(proxy)
+    voter.vote([], [], {'from': locker1})
+
+    week = voter.getWeek()
+    ddd_votes = locker.weeklyTotalWeight(week) / 10**18
+    assert voter.epsVoteRatio(week) == vote_ratio(eps_votes, ddd_votes, eps_voter.isApproved(depx_pool))
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_simulate(params, scenario):
+    history = simulate(scenario, weeks=40, agents=1000, seed=0, params=params)
+
+    assert len(history["week"]) == 40
+    assert (history["ddd_supply"][1:] >= history["ddd_supply"][:-1]).all()
+    assert (history["core_minted"] <= history["ddd_supply"] * params["CORE_MINT_PCT"] / 100 * (1 + 1e-9)).all()
+    assert (history["vote_ratio"] > 0).all()
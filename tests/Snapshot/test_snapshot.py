@@ -0,0 +1,134 @@
+import pytest
+from brownie import chain
+
+from scripts.indexer import EventIndexer
+from scripts.reward_model import pending_rewards
+from scripts.snapshot import Snapshot, find_accounts, restore_state, take_snapshot
+
+
+@pytest.fixture(scope="module")
+def start_block(dotdot_setup):
+    return chain.height + 1
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(start_block, staker, locker, voter, bonded_distro, early_incentives, eps_fee_distro, epx, depx, ddd, fee1, token_3eps, token_abnb, alice, bob, locker1, deployer, advance_week):
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    fee1.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+    fee1._mint_for_testing(deployer, 10**24)
+
+    for acct in [alice, bob]:
+        for token in [token_3eps, token_abnb]:
+            token.mint(acct, 100 * 10**18, {'from': token.minter()})
+            token.approve(staker, 2**256-1, {'from': acct})
+        ddd.mint(acct, 10**21, {'from': staker})
+        ddd.approve(locker, 2**256-1, {'from': acct})
+        depx.deposit(acct, 10**21, False, {'from': locker1})
+        depx.approve(bonded_distro, 2**256-1, {'from': acct})
+
+    staker.deposit(alice, token_3eps, 4 * 10**18, {'from': alice})
+    staker.deposit(bob, token_abnb, 3 * 10**18 + 7, {'from': bob})
+    locker.lock(alice, 10**21, locker.MAX_LOCK_WEEKS(), {'from': alice})
+    locker.lock(bob, 3 * 10**20, 5, {'from': bob})
+    bonded_distro.deposit(alice, 10**21, {'from': alice})
+    eps_fee_distro.depositFee(fee1, 10**18, {'from': deployer})
+    advance_week()
+
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+    voter.vote([token_3eps], [voter.availableVotes(alice)], {'from': alice})
+    bonded_distro.fetchEllipsisFees([fee1], {'from': deployer})
+    bonded_distro.deposit(bob, 5 * 10**20, {'from': bob})
+    advance_week()
+
+    chain.sleep(86400)
+    staker.claim(alice, [token_3eps], 0, {'from': alice})
+    staker.withdraw(bob, token_abnb, 10**18, {'from': bob})
+    advance_week()
+    chain.mine(timedelta=3600)
+
+
+@pytest.fixture(scope="module")
+def snapshot(tmp_path_factory, start_block, staker, locker, voter, bonded_distro, depx):
+    contracts = [staker, locker, voter, bonded_distro, depx]
+    indexer = EventIndexer(
+        tmp_path_factory.mktemp("snapshot").joinpath("events.db"),
+        {i._name: (i.address, i.abi) for i in contracts},
+        start_block=start_block,
+    )
+    indexer.sync()
+    accounts = find_accounts(indexer)
+    indexer.close()
+    return take_snapshot(staker, locker, voter, bonded_distro, accounts, chain.height)
+
+
+def test_reward_model(snapshot, staker, token_3eps, token_abnb, alice, bob):
+    model = snapshot.to_reward_model()
+    assert sorted(model.users) == sorted([alice, bob])
+    pending, _ = pending_rewards(model, staker)
+    epx, ddd = model.claimable(pending)
+    for u, user in enumerate(model.users):
+        assert staker.claimable(user, model.pools) == list(zip(epx[u], ddd[u]))
+
+
+def test_fee_engine(snapshot, bonded_distro, fee1, alice, bob):
+    engine = snapshot.to_fee_engine()
+    for user in [alice, bob]:
+        tx = bonded_distro.claim(user, [fee1], {'from': user})
+        assert engine.claim(user, [fee1], tx.timestamp) == tx.return_value
+
+
+def test_save_and_load(snapshot, tmp_path):
+    path = tmp_path.joinpath("snapshot.npz")
+    snapshot.save(path)
+    loaded = Snapshot.load(path)
+
+    assert loaded.meta == snapshot.meta
+    assert loaded.users == snapshot.users
+    assert loaded.tokens == snapshot.tokens
+    assert loaded.tables.keys() == snapshot.tables.keys()
+    for name in snapshot.tables:
+        for key, value in loaded.table(name).items():
+            assert list(value) == list(snapshot.table(name)[key])
+
+
+def test_restore(snapshot, LpDepositor, TokenLocker, DotDotVoting, BondedFeeDistributor, staker, locker, voter, bonded_distro, epx, eps_staker, eps_voter, eps_locker, eps_fee_distro, ddd, depx, proxy, ddd_distro, ddd_lp_staker, depx_pool, fee1, token_3eps, token_abnb, alice, bob, locker1, deployer):
+    new_staker = LpDepositor.deploy(epx, eps_staker, eps_voter, staker.DDD_EARN_RATIO(), staker.DDD_LOCK_MULTIPLIER(), staker.DDD_LP_PERCENT(), {'from': deployer})
+    new_staker.setAddresses(ddd, depx, proxy, bonded_distro, ddd_distro, ddd_lp_staker, staker.depositTokenImplementation(), depx_pool, {'from': deployer})
+    new_locker = TokenLocker.deploy(eps_locker, locker.MAX_LOCK_WEEKS(), {'from': deployer})
+    new_voter = DotDotVoting.deploy(eps_voter, eps_locker, {'from': deployer})
+    new_distro = BondedFeeDistributor.deploy(epx, eps_fee_distro, {'from': deployer})
+
+    restore_state(
+        snapshot,
+        {
+            "LpDepositor": new_staker.address,
+            "TokenLocker": new_locker.address,
+            "DotDotVoting": new_voter.address,
+            "BondedFeeDistributor": new_distro.address,
+        },
+    )
+
+    pools = [token_3eps, token_abnb]
+    for user in [alice, bob]:
+        assert new_staker.claimable(user, pools) == staker.claimable(user, pools)
+        assert new_locker.userBalance(user) == locker.userBalance(user)
+        assert new_distro.bondedBalance(user) == bonded_distro.bondedBalance(user)
+        assert new_distro.unbondableBalance(user) == bonded_distro.unbondableBalance(user)
+        assert new_distro.claimable(user, [fee1]) == bonded_distro.claimable(user, [fee1])
+    for pool in pools:
+        assert new_staker.totalBalances(pool) == staker.totalBalances(pool)
+
+    week = locker.getWeek()
+    for i in range(week + locker.MAX_LOCK_WEEKS() + 1):
+        assert new_locker.weeklyTotalWeight(i) == locker.weeklyTotalWeight(i)
+        for user in [alice, bob, locker1]:
+            assert new_locker.weeklyWeightOf(user, i) == locker.weeklyWeightOf(user, i)
+    for i in range(voter.getWeek() + 1):
+        for pool in pools:
+            assert new_voter.tokenVotes(pool, i) == voter.tokenVotes(pool, i)
+            assert new_voter.userTokenVotes(alice, pool, i) == voter.userTokenVotes(alice, pool, i)
+        assert new_voter.userVotes(locker1, i) == voter.userVotes(locker1, i)
+    assert new_distro.bondedSupply() == bonded_distro.bondedSupply()
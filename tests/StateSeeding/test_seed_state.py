@@ -0,0 +1,113 @@
+import pytest
+from brownie import chain, multicall
+
+from scripts.seed_state import Population, seed_state
+
+WEEKS = 20
+
+
+@pytest.fixture(scope="module")
+def population(token_3eps, token_abnb, locker, alice, bob):
+    return Population(
+        [token_3eps, token_abnb], 150, 100, 100, WEEKS, users=[alice, bob], max_lock_weeks=locker.MAX_LOCK_WEEKS()
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, population, fund_population, staker, locker, voter, bonded_distro, early_incentives, epx, locker1, charlie, advance_week):
+    # existing lock and bond from real transactions, which the seeded totals are added to
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    advance_week(WEEKS)
+
+    fund_population(population, charlie)
+    seed_state(population, charlie, staker, locker, voter, bonded_distro)
+
+
+def test_lp_balances(DepositToken, population, staker, charlie):
+    users = population.users[: len(population.lp_amounts)]
+    with multicall:
+        balances = [staker.userBalances(u, population.pools[p]) for u, p in zip(users, population.lp_pools)]
+    assert balances == [int(i) * 10**18 for i in population.lp_amounts]
+
+    for pool, total in population.lp_totals().items():
+        assert staker.totalBalances(pool) == total
+        assert staker.userBalances(charlie, pool) == 0
+        assert DepositToken.at(staker.depositTokens(pool)).totalSupply() == total
+
+
+def test_vote_claim_and_withdraw(population, staker, locker, voter, ddd, depx, alice, locker1, advance_week):
+    pool = population.pools[population.lp_pools[0]]
+    ddd.mint(alice, 10**21, {'from': staker})
+    ddd.approve(locker, 2**256-1, {'from': alice})
+    locker.lock(alice, 10**21, locker.MAX_LOCK_WEEKS(), {'from': alice})
+    # ensure the proxy has enough EPS votes relative to the seeded DDD lock weight
+    depx.deposit(locker1, 10**26, False, {'from': locker1})
+
+    advance_week()
+    chain.sleep(86400 * 4)
+    votes = voter.availableVotes(alice)
+    voter.vote([pool], [votes], {'from': alice})
+    assert voter.tokenVotes(pool, voter.getWeek()) == votes
+
+    advance_week()
+    chain.sleep(86400)
+    staker.claim(alice, [pool], 0, {'from': alice})
+
+    # every seeded user earns the same reward per deposited token
+    users = [u for u, p in zip(population.users[1:], population.lp_pools[1:]) if population.pools[p] == pool]
+    with multicall:
+        rates = [staker.claimable(u, [pool])[0][0] / staker.userBalances(u, pool) for u in users]
+    assert min(rates) > 0
+    assert min(rates) == pytest.approx(max(rates), rel=1e-9)
+
+    amount = staker.userBalances(alice, pool)
+    staker.withdraw(alice, pool, amount, {'from': alice})
+    assert staker.totalBalances(pool) == population.lp_totals()[pool] - amount
+
+
+def test_lock_weights(population, locker, ddd, locker1):
+    users = population.users[: len(population.vote_pools)] + [locker1]
+    week = locker.getWeek()
+    for i in range(week - WEEKS, week + locker.MAX_LOCK_WEEKS() + 1):
+        with multicall:
+            weights = [locker.weeklyWeightOf(u, i) for u in users]
+        assert locker.weeklyTotalWeight(i) == sum(weights)
+
+    with multicall:
+        balances = [locker.userBalance(u) for u in users]
+    for owner in range(len(users) - 1):
+        assert balances[owner] == int(population.lock_amounts[population.lock_owners == owner].sum()) * 10**18
+    assert ddd.balanceOf(locker) == sum(balances)
+
+
+def test_votes(population, voter, locker):
+    users = population.users[: len(population.vote_pools)]
+    week = voter.getWeek()
+    for i in range(week - WEEKS, week + 1):
+        with multicall:
+            used = [voter.userVotes(u, i) for u in users]
+            weights = [locker.weeklyWeightOf(u, i) for u in users]
+            token_votes = [voter.userTokenVotes(u, population.pools[p], i) for u, p in zip(users, population.vote_pools)]
+            totals = [voter.tokenVotes(pool, i) for pool in population.pools]
+        assert used == token_votes
+        assert all(a <= b // 10**18 for a, b in zip(used, weights))
+        assert sum(totals) == sum(used)
+        if i == week:
+            assert sum(used) == 0
+
+
+def test_bonds(population, bonded_distro, depx, locker1, alice, advance_week):
+    users = population.users[: len(population.bond_amounts)]
+    with multicall:
+        balances = [bonded_distro.bondedBalance(u) for u in users]
+    assert balances == [int(i) * 10**18 for i in population.bond_amounts]
+    assert bonded_distro.bondedSupply() == sum(balances) + bonded_distro.bondedBalance(locker1)
+    assert depx.balanceOf(bonded_distro) >= bonded_distro.bondedSupply()
+
+    advance_week(2)
+    amount = bonded_distro.unbondableBalance(alice)
+    assert amount == balances[0]
+    bonded_distro.initiateUnbondingStream(amount, {'from': alice})
+    assert bonded_distro.bondedSupply() == sum(balances[1:]) + bonded_distro.bondedBalance(locker1)
+
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.xdist_scheduler import DurationScheduling, load_durations, store_durations
+
+# module -> number of tests
+MODULES = {"tests/test_a.py": 3, "tests/test_b.py": 1, "tests/test_c.py": 2, "tests/test_d.py": 4}
+DURATIONS = {"tests/test_a.py": 10.0, "tests/test_b.py": 50.0, "tests/test_c.py": 5.0}
+
+
+class FakeNode:
+    def __init__(self, name):
+        self.gateway = SimpleNamespace(id=name)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indexes):
+        self.sent.append(indexes)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def _config(workers):
+    return SimpleNamespace(getvalue=lambda name: [f"{workers}*popen"], option=SimpleNamespace(loadscopereorder=False))
+
+
+@pytest.fixture
+def collection():
+    return [f"{module}::test_{i}" for module, count in MODULES.items() for i in range(count)]
+
+
+@pytest.fixture
+def scheduler(collection):
+    def start(workers, durations=DURATIONS):
+        sched = DurationScheduling(_config(workers), durations=durations)
+        nodes = [FakeNode(f"gw{i}") for i in range(workers)]
+        for node in nodes:
+            sched.add_node(node)
+            sched.add_node_collection(node, collection)
+        sched.schedule()
+        return sched, nodes
+
+    return start
+
+
+def _modules(collection, node):
+    # module of each batch of tests sent to `node`
+    return [collection[indexes[0]].split("::")[0] for indexes in node.sent]
+
+
+def test_estimate(scheduler):
+    sched, _ = scheduler(2)
+
+    assert sched.estimate("tests/test_b.py") == 50.0
+    # modules without a duration use the average per test of the recorded modules
+    assert sched.estimate("tests/test_d.py") == pytest.approx(4 * 65 / 6)
+    assert sched.estimate("tests/test_unknown.py") == 0
+
+
+def test_longest_first(scheduler, collection):
+    sched, (first, second) = scheduler(2)
+
+    assert _modules(collection, first) == ["tests/test_b.py", "tests/test_a.py"]
+    assert _modules(collection, second) == ["tests/test_d.py"]
+    assert first.sent[0] == [collection.index("tests/test_b.py::test_0")]
+    assert list(sched.workqueue) == ["tests/test_c.py"]
+
+    # the remaining module goes to the next worker with capacity
+    sched._assign_work_unit(second)
+    assert _modules(collection, second) == ["tests/test_d.py", "tests/test_c.py"]
+    assert not sched.workqueue
+
+
+def test_single_worker_order(scheduler, collection):
+    sched, (node,) = scheduler(1)
+    while sched.workqueue:
+        sched._assign_work_unit(node)
+
+    assert _modules(collection, node) == ["tests/test_b.py", "tests/test_d.py", "tests/test_a.py", "tests/test_c.py"]
+
+
+def test_no_durations(scheduler, collection):
+    sched, (node,) = scheduler(1, durations={})
+    while sched.workqueue:
+        sched._assign_work_unit(node)
+
+    # every estimate is zero, so modules are run in collection order
+    assert _modules(collection, node) == list(MODULES)
+
+
+def test_store_durations(tmp_path):
+    path = tmp_path.joinpath("durations.json")
+    assert load_durations(path) == {}
+
+    store_durations({"tests/test_a.py": 1.5}, path)
+    store_durations({"tests/test_b.py": 2.0, "tests/test_a.py": 3.0}, path)
+    assert load_durations(path) == {"tests/test_a.py": 3.0, "tests/test_b.py": 2.0}
@@ -0,0 +1,59 @@
+from brownie import chain
+from brownie.network import rpc
+import pytest
+
+from scripts.gas_benchmark import GasBenchmark
+from scripts.gas_curves import BSC_BLOCK_GAS_LIMIT, GasCurves
+
+
+@pytest.fixture(scope="session")
+def gas_benchmark(request, is_local):
+    config = request.config
+    benchmark = GasBenchmark("local" if is_local else "fork", config.getoption("gas_tolerance"))
+    config._gas_benchmark = benchmark
+    yield benchmark
+    if hasattr(config, "workeroutput"):
+        # xdist worker, the controller merges the results of every worker
+        config.workeroutput["gas_results"] = benchmark.results
+
+
+@pytest.fixture
+def record_gas(request, gas_benchmark):
+    def fn(name, tx):
+        error = gas_benchmark.record(name, tx.gas_used)
+        if error and not request.config.getoption("update_gas_baseline"):
+            pytest.fail(error)
+        return tx
+
+    return fn
+
+
+@pytest.fixture(scope="session")
+def gas_curves(request):
+    config = request.config
+    output = config.getoption("gas_curves")
+    if not output:
+        pytest.skip("use --gas-curves DIR to run the gas scaling sweeps")
+    curves = GasCurves(config.getoption("block_gas_limit") or BSC_BLOCK_GAS_LIMIT, config.getoption("gas_horizon"))
+    config._gas_curves = curves
+    yield curves
+    curves.write(output)
+
+
+@pytest.fixture
+def sweep(gas_curves):
+    """
+    Record a gas curve. `action` is called with each value in `points` and must
+    return the transaction to measure. The chain is reverted after each point.
+    """
+
+    def fn(name, axis, points, action):
+        curve = gas_curves.curve(name, axis)
+        for x in points:
+            snapshot_id = rpc.Rpc().snapshot()
+            tx = action(x)
+            curve.add(x, tx.gas_used)
+            chain._revert(snapshot_id)
+        return curve
+
+    return fn
@@ -0,0 +1,133 @@
+import pytest
+from brownie import chain
+from brownie_tokens import ERC20
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, token_3eps, token_abnb, alice, bob, staker, early_incentives, locker1, epx, depx, ddd, advance_week, voter):
+    advance_week()
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    early_incentives.deposit(locker1, 10**24, {'from': locker1})
+    early_incentives.deposit(bob, 10**24, {'from': locker1})
+    chain.sleep(86400 * 4)
+    voter.vote([token_3eps, token_abnb], [75, 25], {'from': locker1})
+
+    for token in [token_3eps, token_abnb]:
+        token.mint(alice, 100 * 10**18, {'from': token.minter()})
+        token.approve(staker, 2**256-1, {'from': alice})
+    ddd.mint(alice, 100 * 10**18, {'from': staker})
+
+
+@pytest.fixture(scope="module")
+def fee_tokens(eps_fee_distro, deployer):
+    tokens = []
+    for i in range(4):
+        token = ERC20()
+        token._mint_for_testing(deployer, 10**24)
+        token.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+        tokens.append(token)
+    return tokens
+
+
+@pytest.fixture(scope="module")
+def ddd_lp(ddd, wbnb, ddd_pool, alice, staker, ddd_lp_staker):
+    ddd.mint(ddd_pool, 10**20, {'from': staker})
+    wbnb.deposit({'from': alice, 'value': "100 ether"})
+    wbnb.transfer(ddd_pool, 10**20, {'from': alice})
+    ddd_pool.mint(alice, {'from': alice})
+    ddd_pool.approve(ddd_lp_staker, 2**256-1, {'from': alice})
+    return ddd_pool
+
+
+# LpDepositor
+
+def test_deposit(staker, alice, token_3eps, record_gas):
+    record_gas("LpDepositor.deposit[first]", staker.deposit(alice, token_3eps, 10**18, {'from': alice}))
+    chain.sleep(3600)
+    record_gas("LpDepositor.deposit", staker.deposit(alice, token_3eps, 10**18, {'from': alice}))
+
+
+def test_withdraw(staker, alice, token_3eps, record_gas):
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    chain.sleep(3600)
+    record_gas("LpDepositor.withdraw", staker.withdraw(alice, token_3eps, 10**17, {'from': alice}))
+
+
+@pytest.mark.parametrize("pools", [1, 2])
+def test_claim(staker, alice, token_3eps, token_abnb, advance_week, record_gas, pools):
+    tokens = [token_3eps, token_abnb][:pools]
+    for token in tokens:
+        staker.deposit(alice, token, 10**18, {'from': alice})
+    advance_week()
+    record_gas(f"LpDepositor.claim[pools={pools}]", staker.claim(alice, tokens, 0, {'from': alice}))
+
+
+def test_transfer_deposit(DepositToken, staker, alice, bob, token_3eps, record_gas):
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    deposit_token = DepositToken.at(staker.depositTokens(token_3eps))
+    chain.sleep(3600)
+    record_gas("LpDepositor.transferDeposit", deposit_token.transfer(bob, 10**17, {'from': alice}))
+
+
+def test_push_protocol_fees(staker, alice, token_3eps, advance_week, record_gas):
+    advance_week()
+    staker.deposit(alice, token_3eps, 10**18, {'from': alice})
+    chain.mine(timedelta=50000)
+    staker.claim(alice, [token_3eps], 0, {'from': alice})
+    record_gas("LpDepositor.pushPendingProtocolFees", staker.pushPendingProtocolFees({'from': alice}))
+
+
+# LockedEPX / EpxDepositIncentives
+
+@pytest.mark.parametrize("bond", [False, True])
+def test_depx_deposit(depx, locker1, alice, record_gas, bond):
+    record_gas(f"LockedEPX.deposit[bond={bond}]", depx.deposit(alice, 10**21, bond, {'from': locker1}))
+
+
+def test_early_deposit(early_incentives, locker1, alice, record_gas):
+    record_gas("EpxDepositIncentives.deposit", early_incentives.deposit(alice, 10**21, {'from': locker1}))
+
+
+# BondedFeeDistributor
+
+@pytest.mark.parametrize("n_tokens", [1, 4])
+def test_bonded_claim(bonded_distro, eps_fee_distro, depx, fee_tokens, locker1, alice, deployer, advance_week, record_gas, n_tokens):
+    tokens = fee_tokens[:n_tokens]
+    for token in tokens:
+        eps_fee_distro.depositFee(token, 10**18, {'from': deployer})
+    advance_week()
+    depx.deposit(alice, 10**21, False, {'from': locker1})
+    depx.approve(bonded_distro, 2**256-1, {'from': alice})
+    bonded_distro.deposit(alice, 10**21, {'from': alice})
+    chain.sleep(86400)
+    bonded_distro.fetchEllipsisFees(tokens, {'from': deployer})
+    advance_week(3)
+    record_gas(f"BondedFeeDistributor.claim[tokens={n_tokens}]", bonded_distro.claim(alice, tokens, {'from': alice}))
+
+
+# TokenLocker
+
+@pytest.mark.parametrize("weeks", [1, 16])
+def test_lock(locker, ddd, alice, record_gas, weeks):
+    ddd.approve(locker, 2**256-1, {'from': alice})
+    record_gas(f"TokenLocker.lock[weeks={weeks}]", locker.lock(alice, 10**18, weeks, {'from': alice}))
+
+
+# DotDotVoting
+
+@pytest.mark.parametrize("n_tokens", [1, 2])
+def test_vote(voter, bob, token_3eps, token_abnb, record_gas, n_tokens):
+    tokens = [token_3eps, token_abnb][:n_tokens]
+    record_gas(f"DotDotVoting.vote[tokens={n_tokens}]", voter.vote(tokens, [10] * n_tokens, {'from': bob}))
+
+
+# DddLpStaker
+
+@pytest.mark.parametrize("deposits", [1, 10])
+def test_ddd_lp_withdraw(ddd_lp_staker, ddd_lp, alice, record_gas, deposits):
+    for i in range(deposits):
+        ddd_lp_staker.deposit(alice, 10**17, False, {'from': alice})
+        chain.sleep(86400)
+    amount = ddd_lp_staker.balanceOf(alice)
+    record_gas(f"DddLpStaker.withdraw[deposits={deposits}]", ddd_lp_staker.withdraw(alice, amount, False, {'from': alice}))
@@ -0,0 +1,163 @@
+from brownie import ZERO_ADDRESS, chain, interface
+from brownie_tokens import ERC20
+import pytest
+
+WEEKS = [0, 1, 2, 5, 10, 25, 50, 100, 150, 200]
+POOLS = [1, 2, 4, 6, 8]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, epx, depx, early_incentives, locker1, ddd, staker, alice):
+    epx.approve(early_incentives, 2**256-1, {'from': locker1})
+    epx.approve(depx, 2**256-1, {'from': locker1})
+    ddd.mint(alice, 10**24, {'from': staker})
+
+
+@pytest.fixture(scope="module")
+def fee_tokens(deployer):
+    tokens = []
+    for i in range(8):
+        token = ERC20()
+        token._mint_for_testing(deployer, 10**24)
+        tokens.append(token)
+    return tokens
+
+
+def test_bonded_claim_weeks(sweep, bonded_distro, eps_fee_distro, depx, fee_tokens, locker1, alice, deployer, advance_week):
+    fee = fee_tokens[0]
+    fee.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+    eps_fee_distro.depositFee(fee, 10**18, {'from': deployer})
+    depx.deposit(alice, 10**21, True, {'from': locker1})
+
+    def action(weeks):
+        if weeks:
+            advance_week(weeks)
+        return bonded_distro.claim(alice, [fee], {'from': alice})
+
+    sweep("BondedFeeDistributor.claim", "weeks", WEEKS, action)
+
+
+def test_bonded_claim_tokens(sweep, bonded_distro, eps_fee_distro, depx, fee_tokens, locker1, alice, deployer, advance_week):
+    for token in fee_tokens:
+        token.approve(eps_fee_distro, 2**256-1, {'from': deployer})
+        eps_fee_distro.depositFee(token, 10**18, {'from': deployer})
+    depx.deposit(alice, 10**21, True, {'from': locker1})
+    advance_week(2)
+
+    def action(n_tokens):
+        return bonded_distro.claim(alice, fee_tokens[:n_tokens], {'from': alice})
+
+    sweep("BondedFeeDistributor.claim[tokens]", "tokens", [1, 2, 4, 8], action)
+
+
+def test_incentive_claim_weeks(sweep, ddd_distro, early_incentives, fee_tokens, locker1, alice, deployer, advance_week):
+    fee = fee_tokens[0]
+    early_incentives.deposit(alice, 10**24, {'from': locker1})
+    fee.approve(ddd_distro, 2**256-1, {'from': deployer})
+    ddd_distro.depositIncentive(ZERO_ADDRESS, fee, 10**18, {'from': deployer})
+
+    def action(weeks):
+        if weeks:
+            advance_week(weeks)
+        return ddd_distro.claim(alice, ZERO_ADDRESS, [fee], {'from': alice})
+
+    sweep("DddIncentiveDistributor.claim", "weeks", WEEKS, action)
+
+
+def test_exit_stream_weeks(sweep, locker, ddd, alice, advance_week):
+    ddd.approve(locker, 2**256-1, {'from': alice})
+    locker.lock(alice, 10**18, 1, {'from': alice})
+    # the lock has expired before the sweep starts, so there is a streamable balance at 0 weeks
+    advance_week(2)
+
+    def action(weeks):
+        if weeks:
+            advance_week(weeks)
+        # the cost of `streamableBalance` scales with weeks since the last exit stream
+        return locker.initiateExitStream({'from': alice})
+
+    sweep("TokenLocker.initiateExitStream", "weeks", WEEKS, action)
+
+
+def test_ddd_lp_withdraw_deposits(sweep, ddd_lp_staker, ddd, wbnb, ddd_pool, staker, alice):
+    ddd.mint(ddd_pool, 10**20, {'from': staker})
+    wbnb.deposit({'from': alice, 'value': "100 ether"})
+    wbnb.transfer(ddd_pool, 10**20, {'from': alice})
+    ddd_pool.mint(alice, {'from': alice})
+    ddd_pool.approve(ddd_lp_staker, 2**256-1, {'from': alice})
+
+    def action(deposits):
+        # deposits are tracked per day, so each one creates a new entry to walk on withdrawal
+        for i in range(deposits):
+            ddd_lp_staker.deposit(alice, 10**17, False, {'from': alice})
+            chain.sleep(86400)
+        return ddd_lp_staker.withdraw(alice, ddd_lp_staker.balanceOf(alice), False, {'from': alice})
+
+    sweep("DddLpStaker.withdraw", "deposits", [1, 5, 10, 25, 50], action)
+
+
+def test_update_reserved_deposits_weeks(sweep, early_incentives, locker1, locker2, advance_week):
+    # legacy locks are registered in the first week and released weekly as they expire.
+    # `totalWeeklyReservedDeposits` only covers 13 weeks, so the sweep cannot go further.
+    early_incentives.registerLegacyLocks(locker1, {'from': locker1})
+    early_incentives.registerLegacyLocks(locker2, {'from': locker2})
+
+    def action(weeks):
+        advance_week(weeks)
+        return early_incentives.updateReservedDeposits({'from': locker1})
+
+    sweep("EpxDepositIncentives.updateReservedDeposits", "weeks", [1, 2, 4, 8, 12, 13], action)
+
+
+def test_lp_claim_pools(sweep, staker, voter, eps_voter, early_incentives, factory, token_3eps, token_abnb, locker1, alice, bob, charlie, deployer, advance_week):
+    advance_week()
+    creators = [alice, bob, charlie, locker1]
+    for acct in creators:
+        early_incentives.deposit(acct, 10**25, {'from': locker1})
+    advance_week()
+    # other token approval votes can only be created once the fixed vote pool is approved
+    voter.createFixedVoteApprovalVote({'from': alice})
+
+    # approve new pools the same way as on mainnet. EPS allows one new approval vote
+    # per week from the proxy, and DotDot allows one per 30 days from each creator.
+    tokens = [token_3eps, token_abnb]
+    for i in range(max(POOLS) - len(tokens)):
+        advance_week()
+        if i >= len(creators):
+            chain.sleep(86400 * 3)
+        token = _deploy_pool(factory, i, alice, deployer)
+        tx = voter.createTokenApprovalVote(token, {'from': creators[i % len(creators)]})
+        vote_index = tx.events['CreatedTokenApprovalVote']['voteIndex']
+        for acct in creators:
+            voter.voteForTokenApproval(vote_index, 2**256-1, {'from': acct})
+            if eps_voter.isApproved(token):
+                break
+        tokens.append(token)
+
+    advance_week()
+    chain.sleep(86400 * 4)
+    voter.vote(tokens, [10] * len(tokens), {'from': locker1})
+    for token in [token_3eps, token_abnb]:
+        token.mint(alice, 10**20, {'from': token.minter()})
+    for token in tokens:
+        token.approve(staker, 2**256-1, {'from': alice})
+        staker.deposit(alice, token, 10**18, {'from': alice})
+    advance_week()
+
+    def action(pools):
+        return staker.claim(alice, tokens[:pools], 0, {'from': alice})
+
+    sweep("LpDepositor.claim", "pools", POOLS, action)
+
+
+def _deploy_pool(factory, index, receiver, deployer):
+    coins = [ERC20() for i in range(2)]
+    tx = factory.deploy_plain_pool(
+        f"Gas Curve Pool {index}", f"GAS{index}", coins + [ZERO_ADDRESS] * 2, 200, 4000000, 0, 0, {'from': deployer}
+    )
+    pool = interface.IEllipsisPool2(tx.return_value)
+    for coin in coins:
+        coin._mint_for_testing(receiver, 10**20)
+        coin.approve(pool, 2**256-1, {'from': receiver})
+    pool.add_liquidity([10**20, 10**20], 0, receiver, {'from': receiver})
+    return interface.IERC20(tx.events['PlainPoolDeployed']['lp_token'])
@@ -0,0 +1,66 @@
+import pytest
+from brownie import chain
+
+from scripts.seed_state import Population, seed_state
+
+# size of the seeded population
+LPS = 50_000
+LOCKERS = 10_000
+BONDERS = 10_000
+HISTORY_WEEKS = 200
+
+# checked before any fixture runs, so the population is not built or deployed when skipped
+pytestmark = pytest.mark.skipif(
+    "not config.getoption('seeded_state')", reason="use --seeded-state to run the benchmarks against a seeded state"
+)
+
+
+@pytest.fixture(scope="module")
+def population(token_3eps, token_abnb, locker, alice):
+    return Population(
+        [token_3eps, token_abnb], LPS, LOCKERS, BONDERS, HISTORY_WEEKS, users=[alice], max_lock_weeks=locker.MAX_LOCK_WEEKS()
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(dotdot_setup, population, fund_population, staker, locker, voter, bonded_distro, epx, depx, ddd, alice, charlie, locker1, advance_week):
+    advance_week(HISTORY_WEEKS)
+    fund_population(population, charlie)
+    seed_state(population, charlie, staker, locker, voter, bonded_distro)
+
+    # EPS votes for the proxy, and a DDD lock for alice to vote with
+    depx.deposit(locker1, 10**26, False, {'from': locker1})
+    ddd.mint(alice, 10**21, {'from': staker})
+    ddd.approve(locker, 2**256-1, {'from': alice})
+    locker.lock(alice, 10**21, locker.MAX_LOCK_WEEKS(), {'from': alice})
+    advance_week()
+    chain.sleep(86400 * 4)
+
+
+def test_lp_claim(population, staker, alice, record_gas):
+    pool = population.pools[population.lp_pools[0]]
+    record_gas("LpDepositor.claim[seeded]", staker.claim(alice, [pool], 0, {'from': alice}))
+
+
+def test_lp_withdraw(population, staker, alice, record_gas):
+    pool = population.pools[population.lp_pools[0]]
+    record_gas("LpDepositor.withdraw[seeded]", staker.withdraw(alice, pool, 10**18, {'from': alice}))
+
+
+def test_lock(locker, ddd, staker, alice, record_gas):
+    ddd.mint(alice, 10**18, {'from': staker})
+    record_gas("TokenLocker.lock[seeded]", locker.lock(alice, 10**18, locker.MAX_LOCK_WEEKS(), {'from': alice}))
+
+
+def test_vote(population, voter, alice, record_gas):
+    tokens = population.pools
+    record_gas("DotDotVoting.vote[seeded]", voter.vote(tokens, [1] * len(tokens), {'from': alice}))
+
+
+def test_bonded_claim(bonded_distro, epx, ddd, alice, record_gas):
+    record_gas("BondedFeeDistributor.claim[seeded]", bonded_distro.claim(alice, [epx, ddd], {'from': alice}))
+
+
+def test_unbond(bonded_distro, alice, record_gas):
+    amount = bonded_distro.unbondableBalance(alice)
+    record_gas("BondedFeeDistributor.initiateUnbondingStream[seeded]", bonded_distro.initiateUnbondingStream(amount, {'from': alice}))
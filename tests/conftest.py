@@ -1,10 +1,17 @@
-from brownie import Contract, project, chain, ZERO_ADDRESS, interface
+import os
+import re
+
+from brownie import Contract, project, chain, history, multicall, web3, ZERO_ADDRESS, interface
+from brownie._config import CONFIG
+from brownie.network import rpc
 from brownie_tokens import ERC20
+from eip712.messages import EIP712Message
 import pytest
 
 
 START_TIME = 1649289600
 MAX_LOCK_WEEKS = 16
+WEEK = 86400 * 7
 
 DDD_EARN_RATIO = 20
 DDD_LOCK_MULTIPLIER = 3
@@ -22,13 +29,241 @@ RECEIVERS = {
     "": 0,
 }
 
+# EPX balance given to each of the local legacy lockers
+LOCAL_LOCKER_BALANCE = 10**27
+
+# test module -> total duration in seconds, recorded when using `--store-durations`
+MODULE_DURATIONS = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--local",
+        action="store_true",
+        help="Run against local Ellipsis stand-ins on a development chain instead of a BSC fork",
+    )
+    parser.addoption(
+        "--rpc-cache",
+        metavar="DIR",
+        help="Cache responses from the forked node in DIR, so that repeat runs are offline",
+    )
+    parser.addoption(
+        "--gas-tolerance",
+        type=float,
+        default=1.0,
+        metavar="PCT",
+        help="Allowed gas increase over the benchmark baseline, as a percentage",
+    )
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="Write gas benchmark results to tests/benchmarks/gas-baseline.json",
+    )
+    parser.addoption(
+        "--gas-curves",
+        metavar="DIR",
+        help="Run the gas scaling sweeps in tests/benchmarks and write the results to DIR",
+    )
+    parser.addoption(
+        "--gas-horizon",
+        type=int,
+        default=208,
+        metavar="WEEKS",
+        help="Flag gas curves projected to exceed the block gas limit within WEEKS",
+    )
+    parser.addoption(
+        "--block-gas-limit",
+        type=int,
+        help="Block gas limit used for gas curve projections (default: BSC block gas limit)",
+    )
+    parser.addoption(
+        "--gas-profile",
+        metavar="DIR",
+        help="Write an opcode-level gas profile of the transactions in each test to DIR",
+    )
+    parser.addoption(
+        "--seeded-state",
+        action="store_true",
+        help="Run the gas benchmarks in tests/benchmarks against a production-sized seeded state",
+    )
+    parser.addoption(
+        "--fuzz-steps",
+        type=int,
+        default=500,
+        metavar="N",
+        help="Total number of steps for the differential fuzzing state machine in tests/Fuzzing",
+    )
+    parser.addoption(
+        "--store-durations",
+        action="store_true",
+        help="Record the duration of each test module, used to schedule modules when running with -n",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if config.getoption("local"):
+        config.option.network = ["development"]
+    elif config.getoption("rpc_cache"):
+        _enable_rpc_cache(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    # xdist workers share the controller's caching proxy
+    fork = getattr(node.config, "_rpc_cache_fork", None)
+    if fork is not None:
+        node.workerinput["rpc_cache_fork"] = fork
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # gas benchmarks are recorded by each worker, and reported and saved by the controller
+    results = getattr(node, "workeroutput", {}).get("gas_results")
+    if results:
+        from scripts.gas_benchmark import GasBenchmark
+
+        config = node.config
+        if getattr(config, "_gas_benchmark", None) is None:
+            mode = "local" if config.getoption("local") else "fork"
+            config._gas_benchmark = GasBenchmark(mode, config.getoption("gas_tolerance"))
+        config._gas_benchmark.merge(results)
+
+
+@pytest.hookimpl(optionalhook=True, tryfirst=True)
+def pytest_xdist_make_scheduler(config, log):
+    from scripts.xdist_scheduler import DurationScheduling
+
+    return DurationScheduling(config, log)
+
+
+def pytest_runtest_logreport(report):
+    # module scoped setup is included, as it is reported with the first test of each module
+    module = report.nodeid.split("::")[0]
+    MODULE_DURATIONS[module] = MODULE_DURATIONS.get(module, 0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    # with xdist, the controller receives the reports from every worker
+    if config.getoption("store_durations") and not hasattr(config, "workerinput"):
+        from scripts.xdist_scheduler import store_durations
+
+        store_durations({k: round(v, 3) for k, v in MODULE_DURATIONS.items()})
+
+    benchmark = getattr(config, "_gas_benchmark", None)
+    if benchmark is not None and config.getoption("update_gas_baseline") and not hasattr(config, "workerinput"):
+        benchmark.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    benchmark = getattr(config, "_gas_benchmark", None)
+    if benchmark is not None and benchmark.results:
+        terminalreporter.section("gas benchmarks")
+        for line in benchmark.format_table():
+            terminalreporter.write_line(line)
+
+    curves = getattr(config, "_gas_curves", None)
+    if curves is not None and curves.curves:
+        terminalreporter.section("gas curves")
+        for line in curves.summary():
+            terminalreporter.write_line(line)
+
+    proxy = getattr(config, "_rpc_cache_proxy", None)
+    if proxy is not None:
+        cache = proxy.cache
+        terminalreporter.write_line(f"rpc-cache: {cache.hits} hits, {cache.misses} misses ({cache.root})")
+
+
+def _enable_rpc_cache(config):
+    # route the fork through a caching proxy by rewriting the fork setting of the
+    # active network, before brownie connects to it
+    from scripts.rpc_cache import start_proxy
+
+    network_id = (config.getoption("network") or [CONFIG.settings["networks"]["default"]])[0]
+    network = CONFIG.networks[network_id]
+    cmd_settings = network["cmd_settings"]
+    fork = cmd_settings["fork"]
+    if fork in CONFIG.networks:
+        # normally brownie resolves these from the forked network on connect
+        fork_settings = CONFIG.networks[fork]
+        network["chainid"] = fork_settings["chainid"]
+        cmd_settings.setdefault("chain_id", int(fork_settings["chainid"]))
+        if "explorer" in fork_settings:
+            network["explorer"] = fork_settings["explorer"]
+        fork = fork_settings["host"]
+
+    if "rpc_cache_fork" in getattr(config, "workerinput", {}):
+        # xdist worker, the proxy is already running within the controller
+        cmd_settings["fork"] = config.workerinput["rpc_cache_fork"]
+        return
+
+    proxy, cmd_settings["fork"] = start_proxy(os.path.expandvars(fork), config.getoption("rpc_cache"))
+    config._rpc_cache_proxy = proxy
+    config._rpc_cache_fork = cmd_settings["fork"]
+
+
+@pytest.fixture(scope="session")
+def is_local(request):
+    return request.config.getoption("local")
+
+
+@pytest.fixture(scope="session")
+def start_time(is_local):
+    # every module reverts to the session snapshot, and so begins in the first week
+    if is_local:
+        return chain.time() // WEEK * WEEK
+    return START_TIME
+
+
+# isolation
+#
+# The full system is deployed and wired once per session and snapshotted. Each
+# module reverts to this snapshot before its own module scoped fixtures run, and
+# `fn_isolation` then snapshots on top of them so that each test reverts to the
+# state left by its module's setup.
+#
+# Session scoped fixtures must not change chain state after the snapshot has been
+# taken, or the change is lost when the next module reverts. Fixtures that deploy
+# per-module contracts (`token_ust`, `zap`, `fee1`, `fee2`) or send transactions
+# (`signer`) are module scoped. Multicall2 is deployed by `dotdot_setup`, tests must
+# use it rather than deploying their own.
+
+@pytest.fixture(scope="session")
+def session_snapshot(dotdot_setup, depx_swap):
+    # stored in a list so that `module_isolation` can replace the consumed id
+    return [rpc.Rpc().snapshot()]
+
+
+@pytest.fixture(scope="module")
+def module_isolation(session_snapshot):
+    """
+    Overrides the `module_isolation` fixture from brownie, which resets the chain
+    and so requires every module to redeploy the entire system.
+    """
+    session_snapshot[0] = chain._revert(session_snapshot[0])
+    yield
+
 
 @pytest.fixture(autouse=True)
 def isolation_setup(dotdot_setup, fn_isolation):
     chain.snapshot()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(autouse=True)
+def gas_profile(request, fn_isolation):
+    # requires `fn_isolation` so that transactions are profiled before the chain reverts
+    output = request.config.getoption("gas_profile")
+    start = len(history)
+    yield
+    if output and len(history) > start:
+        from scripts.gas_profiler import write_profiles
+
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", request.node.nodeid)
+        write_profiles(history[start:], output, name)
+
+
+@pytest.fixture(scope="session")
 def ellipsis_setup(eps_voter, factory, epx, eps_locker, eps_staker, eps_fee_distro, token_3eps, token_abnb, eps_admin):
     eps_voter.setLpStaking(eps_staker, [token_3eps, token_abnb], {'from': eps_admin})
     factory.set_fee_receiver(eps_fee_distro, {'from': eps_admin})
@@ -36,7 +271,7 @@ def ellipsis_setup(eps_voter, factory, epx, eps_locker, eps_staker, eps_fee_dist
     token_abnb.setDepositContract(eps_staker, True, {'from': eps_admin})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def dotdot_setup(ellipsis_setup, EmergencyBailout, DepositToken, bonded_distro, core_incentives, ddd_distro, ddd_lp_staker, ddd, voter, proxy, early_incentives, depx, staker, locker, ddd_pool, depx_pool, deployer):
     ddd.setMinters([staker, early_incentives, core_incentives, ddd_lp_staker], {'from': deployer})
 
@@ -54,9 +289,17 @@ def dotdot_setup(ellipsis_setup, EmergencyBailout, DepositToken, bonded_distro,
     staker.setAddresses(ddd, depx, proxy, bonded_distro, ddd_distro, ddd_lp_staker, deposit_token, depx_pool, {'from': deployer})
     locker.setAddresses(ddd, {'from': deployer})
 
+    # `brownie.multicall` deploys Multicall2 on first use and caches the address in the
+    # network config. Deploying it here places it before the session snapshot, so that
+    # no module or test reverts it while the cached address is still in use.
+    if not web3.eth.get_code(CONFIG.active_network.get("multicall2") or ZERO_ADDRESS):
+        multicall.deploy({'from': deployer})
+
 
 @pytest.fixture(scope="session")
-def wbnb():
+def wbnb(is_local, LocalWBNB, deployer):
+    if is_local:
+        return LocalWBNB.deploy({'from': deployer})
     return Contract('0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c')
 
 
@@ -68,12 +311,16 @@ def eps_admin(factory):
 
 
 @pytest.fixture(scope="session")
-def locker1(accounts):
+def locker1(accounts, is_local):
+    if is_local:
+        return accounts[8]
     return accounts.at('0xb01ea75e8eed3a073b39567c8e9b2c392b273531', True)
 
 
 @pytest.fixture(scope="session")
-def locker2(accounts):
+def locker2(accounts, is_local):
+    if is_local:
+        return accounts[9]
     return accounts.at('0x5e2859ebd3ca946e5c4eb86dcc7b6501a2b52aba', True)
 
 
@@ -101,40 +348,85 @@ def core_receivers(accounts):
     return accounts[4:8]
 
 
+@pytest.fixture(scope="module")
+def signer(accounts, alice):
+    # local account with a known private key, used for signing permits. Module
+    # scoped, so that the funding transfer is made after the module snapshot.
+    acct = accounts.add()
+    alice.transfer(acct, 10**18)
+    return acct
+
+
 # Ellipsis core/factory deployments
+# with `--local`, these are stand-ins from `contracts/testing`
+
+def _deploy_local_pool(factory, name, symbol, n_coins, deployer):
+    coins = [ERC20() for i in range(n_coins)] + [ZERO_ADDRESS] * (4 - n_coins)
+    tx = factory.deploy_plain_pool(name, symbol, coins, 200, 4000000, 0, 0, {'from': deployer})
+    return interface.IEllipsisPool(tx.return_value)
+
 
 @pytest.fixture(scope="session")
-def factory():
+def factory(is_local, LocalPoolFactory, deployer):
+    if is_local:
+        return LocalPoolFactory.deploy({'from': deployer})
     return Contract('0xf65BEd27e96a367c61e0E06C54e14B16b84a5870')
 
 
 @pytest.fixture(scope="session")
-def epsv1_staker():
+def pancake(is_local, LocalPancakeFactory, deployer):
+    if is_local:
+        return LocalPancakeFactory.deploy({'from': deployer})
+    return Contract('0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73')
+
+
+@pytest.fixture(scope="session")
+def epsv1_staker(is_local, LocalV1EpsStaker, start_time, locker1, locker2, deployer):
+    if is_local:
+        staker = LocalV1EpsStaker.deploy({'from': deployer})
+        for i in range(1, 13):
+            staker.addLock(locker1, i * 10**21, start_time + i * WEEK, {'from': deployer})
+            staker.addLock(locker2, i * 10**20, start_time + i * WEEK, {'from': deployer})
+        return staker
     return Contract('0x4076CC26EFeE47825917D0feC3A79d0bB9a6bB5c')
 
 
 @pytest.fixture(scope="session")
-def swap_3eps():
+def swap_3eps(is_local, factory, deployer):
+    if is_local:
+        return _deploy_local_pool(factory, "Ellipsis.finance BUSD/USDC/USDT", "3EPS", 3, deployer)
     return Contract('0x160caed03795365f3a589f10c379ffa7d75d4e76')
 
 
 @pytest.fixture(scope="session")
-def token_3eps():
+def token_3eps(is_local, LocalLpToken, swap_3eps):
+    if is_local:
+        return LocalLpToken.at(swap_3eps.lp_token())
     return Contract('0xaF4dE8E872131AE328Ce21D909C74705d3Aaf452')
 
 
 @pytest.fixture(scope="session")
-def swap_abnb():
+def swap_abnb(is_local, factory, deployer):
+    if is_local:
+        return _deploy_local_pool(factory, "Ellipsis.finance aBNBc/BNB", "aBNBc", 2, deployer)
     return Contract('0xf0d17f404343D7Ba66076C818c9DC726650E2435')
 
 
 @pytest.fixture(scope="session")
-def token_abnb():
+def token_abnb(is_local, LocalLpToken, swap_abnb, wbnb, eps_admin):
+    if is_local:
+        token = LocalLpToken.at(swap_abnb.lp_token())
+        # the live pool already has one extra reward token
+        token.addReward(wbnb, eps_admin, WEEK, {'from': eps_admin})
+        return token
     return Contract('0xf71A0bCC3Ef8a8c5a28fc1BC245e394A8ce124ec')
 
 
-@pytest.fixture(scope="session")
-def token_ust():
+@pytest.fixture(scope="module")
+def token_ust(is_local, LocalLpToken, factory, deployer):
+    if is_local:
+        swap = _deploy_local_pool(factory, "Ellipsis.finance UST/3EPS", "UST3EPS", 2, deployer)
+        return LocalLpToken.at(swap.lp_token())
     return Contract('0xD67625ad4104dA86c4D9CB054001E899B1b9061B')
 
 
@@ -146,101 +438,126 @@ def Ellipsis():
 
 
 @pytest.fixture(scope="session")
-def epx():
+def epx(is_local, LocalEpx, locker1, locker2, deployer):
+    if is_local:
+        epx = LocalEpx.deploy({'from': deployer})
+        for acct in [locker1, locker2]:
+            epx.mint(acct, LOCAL_LOCKER_BALANCE, {'from': deployer})
+        return epx
     return Contract('0xAf41054C1487b0e5E2B9250C0332eCBCe6CE9d71')
 
 
-@pytest.fixture(scope="module")
-def eps_locker(Ellipsis, epx, epsv1_staker, eps_admin):
-    return Ellipsis.TokenLocker.deploy(epx, epsv1_staker, START_TIME, 52, 88, {'from': eps_admin})
+@pytest.fixture(scope="session")
+def eps_locker(request, is_local, LocalTokenLocker, epx, epsv1_staker, start_time, eps_admin):
+    if is_local:
+        return LocalTokenLocker.deploy(epx, start_time, 52, {'from': eps_admin})
+    Ellipsis = request.getfixturevalue("Ellipsis")
+    return Ellipsis.TokenLocker.deploy(epx, epsv1_staker, start_time, 52, 88, {'from': eps_admin})
 
 
-@pytest.fixture(scope="module")
-def eps_voter(Ellipsis, eps_locker, eps_admin):
-    return Ellipsis.IncentiveVoting.deploy(eps_locker, 254629629629629629584, 30, 250_000_000 * 10 ** 18, {'from': eps_admin})
+@pytest.fixture(scope="session")
+def eps_voter(request, is_local, LocalIncentiveVoting, eps_locker, eps_admin):
+    args = (eps_locker, 254629629629629629584, 30, 250_000_000 * 10 ** 18, {'from': eps_admin})
+    if is_local:
+        return LocalIncentiveVoting.deploy(*args)
+    return request.getfixturevalue("Ellipsis").IncentiveVoting.deploy(*args)
 
 
-@pytest.fixture(scope="module")
-def eps_fee_distro(Ellipsis, eps_locker, eps_admin):
-    return Ellipsis.FeeDistributor.deploy(eps_locker, {'from': eps_admin})
+@pytest.fixture(scope="session")
+def eps_fee_distro(request, is_local, LocalFeeDistributor, eps_locker, eps_admin):
+    if is_local:
+        return LocalFeeDistributor.deploy(eps_locker, {'from': eps_admin})
+    return request.getfixturevalue("Ellipsis").FeeDistributor.deploy(eps_locker, {'from': eps_admin})
 
 
-@pytest.fixture(scope="module")
-def eps_staker(Ellipsis, epx, eps_voter, eps_locker, eps_admin):
-    return Ellipsis.EllipsisLpStaking.deploy(epx, eps_voter, eps_locker, 66000000000000000000000000000, {'from': eps_admin})
+@pytest.fixture(scope="session")
+def eps_staker(request, is_local, LocalLpStaking, epx, eps_voter, eps_locker, eps_admin):
+    args = (epx, eps_voter, eps_locker, 66000000000000000000000000000, {'from': eps_admin})
+    if is_local:
+        return LocalLpStaking.deploy(*args)
+    return request.getfixturevalue("Ellipsis").EllipsisLpStaking.deploy(*args)
 
 
 # DotDot deployments
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def bonded_distro(BondedFeeDistributor, epx, eps_fee_distro, deployer):
     return BondedFeeDistributor.deploy(epx, eps_fee_distro, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def core_incentives(CoreMinter, deployer, core_receivers):
     return CoreMinter.deploy(CORE_MINT_PCT, MAX_DAILY_MINT, CORE_LOCK_WEEKS, core_receivers, [1, 2, 3, 4], {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def ddd_distro(DddIncentiveDistributor, eps_voter, deployer):
     return DddIncentiveDistributor.deploy(eps_voter, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def ddd_lp_staker(DddLpStaker, deployer):
     return DddLpStaker.deploy(DDD_LP_INITIAL_MINT, INITIAL_DEPOSIT_GRACE_PERIOD, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def ddd(DotDot, deployer):
     return DotDot.deploy({'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def voter(DotDotVoting, eps_voter, eps_locker, deployer):
     return DotDotVoting.deploy(eps_voter, eps_locker, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def proxy(EllipsisProxy, epx, eps_locker, eps_staker, eps_fee_distro, eps_voter, deployer):
     return EllipsisProxy.deploy(epx, eps_locker, eps_staker, eps_fee_distro, eps_voter, deployer, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
-def early_incentives(EpxDepositIncentives, epx, epsv1_staker, deployer):
-    return EpxDepositIncentives.deploy(epx, epsv1_staker, EARLY_DEPOSIT_CAP, DDD_MINT_RATIO, START_TIME, {'from': deployer})
+@pytest.fixture(scope="session")
+def early_incentives(EpxDepositIncentives, epx, epsv1_staker, start_time, deployer):
+    return EpxDepositIncentives.deploy(epx, epsv1_staker, EARLY_DEPOSIT_CAP, DDD_MINT_RATIO, start_time, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def depx(LockedEPX, epx, eps_locker, deployer):
     return LockedEPX.deploy(epx, eps_locker, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def staker(LpDepositor, epx, eps_staker, eps_voter, deployer):
     return LpDepositor.deploy(epx, eps_staker, eps_voter, DDD_EARN_RATIO, DDD_LOCK_MULTIPLIER, DDD_LP_PCT, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def locker(TokenLocker, eps_locker, deployer):
     return TokenLocker.deploy(eps_locker, MAX_LOCK_WEEKS, {'from': deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def depx_pool(factory, deployer, epx, depx):
     tx = factory.deploy_plain_pool("DotDot dEPX/EPX", "dEPX/EPX", [depx, epx, ZERO_ADDRESS, ZERO_ADDRESS], 50, 4000000, 3, 3, {'from': deployer})
     return tx.events['PlainPoolDeployed']['lp_token']
 
 
-@pytest.fixture(scope="module")
-def ddd_pool(ddd, wbnb, deployer):
-    pancake = Contract('0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73')
+@pytest.fixture(scope="session")
+def depx_swap(factory, depx_pool):
+    return interface.IEllipsisPool2(factory.pool_list(factory.pool_count() - 1))
+
+
+@pytest.fixture(scope="session")
+def ddd_pool(ddd, wbnb, pancake, deployer):
     pancake.createPair(ddd, wbnb, {'from': deployer})
     pair = pancake.getPair(ddd, wbnb)
     return interface.IUniswapV2Pair(pair)
 
 
+@pytest.fixture(scope="module")
+def zap(LpDepositorZap, dotdot_setup, staker, deployer):
+    return LpDepositorZap.deploy(staker, {'from': deployer})
+
+
 @pytest.fixture(scope="module")
 def fee1():
     return ERC20()
@@ -258,3 +575,49 @@ def advance_week():
         chain.mine(timestamp=target)
 
     return fn
+
+
+@pytest.fixture(scope="session")
+def fund_population(staker, ddd, epx, depx, locker1, token_3eps, token_abnb):
+    """
+    Mint the LP tokens, DDD and dEPX needed to seed a `scripts.seed_state.Population`
+    to `funder`.
+    """
+    tokens = {token.address: token for token in [token_3eps, token_abnb]}
+
+    def fn(population, funder):
+        for pool, amount in population.lp_totals().items():
+            tokens[pool].mint(funder, amount, {'from': tokens[pool].minter()})
+        ddd.mint(funder, population.lock_total(), {'from': staker})
+        epx.approve(depx, 2**256-1, {'from': locker1})
+        depx.deposit(funder, population.bond_total(), False, {'from': locker1})
+
+    return fn
+
+
+@pytest.fixture(scope="session")
+def sign_permit():
+    def fn(token, owner, spender, value, deadline=2**256-1):
+        class Permit(EIP712Message):
+            _name_: "string" = token.name()
+            _version_: "string" = "1"
+            _chainId_: "uint256" = chain.id
+            _verifyingContract_: "address" = token.address
+
+            owner: "address"
+            spender: "address"
+            value: "uint256"
+            nonce: "uint256"
+            deadline: "uint256"
+
+        permit = Permit(
+            owner=owner.address,
+            spender=spender.address,
+            value=value,
+            nonce=token.nonces(owner),
+            deadline=deadline,
+        )
+        signed = owner.sign_message(permit)
+        return deadline, signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big")
+
+    return fn